@@ -0,0 +1,59 @@
+"""Benchmarks for reading, toggling and updating ``pyvenv.cfg`` files."""
+from __future__ import annotations
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+@pytest.mark.parametrize("mode", ["symlink", "replace", "copy"])
+def test_toggle_cfg(benchmark, uno_venv: Path, mode: str, capsys):
+    from oooenv.cmds import manage_env_cfg
+
+    # every call switches to the other profile.
+    manage_env_cfg.toggle_cfg(mode=mode)
+    benchmark(manage_env_cfg.toggle_cfg, mode=mode)
+    capsys.readouterr()
+
+
+def test_read_pyvenv_cfg_large_cold(benchmark, large_cfg: Path):
+    from oooenv.cmds import manage_env_cfg
+    from oooenv.utils import pyvenv_config
+
+    result = benchmark.pedantic(
+        manage_env_cfg.read_pyvenv_cfg, args=(large_cfg.name,), setup=pyvenv_config.clear, rounds=100, warmup_rounds=3
+    )
+    assert result["key_0"] == "value 0 = with equals"
+
+
+def test_read_pyvenv_cfg_large_warm(benchmark, large_cfg: Path):
+    from oooenv.cmds import manage_env_cfg
+
+    manage_env_cfg.read_pyvenv_cfg(large_cfg.name)
+    result = benchmark(manage_env_cfg.read_pyvenv_cfg, large_cfg.name)
+    assert len(result) > 1000
+
+
+def test_update_cfg(benchmark, uno_venv: Path, lo_install: Path, write_uno_cfg, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cmds import manage_env_cfg
+    from oooenv.cmds import updater
+    from oooenv.utils import py_version
+
+    program = lo_install / "program"
+    # get_uno_python_exe() only supports Windows, point it at the fake install.
+    monkeypatch.setattr(manage_env_cfg, "get_uno_python_exe", lambda: str(program / "python"))
+    fnm = uno_venv / "pyvenv_uno.cfg"
+
+    def setup():
+        write_uno_cfg(fnm, program, "3.7.2")
+
+    benchmark.pedantic(updater.update_cfg, setup=setup, rounds=100, warmup_rounds=3)
+    assert "3.8.16.final.0" in fnm.read_text()
+    # the version comes from the install layout, python is never spawned.
+    assert py_version.get_spawn_count() == 0
+    capsys.readouterr()
@@ -0,0 +1,42 @@
+"""Benchmarks for cloning a virtual environment the size of one with a few large packages installed."""
+from __future__ import annotations
+import sys
+import shutil
+import pytest
+from pathlib import Path
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix virtual environment layout")
+
+# files in site-packages, spread over packages of FILES_PER_DIR files.
+FILES = 10_000
+FILES_PER_DIR = 50
+
+
+@pytest.fixture()
+def large_venv(uno_venv: Path) -> Path:
+    """``uno_venv`` with :py:data:`FILES` modules in ``site-packages`` and an ``activate`` script."""
+    site = next((uno_venv / "lib").glob("python*/site-packages"))
+    for i in range(FILES // FILES_PER_DIR):
+        pkg = site / f"pkg_{i}"
+        pkg.mkdir()
+        for j in range(FILES_PER_DIR):
+            (pkg / f"mod_{j}.py").write_text(f"VALUE = {j}\n")
+    (uno_venv / "bin" / "activate").write_text(f"VIRTUAL_ENV='{uno_venv}'\nexport VIRTUAL_ENV\n")
+    return uno_venv
+
+
+@pytest.mark.parametrize("strategy", ["hardlink", "auto"])
+def test_clone(benchmark, large_venv: Path, tmp_path: Path, strategy: str):
+    from oooenv.cmds import clone
+
+    dst = tmp_path / "clone"
+
+    def setup():
+        shutil.rmtree(dst, ignore_errors=True)
+
+    result = benchmark.pedantic(clone.clone, args=(large_venv, dst, strategy), setup=setup, rounds=5, warmup_rounds=1)
+    assert result.files >= FILES
+    assert result.strategy != "copy"
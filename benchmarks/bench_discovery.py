@@ -0,0 +1,71 @@
+"""
+LibreOffice discovery benchmarks.
+
+Each lookup is measured three ways:
+
+- ``cold``: nothing memoized and no disk cache, the full probe runs.
+- ``disk``: a new process with a valid disk cache, only the recorded stamps are checked.
+- ``warm``: memoized in the running process.
+"""
+from __future__ import annotations
+import sys
+import pytest
+from pathlib import Path
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+LOOKUPS = ["get_uno_path", "get_lo_path", "get_soffice_install_path"]
+
+
+def _forget_memo() -> None:
+    from oooenv.utils import resolver
+
+    resolver.get_resolver().clear()
+
+
+def _new_process() -> None:
+    # a new process has nothing memoized and has not loaded the disk cache file yet.
+    from oooenv.utils import uno_paths
+
+    _forget_memo()
+    uno_paths._DISCOVERY_CACHE = uno_paths.DiskCache("discovery")
+
+
+def _cold() -> None:
+    from oooenv.utils import uno_paths
+
+    _forget_memo()
+    uno_paths._DISCOVERY_CACHE.clear()
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS)
+def test_discovery_cold(benchmark, lo_install: Path, lookup: str):
+    from oooenv.utils import uno_paths
+
+    func = getattr(uno_paths, lookup)
+    result = benchmark.pedantic(func, setup=_cold, rounds=200, warmup_rounds=5)
+    assert lo_install in result.parents or result == lo_install
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS)
+def test_discovery_disk(benchmark, lo_install: Path, lookup: str, monkeypatch):
+    from oooenv.utils import uno_paths
+
+    monkeypatch.setattr(uno_paths, "_DISCOVERY_CACHE", uno_paths.DiskCache("discovery"))
+    func = getattr(uno_paths, lookup)
+    func()
+    result = benchmark.pedantic(func, setup=_new_process, rounds=200, warmup_rounds=5)
+    assert lo_install in result.parents or result == lo_install
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS)
+def test_discovery_warm(benchmark, lo_install: Path, lookup: str):
+    from oooenv.utils import uno_paths
+
+    func = getattr(uno_paths, lookup)
+    func()
+    result = benchmark(func)
+    assert lo_install in result.parents or result == lo_install
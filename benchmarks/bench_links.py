@@ -0,0 +1,55 @@
+"""Benchmarks for adding and removing the uno links in a virtual environment."""
+from __future__ import annotations
+import sys
+import pytest
+from pathlib import Path
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Symlinks need privileges on Windows")
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+def _unlink_all(site: Path) -> None:
+    from oooenv.utils.link_manifest import DEFAULT_MANIFEST
+
+    for name in (e.name for e in DEFAULT_MANIFEST):
+        try:
+            (site / name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def test_add_links(benchmark, venv: Path, lo_install: Path, capsys):
+    from oooenv.cmds import uno_lnk
+
+    site = _site_packages(venv)
+    # discovery is measured by bench_discovery, keep it memoized here.
+    uno_lnk.add_links()
+    benchmark.pedantic(uno_lnk.add_links, setup=lambda: _unlink_all(site), rounds=200, warmup_rounds=5)
+    assert (site / "uno.py").is_symlink()
+    assert (site / "unohelper.py").is_symlink()
+    capsys.readouterr()
+
+
+def test_remove_links(benchmark, venv: Path, lo_install: Path, capsys):
+    from oooenv.cmds import uno_lnk
+
+    site = _site_packages(venv)
+    uno_lnk.add_links()
+    benchmark.pedantic(uno_lnk.remove_links, setup=uno_lnk.add_links, rounds=200, warmup_rounds=5)
+    assert not (site / "uno.py").exists()
+    capsys.readouterr()
+
+
+def test_relink_up_to_date(benchmark, venv: Path, lo_install: Path):
+    from oooenv.session import OooEnv
+
+    env = OooEnv()
+    env.link()
+    result = benchmark(env.link)
+    assert result.messages == ("7 up to date",)
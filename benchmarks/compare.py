@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Compares a benchmark run with the stored baseline.
+
+Usage::
+
+    python -m pytest benchmarks --benchmark-json=bench.json
+    python benchmarks/compare.py bench.json
+    python benchmarks/compare.py bench.json --threshold 25 --stat median
+    python benchmarks/compare.py bench.json --save-baseline
+
+Exits with ``1`` when any benchmark is slower than the baseline by more than the threshold.
+"""
+from __future__ import annotations
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Union
+
+BASELINE = Path(__file__).parent / "baseline.json"
+STATS = ("min", "median", "mean")
+
+
+class Comparison(NamedTuple):
+    name: str
+    base: Union[float, None]
+    current: Union[float, None]
+
+    @property
+    def change(self) -> Union[float, None]:
+        """Gets relative change in percent. Positive is slower."""
+        if not self.base or self.current is None:
+            return None
+        return (self.current - self.base) / self.base * 100.0
+
+
+def load_stats(fnm: Union[str, Path], stat: str) -> Dict[str, float]:
+    """
+    Loads one statistic per benchmark from a ``pytest-benchmark`` JSON file or a baseline file.
+
+    Args:
+        fnm (str | Path): JSON file.
+        stat (str): statistic such as ``median``.
+
+    Returns:
+        Dict[str, float]: seconds keyed by benchmark full name.
+    """
+    with open(fnm, "r") as file:
+        data = json.load(file)
+    return {bench["fullname"]: float(bench["stats"][stat]) for bench in data.get("benchmarks", [])}
+
+
+def compare(base: Dict[str, float], current: Dict[str, float]) -> List[Comparison]:
+    """
+    Pairs baseline and current values by benchmark name.
+
+    Args:
+        base (Dict[str, float]): baseline values.
+        current (Dict[str, float]): current values.
+
+    Returns:
+        List[Comparison]: one entry per benchmark found in either.
+    """
+    names = sorted(set(base) | set(current))
+    return [Comparison(name=name, base=base.get(name, None), current=current.get(name, None)) for name in names]
+
+
+def get_regressions(results: List[Comparison], threshold: float) -> List[Comparison]:
+    """
+    Gets benchmarks that are slower than the baseline by more than ``threshold`` percent.
+
+    Args:
+        results (List[Comparison]): compared results.
+        threshold (float): allowed slow down in percent.
+
+    Returns:
+        List[Comparison]: regressions.
+    """
+    return [r for r in results if r.change is not None and r.change > threshold]
+
+
+def save_baseline(src: Union[str, Path], dst: Union[str, Path] = BASELINE) -> None:
+    """
+    Stores the statistics of a ``pytest-benchmark`` JSON file as the baseline.
+
+    Only names and statistics are kept so the baseline stays small and readable.
+
+    Args:
+        src (str | Path): ``pytest-benchmark`` JSON file.
+        dst (str | Path, optional): baseline file. Defaults to ``benchmarks/baseline.json``.
+    """
+    with open(src, "r") as file:
+        data = json.load(file)
+    machine = data.get("machine_info", {})
+    baseline = {
+        "machine_info": {
+            k: machine.get(k, "") for k in ("machine", "system", "python_implementation", "python_version")
+        },
+        "datetime": data.get("datetime", ""),
+        "benchmarks": [
+            {
+                "fullname": bench["fullname"],
+                "stats": {k: bench["stats"][k] for k in ("min", "median", "mean", "stddev", "rounds")},
+            }
+            for bench in data.get("benchmarks", [])
+        ],
+    }
+    with open(dst, "w") as file:
+        json.dump(baseline, file, indent=1)
+        file.write("\n")
+
+
+def _fmt_us(value: Union[float, None]) -> str:
+    return "-" if value is None else f"{value * 1_000_000:,.1f}"
+
+
+def render(results: List[Comparison], threshold: float) -> str:
+    """
+    Renders compared results as a table, times in microseconds.
+
+    Args:
+        results (List[Comparison]): compared results.
+        threshold (float): allowed slow down in percent. Rows above it are marked.
+
+    Returns:
+        str: table.
+    """
+    width = max([len(r.name) for r in results] + [9])
+    lines = [f"{'benchmark':<{width}}  {'base us':>12}  {'now us':>12}  {'change':>8}"]
+    for r in results:
+        change = r.change
+        change_str = "-" if change is None else f"{change:+.1f}%"
+        flag = "  REGRESSION" if change is not None and change > threshold else ""
+        lines.append(f"{r.name:<{width}}  {_fmt_us(r.base):>12}  {_fmt_us(r.current):>12}  {change_str:>8}{flag}")
+    return "\n".join(lines)
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compares a pytest-benchmark JSON file with the baseline.")
+    parser.add_argument("current", help="JSON written by pytest --benchmark-json")
+    parser.add_argument("--baseline", default=str(BASELINE), help="Baseline file. Default: %(default)s")
+    parser.add_argument(
+        "--threshold", type=float, default=25.0, help="Allowed slow down in percent. Default: %(default)s"
+    )
+    parser.add_argument("--stat", choices=STATS, default="median", help="Statistic to compare. Default: %(default)s")
+    parser.add_argument("--save-baseline", action="store_true", help="Store current as the new baseline and exit.")
+    args = parser.parse_args(argv)
+
+    if args.save_baseline:
+        save_baseline(args.current, args.baseline)
+        print(f"Saved baseline: {args.baseline}")
+        return 0
+
+    results = compare(load_stats(args.baseline, args.stat), load_stats(args.current, args.stat))
+    print(render(results, args.threshold))
+    regressions = get_regressions(results, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold}% ({args.stat}).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
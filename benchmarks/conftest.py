@@ -0,0 +1,139 @@
+"""
+Fixtures for the benchmark suite.
+
+Benchmarks run against generated LibreOffice install trees and virtual environments so
+results do not depend on what is installed on the machine running them.
+"""
+import os
+import sys
+import pytest
+from pathlib import Path
+
+# number of unrelated files in the fake program dir. A real LibreOffice program dir has several hundred.
+PROGRAM_FILLER = 600
+# number of keys in the large cfg file.
+LARGE_CFG_KEYS = 2000
+LO_PY_VER = "3.8.16"
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path_factory, monkeypatch):
+    """Keeps every benchmark away from the user cache and from state cached by earlier benchmarks."""
+    from oooenv.utils import uno_paths, py_version, pyvenv_config, resolver, timings
+
+    cache_dir = tmp_path_factory.mktemp("oooenv_cache")
+    monkeypatch.setenv("OOOENV_CACHE_DIR", str(cache_dir))
+    for name in ("OOOENV_NO_CACHE", "OOOENV_CACHE_REFRESH", "OOOENV_SWITCH_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(resolver, "_RESOLVER", resolver.PathResolver())
+    monkeypatch.setattr(uno_paths, "_DISCOVERY_CACHE", uno_paths.DiskCache("discovery"))
+    monkeypatch.setattr(py_version, "_MEM_CACHE", {})
+    monkeypatch.setattr(py_version, "_INSTALL_CACHE", {})
+    monkeypatch.setattr(py_version, "_DISK_CACHE", py_version.DiskCache("py_version"))
+    py_version.reset_spawn_count()
+    pyvenv_config.clear()
+    timings.enable(False)
+    return cache_dir
+
+
+@pytest.fixture()
+def lo_install(tmp_path: Path, monkeypatch) -> Path:
+    """
+    Creates a fake LibreOffice install with python ``3.8.16`` and puts a ``soffice`` link to it on ``PATH``.
+
+    ``ODEV_CONN_SOFFICE`` is set to the fake ``soffice`` so cfg commands see it as the LibreOffice in use.
+
+    Returns:
+        Path: install dir, ``<tmp>/opt/libreoffice``.
+    """
+    install = tmp_path / "opt" / "libreoffice"
+    program = install / "program"
+    program.mkdir(parents=True)
+    soffice = program / "soffice"
+    soffice.write_text("#!/bin/sh\nexit 0\n")
+    soffice.chmod(0o755)
+    python = program / "python"
+    python.write_text(f'#!/bin/sh\necho "Python {LO_PY_VER}"\n')
+    python.chmod(0o755)
+    (program / f"python-core-{LO_PY_VER}" / "lib").mkdir(parents=True)
+    (program / "libpython3.8.so.1.0").write_bytes(b"")
+    (program / "bootstraprc").write_text("[Bootstrap]\nProductKey=LibreOffice 7.6\n")
+    (program / "versionrc").write_text("[Version]\nbuildid=e19e193f88cd6c0525a17fb7a176ed8e6a3e2aa1\n")
+    (program / "uno.py").write_text("# fake uno\n")
+    (program / "unohelper.py").write_text("# fake unohelper\n")
+    for name in ("scriptforge.py", "officehelper.py", "pythonscript.py", "mailmerge.py", "msgbox.py"):
+        (program / name).write_text(f"# fake {name}\n")
+    for i in range(PROGRAM_FILLER):
+        (program / f"libfiller{i}.so").write_bytes(b"")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    os.symlink(soffice, bin_dir / "soffice")
+    # a few more PATH entries in front so which() has something to search.
+    path_dirs = []
+    for i in range(8):
+        d = tmp_path / f"path{i}"
+        d.mkdir()
+        path_dirs.append(str(d))
+    path_dirs.append(str(bin_dir))
+    monkeypatch.setenv("PATH", os.pathsep.join(path_dirs))
+    monkeypatch.setenv("ODEV_CONN_SOFFICE", str(soffice))
+    for name in ("OOOENV_LO_PROGRAM_PATH", "OOOENV_LO_UNO_PATH", "OOOENV_LO_PY_EXE"):
+        monkeypatch.delenv(name, raising=False)
+    return install
+
+
+@pytest.fixture()
+def venv(tmp_path: Path, monkeypatch) -> Path:
+    """
+    Creates a fake virtual environment and makes it the active one.
+
+    Returns:
+        Path: venv dir containing ``pyvenv.cfg`` and ``lib/pythonX.Y/site-packages``.
+    """
+    venv = tmp_path / "venv"
+    site = venv / "lib" / f"python{sys.version_info[0]}.{sys.version_info[1]}" / "site-packages"
+    site.mkdir(parents=True)
+    (venv / "bin").mkdir()
+    (venv / "pyvenv.cfg").write_text("home = /usr/bin\ninclude-system-site-packages = false\nversion = 3.11.7\n")
+    monkeypatch.setenv("VIRTUAL_ENV", str(venv))
+    for name in ("OOOENV_VIRTUAL_ENV", "OOOENV_SITE_PACKAGES"):
+        monkeypatch.delenv(name, raising=False)
+    return venv
+
+
+@pytest.fixture()
+def uno_venv(venv: Path, lo_install: Path) -> Path:
+    """Virtual environment that has ``pyvenv_orig.cfg`` and ``pyvenv_uno.cfg`` profiles for ``lo_install``."""
+    _write_uno_cfg(venv / "pyvenv_uno.cfg", lo_install / "program", LO_PY_VER)
+    (venv / "pyvenv_orig.cfg").write_text((venv / "pyvenv.cfg").read_text())
+    return venv
+
+
+@pytest.fixture()
+def large_cfg(venv: Path) -> Path:
+    """``pyvenv_large.cfg`` with many keys, comments and blank lines."""
+    lines = ["# generated for benchmarks", ""]
+    for i in range(LARGE_CFG_KEYS):
+        if i % 10 == 0:
+            lines.append(f"# section {i // 10}")
+        lines.append(f"key_{i} = value {i} = with equals  # inline comment {i}")
+        if i % 50 == 0:
+            lines.append("")
+    fnm = venv / "pyvenv_large.cfg"
+    fnm.write_text("\n".join(lines) + "\n")
+    return fnm
+
+
+@pytest.fixture()
+def write_uno_cfg():
+    """Gets a function that writes a uno profile: ``write_uno_cfg(fnm, program_dir, py_ver)``."""
+    return _write_uno_cfg
+
+
+def _write_uno_cfg(fnm: Path, program: Path, ver: str) -> None:
+    """Writes a uno profile for LibreOffice ``program`` dir using python version ``ver``."""
+    fnm.write_text(
+        f"home = {program}\nimplementation = CPython\nversion_info = {ver}.final.0\n"
+        f"include-system-site-packages = false\nbase-prefix = {program}/python-core-{ver}\n"
+        f"base-exec-prefix = {program}/python-core-{ver}\nbase-executable = {program}/python\n"
+    )
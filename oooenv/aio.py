@@ -0,0 +1,293 @@
+"""
+asyncio API.
+
+LibreOffice python is probed with :py:func:`oooenv.utils.probe.run_async` and a timeout. Discovery and the
+filesystem work of :py:class:`~oooenv.session.OooEnv` run in the default executor of the loop.
+A semaphore bounds how many operations run at once, so one event loop can configure hundreds of
+virtual environments without starting hundreds of threads or processes.
+
+Example:
+    .. code-block:: python
+
+        import asyncio
+        from oooenv import aio
+
+        async def main(venvs):
+            results = await aio.map_envs(venvs, lambda env: env.link(), limit=32)
+            for result in results:
+                print(result)
+
+        asyncio.run(main(["/srv/a/.venv", "/srv/b/.venv"]))
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import subprocess
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple, TypeVar, Union
+
+from .results import LinkResult, PipEResult, ToggleResult, UpdateResult
+from .session import OooEnv, PathLike
+from .utils import probe
+from .utils import py_version
+from .utils import uno_paths
+from .utils.py_version import Version
+
+T = TypeVar("T")
+
+DEFAULT_LIMIT = 16
+"""Operations :py:func:`map_envs` runs at once when no limit is given."""
+DEFAULT_TIMEOUT = 30.0
+"""Seconds to wait for ``python --version``."""
+
+# (loop, executable identity) -> probe in progress. Sessions probing the same python share one spawn.
+_INFLIGHT: Dict[Tuple[int, Tuple[str, int, int]], "asyncio.Future[Version]"] = {}
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking function in the default executor of the running loop.
+
+    Args:
+        func (Callable[..., T]): Function to run.
+
+    Returns:
+        T: Result of ``func``.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+# region Version probing
+async def get_version(python_exe: Union[PathLike, str], timeout: float = DEFAULT_TIMEOUT) -> Version:
+    """
+    Gets the version of a python executable.
+
+    Uses the same memory and disk cache as :py:func:`oooenv.utils.py_version.get_version`.
+    Concurrent calls for the same executable share one spawn.
+
+    Args:
+        python_exe (str | PathLike): path to python executable.
+        timeout (float, optional): Seconds to wait for the executable to answer. Defaults to :py:data:`DEFAULT_TIMEOUT`.
+
+    Raises:
+        FileNotFoundError: If ``python_exe`` does not exist.
+        TimeoutError: If ``python_exe`` did not answer in time. It is killed.
+        subprocess.CalledProcessError: If ``python_exe`` exited with an error.
+
+    Returns:
+        Version: python version.
+    """
+    exe = str(python_exe)
+
+    def lookup() -> Tuple[Tuple[str, int, int], Union[Version, None]]:
+        identity = py_version._get_identity(exe)
+        return identity, py_version._get_cached(identity)
+
+    identity, ver = await run_blocking(lookup)
+    if ver is not None:
+        return ver
+    key = (id(asyncio.get_running_loop()), identity)
+    flight = _INFLIGHT.get(key, None)
+    if flight is None:
+        flight = asyncio.ensure_future(_spawn_version(exe, identity, timeout))
+        _INFLIGHT[key] = flight
+        flight.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    # a cancelled caller does not cancel the spawn other callers wait for.
+    return await asyncio.shield(flight)
+
+
+async def _spawn_version(python_exe: str, identity: Tuple[str, int, int], timeout: float) -> Version:
+    py_version._count_spawn()
+    try:
+        result = await probe.run_async([python_exe, "--version"], timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"{python_exe} did not report its version within {timeout} seconds") from None
+    ver = py_version._parse_version_output(result.check().stdout)
+    await run_blocking(py_version._put_cached, identity, ver)
+    return ver
+
+
+async def resolve_version(
+    program_dir: PathLike, python_exe: Union[PathLike, str], timeout: float = DEFAULT_TIMEOUT
+) -> Version:
+    """
+    Gets LibreOffice python version trying the install layout first. See :py:func:`oooenv.utils.py_version.resolve_version`.
+
+    Args:
+        program_dir (str | PathLike): LibreOffice program directory.
+        python_exe (str | PathLike): LibreOffice python executable. Only spawned if the install layout
+            does not tell the version.
+        timeout (float, optional): Seconds to wait for the executable to answer. Defaults to :py:data:`DEFAULT_TIMEOUT`.
+
+    Returns:
+        Version: python version.
+    """
+    if ver := await run_blocking(py_version.get_version_from_install, program_dir):
+        return ver
+    return await get_version(python_exe, timeout=timeout)
+
+
+# endregion Version probing
+
+
+# region Discovery
+async def get_soffice_install_path() -> Path:
+    """Async :py:func:`oooenv.utils.uno_paths.get_soffice_install_path`."""
+    return await run_blocking(uno_paths.get_soffice_install_path)
+
+
+async def get_lo_path() -> Path:
+    """Async :py:func:`oooenv.utils.uno_paths.get_lo_path`."""
+    return await run_blocking(uno_paths.get_lo_path)
+
+
+async def get_uno_path() -> Path:
+    """Async :py:func:`oooenv.utils.uno_paths.get_uno_path`."""
+    return await run_blocking(uno_paths.get_uno_path)
+
+
+# endregion Discovery
+
+
+class AsyncOooEnv:
+    """
+    Async :py:class:`~oooenv.session.OooEnv`.
+
+    Each operation holds the semaphore, if one is given, while it runs. Sessions sharing a semaphore
+    run at most as many operations at once as the semaphore allows.
+    """
+
+    def __init__(
+        self,
+        venv_path: Union[PathLike, None] = None,
+        lo_install: Union[PathLike, None] = None,
+        site_packages: Union[PathLike, None] = None,
+        uno_path: Union[PathLike, None] = None,
+        semaphore: Union[asyncio.Semaphore, None] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            venv_path (str | PathLike, optional): Virtual environment. See :py:class:`~oooenv.session.OooEnv`.
+            lo_install (str | PathLike, optional): LibreOffice install dir. Defaults to the discovered install.
+            site_packages (str | PathLike, optional): ``site-packages`` dir. Defaults to the one in ``venv_path``.
+            uno_path (str | PathLike, optional): Directory that contains ``uno.py``.
+            semaphore (asyncio.Semaphore, optional): Limits operations running at once. Defaults to no limit.
+            timeout (float, optional): Seconds to wait for LibreOffice python to report its version.
+        """
+        self.env = OooEnv(venv_path=venv_path, lo_install=lo_install, site_packages=site_packages, uno_path=uno_path)
+        """The session operations run on."""
+        self._semaphore = semaphore
+        self._timeout = timeout
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.env!r})"
+
+    async def _run(self, func: Callable[..., T], *args: Any, probe: bool = False) -> T:
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        try:
+            if probe:
+                await self._probe_version()
+            return await run_blocking(func, *args)
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    async def _probe_version(self) -> None:
+        # probes without blocking the loop so the session does not spawn python itself.
+        # Errors are left for the session to raise if it really needs the version.
+        try:
+            exe = await run_blocking(lambda: self.env.lo_python_exe)
+            ver = await resolve_version(exe.parent, exe, timeout=self._timeout)
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            if isinstance(e, TimeoutError):
+                raise
+            return
+        self.env._put("lo_python_version", ver)
+
+    # region Paths
+    async def site_packages(self) -> Union[Path, None]:
+        """Gets ``site-packages`` of the virtual environment. ``None`` if not found."""
+        return await self._run(lambda: self.env.site_packages)
+
+    async def uno_path(self) -> Path:
+        """Gets the directory that contains ``uno.py``."""
+        return await self._run(lambda: self.env.uno_path)
+
+    async def lo_program_path(self) -> Path:
+        """Gets LibreOffice ``program`` dir."""
+        return await self._run(lambda: self.env.lo_program_path)
+
+    async def lo_python_version(self) -> Version:
+        """Gets the version of LibreOffice python."""
+        return await self._run(lambda: self.env.lo_python_version, probe=True)
+
+    # endregion Paths
+
+    # region Operations
+    async def link(
+        self,
+        uno_src_dir: Union[PathLike, None] = None,
+        strategy: str = "",
+        manifest: Union[PathLike, None] = None,
+        mode: str = "links",
+        pyc: str = "",
+    ) -> LinkResult:
+        """Async :py:meth:`OooEnv.link() <oooenv.session.OooEnv.link>`."""
+        return await self._run(self.env.link, uno_src_dir, strategy, manifest, mode, pyc)
+
+    async def unlink(self, manifest: Union[PathLike, None] = None) -> LinkResult:
+        """Async :py:meth:`OooEnv.unlink() <oooenv.session.OooEnv.unlink>`."""
+        return await self._run(self.env.unlink, manifest)
+
+    async def is_uno(self) -> bool:
+        """Async :py:meth:`OooEnv.is_uno() <oooenv.session.OooEnv.is_uno>`."""
+        return await self._run(self.env.is_uno)
+
+    async def toggle(self, suffix: str = "", mode: str = "") -> ToggleResult:
+        """Async :py:meth:`OooEnv.toggle() <oooenv.session.OooEnv.toggle>`."""
+        return await self._run(self.env.toggle, suffix, mode, probe=True)
+
+    async def needs_update(self, fnm: str = "pyvenv_uno.cfg") -> bool:
+        """Async :py:meth:`OooEnv.needs_update() <oooenv.session.OooEnv.needs_update>`."""
+        return await self._run(self.env.needs_update, fnm, probe=True)
+
+    async def update(self, fnm: str = "pyvenv_uno.cfg", mode: str = "") -> UpdateResult:
+        """Async :py:meth:`OooEnv.update() <oooenv.session.OooEnv.update>`."""
+        return await self._run(self.env.update, fnm, mode, probe=True)
+
+    async def pip_e(self) -> PipEResult:
+        """Async :py:meth:`OooEnv.pip_e() <oooenv.session.OooEnv.pip_e>`."""
+        return await self._run(self.env.pip_e)
+
+    # endregion Operations
+
+
+async def map_envs(
+    venv_paths: Iterable[PathLike],
+    func: Callable[[AsyncOooEnv], Awaitable[T]],
+    limit: int = DEFAULT_LIMIT,
+    return_exceptions: bool = True,
+    **kwargs: Any,
+) -> List[Union[T, BaseException]]:
+    """
+    Runs ``func`` for many virtual environments, at most ``limit`` operations at once.
+
+    Args:
+        venv_paths (Iterable[str | PathLike]): Virtual environments.
+        func (Callable[[AsyncOooEnv], Awaitable[T]]): Called with a session for each virtual environment.
+        limit (int, optional): Operations running at once. Defaults to :py:data:`DEFAULT_LIMIT`.
+        return_exceptions (bool, optional): Return errors in place of results instead of raising the first one.
+            Defaults to ``True``.
+        kwargs (Any): Passed on to :py:class:`AsyncOooEnv`, such as ``lo_install``.
+
+    Returns:
+        List[T | BaseException]: Results in the order of ``venv_paths``.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    envs = [AsyncOooEnv(venv_path=pth, semaphore=semaphore, **kwargs) for pth in venv_paths]
+    return list(await asyncio.gather(*(func(env) for env in envs), return_exceptions=return_exceptions))
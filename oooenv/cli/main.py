@@ -1,13 +1,18 @@
 #!/usr/bin/env python
 # coding: utf-8
 from __future__ import annotations
-import importlib.metadata
 import argparse
 import sys
 import os
-from pathlib import Path
-from oooenv.cmds import uno_lnk, manage_env_cfg, updater, install
-from oooenv.utils import local_paths
+import time
+from typing import TYPE_CHECKING, Any, Callable, NoReturn, Union
+
+if TYPE_CHECKING:
+    from oooenv.session import OooEnv
+    from oooenv.utils.lo_registry import LoInstall
+
+# Sub command modules are imported when their command is dispatched.
+# ``oooenv env -u`` is run from shell prompts and git hooks so start up time matters.
 
 
 # region parser
@@ -24,9 +29,85 @@ def _create_parser(name: str) -> argparse.ArgumentParser:
 # region Process Sub Commands
 
 
+def _set_env_site_packages() -> None:
+    from oooenv.utils import local_paths
+
+    os.environ["env-site-packages"] = str(local_paths.get_site_packages_dir())
+
+
+def _get_session(args: argparse.Namespace, **kwargs: Any) -> OooEnv:
+    from oooenv.session import OooEnv
+
+    if args.lo:
+        inst = _select_install(args.lo)
+        kwargs.setdefault("lo_install", inst.install)
+        if inst.uno_path is not None:
+            kwargs.setdefault("uno_path", inst.uno_path)
+    return OooEnv(**kwargs)
+
+
+def _select_install(spec: str) -> LoInstall:
+    from oooenv.utils import lo_registry
+
+    try:
+        return lo_registry.select_install(spec)
+    except (ValueError, FileNotFoundError) as e:
+        _fail("select-install", e)
+
+
+def _emit(op: str, **kwargs: Any) -> None:
+    """Reports an operation in the format chosen with ``--output``. See :py:func:`oooenv.utils.output.emit`."""
+    from oooenv.utils import output
+
+    output.emit(op, **kwargs)
+
+
+def _emit_result(op: str, result: Any, **kwargs: Any) -> None:
+    """Reports a result of :py:mod:`oooenv.results`. See :py:func:`oooenv.utils.output.emit_result`."""
+    from oooenv.utils import output
+
+    output.emit_result(op, result, **kwargs)
+
+
+def _fail(op: str, error: Union[Exception, str], path: Any = None) -> NoReturn:
+    """Reports a failed operation and exits with status ``1``."""
+    _emit(op, path=path, result="error", errors=(str(error),))
+    raise SystemExit(1)
+
+
+def _query(args: argparse.Namespace, op: str, use_daemon: bool = True) -> Any:
+    """Answers a query from the daemon when one is running, otherwise in-process."""
+    if use_daemon and not args.lo:
+        from oooenv.utils import daemon_client
+
+        try:
+            return daemon_client.request(op)
+        except daemon_client.DaemonUnavailable:
+            pass
+    from oooenv.queries import run_op
+
+    return run_op(op, _get_session(args))
+
+
 def _args_process_cmd(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if args.command:
+        _set_env_site_packages()
     if args.command == "cmd-link":
         _args_action_cmd_link(a_parser=a_parser, args=args)
+    elif args.command == "query":
+        _args_action_cmd_query(a_parser=a_parser, args=args)
+    elif args.command == "daemon":
+        _args_action_cmd_daemon(a_parser=a_parser, args=args)
+    elif args.command == "installs":
+        _args_action_cmd_installs(a_parser=a_parser, args=args)
+    elif args.command == "watch":
+        _args_action_cmd_watch(a_parser=a_parser, args=args)
+    elif args.command == "bench-import":
+        _args_action_cmd_bench_import(a_parser=a_parser, args=args)
+    elif args.command == "doctor":
+        _args_action_cmd_doctor(a_parser=a_parser, args=args)
+    elif args.command == "clone":
+        _args_action_cmd_clone(a_parser=a_parser, args=args)
     elif args.command == "env":
         _args_action_cmd_toggle_env(a_parser=a_parser, args=args)
     elif args.command == "info" and sys.platform == "win32":
@@ -60,6 +141,32 @@ def _args_cmd_link(parser: argparse.ArgumentParser) -> None:
         dest="src_dir",
         default=None,
     )
+    add_grp.add_argument(
+        "--mode",
+        help="links places the modules in site-packages. finder writes one oooenv_uno.pth that imports them "
+        "from LibreOffice without any files in site-packages. Defaults to links.",
+        choices=["links", "finder"],
+        dest="mode",
+        default="links",
+    )
+    add_grp.add_argument(
+        "--strategy",
+        help="How files are placed. auto tries symlink, hardlink, reflink and copy in that order. "
+        "hardlink, reflink and copy share one copy per file content in the oooenv store. "
+        "Defaults to OOOENV_LINK_STRATEGY or auto.",
+        choices=["auto", "symlink", "hardlink", "reflink", "copy"],
+        dest="strategy",
+        default="",
+    )
+    add_grp.add_argument(
+        "--pyc",
+        help="How the modules are compiled into site-packages/__pycache__. checked-hash caches are used while "
+        "the source is unchanged, unchecked-hash caches until linked again. Defaults to OOOENV_PYC_INVALIDATION "
+        "or checked-hash.",
+        choices=["checked-hash", "unchecked-hash", "none"],
+        dest="pyc",
+        default="",
+    )
     parser.add_argument(
         "-r",
         "--remove",
@@ -68,19 +175,532 @@ def _args_cmd_link(parser: argparse.ArgumentParser) -> None:
         dest="remove",
         default=False,
     )
+    parser.add_argument(
+        "--manifest",
+        help="File listing modules to link or remove in addition to uno.py, unohelper.py, scriptforge.py, "
+        "officehelper.py, pythonscript.py, mailmerge.py and msgbox.py. Defaults to OOOENV_LINK_MANIFEST.",
+        action="store",
+        dest="manifest",
+        default=None,
+    )
+    gc_grp = parser.add_argument_group()
+    gc_grp.add_argument(
+        "--gc",
+        help="Remove files from the oooenv store that are no longer hard linked from any virtual environment.",
+        action="store_true",
+        dest="gc",
+        default=False,
+    )
+    gc_grp.add_argument(
+        "--dry-run",
+        help="With --gc only list what would be removed.",
+        action="store_true",
+        dest="dry_run",
+        default=False,
+    )
 
 
 def _args_action_cmd_link(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
-    if not (args.add or args.remove):
-        a_parser.error("No action requested, add --add or --remove")
-    if args.add:
-        uno_lnk.add_links(args.src_dir)
-    elif args.remove:
-        uno_lnk.remove_links()
+    if not (args.add or args.remove or args.gc):
+        a_parser.error("No action requested, add --add, --remove or --gc")
+    if args.gc:
+        _store_gc(dry_run=args.dry_run)
+        return
+    session = _get_session(args)
+    op = "link" if args.add else "unlink"
+    start = time.perf_counter()
+    try:
+        if args.add:
+            result = session.link(
+                args.src_dir, strategy=args.strategy, manifest=args.manifest, mode=args.mode, pyc=args.pyc
+            )
+        else:
+            result = session.unlink(manifest=args.manifest)
+    except (FileNotFoundError, ValueError) as e:
+        _fail(op, e)
+    _emit_result(op, result, path=result.site_packages, elapsed=time.perf_counter() - start, summary=result.summary)
+
+
+def _store_gc(dry_run: bool) -> None:
+    from oooenv.utils import link_store
+
+    start = time.perf_counter()
+    result = link_store.gc(dry_run=dry_run)
+    verb = "Would remove" if dry_run else "Removed"
+    text = [f"{verb} {pth}" for pth in result.removed]
+    text.append(f"{verb} {len(result.removed)} file(s), {result.freed} bytes. {result.kept} file(s) in use.")
+    _emit(
+        "gc",
+        path=link_store.get_store_dir(),
+        result="dry-run" if dry_run else "ok",
+        elapsed=time.perf_counter() - start,
+        text=text,
+        removed=result.removed,
+        freed=result.freed,
+        kept=result.kept,
+    )
 
 
 # endregion command link
 
+# region command query
+_QUERY_NAMES = ("status", "is-uno", "uno-path", "lo-path", "lo-install", "lo-python-version", "site-packages")
+
+
+def _args_cmd_query(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "what",
+        help="What to query.",
+        choices=_QUERY_NAMES,
+    )
+    parser.add_argument(
+        "--no-daemon",
+        help="Resolve in-process even when oooenv daemon is running.",
+        action="store_true",
+        dest="no_daemon",
+        default=False,
+    )
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+def _args_action_cmd_query(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from oooenv.utils.daemon_client import DaemonError
+
+    start = time.perf_counter()
+    try:
+        value = _query(args, args.what.replace("-", "_"), use_daemon=not args.no_daemon)
+    except (DaemonError, ValueError, OSError) as e:
+        _fail("query", e)
+    elapsed = time.perf_counter() - start
+    if isinstance(value, dict):
+        errors = value.pop("errors", {})
+        _emit(
+            "query",
+            result="error" if errors else "ok",
+            elapsed=elapsed,
+            text=[f"{key.replace('_', '-')}: {_format_value(val)}" for key, val in value.items()],
+            errors=[f"error {key.replace('_', '-')}: {err}" for key, err in errors.items()],
+            what=args.what,
+            value=value,
+        )
+        return
+    _emit("query", elapsed=elapsed, text=(_format_value(value),), what=args.what, value=value)
+
+
+# endregion command query
+
+
+# region command daemon
+def _args_cmd_daemon(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--socket",
+        help="Socket path. Default OOOENV_DAEMON_SOCKET, or oooenv.sock in XDG_RUNTIME_DIR or the oooenv cache dir.",
+        action="store",
+        dest="socket",
+        default=None,
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        help="Exit after this many seconds without requests. Default 0, never.",
+        action="store",
+        type=float,
+        dest="idle_timeout",
+        default=0.0,
+    )
+    grp = parser.add_mutually_exclusive_group()
+    grp.add_argument(
+        "--stop",
+        help="Stop the running daemon.",
+        action="store_true",
+        dest="stop",
+        default=False,
+    )
+    grp.add_argument(
+        "--status",
+        help="Show if the daemon is running.",
+        action="store_true",
+        dest="status",
+        default=False,
+    )
+
+
+def _args_action_cmd_daemon(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from pathlib import Path
+    from oooenv.utils import daemon_client
+
+    socket_path = Path(args.socket) if args.socket else None
+    if args.stop or args.status:
+        op = "daemon.stop" if args.stop else "daemon.status"
+        path = socket_path or daemon_client.get_socket_path()
+        start = time.perf_counter()
+        try:
+            info = daemon_client.request("shutdown" if args.stop else "ping", socket_path=socket_path)
+        except daemon_client.DaemonUnavailable:
+            _emit(op, path=path, result="not-running", text=("Daemon is not running",))
+            raise SystemExit(1)
+        _emit(
+            op,
+            path=path,
+            result="stopped" if args.stop else "running",
+            elapsed=time.perf_counter() - start,
+            text=(
+                "Daemon stopped" if args.stop else f"Daemon running, pid {info['pid']}, {info['requests']} requests",
+            ),
+            pid=None if args.stop else info["pid"],
+            requests=None if args.stop else info["requests"],
+        )
+        return
+    from oooenv import daemon
+
+    raise SystemExit(daemon.main(socket_path=socket_path, idle_timeout=args.idle_timeout))
+
+
+# endregion command daemon
+
+
+# region command installs
+def _args_cmd_installs(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-s",
+        "--select",
+        help="Only show the install that --lo selects. Default is latest.",
+        action="store_true",
+        dest="select",
+        default=False,
+    )
+
+
+def _args_action_cmd_installs(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from oooenv.utils import lo_registry
+
+    start = time.perf_counter()
+    if args.select or args.lo:
+        installs = (_select_install(args.lo or "latest"),)
+    else:
+        installs = sorted(lo_registry.get_installs(), key=lambda inst: inst.version, reverse=True)
+    elapsed = time.perf_counter() - start
+    if not installs:
+        _emit("installs", result="none", elapsed=elapsed, text=("No LibreOffice install found.",))
+        return
+    for inst in installs:
+        py_ver = inst.python_version or "-"
+        _emit(
+            "installs",
+            path=inst.install,
+            result="found",
+            elapsed=elapsed,
+            text=(f"{inst.version_str:<12} python {py_ver:<8} {inst.install}",),
+            version=inst.version_str,
+            python_version=inst.python_version,
+            uno_path=inst.uno_path,
+        )
+
+
+# endregion command installs
+
+
+# region command watch
+def _args_cmd_watch(parser: argparse.ArgumentParser) -> None:
+    grp = parser.add_mutually_exclusive_group()
+    grp.add_argument(
+        "--add",
+        help="Register a virtual environment, default the active one, for repairs.",
+        nargs="?",
+        const="",
+        dest="add",
+        default=None,
+    )
+    grp.add_argument(
+        "--remove",
+        help="Unregister a virtual environment, default the active one.",
+        nargs="?",
+        const="",
+        dest="remove",
+        default=None,
+    )
+    grp.add_argument(
+        "--list",
+        help="List registered virtual environments.",
+        action="store_true",
+        dest="list",
+        default=False,
+    )
+    grp.add_argument(
+        "--once",
+        help="Repair registered virtual environments now and exit.",
+        action="store_true",
+        dest="once",
+        default=False,
+    )
+    parser.add_argument(
+        "--poll",
+        help="Poll with stat instead of using inotify.",
+        action="store_true",
+        dest="poll",
+        default=False,
+    )
+    parser.add_argument(
+        "--interval",
+        help="Seconds between polls. Default 5.",
+        type=float,
+        dest="interval",
+        default=5.0,
+    )
+    parser.add_argument(
+        "--debounce",
+        help="Seconds without changes before repairs start. Default 2.",
+        type=float,
+        dest="debounce",
+        default=2.0,
+    )
+
+
+def _args_action_cmd_watch(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from oooenv.utils import venv_registry
+
+    if args.add is not None or args.remove is not None:
+        venv = args.add if args.add is not None else args.remove
+        op = "watch.add" if args.add is not None else "watch.remove"
+        if not venv:
+            try:
+                venv = str(_get_session(args).venv_path)
+            except ValueError as e:
+                _fail(op, e)
+        if args.add is not None:
+            added = venv_registry.add(venv)
+            _emit(
+                op,
+                path=venv,
+                result="registered" if added else "exists",
+                text=(f"Registered {venv}" if added else f"Already registered {venv}",),
+            )
+        else:
+            removed = venv_registry.remove(venv)
+            _emit(
+                op,
+                path=venv,
+                result="unregistered" if removed else "absent",
+                text=(f"Unregistered {venv}" if removed else f"Not registered {venv}",),
+            )
+        return
+    if args.list:
+        for venv in venv_registry.load():
+            _emit("watch.list", path=venv, result="registered", text=(str(venv),))
+        return
+    from oooenv import watcher
+
+    if args.once:
+        watcher.repair_all(on_repair=watcher.print_repair)
+        return
+    raise SystemExit(watcher.main(poll=args.poll, interval=args.interval, debounce=args.debounce))
+
+
+# endregion command watch
+
+
+# region command bench import
+def _args_cmd_bench_import(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-n",
+        "--runs",
+        help="Number of cold imports, each in a new interpreter. Default 10.",
+        type=int,
+        dest="runs",
+        default=10,
+    )
+    parser.add_argument(
+        "-m",
+        "--module",
+        help="Module to import. Can be repeated. Default uno and unohelper.",
+        action="append",
+        dest="modules",
+        default=None,
+    )
+    parser.add_argument(
+        "-p",
+        "--python",
+        help="Interpreter to run. Default is the interpreter of the virtual environment.",
+        dest="python_exe",
+        default="",
+    )
+    parser.add_argument(
+        "-t",
+        "--top",
+        help="Number of slowest modules to list. Default 10.",
+        type=int,
+        dest="top",
+        default=10,
+    )
+    if os.name != "nt":
+        parser.add_argument(
+            "-c",
+            "--compare",
+            help="Compare symlink, copy and finder link modes. Links are restored afterwards.",
+            action="store_true",
+            dest="compare",
+            default=False,
+        )
+
+
+def _args_action_cmd_bench_import(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    import subprocess
+    from oooenv.cmds import bench_import
+
+    session = _get_session(args)
+    modules = args.modules or bench_import.DEFAULT_MODULES
+    start = time.perf_counter()
+    try:
+        if getattr(args, "compare", False):
+            results = bench_import.compare_modes(
+                session, python_exe=args.python_exe or None, modules=modules, runs=args.runs
+            )
+            elapsed = time.perf_counter() - start
+            # the table header is printed with the first mode.
+            header, *lines = bench_import.render_compare(results).splitlines()
+            for i, ((mode, res), line) in enumerate(zip(results.items(), lines)):
+                _emit(
+                    "bench-import",
+                    path=res.python_exe,
+                    elapsed=elapsed,
+                    text=(header, line) if i == 0 else (line,),
+                    mode=mode,
+                    **_bench_fields(res),
+                )
+            return
+        result = bench_import.bench(args.python_exe or None, modules, runs=args.runs, site_dir=session.site_packages)
+    except (ValueError, OSError, subprocess.SubprocessError) as e:
+        if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+            _fail("bench-import", e.stderr.strip().splitlines()[-1])
+        _fail("bench-import", e)
+    _emit(
+        "bench-import",
+        path=result.python_exe,
+        elapsed=time.perf_counter() - start,
+        text=(bench_import.render(result, top=args.top),),
+        slowest=[
+            {"name": name, "seconds": secs, "native": native}
+            for name, secs, native in result.get_breakdown()[: args.top]
+        ],
+        **_bench_fields(result),
+    )
+
+
+def _bench_fields(result: Any) -> dict:
+    return {
+        "modules": result.modules,
+        "runs": len(result.samples),
+        "median": result.median,
+        "p95": result.p95,
+        "python_median": result.python_median,
+        "native_median": result.native_median,
+    }
+
+
+# endregion command bench import
+
+# region command doctor
+_DOCTOR_CHECKS = ("install", "uno", "site-packages", "links", "pyvenv", "import")
+
+
+def _args_cmd_doctor(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-c",
+        "--check",
+        help="Check to run. Can be repeated. Default all.",
+        choices=_DOCTOR_CHECKS,
+        action="append",
+        dest="checks",
+        default=None,
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        help="Seconds each check may take. Default 10.",
+        type=float,
+        dest="timeout",
+        default=10.0,
+    )
+
+
+def _args_action_cmd_doctor(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from oooenv.cmds import doctor
+
+    checks = doctor.run(_get_session(args), names=args.checks, timeout=args.timeout)
+    header, *lines = doctor.render(checks)
+    for i, (check, line) in enumerate(zip(checks, lines)):
+        _emit(
+            "doctor",
+            path=check.path,
+            result=check.status,
+            elapsed=check.elapsed,
+            text=(header, line) if i == 0 else (line,),
+            check=check.name,
+            detail=check.detail,
+        )
+    if not all(check.ok for check in checks):
+        raise SystemExit(1)
+
+
+# endregion command doctor
+
+# region command clone
+_CLONE_STRATEGIES = ("auto", "reflink", "hardlink", "copy")
+
+
+def _args_cmd_clone(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "dst",
+        help="Virtual environment to create. Must not exist.",
+        action="store",
+    )
+    parser.add_argument(
+        "-s",
+        "--src",
+        help="Virtual environment to clone. Defaults to the current virtual environment.",
+        action="store",
+        dest="src",
+        default=None,
+    )
+    parser.add_argument(
+        "--strategy",
+        help="How unchanged files are placed. Default auto, reflink where supported, otherwise hardlink.",
+        choices=_CLONE_STRATEGIES,
+        dest="strategy",
+        default="auto",
+    )
+
+
+def _args_action_cmd_clone(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from oooenv.cmds import clone
+    from oooenv.utils import local_paths
+
+    src = args.src or local_paths.get_virtual_env_path()
+    try:
+        result = clone.clone(src, args.dst, strategy=args.strategy)
+    except (ValueError, OSError) as e:
+        _fail("clone", e, path=args.dst)
+    _emit(
+        "clone",
+        path=result.dst,
+        elapsed=result.elapsed,
+        text=result.messages,
+        src=result.src,
+        strategy=result.strategy,
+        files=result.files,
+        copied=result.copied,
+        rewritten=result.rewritten,
+        symlinks=result.symlinks,
+        retargeted=result.retargeted,
+    )
+
+
+# endregion command clone
+
 # region process env commands
 
 
@@ -109,21 +729,33 @@ def _args_cmd_toggle_evn(parser: argparse.ArgumentParser) -> None:
         dest="custom_env",
         required=False,
     )
+    parser.add_argument(
+        "--switch-mode",
+        help="How pyvenv.cfg is switched. symlink and replace are atomic. auto uses symlink where possible, otherwise replace. Default auto.",
+        choices=["auto", "symlink", "replace", "copy"],
+        dest="switch_mode",
+        default="",
+    )
 
 
 def _args_action_cmd_toggle_env(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
     if args.uno_env:
-        if manage_env_cfg.is_env_uno_python():
-            print("UNO Environment")
+        start = time.perf_counter()
+        if _query(args, "is_uno"):
+            _emit("is-uno", result="uno", elapsed=time.perf_counter() - start, text=("UNO Environment",))
         else:
-            print("NOT a UNO Environment")
+            _emit("is-uno", result="not-uno", elapsed=time.perf_counter() - start, text=("NOT a UNO Environment",))
         return
 
-    if args.toggle_env:
-        manage_env_cfg.toggle_cfg()
-        return
-    if args.custom_env:
-        manage_env_cfg.toggle_cfg(suffix=args.custom_env)
+    session = _get_session(args)
+
+    if args.toggle_env or args.custom_env:
+        start = time.perf_counter()
+        if args.toggle_env:
+            result = session.toggle(mode=args.switch_mode)
+        else:
+            result = session.toggle(suffix=args.custom_env, mode=args.switch_mode)
+        _emit_result("toggle", result, path=session.venv_path, elapsed=time.perf_counter() - start)
         return
 
 
@@ -148,27 +780,70 @@ def _args_cmd_update(parser: argparse.ArgumentParser) -> None:
         dest="cfg_update",
         default=False,
     )
+    parser.add_argument(
+        "-a",
+        "--all-profiles",
+        help="Update every LibreOffice cfg profile, pyvenv_*.cfg and pyvenv.cfg when it is active, "
+        "probing LibreOffice python once.",
+        action="store_true",
+        dest="all_profiles",
+        default=False,
+    )
+    parser.add_argument(
+        "--dry-run",
+        help="With --all-profiles only show what would change.",
+        action="store_true",
+        dest="dry_run",
+        default=False,
+    )
 
 
 def _args_action_cmd_update(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
-    if args.uno_up_to_date:
-        if updater.needs_updating():
-            print("Update Needed")
-        else:
-            print("No Update Needed")
+    session = _get_session(args)
+    start = time.perf_counter()
+    if args.all_profiles:
+
+        def on_profile(profile: Any) -> None:
+            if not profile.changes:
+                outcome = "skipped"
+            else:
+                outcome = "would-update" if args.dry_run else "updated"
+            _emit_result("update", profile, path=profile.cfg_file, result=outcome, elapsed=profile.elapsed)
+
+        result = session.update_all(dry_run=args.dry_run, on_profile=on_profile)
+        _emit(
+            "update.all",
+            path=session.venv_path,
+            result="dry-run" if args.dry_run else "ok",
+            elapsed=time.perf_counter() - start,
+            text=result.messages[-1:],
+            new_version=result.new_version,
+            updated=len(result.updated),
+            profiles=len(result.profiles),
+            reactivated=result.reactivated,
+        )
         return
 
-    if args.cfg_update:
-        if not updater.needs_updating():
-            print("No Update Needed")
+    if args.uno_up_to_date or args.cfg_update:
+        needed = session.needs_update()
+        if args.uno_up_to_date or not needed:
+            _emit(
+                "update.check",
+                path=session.venv_path,
+                result="needed" if needed else "current",
+                elapsed=time.perf_counter() - start,
+                text=("Update Needed" if needed else "No Update Needed",),
+            )
             return
-        updater.update_cfg()
-        if manage_env_cfg.is_env_uno_python():
-            # if we are in a uno environment then we need to reload the cfg
-            cfg = manage_env_cfg.read_pyvenv_cfg(fnm="pyvenv_uno.cfg")
-            manage_env_cfg.save_config(cfg=cfg)
-
-        print("Update Complete")
+        # if we are in a uno environment then pyvenv.cfg is switched to the updated cfg again.
+        result = session.update()
+        _emit_result(
+            "update",
+            result,
+            path=result.cfg_file,
+            result="updated" if result.updated else "current",
+            elapsed=time.perf_counter() - start,
+        )
         return
 
 
@@ -189,8 +864,9 @@ def _args_cmd_info_win(parser: argparse.ArgumentParser) -> None:
 
 def _args_action_cmd_info_win(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
     if args.lo_py_version:
-        ver = manage_env_cfg.get_uno_python_ver()
-        print(ver)
+        start = time.perf_counter()
+        value = _query(args, "lo_python_version")
+        _emit("query", elapsed=time.perf_counter() - start, text=(str(value),), what="lo-python-version", value=value)
         return
 
 
@@ -215,19 +891,119 @@ def _args_cmd_global(parser: argparse.ArgumentParser) -> None:
         dest="editable",
         default=False,
     )
+    parser.add_argument(
+        "--no-cache",
+        help="Do not read or write the LibreOffice discovery cache.",
+        action="store_true",
+        dest="no_cache",
+        default=False,
+    )
+    parser.add_argument(
+        "--refresh",
+        help="Ignore cached LibreOffice discovery results and probe again, updating the cache.",
+        action="store_true",
+        dest="refresh_cache",
+        default=False,
+    )
+    parser.add_argument(
+        "--lo",
+        help='LibreOffice install to use when several are installed. "latest" or a version constraint such as ">=7.6". Constraints resolve to major.minor, the full version is usually unknown. See: oooenv installs',
+        action="store",
+        metavar="SPEC",
+        dest="lo",
+        default=None,
+    )
+    parser.add_argument(
+        "--timings",
+        help="Print a tree of timed phases to stderr when done.",
+        action="store_true",
+        dest="timings",
+        default=False,
+    )
+    parser.add_argument(
+        "--timings-json",
+        help="Write the tree of timed phases to this file as JSON when done.",
+        action="store",
+        metavar="JSON_FILE",
+        dest="timings_json",
+        default=None,
+    )
+    parser.add_argument(
+        "--output",
+        help="Output format. json and ndjson write one event per operation as it completes. Default text.",
+        choices=["text", "json", "ndjson"],
+        dest="output",
+        default="text",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Run the command under cProfile and write the stats to this file.",
+        action="store",
+        metavar="OUT_PROF",
+        dest="profile",
+        default=None,
+    )
 
 
-def _args_action_global(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> str | None:
+def _args_action_global(a_parser: argparse.ArgumentParser, args: argparse.Namespace) -> bool:
     # sourcery skip: assign-if-exp, reintroduce-else
+    if args.no_cache:
+        os.environ["OOOENV_NO_CACHE"] = "1"
+    if args.refresh_cache:
+        os.environ["OOOENV_CACHE_REFRESH"] = "1"
     if args.show_version:
-        # return importlib.metadata.version(__package__ or __name__)
-        return importlib.metadata.version("oooenv")
+        if args.output == "text":
+            # oooenv.utils is not imported for --version, see tests/import_budget.json
+            print(_get_version())
+        else:
+            _emit("version", version=_get_version())
+        return True
     if args.editable:
-        if result := install.pip_e():
-            return result
+        from oooenv.session import OooEnv
+        from oooenv.utils import local_paths
+
+        _set_env_site_packages()
+        session = OooEnv(venv_path=local_paths.get_virtual_env_path())
+        start = time.perf_counter()
+        result = session.pip_e()
+        elapsed = time.perf_counter() - start
+        if result.messages:
+            _emit_result("pip-e", result, path=result.pth_file, elapsed=elapsed)
         else:
-            return "Install Failed for unknown reason."
-    return None
+            _emit("pip-e", result="error", elapsed=elapsed, text=("Install Failed for unknown reason.",))
+        return True
+    return False
+
+
+def _get_version() -> str:
+    """
+    Gets the installed version of oooenv.
+
+    Reads the ``Version`` field of the ``oooenv`` dist-info metadata directly.
+    ``importlib.metadata`` takes longer to import than the rest of the cli together,
+    so it is only used when the metadata can not be found on ``sys.path``.
+    """
+    for entry in sys.path:
+        try:
+            names = os.listdir(entry or ".")
+        except OSError:
+            continue
+        for name in names:
+            if not (name.startswith("oooenv-") and name.endswith(".dist-info")):
+                continue
+            try:
+                with open(os.path.join(entry, name, "METADATA"), "r", encoding="utf-8") as file:
+                    for line in file:
+                        if line.startswith("Version:"):
+                            return line.partition(":")[2].strip()
+                        if not line.strip():
+                            # end of headers
+                            break
+            except OSError:
+                continue
+    import importlib.metadata
+
+    return importlib.metadata.version("oooenv")
 
 
 # endregion process arg command for global
@@ -235,9 +1011,39 @@ def _args_action_global(a_parser: argparse.ArgumentParser, args: argparse.Namesp
 # endregion parser
 
 
+def _run_instrumented(args: argparse.Namespace, func: Callable[[], Any]) -> Any:
+    """
+    Runs ``func`` recording timings and profile as requested by ``--timings`` and ``--profile``.
+    """
+    if not (args.timings or args.timings_json or args.profile):
+        return func()
+
+    from oooenv.utils import timings
+
+    if args.timings or args.timings_json:
+        timings.enable()
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    try:
+        with timings.span(f"cli.{args.command or 'global'}"):
+            if profiler is None:
+                return func()
+            return profiler.runcall(func)
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(args.profile)
+        if args.timings:
+            print(timings.render_tree(), file=sys.stderr)
+        if args.timings_json:
+            with open(args.timings_json, "w") as file:
+                file.write(timings.to_json())
+
+
 def main() -> int:
-    os.environ["project_root"] = str(Path(__file__).parent)
-    os.environ["env-site-packages"] = str(local_paths.get_site_packages_dir())
+    os.environ["project_root"] = os.path.dirname(os.path.abspath(__file__))
     parser = _create_parser("main")
     subparser = parser.add_subparsers(dest="command")
 
@@ -245,6 +1051,42 @@ def main() -> int:
     _args_cmd_global(parser=parser)
     # endregion Global
 
+    cmd_query = subparser.add_parser(
+        name="query",
+        help="Query paths and status. Answered by oooenv daemon when it is running.",
+    )
+    _args_cmd_query(parser=cmd_query)
+
+    cmd_installs = subparser.add_parser(
+        name="installs",
+        help="List LibreOffice installs found on this machine.",
+    )
+    _args_cmd_installs(parser=cmd_installs)
+
+    cmd_watch = subparser.add_parser(
+        name="watch",
+        help="Watch LibreOffice and repair registered virtual environments when it is upgraded.",
+    )
+    _args_cmd_watch(parser=cmd_watch)
+
+    cmd_bench_import = subparser.add_parser(
+        name="bench-import",
+        help="Measure how long importing uno takes in the virtual environment.",
+    )
+    _args_cmd_bench_import(parser=cmd_bench_import)
+
+    cmd_doctor = subparser.add_parser(
+        name="doctor",
+        help="Check the virtual environment and LibreOffice install, all checks at once.",
+    )
+    _args_cmd_doctor(parser=cmd_doctor)
+
+    cmd_clone = subparser.add_parser(
+        name="clone",
+        help="Create a virtual environment from an existing one, sharing its files.",
+    )
+    _args_cmd_clone(parser=cmd_clone)
+
     # region OS Specific Commands
     if os.name != "nt":
         # linking is not useful in Windows.
@@ -253,6 +1095,11 @@ def main() -> int:
             help="Add/Remove links in virtual environments to uno files.",
         )
         _args_cmd_link(parser=cmd_link)
+        cmd_daemon = subparser.add_parser(
+            name="daemon",
+            help="Run a daemon that answers oooenv query requests over a Unix domain socket.",
+        )
+        _args_cmd_daemon(parser=cmd_daemon)
 
     if sys.platform == "win32":
         _add_windows_sub_parsers(subparser)
@@ -260,12 +1107,23 @@ def main() -> int:
 
     # region Read Args
     args = parser.parse_args()
-    if global_action := _args_action_global(a_parser=parser, args=args):
-        print(global_action)
-        return 0
     # endregion Read Args
 
-    _args_process_cmd(a_parser=parser, args=args)
+    def dispatch() -> None:
+        if _args_action_global(a_parser=parser, args=args):
+            return
+        _args_process_cmd(a_parser=parser, args=args)
+
+    if args.output == "text":
+        _run_instrumented(args, dispatch)
+        return 0
+    from oooenv.utils import output
+
+    output.set_format(args.output)
+    try:
+        _run_instrumented(args, dispatch)
+    finally:
+        output.close()
     return 0
 
 
@@ -0,0 +1,323 @@
+"""
+Measures how long ``import uno`` takes in a virtual environment.
+
+Each run imports the modules in a fresh interpreter started with ``-X importtime``.
+The ``importtime`` rows of the imported modules are split into time spent loading python modules
+and time spent loading native extension modules such as ``pyuno``, which loads the URE shared libraries.
+"""
+from __future__ import annotations
+import os
+import json
+import statistics
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Sequence, Tuple, Union
+from ..utils import timings
+from ..utils import uno_paths
+
+if TYPE_CHECKING:
+    from ..session import OooEnv
+
+DEFAULT_MODULES = ("uno", "unohelper")
+MODES = ("symlink", "copy", "finder")
+"""Link modes compared by :py:func:`compare_modes`."""
+
+_MARKER = "--oooenv-bench-import--"
+# runs in the interpreter being measured. The site dir is added the way the venv interpreter adds it on start up,
+# a no-op when it already is on sys.path.
+_CHILD_CODE = """\
+import site, sys, time, json
+from importlib.machinery import ExtensionFileLoader
+if {site_dir!r}:
+    site.addsitedir({site_dir!r})
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+native = [
+    k for k, m in list(sys.modules.items())
+    if isinstance(getattr(getattr(m, "__spec__", None), "loader", None), ExtensionFileLoader)
+]
+print(json.dumps({{"elapsed": elapsed, "native": native}}))
+"""
+
+
+class ImportRow(NamedTuple):
+    name: str
+    """Module name as printed by ``-X importtime``."""
+    self_us: int
+    """Microseconds spent importing the module itself."""
+    cumulative_us: int
+    """Microseconds including the imports of the module."""
+    depth: int
+    """Nesting level, ``0`` for modules imported directly."""
+
+
+class ImportSample(NamedTuple):
+    """One cold import."""
+
+    elapsed: float
+    """Seconds the imports took."""
+    python: float
+    """Seconds spent loading python modules."""
+    native: float
+    """Seconds spent loading native extension modules."""
+    rows: Tuple[ImportRow, ...]
+    native_names: Tuple[str, ...]
+
+
+class ImportBench(NamedTuple):
+    """Summary of several cold imports."""
+
+    modules: Tuple[str, ...]
+    python_exe: str
+    samples: Tuple[ImportSample, ...]
+
+    @property
+    def median(self) -> float:
+        """Gets median seconds of all imports."""
+        return statistics.median(s.elapsed for s in self.samples)
+
+    @property
+    def p95(self) -> float:
+        """Gets 95th percentile seconds of all imports, nearest rank."""
+        return _percentile([s.elapsed for s in self.samples], 95)
+
+    @property
+    def python_median(self) -> float:
+        """Gets median seconds spent loading python modules."""
+        return statistics.median(s.python for s in self.samples)
+
+    @property
+    def native_median(self) -> float:
+        """Gets median seconds spent loading native extension modules."""
+        return statistics.median(s.native for s in self.samples)
+
+    def get_breakdown(self) -> List[Tuple[str, float, bool]]:
+        """
+        Gets median self time of each imported module.
+
+        Returns:
+            List[Tuple[str, float, bool]]: name, seconds and if it is native, slowest first.
+        """
+        times: Dict[str, List[int]] = {}
+        native = set()
+        for sample in self.samples:
+            native.update(sample.native_names)
+            for row in sample.rows:
+                times.setdefault(row.name, []).append(row.self_us)
+        breakdown = [(name, statistics.median(values) / 1e6, name in native) for name, values in times.items()]
+        breakdown.sort(key=lambda item: item[1], reverse=True)
+        return breakdown
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, -(-len(ordered) * pct // 100) - 1))
+    return ordered[int(index)]
+
+
+def parse_importtime(text: str) -> List[ImportRow]:
+    """
+    Parses ``-X importtime`` output.
+
+    Args:
+        text (str): ``stderr`` of the interpreter.
+
+    Returns:
+        List[ImportRow]: rows in the order printed.
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # the header line
+            continue
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        rows.append(
+            ImportRow(
+                name=stripped,
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return rows
+
+
+def run_once(
+    python_exe: str,
+    modules: Sequence[str] = DEFAULT_MODULES,
+    site_dir: Union[str, os.PathLike, None] = None,
+    timeout: float = 60.0,
+) -> ImportSample:
+    """
+    Imports ``modules`` once in a fresh interpreter.
+
+    Args:
+        python_exe (str): Interpreter to run.
+        modules (Sequence[str], optional): Modules to import. Defaults to ``uno`` and ``unohelper``.
+        site_dir (str | PathLike, optional): ``site-packages`` processed before importing, including ``.pth`` files.
+        timeout (float, optional): Seconds to wait for the interpreter.
+
+    Raises:
+        subprocess.CalledProcessError: If the imports failed.
+        subprocess.TimeoutExpired: If the interpreter did not finish in time.
+
+    Returns:
+        ImportSample: Timings.
+    """
+    from ..utils import probe
+
+    code = _CHILD_CODE.format(site_dir=os.fspath(site_dir) if site_dir else "", modules=list(modules), marker=_MARKER)
+    with timings.span("bench_import.run", exe=python_exe):
+        proc = probe.run([python_exe, "-X", "importtime", "-c", code], timeout=timeout)
+    stderr = proc.stderr.decode("utf-8", errors="replace")
+    if proc.returncode != 0:
+        raise probe.ProbeError(proc.returncode, python_exe, proc.stdout, stderr)
+    # only the rows of the measured imports, not of the start up.
+    rows = parse_importtime(stderr.partition(_MARKER)[2])
+    data = json.loads(proc.stdout.decode("utf-8").strip().splitlines()[-1])
+    native_names = tuple(data["native"])
+    native_set = set(native_names)
+    native_us = sum(r.self_us for r in rows if r.name in native_set)
+    python_us = sum(r.self_us for r in rows) - native_us
+    return ImportSample(
+        elapsed=data["elapsed"],
+        python=python_us / 1e6,
+        native=native_us / 1e6,
+        rows=tuple(rows),
+        native_names=tuple(n for n in native_names if any(r.name == n for r in rows)),
+    )
+
+
+def bench(
+    python_exe: Union[str, None] = None,
+    modules: Sequence[str] = DEFAULT_MODULES,
+    runs: int = 10,
+    site_dir: Union[str, os.PathLike, None] = None,
+) -> ImportBench:
+    """
+    Imports ``modules`` ``runs`` times, each in a fresh interpreter.
+
+    Args:
+        python_exe (str, optional): Interpreter to run. Defaults to :py:func:`oooenv.utils.uno_paths.get_lo_python_ex`.
+        modules (Sequence[str], optional): Modules to import. Defaults to ``uno`` and ``unohelper``.
+        runs (int, optional): Number of runs. Defaults to ``10``.
+        site_dir (str | PathLike, optional): ``site-packages`` processed before importing.
+
+    Returns:
+        ImportBench: Timings.
+    """
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+    exe = python_exe or uno_paths.get_lo_python_ex()
+    samples = tuple(run_once(exe, modules, site_dir=site_dir) for _ in range(runs))
+    return ImportBench(modules=tuple(modules), python_exe=exe, samples=samples)
+
+
+def compare_modes(
+    env: OooEnv,
+    modes: Sequence[str] = MODES,
+    python_exe: Union[str, None] = None,
+    modules: Sequence[str] = DEFAULT_MODULES,
+    runs: int = 10,
+) -> Dict[str, ImportBench]:
+    """
+    Benchmarks imports with each link mode in turn. Links as they were before are restored afterwards,
+    with the strategy, manifest and bytecode mode they were made with. See :py:mod:`oooenv.utils.link_settings`.
+
+    Args:
+        env (OooEnv): Virtual environment.
+        modes (Sequence[str], optional): Any of ``symlink``, ``copy`` and ``finder``. Defaults to all.
+        python_exe (str, optional): Interpreter to run. Defaults to :py:func:`oooenv.utils.uno_paths.get_lo_python_ex`.
+        modules (Sequence[str], optional): Modules to import. Defaults to ``uno`` and ``unohelper``.
+        runs (int, optional): Number of runs per mode. Defaults to ``10``.
+
+    Raises:
+        ValueError: If a mode is not known or the virtual environment has no ``site-packages``.
+
+    Returns:
+        Dict[str, ImportBench]: Timings per mode.
+    """
+    from .. import uno_finder
+    from ..utils import link_manifest
+    from ..utils import link_settings
+    from . import uno_lnk
+
+    for mode in modes:
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+    site_dir = env.site_packages
+    if site_dir is None:
+        raise ValueError("Unable to find site_packages direct in virtual environment")
+    try:
+        prior = link_settings.load(env.venv_path)
+    except ValueError:
+        prior = None
+    # the same modules are linked for each mode, so restoring leaves none behind.
+    manifest = prior.manifest if prior is not None and prior.manifest else None
+    pyc = prior.pyc if prior is not None else ""
+    names = [e.name for e in link_manifest.load_manifest(manifest)]
+    linked = uno_lnk.find_owned(site_dir, names, owned=prior.files if prior is not None else ())
+    had_finder = Path(site_dir, uno_finder.PTH_NAME).exists()
+    results = {}
+    try:
+        for mode in modes:
+            if mode == "finder":
+                env.link(manifest=manifest, mode="finder", pyc=pyc)
+            else:
+                env.link(strategy=mode, manifest=manifest, pyc=pyc)
+            results[mode] = bench(python_exe, modules, runs=runs, site_dir=site_dir)
+    finally:
+        if had_finder:
+            env.link(manifest=manifest, mode="finder", pyc=pyc)
+        elif linked:
+            strategy = prior.strategy if prior is not None else link_settings.infer_strategy(site_dir, linked)
+            env.link(strategy=strategy, manifest=manifest, pyc=pyc)
+        else:
+            env.unlink(manifest=manifest)
+    return results
+
+
+def render(result: ImportBench, top: int = 10) -> str:
+    """
+    Formats a benchmark for the console.
+
+    Args:
+        result (ImportBench): Timings.
+        top (int, optional): Number of slowest modules to list. Defaults to ``10``.
+
+    Returns:
+        str: Report.
+    """
+    lines = [
+        f"import {', '.join(result.modules)}: {len(result.samples)} runs of {result.python_exe}",
+        f"  median {_ms(result.median)}  p95 {_ms(result.p95)}",
+        f"  python modules {_ms(result.python_median)}  native libraries {_ms(result.native_median)}",
+        "  slowest modules, median self time:",
+    ]
+    breakdown = result.get_breakdown()[:top]
+    width = max((len(name) for name, _, _ in breakdown), default=0)
+    for name, secs, native in breakdown:
+        lines.append(f"    {name:<{width}}  {_ms(secs):>10}{'  native' if native else ''}")
+    return "\n".join(lines)
+
+
+def render_compare(results: Dict[str, ImportBench]) -> str:
+    """Formats :py:func:`compare_modes` results as a table."""
+    lines = [f"{'mode':<8}  {'median':>10}  {'p95':>10}  {'python':>10}  {'native':>10}"]
+    for mode, result in results.items():
+        lines.append(
+            f"{mode:<8}  {_ms(result.median):>10}  {_ms(result.p95):>10}"
+            f"  {_ms(result.python_median):>10}  {_ms(result.native_median):>10}"
+        )
+    return "\n".join(lines)
+
+
+def _ms(secs: float) -> str:
+    return f"{secs * 1000:.2f} ms"
@@ -0,0 +1,257 @@
+"""
+Creates a virtual environment from an existing one.
+
+The clone shares the files of the template instead of holding a copy of its own. Files are reflinked where the
+file system supports copy on write clones, otherwise hard linked. Only the files that name the template path are
+written anew:
+
+- ``pyvenv*.cfg`` in the virtual environment, for instance the ``command`` key written by ``python -m venv``.
+- scripts in ``bin`` (``Scripts`` on Windows), such as ``activate`` and console script shebang lines.
+- ``.pth`` files, including the one written by :py:meth:`~oooenv.session.OooEnv.pip_e`, which points to the
+  directory holding the clone.
+
+Symbolic links are kept, so uno links to LibreOffice and a ``pyvenv.cfg`` switched to a profile carry over.
+Absolute links into the template are pointed into the clone. The clone is built next to its destination and
+renamed into place, a clone that fails half way is never left behind.
+"""
+from __future__ import annotations
+import os
+import stat
+import time
+import shutil
+from pathlib import Path
+from typing import List, NamedTuple, Tuple, Union
+from ..utils import link_store
+from ..utils import local_paths
+from ..utils import timings
+from ..utils import venv_lock
+
+STRATEGIES = ("auto", "reflink", "hardlink", "copy")
+"""Ways unchanged files are placed. ``auto`` tries ``reflink``, ``hardlink`` and ``copy`` in that order."""
+
+_AUTO_ORDER = ("reflink", "hardlink", "copy")
+# files of the template that are not part of the clone.
+_SKIP_NAMES = (venv_lock.LOCK_NAME, f"{venv_lock.LOCK_NAME}.pid")
+_SCRIPT_DIRS = ("bin", "Scripts")
+# larger files in the script dirs are executables, not scripts.
+_MAX_SCRIPT_SIZE = 1 << 20
+
+
+class CloneResult(NamedTuple):
+    src: Path
+    dst: Path
+    strategy: str
+    """How unchanged files were placed, never ``auto``."""
+    files: int
+    """Files placed with ``strategy``."""
+    copied: int
+    """Files copied because ``strategy`` failed for them."""
+    rewritten: Tuple[Path, ...]
+    """Files of the clone written with the template path replaced."""
+    symlinks: int
+    retargeted: int
+    """Symbolic links that pointed into the template and now point into the clone."""
+    elapsed: float
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets the lines the command line interface shows."""
+        return (
+            f"Cloned {self.src} -> {self.dst} in {self.elapsed * 1000:.1f} ms",
+            f"{self.files} files ({self.strategy}), {self.copied} copied, {len(self.rewritten)} rewritten, "
+            f"{self.symlinks} symlinks ({self.retargeted} retargeted)",
+        )
+
+
+class _Clone:
+    """State of one clone while the tree is walked."""
+
+    def __init__(self, src: Path, dst: Path, strategy: str) -> None:
+        self.src = src
+        self.dst = dst
+        self.strategy = strategy
+        # the template may be named through a symlink, files name either path.
+        olds = {str(src), os.path.realpath(src)}
+        self.olds = tuple(sorted((os.fsencode(p) for p in olds), key=len, reverse=True))
+        self.new = os.fsencode(str(dst))
+        self.tmp = ""
+        """Dir the clone is built in."""
+        self.auto = strategy == "auto"
+        self.files = 0
+        self.copied = 0
+        self.rewritten: List[Path] = []
+        self.symlinks = 0
+        self.retargeted = 0
+
+
+def clone(src: Union[str, os.PathLike], dst: Union[str, os.PathLike], strategy: str = "auto") -> CloneResult:
+    """
+    Creates virtual environment ``dst`` from the template ``src``.
+
+    The template is read holding its shared lock. See :py:mod:`oooenv.utils.venv_lock`.
+
+    Args:
+        src (str | PathLike): Virtual environment to clone.
+        dst (str | PathLike): Virtual environment to create. Must not exist.
+        strategy (str, optional): One of :py:data:`STRATEGIES`. ``auto`` copies files that can not be linked.
+            Defaults to ``auto``.
+
+    Raises:
+        ValueError: If ``src`` is not a virtual environment or ``strategy`` is not known.
+        FileExistsError: If ``dst`` exists.
+        OSError: If a file could not be placed with ``strategy``.
+
+    Returns:
+        CloneResult: Result.
+    """
+    start = time.perf_counter()
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown clone strategy: {strategy}")
+    p_src = Path(os.path.abspath(src))
+    p_dst = Path(os.path.abspath(dst))
+    if not os.path.lexists(p_src / "pyvenv.cfg"):
+        raise ValueError(f"Not a virtual environment, pyvenv.cfg not found: {p_src}")
+    if os.path.lexists(p_dst):
+        raise FileExistsError(f"Destination exists: {p_dst}")
+    state = _Clone(p_src, p_dst, strategy)
+    tmp = p_dst.with_name(f".{p_dst.name}.{os.getpid()}.tmp")
+    state.tmp = str(tmp)
+    with venv_lock.shared(p_src), timings.span("clone", src=str(p_src), dst=str(p_dst)):
+        try:
+            _clone_tree(state, tmp)
+            os.rename(tmp, p_dst)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+    return CloneResult(
+        src=p_src,
+        dst=p_dst,
+        # a template without regular files never left auto.
+        strategy="copy" if state.strategy == "auto" else state.strategy,
+        files=state.files,
+        copied=state.copied,
+        rewritten=tuple(state.rewritten),
+        symlinks=state.symlinks,
+        retargeted=state.retargeted,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def _clone_tree(state: _Clone, tmp: Path) -> None:
+    src_root = str(state.src)
+    tmp_root = str(tmp)
+    os.mkdir(tmp_root)
+    # (src dir, dst dir, relative dir), directory modes are set last so a read only dir can still be filled.
+    stack = [(src_root, tmp_root, "")]
+    modes: List[Tuple[str, int]] = [(tmp_root, os.stat(src_root).st_mode)]
+    while stack:
+        src_dir, dst_dir, rel_dir = stack.pop()
+        with os.scandir(src_dir) as it:
+            entries = list(it)
+        for entry in entries:
+            if not rel_dir and entry.name in _SKIP_NAMES:
+                continue
+            dst_path = os.path.join(dst_dir, entry.name)
+            if entry.is_symlink():
+                _clone_symlink(state, entry, dst_path)
+            elif entry.is_dir():
+                os.mkdir(dst_path)
+                modes.append((dst_path, entry.stat().st_mode))
+                stack.append((entry.path, dst_path, os.path.join(rel_dir, entry.name)))
+            elif not _rewrite(state, entry, dst_path, rel_dir):
+                _place(state, entry, dst_path)
+    for path, mode in reversed(modes):
+        os.chmod(path, stat.S_IMODE(mode))
+
+
+def _clone_symlink(state: _Clone, entry: os.DirEntry, dst_path: str) -> None:
+    target = os.readlink(entry.path)
+    if os.path.isabs(target):
+        raw = os.fsencode(target)
+        for old in state.olds:
+            if raw == old or raw.startswith(old + os.fsencode(os.sep)):
+                target = os.fsdecode(state.new + raw[len(old) :])
+                state.retargeted += 1
+                break
+    os.symlink(target, dst_path, target_is_directory=entry.is_dir())
+    state.symlinks += 1
+
+
+def _is_candidate(entry: os.DirEntry, rel_dir: str) -> bool:
+    name = entry.name
+    if name.endswith(".pth"):
+        return True
+    if not rel_dir:
+        return name.startswith("pyvenv") and name.endswith(".cfg")
+    return rel_dir in _SCRIPT_DIRS and entry.stat().st_size <= _MAX_SCRIPT_SIZE
+
+
+def _rewrite(state: _Clone, entry: os.DirEntry, dst_path: str, rel_dir: str) -> bool:
+    """Writes ``dst_path`` with the template path replaced. Returns ``False`` if the file does not name it."""
+    if not _is_candidate(entry, rel_dir):
+        return False
+    with open(entry.path, "rb") as file:
+        data = file.read()
+    if b"\0" in data:
+        # binary such as a Windows console script launcher.
+        return False
+    new_data = data
+    for old in state.olds:
+        new_data = new_data.replace(old, state.new)
+    if entry.name.endswith(".pth"):
+        new_data, dst_path = _rewrite_pip_e(state, new_data, entry.name, dst_path)
+    if new_data == data and os.path.basename(dst_path) == entry.name:
+        return False
+    with open(dst_path, "xb") as file:
+        file.write(new_data)
+    os.chmod(dst_path, stat.S_IMODE(entry.stat().st_mode))
+    state.rewritten.append(state.dst / os.path.relpath(dst_path, state.tmp))
+    return True
+
+
+def _rewrite_pip_e(state: _Clone, data: bytes, name: str, dst_path: str) -> Tuple[bytes, str]:
+    # OooEnv.pip_e() points to the dir holding the virtual environment, the clone gets its own.
+    src_root = state.src.parent
+    if name != local_paths.get_pip_e_name(src_root) or data.strip() != os.fsencode(str(src_root)):
+        return data, dst_path
+    dst_root = state.dst.parent
+    return os.fsencode(str(dst_root)), os.path.join(os.path.dirname(dst_path), local_paths.get_pip_e_name(dst_root))
+
+
+def _place(state: _Clone, entry: os.DirEntry, dst_path: str) -> None:
+    if state.strategy != "auto":
+        try:
+            _place_as(state.strategy, entry, dst_path)
+            state.files += 1
+        except OSError:
+            if not state.auto:
+                raise
+            shutil.copy2(entry.path, dst_path)
+            state.copied += 1
+        return
+    # the first file decides, trying every strategy on each of 10k files would cost more than the clone.
+    error: Union[OSError, None] = None
+    for kind in _AUTO_ORDER:
+        try:
+            _place_as(kind, entry, dst_path)
+        except OSError as e:
+            error = e
+            continue
+        state.strategy = kind
+        state.files += 1
+        return
+    assert error is not None
+    raise error
+
+
+def _place_as(kind: str, entry: os.DirEntry, dst_path: str) -> None:
+    if kind == "hardlink":
+        os.link(entry.path, dst_path)
+    elif kind == "reflink":
+        link_store.reflink(entry.path, dst_path)
+        st = entry.stat()
+        # keep the mtime, bytecode caches are checked against it.
+        os.chmod(dst_path, stat.S_IMODE(st.st_mode))
+        os.utime(dst_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    else:
+        shutil.copy2(entry.path, dst_path)
@@ -0,0 +1,210 @@
+"""
+Health check of a virtual environment and the LibreOffice it is configured for.
+
+Each check runs on a thread of its own with its own timeout, so ``oooenv doctor`` takes about as long as
+the slowest check. The checks share one :py:class:`~oooenv.session.OooEnv`, so LibreOffice is discovered once.
+A check that does not finish in time is reported as ``timeout`` and left to end on its own,
+its thread does not keep the process alive.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Sequence, Tuple, Union
+from .. import uno_finder
+from ..utils import link_manifest
+
+if TYPE_CHECKING:
+    from ..session import OooEnv
+
+DEFAULT_TIMEOUT = 10.0
+"""Seconds each check may take."""
+
+# outcome, detail, path
+_Outcome = Tuple[str, str, Union[Path, None]]
+
+
+class Check(NamedTuple):
+    name: str
+    status: str
+    """``pass``, ``fail``, ``skip`` or ``timeout``."""
+    detail: str
+    path: Union[Path, None]
+    """File or directory the check looked at."""
+    elapsed: float
+    """Seconds the check took, the timeout if it did not finish."""
+
+    @property
+    def ok(self) -> bool:
+        """Gets if the check did not find a problem."""
+        return self.status in ("pass", "skip")
+
+
+# region Checks
+def check_install(env: OooEnv, timeout: float) -> _Outcome:
+    """LibreOffice install and its ``program`` directory are found."""
+    program = env.lo_program_path
+    if not program.is_dir():
+        return "fail", f"program directory not found: {program}", program
+    return "pass", str(env.lo_install), program
+
+
+def check_uno(env: OooEnv, timeout: float) -> _Outcome:
+    """``uno.py`` is in the discovered uno path."""
+    uno = env.uno_path / "uno.py"
+    if not uno.is_file():
+        return "fail", f"uno.py not found in {env.uno_path}", uno
+    return "pass", str(uno), uno
+
+
+def check_site_packages(env: OooEnv, timeout: float) -> _Outcome:
+    """``site-packages`` of the virtual environment is found."""
+    site_dir = env.site_packages
+    if site_dir is None or not site_dir.is_dir():
+        return "fail", f"site-packages not found in {env.venv_path}", site_dir
+    return "pass", str(site_dir), site_dir
+
+
+def check_links(env: OooEnv, timeout: float) -> _Outcome:
+    """Links in ``site-packages`` point to files that exist, or the import finder is installed."""
+    site_dir = env.site_packages
+    if site_dir is None:
+        return "skip", "no site-packages", None
+    pth = site_dir / uno_finder.PTH_NAME
+    if pth.exists():
+        return "pass", "import finder installed", pth
+    found = []
+    broken = []
+    for entry in link_manifest.load_manifest():
+        dst = site_dir / entry.name
+        if not os.path.lexists(dst):
+            continue
+        found.append(entry.name)
+        if not dst.exists():
+            broken.append(f"{entry.name} -> {os.readlink(dst)}")
+    if broken:
+        return "fail", f"broken links: {', '.join(broken)}", site_dir
+    if not found:
+        return "skip", "not linked", site_dir
+    return "pass", f"{len(found)} files linked", site_dir
+
+
+def check_pyvenv(env: OooEnv, timeout: float) -> _Outcome:
+    """``pyvenv_uno.cfg``, and ``pyvenv.cfg`` when it is active, match the version of LibreOffice python."""
+    venv = env.venv_path
+    cfg_file = venv / "pyvenv_uno.cfg"
+    active = env.is_uno()
+    if active:
+        cfg_file = venv / "pyvenv.cfg"
+    elif not cfg_file.exists():
+        return "skip", "not a UNO environment", venv / "pyvenv.cfg"
+    recorded = env.cfg_version(cfg_file.name)
+    expected = env.lo_python_version
+    if recorded != expected:
+        return "fail", f"{cfg_file.name} has python {recorded}, LibreOffice has {expected}", cfg_file
+    home = env.load_cfg(cfg_file.name).get("home", "")
+    if not Path(home).is_dir():
+        return "fail", f"{cfg_file.name} home does not exist: {home}", cfg_file
+    return "pass", f"{cfg_file.name} python {recorded}{' (active)' if active else ''}", cfg_file
+
+
+def check_import(env: OooEnv, timeout: float) -> _Outcome:
+    """``import uno`` works in the python of the virtual environment."""
+    import subprocess
+    from ..utils import probe
+
+    python = get_venv_python(env.venv_path)
+    if not python.exists():
+        return "fail", f"python not found: {python}", python
+    try:
+        out = probe.run([str(python), "-c", "import uno; print(uno.__file__)"], timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return "timeout", f"import uno did not finish in {timeout:g} seconds", python
+    if out.returncode != 0:
+        lines = out.stderr.decode("utf-8", errors="replace").strip().splitlines()
+        return "fail", lines[-1] if lines else f"exit status {out.returncode}", python
+    return "pass", out.stdout.decode("utf-8", errors="replace").strip(), python
+
+
+CHECKS: Dict[str, Callable[[OooEnv, float], _Outcome]] = {
+    "install": check_install,
+    "uno": check_uno,
+    "site-packages": check_site_packages,
+    "links": check_links,
+    "pyvenv": check_pyvenv,
+    "import": check_import,
+}
+"""Checks by name, in the order they are reported."""
+
+# endregion Checks
+
+
+def get_venv_python(venv: Union[str, os.PathLike]) -> Path:
+    """Gets the python executable of a virtual environment."""
+    if sys.platform == "win32":
+        return Path(venv, "Scripts", "python.exe")
+    return Path(venv, "bin", "python")
+
+
+def run(env: OooEnv, names: Union[Sequence[str], None] = None, timeout: float = DEFAULT_TIMEOUT) -> Tuple[Check, ...]:
+    """
+    Runs checks at the same time.
+
+    Args:
+        env (OooEnv): Session of the virtual environment.
+        names (Sequence[str], optional): Names of :py:data:`CHECKS` to run. Defaults to all.
+        timeout (float, optional): Seconds each check may take. Defaults to :py:data:`DEFAULT_TIMEOUT`.
+
+    Raises:
+        ValueError: If a name is not known.
+
+    Returns:
+        Tuple[Check, ...]: One result per check in the order of :py:data:`CHECKS`.
+    """
+    selected = [n for n in CHECKS if names is None or n in names]
+    unknown = set(names or ()) - set(CHECKS)
+    if unknown:
+        raise ValueError(f"Unknown check: {', '.join(sorted(unknown))}")
+    results: Dict[str, Check] = {}
+    threads: List[Tuple[str, threading.Thread]] = []
+    start = time.monotonic()
+
+    def target(name: str) -> None:
+        t0 = time.perf_counter()
+        try:
+            status, detail, path = CHECKS[name](env, timeout)
+        except Exception as e:
+            status, detail, path = "fail", str(e) or type(e).__name__, None
+        results[name] = Check(name, status, detail, path, time.perf_counter() - t0)
+
+    for name in selected:
+        # daemon threads, a check stuck in the file system must not keep the process alive.
+        thread = threading.Thread(target=target, args=(name,), name=f"oooenv-doctor-{name}", daemon=True)
+        thread.start()
+        threads.append((name, thread))
+    for name, thread in threads:
+        thread.join(max(0.0, start + timeout - time.monotonic()))
+    checks = []
+    for name in selected:
+        # a check that finished after the join timed out still counts.
+        check = results.get(name, None)
+        if check is None:
+            check = Check(name, "timeout", f"did not finish in {timeout:g} seconds", None, timeout)
+        checks.append(check)
+    return tuple(checks)
+
+
+def render(checks: Sequence[Check]) -> List[str]:
+    """
+    Formats checks as a table for the console.
+
+    Returns:
+        List[str]: Header followed by one line per check.
+    """
+    width = max((len(c.name) for c in checks), default=5)
+    lines = [f"{'check':<{width}}  {'status':<7}  {'time':>10}  detail"]
+    for c in checks:
+        lines.append(f"{c.name:<{width}}  {c.status:<7}  {c.elapsed * 1000:>7.1f} ms  {c.detail}")
+    return lines
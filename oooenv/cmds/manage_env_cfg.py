@@ -1,22 +1,22 @@
 from __future__ import annotations
 import os
 import sys
-import subprocess
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, NamedTuple, cast
+from typing import TYPE_CHECKING, ContextManager, Dict, Mapping, cast
 from ..utils import local_paths
 
 # from ..lib.connect import LoSocketStart
 from ..utils import uno_paths
+from ..utils import py_version
+from ..utils.py_version import Version
+from ..utils import timings
+from ..utils import pyvenv_config
+from ..utils import venv_lock
+from ..utils.pyvenv_config import PyvenvConfig
 
-
-class Version(NamedTuple):
-    major: int
-    minor: int
-    revision: int
-
-    def __str__(self) -> str:
-        return f"{self.major}.{self.minor}.{self.revision}"
+if TYPE_CHECKING:
+    from ..session import OooEnv
 
 
 def get_uno_python_exe() -> str:
@@ -33,35 +33,49 @@ def get_uno_python_exe() -> str:
     return str(p)
 
 
+@timings.timed("manage_env_cfg.get_uno_python_ver")
 def get_uno_python_ver() -> Version:
     """
     Gets Uno Python Version
 
+    The version is read from the install layout when possible. The LibreOffice python
+    executable is only spawned when that fails and its version is not already cached.
+    See :py:mod:`oooenv.utils.py_version`.
+
     Raises: Exception if not on Windows.
     """
     python_exe = get_uno_python_exe()
-    output = subprocess.check_output([python_exe, "--version"]).decode("UTF8").strip()
-    # something like Python 3.8.10
-    parts = output.split()
-    major, minor, rev = parts[1].split(".")
-    return Version(major=int(major), minor=int(minor), revision=int(rev))
+    return py_version.resolve_version(Path(python_exe).parent, python_exe)
 
 
 def read_pyvenv_cfg(fnm: str = "pyvenv.cfg") -> Dict[str, str]:
-    pyvenv_cfg = _get_pyvenv_cfg_path(fnm=fnm)
-    result = {}
-    with open(pyvenv_cfg, "r") as file:
-        # strip of new line and remove anything after #
-        # # for comment
-        data = (row.partition("#")[0].rstrip() for row in file)
-        # chain generator
-        # remove empty lines
-        data = (row for row in data if row)
-        # each line should now be key value pairs separated by =
-        for row in data:
-            key, value = row.split("=")
-            result[key.strip()] = value.strip()
-    return result
+    """
+    Reads a cfg file of the virtual environment.
+
+    Files are parsed once and only parsed again when changed on disk.
+    See :py:mod:`oooenv.utils.pyvenv_config`.
+
+    Args:
+        fnm (str, optional): cfg file name. Defaults to "pyvenv.cfg".
+
+    Returns:
+        Dict[str, str]: keys and values of cfg.
+    """
+    return load_pyvenv_cfg(fnm=fnm).to_dict()
+
+
+def load_pyvenv_cfg(fnm: str = "pyvenv.cfg") -> PyvenvConfig:
+    """
+    Loads a cfg file of the virtual environment keeping comments and key order.
+
+    Args:
+        fnm (str, optional): cfg file name. Defaults to "pyvenv.cfg".
+
+    Returns:
+        PyvenvConfig: cfg that can be changed and passed to :py:func:`save_config`.
+    """
+    with _lock_venv(exclusive=False):
+        return pyvenv_config.load(_get_pyvenv_cfg_path(fnm=fnm))
 
 
 def get_libreoffice_py_ver_from_cfg(fnm: str = "pyvenv_uno.cfg") -> Version:
@@ -85,94 +99,93 @@ def get_libreoffice_py_ver_from_cfg(fnm: str = "pyvenv_uno.cfg") -> Version:
     return Version(major=int(major), minor=int(minor), revision=int(revision))
 
 
-def is_env_uno_python(cfg: dict | None = None) -> bool:
-    if cfg is None:
-        cfg = read_pyvenv_cfg()
-    home = cfg.get("home", "")
-    if not home:
-        return False
-    lo_path = _get_lo_path()
-    return home.lower() == lo_path.lower()
+@timings.timed("manage_env_cfg.is_env_uno_python")
+def is_env_uno_python(cfg: Mapping[str, str] | None = None) -> bool:
+    """
+    Gets if the virtual environment is set to LibreOffice python.
+
+    See :py:meth:`oooenv.session.OooEnv.is_uno`.
+    """
+    return _get_session().is_uno(cfg)
 
 
 def backup_cfg() -> None:
-    src = _get_pyvenv_cfg_path()
-    cfg = read_pyvenv_cfg()
-    if is_env_uno_python(cfg):
-        dst = src.parent / "pyvenv_uno.cfg"
-    else:
-        dst = src.parent / "pyvenv_orig.cfg"
-    local_paths.copy_file(src=src, dst=dst)
-
-
-def save_config(cfg: Dict[str, str], fnm: str = "pyvenv.cfg"):
-    lst = [f"{k} = {v}" for k, v in cfg.items()]
-    if lst:
-        lst.append("")
-    f_out = _get_venv_path() / fnm
-    with open(f_out, "w") as file:
-        file.write("\n".join(lst))
-    print("Saved cfg")
-
-
-def toggle_cfg(suffix: str = "") -> None:
+    with _lock_venv():
+        src = _get_pyvenv_cfg_path()
+        cfg = pyvenv_config.load(src)
+        if is_env_uno_python(cfg):
+            dst = src.parent / "pyvenv_uno.cfg"
+        else:
+            dst = src.parent / "pyvenv_orig.cfg"
+        # pyvenv.cfg may be a symlink to dst, save rather than copy onto itself.
+        pyvenv_config.save(dst, cfg)
+
+
+def save_config(cfg: Mapping[str, str], fnm: str = "pyvenv.cfg") -> Path:
+    """
+    Atomically saves a cfg file in the virtual environment.
+
+    See :py:meth:`oooenv.session.OooEnv.save_cfg`. Nothing is printed, callers report the save.
+
+    Args:
+        cfg (Mapping[str, str]): cfg to save. A :py:class:`~oooenv.utils.pyvenv_config.PyvenvConfig`
+            is written as is. For other mappings comments and key order of the existing file are kept.
+        fnm (str, optional): cfg file name. Defaults to "pyvenv.cfg".
+
+    Returns:
+        Path: saved file.
+    """
+    return _get_session().save_cfg(cfg, fnm=fnm)
+
+
+def switch_cfg(fnm: str, mode: str = "") -> float:
+    """
+    Makes ``pyvenv.cfg`` use the profile ``fnm``.
+
+    The profile is not parsed. ``pyvenv.cfg`` is replaced atomically so a crash
+    never leaves it truncated.
+
+    Args:
+        fnm (str): Profile file name in the virtual environment such as ``pyvenv_uno.cfg``.
+        mode (str, optional): Switch mode. See :py:func:`oooenv.utils.local_paths.switch_file`.
+
+    Returns:
+        float: Seconds the switch took.
+    """
     env_path = _get_venv_path()
-    if suffix:
-        src = env_path / f"pyvenv_{suffix.strip()}.cfg"
-        if not src.exists():
-            print('File not found: "{src}"')
-            print("No action taken")
-            return
-        dst = env_path / "pyvenv.cfg"
-        local_paths.copy_file(src=src, dst=dst)
-        print(f"Set to {suffix.strip()} environment.")
-        return
-
-    cfg = read_pyvenv_cfg()
-    if is_env_uno_python(cfg):
-        src = env_path / "pyvenv_orig.cfg"
-        dst = env_path / "pyvenv.cfg"
-        local_paths.copy_file(src=src, dst=dst)
-        print("Set to Original Environment")
-        return
-
-    src = env_path / "pyvenv_orig.cfg"
-    if not src.exists():
-        save_config(cfg=cfg, fnm="pyvenv_orig.cfg")
-
-    uno_cfg = env_path / "pyvenv_uno.cfg"
-    if not uno_cfg.exists():
-        _set_config_save(cfg)
-    src = env_path / "pyvenv_uno.cfg"
-    dst = env_path / "pyvenv.cfg"
-    local_paths.copy_file(src=src, dst=dst)
-    print("Set to UNO Environment")
-
-
-def _set_config_save(cfg):
-    # need to create the file.
-    ver = str(get_uno_python_ver())
-    hm = _get_lo_path()
-    if "version" in cfg:
-        del cfg["version"]
-    cfg["home"] = hm
-    cfg["implementation"] = "CPython"
-    cfg["version_info"] = f"{ver}.final.0"
-    cfg["include-system-site-packages"] = "false"
-    cfg["base-prefix"] = f"{hm}\\python-core-{ver}"
-    cfg["base-exec-prefix"] = f"{hm}\\python-core-{ver}"
-    cfg["base-executable"] = f"{hm}\\python.exe"
-    save_config(cfg=cfg, fnm="pyvenv_uno.cfg")
-
-
-def _get_lo_path() -> str:
-    lo_path = os.environ.get("ODEV_CONN_SOFFICE", None)
-    if lo_path:
-        index = lo_path.rfind("program")
-        lo_path = lo_path[: index + 7] if index > -1 else None
-    if not lo_path:
-        lo_path = str(uno_paths.get_soffice_install_path() / "program")
-    return lo_path
+    with _lock_venv(), timings.span("manage_env_cfg.switch_cfg", profile=fnm):
+        return local_paths.switch_file(src=env_path / fnm, dst=env_path / "pyvenv.cfg", mode=mode)
+
+
+@timings.timed("manage_env_cfg.toggle_cfg")
+def toggle_cfg(suffix: str = "", mode: str = "") -> None:
+    """
+    Toggles virtual environment between original and UNO configuration or sets a custom configuration
+    and prints the outcome.
+
+    See :py:meth:`oooenv.session.OooEnv.toggle` for a version that does not print.
+
+    Args:
+        suffix (str, optional): Suffix of custom configuration. ``myenv`` sets ``pyvenv_myenv.cfg``.
+        mode (str, optional): Switch mode. See :py:func:`oooenv.utils.local_paths.switch_file`.
+    """
+    for line in _get_session().toggle(suffix=suffix, mode=mode).messages:
+        print(line)
+
+
+def _get_session() -> OooEnv:
+    from ..session import OooEnv
+
+    return OooEnv(venv_path=_get_venv_path())
+
+
+def _lock_venv(exclusive: bool = True) -> ContextManager[None]:
+    # see OooEnv.lock(), nothing is locked without a virtual environment.
+    try:
+        venv = _get_venv_path()
+    except ValueError:
+        return nullcontext()
+    return venv_lock.lock(venv, exclusive=exclusive)
 
 
 def _get_venv_path() -> Path:
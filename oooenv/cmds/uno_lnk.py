@@ -11,107 +11,355 @@ this code base and its site-packages.
 """
 import os
 import sys
-import shutil
-from typing import Optional
+import stat
+from typing import Container, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
+from .. import uno_finder
+from ..results import FileAction
 from ..utils import local_paths
-from ..utils import uno_paths
+from ..utils import link_manifest
+from ..utils import link_store
+from ..utils.link_manifest import ManifestEntry
+from ..utils import timings
 
 
-def add_links(uno_src_dir: Optional[str] = None):
-    # sourcery skip: extract-duplicate-method
-    if isinstance(uno_src_dir, str):
-        str_cln = uno_src_dir.strip()
-        if len(str_cln) == 0:
-            p_uno_dir = uno_paths.get_uno_path()
-        else:
-            p_uno_dir = Path(str_cln)
-            if not p_uno_dir.exists():
-                raise FileNotFoundError(f"Uno Source Dir not found: {uno_src_dir}")
-            if not p_uno_dir.is_dir():
-                raise NotADirectoryError(f"UNO source is not a Directory: {uno_src_dir}")
-    else:
-        p_uno_dir = uno_paths.get_uno_path()
-    p_site_dir = local_paths.get_site_packages_dir()
-    if p_site_dir is None:
-        print("Unable to find site_packages direct in virtual environment")
-        return
-
-    p_uno = Path(p_uno_dir, "uno.py")
-    p_uno_helper = Path(p_uno_dir, "unohelper.py")
-
-    if p_uno.exists():
-        dest = Path(p_site_dir, "uno.py")
+Manifest = Iterable[Union[ManifestEntry, str]]
+# directories LibreOffice and distributions keep uno.py in. A link made before LibreOffice moved still points there.
+_LO_DIR_NAMES = frozenset(("program", "dist-packages", "Resources"))
+
+
+def _get_entries(manifest: Union[Manifest, None]) -> Tuple[ManifestEntry, ...]:
+    if manifest is None:
+        return link_manifest.load_manifest()
+    return tuple(e if isinstance(e, ManifestEntry) else ManifestEntry(e, True) for e in manifest)
+
+
+def _scan_names(dir_path: Path, names: Container[str]) -> Dict[str, str]:
+    # paths are kept as str, pathlib costs more than the file system calls here.
+    found = {}
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.name in names:
+                    found[entry.name] = entry.path
+    except OSError:
+        pass
+    return found
+
+
+def find_sources(src_dirs: Sequence[Path], names: Iterable[str]) -> Dict[str, str]:
+    """
+    Finds files in directories. Each directory is scanned once.
+
+    Args:
+        src_dirs (Sequence[Path]): Directories in search order.
+        names (Iterable[str]): File names such as ``uno.py``.
+
+    Returns:
+        Dict[str, str]: File name to the path of the first one found. Files not found are left out.
+    """
+    wanted = set(names)
+    found: Dict[str, str] = {}
+    with timings.span("uno_lnk.scan"):
+        for src_dir in src_dirs:
+            if len(found) == len(wanted):
+                break
+            for k, v in _scan_names(src_dir, wanted.difference(found)).items():
+                found[k] = v
+    return found
+
+
+def is_owned(path: str, src_dirs: Sequence[Path] = (), owned: Container[str] = ()) -> bool:
+    """
+    Gets if a file in ``site-packages`` was placed by oooenv, so it may be replaced or removed.
+
+    That is a name in ``owned``, a symbolic link to a file of the same name in one of ``src_dirs`` or in
+    a LibreOffice ``program`` directory, or a hard link to a blob of :py:mod:`oooenv.utils.link_store`.
+    Copies are only known by name.
+
+    Args:
+        path (str): File in ``site-packages``.
+        src_dirs (Sequence[Path], optional): Directories files are linked from.
+        owned (Container[str], optional): File names recorded in :py:mod:`oooenv.utils.link_settings`.
+
+    Returns:
+        bool: ``True`` if oooenv placed the file; Otherwise, ``False``, also if it does not exist.
+    """
+    name = os.path.basename(path)
+    if name in owned:
+        return True
+    try:
+        st = os.lstat(path)
+        if stat.S_ISLNK(st.st_mode):
+            target = os.path.normpath(os.path.join(os.path.dirname(path), os.readlink(path)))
+            target_dir, target_name = os.path.split(target)
+            if target_name != name:
+                return False
+            if os.path.basename(target_dir) in _LO_DIR_NAMES:
+                return True
+            return any(os.path.normpath(os.fspath(d)) == target_dir for d in src_dirs)
+        if st.st_nlink < 2:
+            return False
+        blob = link_store.get_blob_path(link_store.hash_file(path))
+        return os.path.samestat(st, os.stat(blob))
+    except OSError:
+        return False
+
+
+def find_owned(
+    site_dir: Path, names: Iterable[str], src_dirs: Sequence[Path] = (), owned: Container[str] = ()
+) -> List[str]:
+    """
+    Gets the names of files in ``site_dir`` placed by oooenv. See :py:func:`is_owned`.
+
+    Args:
+        site_dir (Path): ``site-packages`` directory of the virtual environment.
+        names (Iterable[str]): File names such as ``uno.py``.
+        src_dirs (Sequence[Path], optional): Directories files are linked from.
+        owned (Container[str], optional): File names recorded in :py:mod:`oooenv.utils.link_settings`.
+
+    Returns:
+        List[str]: Names of ``names`` that exist in ``site_dir`` and were placed by oooenv.
+    """
+    site_str = os.fspath(site_dir)
+    result = []
+    for name in names:
+        path = os.path.join(site_str, name)
+        if os.path.lexists(path) and is_owned(path, src_dirs, owned):
+            result.append(name)
+    return result
+
+
+def _find_current_links(
+    src_dirs: Sequence[Path], site_str: str, entries: Iterable[ManifestEntry], strategy: str
+) -> Dict[str, str]:
+    """Finds links in ``site_str`` that point to the first of ``src_dirs`` holding their name, without scanning."""
+    if strategy not in ("auto", "symlink"):
+        return {}
+    dirs = [os.fspath(d) for d in src_dirs]
+    current = {}
+    for entry in entries:
         try:
-            os.symlink(src=p_uno, dst=dest)
-            print(f"Created system link: {p_uno} -> {dest}")
-        except FileExistsError:
-            print(f"File already exist: {dest}")
+            target = os.readlink(os.path.join(site_str, entry.name))
         except OSError:
-            # OSError: [WinError 1314] A required privilege is not held by the client
-            print(f"Unable to create system link for  '{p_uno.name}'. Attempting copy.")
-            shutil.copy2(p_uno, dest)
-            print(f"Copied file: {p_uno} -> {dest}")
-    else:
-        print(f"{p_uno.name} not found.")
-
-    if p_uno_helper.exists():
-        dest = Path(p_site_dir, "unohelper.py")
+            continue
+        for src_dir in dirs:
+            src = os.path.join(src_dir, entry.name)
+            if os.path.exists(src):
+                if src == target:
+                    current[entry.name] = src
+                break
+    return current
+
+
+def link_files(
+    src_dir: Path,
+    site_dir: Path,
+    manifest: Union[Manifest, None] = None,
+    strategy: str = "",
+    fallback_dirs: Iterable[Path] = (),
+    owned: Container[str] = (),
+) -> Tuple[FileAction, ...]:
+    """
+    Links the files of a manifest from ``src_dir`` into ``site_dir``.
+
+    Each directory is scanned once. Files that already match their source are left alone, others placed by oooenv
+    are replaced. Files of other packages with the same name are reported as ``conflict`` and left alone,
+    see :py:func:`is_owned`. See :py:mod:`oooenv.utils.link_store` for strategies.
+
+    Args:
+        src_dir (Path): Directory containing ``uno.py``.
+        site_dir (Path): ``site-packages`` directory of the virtual environment.
+        manifest (Iterable[ManifestEntry | str], optional): Files to link. Plain names are required files.
+            Defaults to :py:func:`oooenv.utils.link_manifest.load_manifest`.
+        strategy (str, optional): One of ``auto``, ``symlink``, ``hardlink``, ``reflink`` or ``copy``.
+            Defaults to :py:func:`oooenv.utils.link_store.get_strategy`.
+        fallback_dirs (Iterable[Path], optional): Directories searched for files not in ``src_dir``.
+        owned (Container[str], optional): File names recorded as placed by oooenv.
+
+    Raises:
+        ValueError: If ``strategy`` is not known.
+
+    Returns:
+        Tuple[FileAction, ...]: What happened to each file. Optional files that were not found are left out.
+    """
+    strategy = strategy or link_store.get_strategy()
+    if strategy not in link_store.STRATEGIES:
+        raise ValueError(f"Unknown link strategy: {strategy}")
+    entries = _get_entries(manifest)
+    src_dirs = [src_dir, *fallback_dirs]
+    site_str = os.fspath(site_dir)
+    # relinking an up to date venv is the common case, it needs no directory scan.
+    current = _find_current_links(src_dirs, site_str, entries, strategy)
+    names = {e.name for e in entries}.difference(current)
+    sources: Dict[str, str] = dict(current)
+    existing: Dict[str, str] = {name: os.path.join(site_str, name) for name in current}
+    if names:
+        sources.update(find_sources(src_dirs, names))
+        with timings.span("uno_lnk.scan_site"):
+            existing.update(_scan_names(site_dir, names))
+
+    results = []
+    for entry in entries:
+        name = entry.name
+        src_str = sources.get(name, None)
+        if src_str is None:
+            if entry.required:
+                results.append(
+                    FileAction(name=name, src=Path(src_dir, name), dst=Path(site_dir, name), action="missing")
+                )
+            continue
+        existed = name in existing
+        src = Path(src_str)
+        dest = Path(site_str, name)
+        if name in current or (existed and link_store.is_current(src_str, existing[name], strategy)):
+            results.append(FileAction(name=name, src=src, dst=dest, action="exists"))
+            continue
+        if existed and not is_owned(existing[name], src_dirs, owned):
+            results.append(FileAction(name=name, src=src, dst=dest, action="conflict"))
+            continue
         try:
-            os.symlink(src=p_uno_helper, dst=dest)
-            print(f"Created system link: {p_uno_helper} -> {dest}")
-        except FileExistsError:
-            print(f"File already exist: {dest}")
-        except OSError:
+            kind = link_store.place(src, dest, strategy)
+        except OSError as e:
             # OSError: [WinError 1314] A required privilege is not held by the client
-            print(f"Unable to create system link for  '{p_uno_helper.name}'. Attempting copy.")
-            shutil.copy2(p_uno_helper, dest)
-            print(f"Copied file: {p_uno_helper} -> {dest}")
-    else:
-        print(f"{p_uno_helper.name} not found.")
-    return
-    # p_scriptforge = Path(uno_paths.get_lo_path(), "scriptforge.py")
-    # if p_scriptforge.exists():
-    #     dest = Path(p_site_dir, "scriptforge.py")
-    #     try:
-    #         os.symlink(src=p_scriptforge, dst=dest)
-    #         print(f"Created system link: {p_scriptforge} -> {dest}")
-    #     except FileExistsError:
-    #         print(f"File already exist: {dest}")
-    #     except OSError:
-    #         # OSError: [WinError 1314] A required privilege is not held by the client
-    #         print(f"Unable to create system link for  '{p_scriptforge.name}'. Attempting copy.")
-    #         shutil.copy2(p_scriptforge, dest)
-    #         print(f"Copied file: {p_scriptforge} -> {dest}")
-    # else:
-    #     print(f"{p_scriptforge.name} not found.")
+            results.append(FileAction(name=name, src=src, dst=dest, action="failed", strategy=strategy, error=str(e)))
+            continue
+        if existed:
+            action = "replaced"
+        else:
+            action = "copied" if kind == "copy" else "linked"
+        results.append(FileAction(name=name, src=src, dst=dest, action=action, strategy=kind))
+    return tuple(results)
+
+
+def unlink_files(
+    site_dir: Path,
+    manifest: Union[Manifest, None] = None,
+    src_dirs: Sequence[Path] = (),
+    owned: Container[str] = (),
+) -> Tuple[FileAction, ...]:
+    """
+    Removes the files of a manifest from ``site_dir``.
+
+    Only files placed by oooenv are removed, others are reported as ``conflict``. See :py:func:`is_owned`.
+
+    Args:
+        site_dir (Path): ``site-packages`` directory of the virtual environment.
+        manifest (Iterable[ManifestEntry | str], optional): Files to remove. Plain names are required files.
+            Defaults to :py:func:`oooenv.utils.link_manifest.load_manifest`.
+        src_dirs (Sequence[Path], optional): Directories files were linked from.
+        owned (Container[str], optional): File names recorded as placed by oooenv.
+
+    Returns:
+        Tuple[FileAction, ...]: What happened to each file. Optional files that were not present are left out.
+    """
+    entries = _get_entries(manifest)
+    existing = _scan_names(site_dir, {e.name for e in entries})
+    results = []
+    for entry in entries:
+        dest = Path(site_dir, entry.name)
+        if entry.name in existing and not is_owned(existing[entry.name], src_dirs, owned):
+            results.append(FileAction(name=entry.name, src=None, dst=dest, action="conflict"))
+        elif entry.name in existing:
+            os.remove(dest)
+            results.append(FileAction(name=entry.name, src=None, dst=dest, action="removed"))
+        elif entry.required:
+            results.append(FileAction(name=entry.name, src=None, dst=dest, action="absent"))
+    return tuple(results)
+
+
+def write_finder(
+    src_dirs: Sequence[Path],
+    site_dir: Path,
+    manifest: Union[Manifest, None] = None,
+    cache_dir: Union[Path, None] = None,
+    owned: Container[str] = (),
+) -> Tuple[FileAction, ...]:
+    """
+    Writes ``oooenv_uno.pth`` that imports the modules of a manifest from ``src_dirs``.
+
+    See :py:mod:`oooenv.uno_finder`. Links of the manifest modules in ``site_dir`` are removed,
+    files of other packages are left alone. See :py:func:`unlink_files`.
 
+    Args:
+        src_dirs (Sequence[Path]): Directories containing ``uno.py`` and the other modules, in search order.
+        site_dir (Path): ``site-packages`` directory of the virtual environment.
+        manifest (Iterable[ManifestEntry | str], optional): Modules to import from ``src_dirs``.
+            Defaults to :py:func:`oooenv.utils.link_manifest.load_manifest`.
+        cache_dir (Path, optional): Directory the finder keeps bytecode of the modules in.
+            See :py:mod:`oooenv.utils.bytecode`.
+        owned (Container[str], optional): File names recorded as placed by oooenv.
 
+    Returns:
+        Tuple[FileAction, ...]: What happened to the ``.pth`` file, required modules that were not found,
+        links that were removed and files that were left alone.
+    """
+    entries = _get_entries(manifest)
+    found = find_sources(src_dirs, (e.name for e in entries))
+    results = [
+        FileAction(name=e.name, src=Path(src_dirs[0], e.name), dst=Path(site_dir, e.name), action="missing")
+        for e in entries
+        if e.required and e.name not in found
+    ]
+    modules = [os.path.splitext(e.name)[0] for e in entries]
+    if "pyuno" not in modules:
+        modules.append("pyuno")
+    line = uno_finder.get_pth_line(
+        [os.fspath(d) for d in src_dirs], modules, os.fspath(cache_dir) if cache_dir else None
+    )
+    pth = Path(site_dir, uno_finder.PTH_NAME)
+    try:
+        action = "exists" if pth.read_text() == line else "replaced"
+    except FileNotFoundError:
+        action = "linked"
+    if action != "exists":
+        with timings.span("uno_lnk.write_finder"):
+            local_paths.write_text_atomic(pth, line)
+    results.append(FileAction(name=pth.name, src=Path(src_dirs[0]), dst=pth, action=action, strategy="finder"))
+    # the finder comes first on sys.meta_path, links left behind would only be confusing.
+    results.extend(f for f in unlink_files(site_dir, entries, src_dirs, owned) if f.action != "absent")
+    return tuple(results)
+
+
+def remove_finder(site_dir: Path) -> Tuple[FileAction, ...]:
+    """
+    Removes ``oooenv_uno.pth`` from ``site_dir``.
+
+    Returns:
+        Tuple[FileAction, ...]: ``removed`` action if it was present; Otherwise, empty.
+    """
+    pth = Path(site_dir, uno_finder.PTH_NAME)
+    try:
+        os.remove(pth)
+    except FileNotFoundError:
+        return ()
+    return (FileAction(name=pth.name, src=None, dst=pth, action="removed"),)
+
+
+@timings.timed("uno_lnk.add_links")
+def add_links(uno_src_dir: Optional[str] = None):
+    """
+    Adds links to the modules of the link manifest in the virtual environment and prints the outcome.
+
+    See :py:meth:`oooenv.session.OooEnv.link` for a version that does not print.
+    """
+    from ..session import OooEnv
+
+    for line in OooEnv().link(uno_src_dir).messages:
+        print(line)
+
+
+@timings.timed("uno_lnk.remove_links")
 def remove_links():
-    p_site_dir = local_paths.get_site_packages_dir()
-    if p_site_dir is None:
-        print("Unable to find site_packages direct in virtual environment")
-        return
-
-    uno_path = Path(p_site_dir, "uno.py")
-    if uno_path.exists():
-        os.remove(uno_path)
-        print("removed uno.py")
-    else:
-        print("uno.py does not exist in virtual env.")
-    unohelper_path = Path(p_site_dir, "unohelper.py")
-    if unohelper_path.exists():
-        os.remove(unohelper_path)
-        print("removed unohelper.py")
-    else:
-        print("unohelper.py does not exist in virtual env.")
-    return
-    # scriptforge_path = Path(p_site_dir, "scriptforge.py")
-    # if scriptforge_path.exists():
-    #     os.remove(scriptforge_path)
-    #     print("removed scriptforge.py")
-    # else:
-    #     print("scriptforge.py does not exist in virtual env.")
+    """
+    Removes links to the modules of the link manifest from the virtual environment and prints the outcome.
+
+    See :py:meth:`oooenv.session.OooEnv.unlink` for a version that does not print.
+    """
+    from ..session import OooEnv
+
+    for line in OooEnv().unlink().messages:
+        print(line)
 
 
 def main():
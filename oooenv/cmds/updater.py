@@ -1,8 +1,16 @@
 from __future__ import annotations
+import re
+from typing import Dict, MutableMapping, Tuple
 
 from . import manage_env_cfg
+from ..utils import timings
+from ..utils.py_version import Version
 
+VERSION_KEYS = ("version_info", "base-prefix", "base-exec-prefix")
+"""Keys of a LibreOffice cfg profile that contain the LibreOffice python version."""
 
+
+@timings.timed("updater.needs_updating")
 def needs_updating(fnm: str = "pyvenv_uno.cfg") -> bool:
     """
     Checks if the current environment needs updating.
@@ -11,13 +19,15 @@ def needs_updating(fnm: str = "pyvenv_uno.cfg") -> bool:
         bool: True if needs updating.
     """
     try:
-        cfg_version = manage_env_cfg.get_libreoffice_py_ver_from_cfg(fnm=fnm)
+        with manage_env_cfg._lock_venv(exclusive=False):
+            cfg_version = manage_env_cfg.get_libreoffice_py_ver_from_cfg(fnm=fnm)
         uno_py_version = manage_env_cfg.get_uno_python_ver()
         return cfg_version != uno_py_version
     except Exception:
         return False
 
 
+@timings.timed("updater.update_cfg")
 def update_cfg(fnm: str = "pyvenv_uno.cfg") -> None:
     """
     Updates a config file to the current UNO Python version.
@@ -27,13 +37,41 @@ def update_cfg(fnm: str = "pyvenv_uno.cfg") -> None:
     Args:
         fnm (str, optional): Config File to update. Defaults to "pyvenv_uno.cfg".
     """
-    cfg_version = manage_env_cfg.get_libreoffice_py_ver_from_cfg(fnm=fnm)
+    # the version is probed before locking, the lock is only held for the read and write of the cfg.
     uno_py_version = manage_env_cfg.get_uno_python_ver()
-    if cfg_version == uno_py_version:
-        return
-    cfg = manage_env_cfg.read_pyvenv_cfg(fnm=fnm)
-    ver_old = str(cfg_version)
-    ver_new = str(uno_py_version)
-    for key, value in cfg.items():
-        cfg[key] = value.replace(ver_old, ver_new)
-    manage_env_cfg.save_config(cfg, fnm=fnm)
+    with manage_env_cfg._lock_venv():
+        cfg_version = manage_env_cfg.get_libreoffice_py_ver_from_cfg(fnm=fnm)
+        if cfg_version == uno_py_version:
+            return
+        cfg = manage_env_cfg.read_pyvenv_cfg(fnm=fnm)
+        rewrite_version(cfg, cfg_version, uno_py_version)
+        manage_env_cfg.save_config(cfg, fnm=fnm)
+
+
+def rewrite_version(cfg: MutableMapping[str, str], ver_old: Version, ver_new: Version) -> Dict[str, Tuple[str, str]]:
+    """
+    Replaces the python version in the version keys of a cfg.
+
+    Only :py:data:`VERSION_KEYS` are changed, and only where the old version is a whole version,
+    so ``3.8.1`` does not match in ``3.8.16`` and paths such as ``home`` are never touched.
+
+    Args:
+        cfg (MutableMapping[str, str]): cfg to change in place.
+        ver_old (Version): version to replace.
+        ver_new (Version): new version.
+
+    Returns:
+        Dict[str, Tuple[str, str]]: Changed keys with their old and new value.
+    """
+    pattern = re.compile(rf"(?<![\d.]){re.escape(str(ver_old))}(?!\d)")
+    new = str(ver_new)
+    changes = {}
+    for key in VERSION_KEYS:
+        value = cfg.get(key, None)
+        if value is None:
+            continue
+        changed = pattern.sub(new, value)
+        if changed != value:
+            cfg[key] = changed
+            changes[key] = (value, changed)
+    return changes
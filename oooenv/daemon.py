@@ -0,0 +1,204 @@
+"""
+Long running process that answers path and status queries over a Unix domain socket.
+
+Editor integrations and prompt plugins ask the same questions (*is this venv UNO?*, *where is uno.py?*,
+*which LibreOffice python?*) many times. The daemon keeps discovery and parsed ``pyvenv.cfg`` files warm.
+Each answer is still checked against the files it came from (``mtime`` stamps of the discovery cache,
+``pyvenv.cfg`` identity and the LibreOffice ``program`` dir) so changes are picked up without a restart.
+
+Protocol, one JSON object per line in each direction::
+
+    > {"op": "is_uno", "venv": "/home/me/proj/.venv", "env": [["PATH", "..."]]}
+    < {"ok": true, "value": false}
+
+``env`` is the discovery environment of the client, see :py:func:`oooenv.utils.daemon_client.get_discovery_env`.
+When it differs from the daemon's the answer is ``{"ok": false, "unavailable": true}`` and the client
+resolves in-process.
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import threading
+import socketserver
+from pathlib import Path
+from typing import Any, Callable, Dict, Union
+
+from .queries import run_op
+from .session import OooEnv
+from .utils import daemon_client
+from .utils import resolver
+from .utils.resolver import get_resolver
+
+
+class DaemonState:
+    """
+    Answers requests. Requests are answered one at a time.
+
+    The environment of the daemon must not change once the state is created.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._env = daemon_client.get_discovery_env()
+        self.started = time.time()
+        self.last_active = time.monotonic()
+        self.requests = 0
+        self.stopping = False
+
+    def _get_session(self, venv: Union[str, None]) -> OooEnv:
+        # discovery values are re-validated against the stamps kept in the discovery cache,
+        # a fresh session and resolver is what makes changes on disk visible.
+        get_resolver().clear()
+        site_packages = os.environ.get("OOOENV_SITE_PACKAGES", None)
+        if venv:
+            return OooEnv(venv_path=venv, site_packages=site_packages)
+        # no venv, venv operations raise ValueError.
+        return OooEnv(site_packages=site_packages)
+
+    def answer(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answers a request.
+
+        Args:
+            message (Dict[str, Any]): request.
+
+        Returns:
+            Dict[str, Any]: response.
+        """
+        with self._lock:
+            self.last_active = time.monotonic()
+            self.requests += 1
+            op = message.get("op", "")
+            if op == "ping":
+                return {"ok": True, "value": {"pid": os.getpid(), "started": self.started, "requests": self.requests}}
+            if op == "shutdown":
+                self.stopping = True
+                return {"ok": True, "value": None}
+            env = [tuple(pair) for pair in message.get("env", [])]
+            if env != self._env:
+                return {"ok": False, "unavailable": True, "error": "Daemon runs with a different environment"}
+            try:
+                return {"ok": True, "value": run_op(op, self._get_session(message.get("venv", None)))}
+            except Exception as e:
+                return {"ok": False, "error": str(e) or type(e).__name__}
+
+    def answer_line(self, line: bytes) -> bytes:
+        """Answers a request line with a response line."""
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("Request is not an object")
+        except ValueError as e:
+            response: Dict[str, Any] = {"ok": False, "error": f"Invalid request: {e}"}
+        else:
+            response = self.answer(message)
+        return json.dumps(response).encode("utf-8") + b"\n"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        # a client may send several requests on one connection.
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(self.server.state.answer_line(line))
+            self.wfile.flush()
+            if self.server.state.stopping:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, state: DaemonState) -> None:
+        self.state = state
+        super().__init__(socket_path, _Handler)
+
+
+def _remove_stale_socket(pth: Path) -> None:
+    """
+    Removes a socket left behind by a daemon that is no longer running.
+
+    Raises:
+        RuntimeError: If a daemon is answering on ``pth``.
+    """
+    if not (pth.exists() or pth.is_symlink()):
+        return
+    try:
+        daemon_client.request("ping", socket_path=pth, timeout=0.5)
+    except daemon_client.DaemonUnavailable:
+        pth.unlink()
+        return
+    raise RuntimeError(f"A daemon is already running on {pth}")
+
+
+def serve(
+    socket_path: Union[Path, None] = None,
+    idle_timeout: float = 0.0,
+    on_ready: Union[Callable[[Path], None], None] = None,
+) -> None:
+    """
+    Runs the daemon until it is asked to shut down or was idle for ``idle_timeout`` seconds.
+
+    Args:
+        socket_path (Path, optional): Socket to listen on. Defaults to :py:func:`oooenv.utils.daemon_client.get_socket_path`.
+        idle_timeout (float, optional): Seconds without requests after which the daemon exits. ``0`` never exits.
+        on_ready (Callable[[Path], None], optional): Called with the socket path once the daemon accepts connections.
+
+    Raises:
+        RuntimeError: If Unix domain sockets are not supported or another daemon is running.
+    """
+    if not daemon_client.is_supported():
+        raise RuntimeError("oooenv daemon requires Unix domain sockets")
+    pth = daemon_client.get_socket_path() if socket_path is None else Path(socket_path)
+    pth.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    _remove_stale_socket(pth)
+
+    # the venv comes with each request, never from the environment the daemon was started in.
+    for name in daemon_client.VENV_NAMES:
+        os.environ.pop(name, None)
+
+    # the environment is fixed from here on, the resolver does not need to watch it.
+    resolver._RESOLVER = resolver.PathResolver(check_env=False)
+    state = DaemonState()
+    old_umask = os.umask(0o177)
+    try:
+        server = _Server(os.fspath(pth), state)
+    finally:
+        os.umask(old_umask)
+    ident = pth.stat().st_ino
+    server.timeout = 0.5
+    try:
+        if on_ready is not None:
+            on_ready(pth)
+        while not state.stopping:
+            server.handle_request()
+            if idle_timeout > 0 and time.monotonic() - state.last_active > idle_timeout:
+                break
+    finally:
+        server.server_close()
+        try:
+            if pth.stat().st_ino == ident:
+                pth.unlink()
+        except OSError:
+            pass
+
+
+def main(socket_path: Union[Path, None] = None, idle_timeout: float = 0.0) -> int:
+    """Runs the daemon in the foreground. Returns the process exit code."""
+
+    def on_ready(pth: Path) -> None:
+        print(f"oooenv daemon listening on {pth} (pid {os.getpid()})", file=sys.stderr)
+
+    try:
+        serve(socket_path=socket_path, idle_timeout=idle_timeout, on_ready=on_ready)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,51 @@
+"""
+Read only queries about a virtual environment and its LibreOffice.
+
+Answered by ``oooenv query`` and by the ``oooenv daemon``. Both use :py:func:`run_op` so answers
+are the same whether they come from the daemon or are resolved in-process.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict
+from .session import OooEnv
+
+OPS: Dict[str, Callable[[OooEnv], Any]] = {
+    "is_uno": lambda env: env.is_uno(),
+    "uno_path": lambda env: str(env.uno_path),
+    "lo_path": lambda env: str(env.lo_program_path),
+    "lo_install": lambda env: str(env.lo_install),
+    "lo_python_version": lambda env: str(env.lo_python_version),
+    "site_packages": lambda env: None if env.site_packages is None else str(env.site_packages),
+}
+"""Queries answered for a session. ``status`` answers all of them at once."""
+
+
+def run_op(op: str, env: OooEnv) -> Any:
+    """
+    Answers a query in-process.
+
+    Args:
+        op (str): ``status`` or a key of ``OPS``.
+        env (OooEnv): Session to answer for.
+
+    Raises:
+        ValueError: If ``op`` is unknown.
+
+    Returns:
+        Any: JSON serializable answer. For ``status`` a dictionary of all ``OPS`` with an ``errors``
+        dictionary for the ones that failed.
+    """
+    if op == "status":
+        result: Dict[str, Any] = {}
+        errors = {}
+        for name, func in OPS.items():
+            try:
+                result[name] = func(env)
+            except Exception as e:
+                result[name] = None
+                errors[name] = str(e)
+        result["errors"] = errors
+        return result
+    func = OPS.get(op, None)
+    if func is None:
+        raise ValueError(f"Unknown operation: {op}")
+    return func(env)
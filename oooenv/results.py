@@ -0,0 +1,222 @@
+"""
+Results returned by :py:class:`oooenv.session.OooEnv`.
+
+Results never print. ``messages`` gives the lines the command line interface shows for a result.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple, Union
+from .utils.py_version import Version
+
+
+@dataclass(frozen=True)
+class FileAction:
+    """What happened to one file when adding or removing links."""
+
+    name: str
+    """File name such as ``uno.py``."""
+    src: Union[Path, None]
+    """Source file in LibreOffice. ``None`` when removing."""
+    dst: Path
+    """File in ``site-packages``."""
+    action: str
+    """
+    One of ``linked``, ``copied``, ``replaced``, ``exists``, ``failed``, ``missing``, ``conflict``, ``removed``
+    or ``absent``.
+
+    ``replaced`` is a file that no longer matched its source and was placed again. ``conflict`` is a file
+    of the same name that oooenv did not place, it is left alone.
+    """
+    strategy: str = ""
+    """
+    How the file was placed, ``symlink``, ``hardlink``, ``reflink``, ``copy`` or ``finder`` for the ``.pth`` file
+    of :py:mod:`oooenv.uno_finder`. Empty if it was not placed.
+    """
+    error: str = ""
+    """Why a file ``failed``."""
+
+    @property
+    def message(self) -> str:
+        """Gets a human readable description of the action."""
+        if self.action == "linked":
+            if self.strategy == "hardlink":
+                return f"Created hard link to store: {self.src} -> {self.dst}"
+            if self.strategy == "reflink":
+                return f"Created reflink to store: {self.src} -> {self.dst}"
+            if self.strategy == "finder":
+                return f"Created import finder: {self.dst} -> {self.src}"
+            return f"Created system link: {self.src} -> {self.dst}"
+        if self.action == "copied":
+            return f"Copied file: {self.src} -> {self.dst}"
+        if self.action == "replaced":
+            return f"Replaced stale file ({self.strategy}): {self.src} -> {self.dst}"
+        if self.action == "exists":
+            return f"File already exist: {self.dst}"
+        if self.action == "failed":
+            return f"Unable to place {self.name}: {self.error}"
+        if self.action == "missing":
+            return f"{self.name} not found."
+        if self.action == "conflict":
+            return f"Left {self.dst} alone, it was not placed by oooenv"
+        if self.action == "removed":
+            return f"removed {self.name}"
+        return f"{self.name} does not exist in virtual env."
+
+
+_SUMMARY_LABELS = {"exists": "up to date", "absent": "not present", "conflict": "left alone"}
+
+
+@dataclass(frozen=True)
+class LinkResult:
+    """Result of :py:meth:`~oooenv.session.OooEnv.link` and :py:meth:`~oooenv.session.OooEnv.unlink`."""
+
+    ok: bool
+    site_packages: Union[Path, None]
+    files: Tuple[FileAction, ...] = ()
+    error: str = ""
+    compiled: Tuple[Path, ...] = ()
+    """Bytecode cache files written. See :py:mod:`oooenv.utils.bytecode`."""
+    compile_errors: Tuple[str, ...] = ()
+    """Modules that could not be compiled. Linking still succeeded."""
+
+    @property
+    def summary(self) -> str:
+        """Gets one line counting the files per action, such as ``2 linked, 5 up to date``."""
+        counts: Dict[str, int] = {}
+        for f in self.files:
+            counts[f.action] = counts.get(f.action, 0) + 1
+        if not counts:
+            return "No files"
+        return ", ".join(f"{n} {_SUMMARY_LABELS.get(action, action)}" for action, n in counts.items())
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets human readable lines describing the result. Files that are up to date are only counted."""
+        if self.error:
+            return (self.error,)
+        lines = [f.message for f in self.files if f.action != "exists"]
+        lines.extend(f"Unable to compile {err}" for err in self.compile_errors)
+        if self.compiled:
+            lines.append(f"Compiled {len(self.compiled)} modules into {self.compiled[0].parent}")
+        lines.append(self.summary)
+        return tuple(lines)
+
+
+@dataclass(frozen=True)
+class ToggleResult:
+    """Result of :py:meth:`~oooenv.session.OooEnv.toggle`."""
+
+    ok: bool
+    profile: str
+    """Profile ``pyvenv.cfg`` now uses such as ``pyvenv_uno.cfg``. Empty if nothing was switched."""
+    target: str
+    """``uno``, ``orig`` or the suffix of a custom profile."""
+    elapsed: float = 0.0
+    """Seconds the switch took."""
+    saved: Tuple[Path, ...] = ()
+    """Profiles that were created because they did not exist yet."""
+    error: str = ""
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets human readable lines describing the result."""
+        if not self.ok:
+            return (self.error, "No action taken")
+        lines = ["Saved cfg" for _ in self.saved]
+        ms = f"{self.elapsed * 1000:.3f} ms"
+        if self.target == "uno":
+            lines.append(f"Set to UNO Environment ({ms})")
+        elif self.target == "orig":
+            lines.append(f"Set to Original Environment ({ms})")
+        else:
+            lines.append(f"Set to {self.target} environment. ({ms})")
+        return tuple(lines)
+
+
+@dataclass(frozen=True)
+class UpdateResult:
+    """Result of :py:meth:`~oooenv.session.OooEnv.update`."""
+
+    cfg_file: Path
+    updated: bool
+    old_version: Version
+    new_version: Version
+    reactivated: bool = False
+    """``True`` if ``pyvenv.cfg`` was switched to the updated profile again."""
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets human readable lines describing the result."""
+        return ("Update Complete",) if self.updated else ("No Update Needed",)
+
+
+@dataclass(frozen=True)
+class ProfileUpdate:
+    """What happened to one cfg profile in :py:meth:`~oooenv.session.OooEnv.update_all`."""
+
+    cfg_file: Path
+    old_version: Union[Version, None]
+    """Version the profile recorded. ``None`` if it could not be read."""
+    new_version: Version
+    changes: Tuple[Tuple[str, str, str], ...] = ()
+    """Changed keys as ``(key, old value, new value)``."""
+    note: str = ""
+    """Why the profile was left alone, such as ``up to date``."""
+    elapsed: float = 0.0
+    """Seconds updating the profile took."""
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets the file name with a diff of the changed keys."""
+        if not self.changes:
+            return (f"{self.cfg_file.name}: {self.note}",)
+        lines = [f"{self.cfg_file.name}: {self.old_version} -> {self.new_version}"]
+        for key, old, new in self.changes:
+            lines.append(f"  - {key} = {old}")
+            lines.append(f"  + {key} = {new}")
+        return tuple(lines)
+
+
+@dataclass(frozen=True)
+class UpdateAllResult:
+    """Result of :py:meth:`~oooenv.session.OooEnv.update_all`."""
+
+    new_version: Version
+    profiles: Tuple[ProfileUpdate, ...] = ()
+    dry_run: bool = False
+    reactivated: bool = False
+    """``True`` if ``pyvenv.cfg`` was switched to the updated ``pyvenv_uno.cfg`` again."""
+
+    @property
+    def updated(self) -> Tuple[ProfileUpdate, ...]:
+        """Gets the profiles that were changed, or would be changed on a dry run."""
+        return tuple(p for p in self.profiles if p.changes)
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets a diff per profile and a summary line."""
+        lines = [line for p in self.profiles for line in p.messages]
+        verb = "Would update" if self.dry_run else "Updated"
+        lines.append(f"{verb} {len(self.updated)} of {len(self.profiles)} profiles to python {self.new_version}")
+        return tuple(lines)
+
+
+@dataclass(frozen=True)
+class PipEResult:
+    """Result of :py:meth:`~oooenv.session.OooEnv.pip_e`."""
+
+    ok: bool
+    pth_file: Union[Path, None]
+    root: Union[Path, None] = None
+    """Project root written to ``pth_file``."""
+    error: str = ""
+
+    @property
+    def messages(self) -> Tuple[str, ...]:
+        """Gets human readable lines describing the result."""
+        if self.ok:
+            return (f"Created file: {self.pth_file}",)
+        if self.error:
+            return (f"Failed to create file: {self.pth_file}\n{self.error}",)
+        return ()
@@ -0,0 +1,711 @@
+"""
+Embeddable API for configuring a virtual environment for LibreOffice.
+
+:py:class:`OooEnv` resolves the virtual environment, its ``site-packages`` and the LibreOffice
+paths once, on first use, and keeps them for the life of the session. Methods return results
+from :py:mod:`oooenv.results` and never print, so a session can be used in-process as often as needed.
+
+Example:
+    .. code-block:: python
+
+        from oooenv.session import OooEnv
+
+        env = OooEnv(venv_path="/home/me/project/.venv")
+        env.link()
+        if env.needs_update():
+            env.update()
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import threading
+from contextlib import nullcontext, suppress
+from dataclasses import replace
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Mapping, Tuple, TypeVar, Union
+
+from .results import LinkResult, PipEResult, ProfileUpdate, ToggleResult, UpdateAllResult, UpdateResult
+from .utils import bytecode
+from .utils import link_manifest
+from .utils import local_paths
+from .utils import py_version
+from .utils import pyvenv_config
+from .utils import timings
+from .utils import uno_paths
+from .utils import venv_lock
+from .utils.py_version import Version
+from .utils.pyvenv_config import PyvenvConfig
+from .utils.resolver import get_resolver
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+PathLike = Union[str, os.PathLike]
+
+
+def _locked(exclusive: bool) -> Callable[[F], F]:
+    """Runs a method holding the lock of the virtual environment. See :py:mod:`oooenv.utils.venv_lock`."""
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(self: OooEnv, *args: Any, **kwargs: Any) -> Any:
+            with self.lock(exclusive=exclusive):
+                return func(self, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class OooEnv:
+    """
+    A virtual environment and the LibreOffice it is configured for.
+
+    Paths not passed to the constructor are discovered the same way the command line interface does,
+    when first needed. Safe to use from several threads. Methods that change the virtual environment hold its
+    exclusive lock and methods that read it the shared lock, so processes working on the same virtual
+    environment do not interleave. See :py:mod:`oooenv.utils.venv_lock`.
+    """
+
+    def __init__(
+        self,
+        venv_path: Union[PathLike, None] = None,
+        lo_install: Union[PathLike, None] = None,
+        site_packages: Union[PathLike, None] = None,
+        uno_path: Union[PathLike, None] = None,
+    ) -> None:
+        """
+        Constructor
+
+        Args:
+            venv_path (str | PathLike, optional): Virtual environment. Defaults to ``OOOENV_VIRTUAL_ENV`` or ``VIRTUAL_ENV``.
+            lo_install (str | PathLike, optional): LibreOffice install dir such as ``/opt/libreoffice7.6``.
+                Defaults to the discovered install.
+            site_packages (str | PathLike, optional): ``site-packages`` dir. Defaults to the one in ``venv_path``.
+            uno_path (str | PathLike, optional): Directory that contains ``uno.py``.
+                Defaults to ``program`` of ``lo_install`` if it has ``uno.py``, otherwise the discovered path.
+        """
+        self._lock = threading.Lock()
+        self._explicit_venv = venv_path is not None
+        self._explicit_install = lo_install is not None
+        self._values: Dict[str, Any] = {}
+        for key, value in (
+            ("venv_path", venv_path),
+            ("lo_install", lo_install),
+            ("site_packages", site_packages),
+            ("uno_path", uno_path),
+        ):
+            if value is not None:
+                self._values[key] = Path(value)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self._values.items())})"
+
+    def _get(self, key: str, find: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+        # errors are not kept so a later call can succeed once the environment is fixed.
+        value = find()
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def _put(self, key: str, value: T) -> T:
+        # keeps a value found elsewhere, such as by oooenv.aio. A value already kept wins.
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def lock(self, exclusive: bool = True) -> ContextManager[None]:
+        """
+        Holds the lock of the virtual environment. See :py:func:`oooenv.utils.venv_lock.lock`.
+
+        Args:
+            exclusive (bool, optional): Exclusive lock for changes, shared lock for reads. Defaults to ``True``.
+
+        Returns:
+            ContextManager[None]: Lock. Nothing is locked when there is no virtual environment.
+        """
+        try:
+            venv = self.venv_path
+        except ValueError:
+            return nullcontext()
+        return venv_lock.lock(venv, exclusive=exclusive)
+
+    # region Paths
+    @property
+    def venv_path(self) -> Path:
+        """
+        Gets the virtual environment path.
+
+        Raises:
+            ValueError: If no path was passed and no virtual environment is active.
+        """
+        return self._get("venv_path", _find_venv_path)
+
+    @property
+    def site_packages(self) -> Union[Path, None]:
+        """Gets ``site-packages`` of the virtual environment. ``None`` if not found."""
+        return self._get("site_packages", self._find_site_packages)
+
+    @property
+    def lo_install(self) -> Path:
+        """Gets LibreOffice install path such as ``C:\\Program Files\\LibreOffice`` or ``/usr/lib/libreoffice``."""
+        return self._get("lo_install", uno_paths.get_soffice_install_path)
+
+    @property
+    def lo_program_path(self) -> Path:
+        """Gets LibreOffice ``program`` dir. This is the ``home`` of a UNO environment."""
+        return self._get("lo_program_path", self._find_lo_program_path)
+
+    @property
+    def uno_path(self) -> Path:
+        """Gets the directory that contains ``uno.py``."""
+        return self._get("uno_path", self._find_uno_path)
+
+    @property
+    def lo_python_version(self) -> Version:
+        """Gets the version of LibreOffice python."""
+        return self._get("lo_python_version", self._find_lo_python_version)
+
+    @property
+    def lo_python_exe(self) -> Path:
+        """Gets the LibreOffice python executable. It may not exist, LibreOffice of Linux distributions has none."""
+        return self.lo_program_path / ("python.exe" if sys.platform == "win32" else "python")
+
+    def _find_site_packages(self) -> Union[Path, None]:
+        if self._explicit_venv:
+            return local_paths.find_site_packages_dir(self.venv_path)
+        return local_paths.get_site_packages_dir()
+
+    def _find_lo_program_path(self) -> Path:
+        if self._explicit_install:
+            return self.lo_install / "program"
+        return Path(get_resolver().get("cfg_lo_path", _find_lo_path))
+
+    def _find_uno_path(self) -> Path:
+        if self._explicit_install:
+            program = self.lo_program_path
+            if (program / "uno.py").exists():
+                return program
+        return uno_paths.get_uno_path()
+
+    def _find_lo_python_version(self) -> Version:
+        return py_version.resolve_version(self.lo_program_path, str(self.lo_python_exe))
+
+    # endregion Paths
+
+    # region Links
+    def _get_linked_files(self) -> Tuple[str, ...]:
+        from .utils import link_settings
+
+        with suppress(ValueError):
+            settings = link_settings.load(self.venv_path)
+            if settings is not None:
+                return settings.files
+        return ()
+
+    @timings.timed("session.link")
+    @_locked(exclusive=True)
+    def link(
+        self,
+        uno_src_dir: Union[PathLike, None] = None,
+        strategy: str = "",
+        manifest: Union[PathLike, None] = None,
+        mode: str = "links",
+        pyc: str = "",
+    ) -> LinkResult:
+        """
+        Links ``uno.py``, ``unohelper.py`` and the other modules of the link manifest into ``site-packages``.
+        The settings are recorded in the virtual environment, see :py:mod:`oooenv.utils.link_settings`.
+        Files of the same name that oooenv did not place are left alone and reported as ``conflict``.
+
+        With ``mode="finder"`` nothing is linked. ``oooenv_uno.pth`` is written instead, it installs
+        the import finder of :py:mod:`oooenv.uno_finder` when the virtual environment starts.
+
+        Args:
+            uno_src_dir (str | PathLike, optional): Directory containing ``uno.py``. Defaults to :py:attr:`uno_path`.
+                Modules not in :py:attr:`uno_path` are then looked for in :py:attr:`lo_program_path`.
+            strategy (str, optional): One of ``auto``, ``symlink``, ``hardlink``, ``reflink`` or ``copy``.
+                See :py:mod:`oooenv.utils.link_store`. Defaults to ``OOOENV_LINK_STRATEGY`` or ``auto``.
+            manifest (str | PathLike, optional): Manifest file. See :py:mod:`oooenv.utils.link_manifest`.
+                Defaults to ``OOOENV_LINK_MANIFEST`` or the built in manifest.
+            mode (str, optional): ``links`` or ``finder``. Switching mode removes what the other mode added.
+                Defaults to ``links``.
+            pyc (str, optional): How the modules are compiled into ``site-packages/__pycache__``,
+                ``checked-hash``, ``unchecked-hash`` or ``none``. See :py:mod:`oooenv.utils.bytecode`.
+                Defaults to ``OOOENV_PYC_INVALIDATION`` or ``checked-hash``.
+
+        Raises:
+            FileNotFoundError: If ``uno_src_dir`` or ``manifest`` does not exist.
+            NotADirectoryError: If ``uno_src_dir`` is not a directory.
+            ValueError: If ``strategy``, ``mode`` or ``pyc`` is not known or ``manifest`` is not valid.
+
+        Returns:
+            LinkResult: Result.
+        """
+        from .cmds import uno_lnk
+        from .utils import link_settings
+        from .utils import link_store
+
+        if mode not in ("links", "finder"):
+            raise ValueError(f"Unknown link mode: {mode}")
+        pyc = pyc or bytecode.get_invalidation_mode()
+        if pyc not in bytecode.INVALIDATION_MODES:
+            raise ValueError(f"Unknown invalidation mode: {pyc}")
+        entries = link_manifest.load_manifest(manifest)
+        src_dir = str(uno_src_dir).strip() if uno_src_dir is not None else ""
+        fallback_dirs = []
+        if src_dir:
+            p_uno_dir = Path(src_dir)
+            if not p_uno_dir.exists():
+                raise FileNotFoundError(f"Uno Source Dir not found: {uno_src_dir}")
+            if not p_uno_dir.is_dir():
+                raise NotADirectoryError(f"UNO source is not a Directory: {uno_src_dir}")
+        else:
+            p_uno_dir = self.uno_path
+            # distributions put uno.py in dist-packages, the other modules stay in program.
+            try:
+                program = self.lo_program_path
+            except Exception:
+                program = p_uno_dir
+            if program != p_uno_dir:
+                fallback_dirs.append(program)
+        site_dir = self.site_packages
+        if site_dir is None:
+            return LinkResult(ok=False, site_packages=None, error=_NO_SITE_PACKAGES)
+        cache_dir = bytecode.get_cache_dir(site_dir)
+        owned = self._get_linked_files()
+        if mode == "finder":
+            src_dirs = [p_uno_dir, *fallback_dirs]
+            files = uno_lnk.write_finder(src_dirs, site_dir, entries, None if pyc == "none" else cache_dir, owned)
+            conflicts = {f.name for f in files if f.action == "conflict"}
+            found = uno_lnk.find_sources(src_dirs, (e.name for e in entries)) if pyc != "none" else {}
+            sources = {name: src for name, src in found.items() if name not in conflicts}
+            placed: Tuple[str, ...] = ()
+        else:
+            files = uno_lnk.link_files(
+                p_uno_dir, site_dir, entries, strategy=strategy, fallback_dirs=fallback_dirs, owned=owned
+            )
+            files += uno_lnk.remove_finder(site_dir)
+            sources = {f.name: f.src for f in files if f.src is not None and f.action not in ("failed", "conflict")}
+            names = {e.name for e in entries}
+            placed = tuple(f.name for f in files if f.name in names and f.action in _PLACED_ACTIONS)
+            # files of a previous manifest stay known as placed by oooenv if it lists them again.
+            placed += tuple(uno_lnk.find_owned(site_dir, [n for n in owned if n not in names], owned=owned))
+        required = {e.name for e in entries if e.required}
+        ok = all(f.action not in ("missing", "failed") for f in files)
+        ok = ok and not any(f.action == "conflict" and f.name in required for f in files)
+        # cache files are named after the import name, the one a link in site-packages has.
+        modules = {name[:-3]: src for name, src in sources.items() if name.endswith(".py")}
+        compiled = bytecode.compile_modules(modules, cache_dir, pyc, bytecode.get_target_python(site_dir))
+        manifest_file = link_manifest.get_manifest_file() if manifest is None else Path(manifest)
+        settings = link_settings.LinkSettings(
+            mode=mode,
+            strategy=strategy or link_store.get_strategy(),
+            manifest="" if manifest_file is None else os.path.abspath(manifest_file),
+            pyc=pyc,
+            files=placed,
+        )
+        with suppress(ValueError):
+            # nothing is recorded for a site-packages without a virtual environment.
+            link_settings.save(self.venv_path, settings)
+        return LinkResult(
+            ok=ok, site_packages=site_dir, files=files, compiled=compiled.compiled, compile_errors=compiled.errors
+        )
+
+    @timings.timed("session.unlink")
+    @_locked(exclusive=True)
+    def unlink(self, manifest: Union[PathLike, None] = None) -> LinkResult:
+        """
+        Removes the modules of the link manifest, their bytecode and ``oooenv_uno.pth`` from ``site-packages``.
+        The recorded link settings are removed too. Files oooenv did not place are left alone.
+
+        Args:
+            manifest (str | PathLike, optional): Manifest file. See :py:meth:`link`.
+
+        Raises:
+            FileNotFoundError: If ``manifest`` does not exist.
+            ValueError: If ``manifest`` is not valid.
+
+        Returns:
+            LinkResult: Result.
+        """
+        from .cmds import uno_lnk
+        from .utils import link_settings
+
+        entries = link_manifest.load_manifest(manifest)
+        site_dir = self.site_packages
+        if site_dir is None:
+            return LinkResult(ok=False, site_packages=None, error=_NO_SITE_PACKAGES)
+        files = uno_lnk.unlink_files(site_dir, entries, owned=self._get_linked_files())
+        files += uno_lnk.remove_finder(site_dir)
+        conflicts = {f.name for f in files if f.action == "conflict"}
+        modules = (Path(e.name).stem for e in entries if e.name not in conflicts)
+        bytecode.remove_modules(bytecode.get_cache_dir(site_dir), modules)
+        with suppress(ValueError):
+            link_settings.remove(self.venv_path)
+        return LinkResult(ok=True, site_packages=site_dir, files=files)
+
+    # endregion Links
+
+    # region Config
+    @_locked(exclusive=False)
+    def load_cfg(self, fnm: str = "pyvenv.cfg") -> PyvenvConfig:
+        """
+        Loads a cfg file of the virtual environment keeping comments and key order.
+
+        Args:
+            fnm (str, optional): cfg file name. Defaults to ``pyvenv.cfg``.
+
+        Raises:
+            FileNotFoundError: If file does not exist.
+
+        Returns:
+            PyvenvConfig: cfg that can be changed and passed to :py:meth:`save_cfg`.
+        """
+        return pyvenv_config.load(self.venv_path / fnm)
+
+    @_locked(exclusive=True)
+    def save_cfg(self, cfg: Mapping[str, str], fnm: str = "pyvenv.cfg") -> Path:
+        """
+        Atomically saves a cfg file in the virtual environment.
+
+        Args:
+            cfg (Mapping[str, str]): cfg to save. A :py:class:`~oooenv.utils.pyvenv_config.PyvenvConfig`
+                is written as is. For other mappings comments and key order of the existing file are kept.
+            fnm (str, optional): cfg file name. Defaults to ``pyvenv.cfg``.
+
+        Returns:
+            Path: saved file.
+        """
+        f_out = self.venv_path / fnm
+        if isinstance(cfg, PyvenvConfig):
+            doc = cfg
+        elif f_out.exists():
+            doc = pyvenv_config.load(f_out)
+            doc.assign(cfg)
+        else:
+            doc = PyvenvConfig.from_dict(cfg)
+        pyvenv_config.save(f_out, doc)
+        return f_out
+
+    @_locked(exclusive=True)
+    def switch(self, fnm: str, mode: str = "") -> float:
+        """
+        Makes ``pyvenv.cfg`` use the profile ``fnm``. The profile is not parsed.
+
+        Args:
+            fnm (str): Profile file name in the virtual environment such as ``pyvenv_uno.cfg``.
+            mode (str, optional): Switch mode. See :py:func:`oooenv.utils.local_paths.switch_file`.
+
+        Returns:
+            float: Seconds the switch took.
+        """
+        env_path = self.venv_path
+        with timings.span("session.switch", profile=fnm):
+            return local_paths.switch_file(src=env_path / fnm, dst=env_path / "pyvenv.cfg", mode=mode)
+
+    @timings.timed("session.is_uno")
+    @_locked(exclusive=False)
+    def is_uno(self, cfg: Union[Mapping[str, str], None] = None) -> bool:
+        """
+        Gets if the virtual environment is set to LibreOffice python.
+
+        Args:
+            cfg (Mapping[str, str], optional): cfg to check. Defaults to ``pyvenv.cfg``.
+
+        Returns:
+            bool: ``True`` if ``home`` of cfg is the LibreOffice ``program`` dir.
+        """
+        if cfg is None:
+            cfg = self.load_cfg()
+        home = cfg.get("home", "")
+        if not home:
+            return False
+        return home.lower() == str(self.lo_program_path).lower()
+
+    @timings.timed("session.toggle")
+    @_locked(exclusive=True)
+    def toggle(self, suffix: str = "", mode: str = "") -> ToggleResult:
+        """
+        Toggles between original and UNO configuration or sets a custom configuration.
+
+        ``pyvenv_orig.cfg`` and ``pyvenv_uno.cfg`` are created when they do not exist.
+
+        Args:
+            suffix (str, optional): Suffix of custom configuration. ``myenv`` sets ``pyvenv_myenv.cfg``.
+            mode (str, optional): Switch mode. See :py:func:`oooenv.utils.local_paths.switch_file`.
+
+        Returns:
+            ToggleResult: Result.
+        """
+        env_path = self.venv_path
+        suffix = suffix.strip()
+        if suffix:
+            src = env_path / f"pyvenv_{suffix}.cfg"
+            if not src.exists():
+                return ToggleResult(ok=False, profile="", target=suffix, error=f'File not found: "{src}"')
+            return ToggleResult(ok=True, profile=src.name, target=suffix, elapsed=self.switch(src.name, mode=mode))
+
+        cfg = self.load_cfg()
+        if self.is_uno(cfg):
+            elapsed = self.switch("pyvenv_orig.cfg", mode=mode)
+            return ToggleResult(ok=True, profile="pyvenv_orig.cfg", target="orig", elapsed=elapsed)
+
+        saved = []
+        if not (env_path / "pyvenv_orig.cfg").exists():
+            saved.append(self.save_cfg(cfg.copy(), "pyvenv_orig.cfg"))
+        if not (env_path / "pyvenv_uno.cfg").exists():
+            saved.append(self.save_cfg(self._create_uno_cfg(cfg), "pyvenv_uno.cfg"))
+        elapsed = self.switch("pyvenv_uno.cfg", mode=mode)
+        return ToggleResult(ok=True, profile="pyvenv_uno.cfg", target="uno", elapsed=elapsed, saved=tuple(saved))
+
+    def _create_uno_cfg(self, cfg: PyvenvConfig) -> PyvenvConfig:
+        ver = str(self.lo_python_version)
+        hm = self.lo_program_path
+        result = cfg.copy()
+        if "version" in result:
+            del result["version"]
+        result["home"] = str(hm)
+        result["implementation"] = "CPython"
+        result["version_info"] = f"{ver}.final.0"
+        result["include-system-site-packages"] = "false"
+        result["base-prefix"] = str(hm / f"python-core-{ver}")
+        result["base-exec-prefix"] = str(hm / f"python-core-{ver}")
+        result["base-executable"] = str(hm / ("python.exe" if sys.platform == "win32" else "python"))
+        return result
+
+    # endregion Config
+
+    # region Update
+    @_locked(exclusive=False)
+    def cfg_version(self, fnm: str = "pyvenv_uno.cfg") -> Version:
+        """
+        Gets LibreOffice python version recorded in a cfg file.
+
+        Args:
+            fnm (str, optional): cfg file name. Defaults to ``pyvenv_uno.cfg``.
+
+        Raises:
+            ValueError: If ``version_info`` is not in cfg.
+
+        Returns:
+            Version: version.
+        """
+        version_info = self.load_cfg(fnm).get("version_info", "")
+        if not version_info:
+            raise ValueError(f"version_info not found in {fnm}")
+        return Version.from_str(version_info)
+
+    @timings.timed("session.needs_update")
+    @_locked(exclusive=False)
+    def needs_update(self, fnm: str = "pyvenv_uno.cfg") -> bool:
+        """
+        Checks if a cfg file records a different python version than LibreOffice has.
+
+        Args:
+            fnm (str, optional): cfg file name. Defaults to ``pyvenv_uno.cfg``.
+
+        Returns:
+            bool: ``True`` if needs updating. ``False`` if up to date or the versions can not be read.
+        """
+        try:
+            return self.cfg_version(fnm) != self.lo_python_version
+        except Exception:
+            return False
+
+    @timings.timed("session.update")
+    @_locked(exclusive=True)
+    def update(self, fnm: str = "pyvenv_uno.cfg", mode: str = "") -> UpdateResult:
+        """
+        Updates a cfg file to the python version of LibreOffice.
+
+        If ``fnm`` is ``pyvenv_uno.cfg`` and the environment is a UNO environment, ``pyvenv.cfg`` is switched
+        to the updated file again.
+
+        Args:
+            fnm (str, optional): cfg file name. Defaults to ``pyvenv_uno.cfg``.
+            mode (str, optional): Switch mode. See :py:func:`oooenv.utils.local_paths.switch_file`.
+
+        Raises:
+            FileNotFoundError: If ``fnm`` does not exist.
+            ValueError: If ``version_info`` is not in cfg.
+
+        Returns:
+            UpdateResult: Result.
+        """
+        from .cmds import updater
+
+        cfg_file = self.venv_path / fnm
+        ver_old = self.cfg_version(fnm)
+        ver_new = self.lo_python_version
+        if ver_old == ver_new:
+            return UpdateResult(cfg_file=cfg_file, updated=False, old_version=ver_old, new_version=ver_new)
+        cfg = self.load_cfg(fnm)
+        updater.rewrite_version(cfg, ver_old, ver_new)
+        pyvenv_config.save(cfg_file, cfg)
+        reactivated = False
+        if fnm == "pyvenv_uno.cfg" and self.is_uno():
+            self.switch(fnm, mode=mode)
+            reactivated = True
+        return UpdateResult(
+            cfg_file=cfg_file, updated=True, old_version=ver_old, new_version=ver_new, reactivated=reactivated
+        )
+
+    @_locked(exclusive=False)
+    def find_profiles(self) -> Tuple[str, ...]:
+        """
+        Gets the cfg profiles of the virtual environment with one directory scan.
+
+        Returns:
+            Tuple[str, ...]: Sorted ``pyvenv_<suffix>.cfg`` file names such as ``pyvenv_uno.cfg``.
+        """
+        try:
+            with os.scandir(self.venv_path) as it:
+                names = [
+                    e.name for e in it if e.name.startswith("pyvenv_") and e.name.endswith(".cfg") and e.is_file()
+                ]
+        except FileNotFoundError:
+            names = []
+        return tuple(sorted(names))
+
+    @timings.timed("session.update_all")
+    @_locked(exclusive=True)
+    def update_all(
+        self, dry_run: bool = False, mode: str = "", on_profile: Union[Callable[[ProfileUpdate], None], None] = None
+    ) -> UpdateAllResult:
+        """
+        Updates every LibreOffice cfg profile of the virtual environment to the python version of LibreOffice.
+
+        LibreOffice python is probed once for all profiles. Profiles whose ``home`` is not the LibreOffice
+        ``program`` dir, such as ``pyvenv_orig.cfg``, are left alone. Only the keys in
+        :py:data:`~oooenv.cmds.updater.VERSION_KEYS` are changed.
+
+        When ``pyvenv.cfg`` is a UNO cfg it is switched to the updated profile it came from again,
+        or updated itself if it matches no profile.
+
+        Args:
+            dry_run (bool, optional): Only report what would change.
+            mode (str, optional): Switch mode. See :py:func:`oooenv.utils.local_paths.switch_file`.
+            on_profile (Callable[[ProfileUpdate], None], optional): Called with each profile as soon as it is done.
+
+        Returns:
+            UpdateAllResult: Result with a diff per profile.
+        """
+        env_path = self.venv_path
+        ver_new = self.lo_python_version
+        active_file = env_path / "pyvenv.cfg"
+        try:
+            active_cfg: Union[PyvenvConfig, None] = self.load_cfg()
+        except FileNotFoundError:
+            active_cfg = None
+        active_is_uno = active_cfg is not None and self.is_uno(active_cfg)
+        active_text = active_cfg.to_text() if active_cfg is not None else ""
+        source_profile = ""
+        updates: List[ProfileUpdate] = []
+
+        def done(update: ProfileUpdate, start: float) -> None:
+            update = replace(update, elapsed=time.perf_counter() - start)
+            updates.append(update)
+            if on_profile is not None:
+                on_profile(update)
+
+        for fnm in self.find_profiles():
+            start = time.perf_counter()
+            cfg_file = env_path / fnm
+            cfg = self.load_cfg(fnm)
+            text = cfg.to_text()
+            update = self._update_profile(cfg_file, cfg, ver_new)
+            if update.changes:
+                if active_is_uno and not source_profile:
+                    if text == active_text or os.path.samefile(active_file, cfg_file):
+                        source_profile = fnm
+                if not dry_run:
+                    pyvenv_config.save(cfg_file, cfg)
+            done(update, start)
+
+        reactivated = False
+        if active_cfg is not None and active_is_uno:
+            start = time.perf_counter()
+            if source_profile:
+                if not dry_run:
+                    self.switch(source_profile, mode=mode)
+                    reactivated = True
+                verb = "would switch" if dry_run else "switched"
+                done(ProfileUpdate(active_file, None, ver_new, note=f"{verb} to {source_profile}"), start)
+            else:
+                update = self._update_profile(active_file, active_cfg, ver_new)
+                if update.changes and not dry_run:
+                    pyvenv_config.save(active_file, active_cfg)
+                done(update, start)
+        return UpdateAllResult(new_version=ver_new, profiles=tuple(updates), dry_run=dry_run, reactivated=reactivated)
+
+    def _update_profile(self, cfg_file: Path, cfg: PyvenvConfig, ver_new: Version) -> ProfileUpdate:
+        # changes cfg in place
+        from .cmds import updater
+
+        if not self.is_uno(cfg):
+            return ProfileUpdate(cfg_file, None, ver_new, note="not a LibreOffice profile")
+        try:
+            ver_old = Version.from_str(cfg.get("version_info", ""))
+        except ValueError:
+            return ProfileUpdate(cfg_file, None, ver_new, note="version_info not found")
+        if ver_old == ver_new:
+            return ProfileUpdate(cfg_file, ver_old, ver_new, note="up to date")
+        changes = updater.rewrite_version(cfg, ver_old, ver_new)
+        if not changes:
+            return ProfileUpdate(cfg_file, ver_old, ver_new, note="no version keys to change")
+        return ProfileUpdate(
+            cfg_file, ver_old, ver_new, changes=tuple((key, old, new) for key, (old, new) in changes.items())
+        )
+
+    # endregion Update
+
+    # region Install
+    @_locked(exclusive=True)
+    def pip_e(self) -> PipEResult:
+        """
+        Installs the project that contains the virtual environment in editable mode.
+
+        Basically the same thing as ``pip -e .`` but without the need for pip.
+        A ``.pth`` file pointing to the parent of the virtual environment is written to ``site-packages``.
+
+        Returns:
+            PipEResult: Result.
+        """
+        file_name = None
+        try:
+            root_path = self.venv_path.parent
+            site_dir = self.site_packages
+            if site_dir is None:
+                return PipEResult(ok=False, pth_file=None)
+            file_name = site_dir / local_paths.get_pip_e_name(root_path)
+            with open(file_name, "w") as f:
+                f.write(str(root_path))
+            return PipEResult(ok=True, pth_file=file_name, root=root_path)
+        except Exception as e:
+            return PipEResult(ok=False, pth_file=file_name, error=str(e))
+
+    # endregion Install
+
+
+_NO_SITE_PACKAGES = "Unable to find site_packages direct in virtual environment"
+_PLACED_ACTIONS = ("linked", "copied", "replaced", "exists")
+
+
+def _find_venv_path() -> Path:
+    v_path = os.environ.get("OOOENV_VIRTUAL_ENV", "") or os.environ.get("VIRTUAL_ENV", "")
+    if not v_path:
+        raise ValueError("Unable to get Virtual Environment Path")
+    return Path(v_path)
+
+
+def _find_lo_path() -> str:
+    lo_path = os.environ.get("ODEV_CONN_SOFFICE", None)
+    if lo_path:
+        index = lo_path.rfind("program")
+        lo_path = lo_path[: index + 7] if index > -1 else None
+    if not lo_path:
+        lo_path = str(uno_paths.get_soffice_install_path() / "program")
+    return lo_path
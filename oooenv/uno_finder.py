@@ -0,0 +1,171 @@
+"""
+Meta path finder that imports ``uno`` and friends from LibreOffice without links in ``site-packages``.
+
+``oooenv cmd-link --add --mode finder`` writes one line to ``oooenv_uno.pth`` in ``site-packages``::
+
+    import importlib.util; importlib.util.find_spec("oooenv") and __import__("oooenv.uno_finder").uno_finder.install(["/usr/lib/libreoffice/program"], ["uno", "unohelper", "pyuno"])
+
+Python runs it at start up. Only the listed module names are looked for, and only in the listed directories,
+so other imports are not slowed down and the LibreOffice directories are never put on ``sys.path``.
+Switching LibreOffice installs means changing the directories in that line.
+
+When the line names a cache directory, bytecode of the modules is read from and written to that directory
+instead of ``__pycache__`` next to the module, which is usually not writable. See :py:mod:`oooenv.utils.bytecode`.
+
+This module is imported on interpreter start up and must stay small.
+"""
+from __future__ import annotations
+import os
+import sys
+import marshal
+from importlib.machinery import PathFinder, SourceFileLoader
+from importlib.util import MAGIC_NUMBER, source_hash
+
+# typing is not imported at run time, it would add to the start up of every interpreter in the venv.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from importlib.machinery import ModuleSpec
+    from types import CodeType
+    from typing import Iterable, List, Sequence, Union
+
+PTH_NAME = "oooenv_uno.pth"
+"""Name of the ``.pth`` file in ``site-packages``."""
+
+
+class CachedSourceLoader(SourceFileLoader):
+    """Source loader that keeps hash based bytecode in a directory of its own, see :pep:`552`."""
+
+    def __init__(self, fullname: str, path: str, cache_dir: str) -> None:
+        super().__init__(fullname, path)
+        self.cache_dir = cache_dir
+
+    def get_cache_file(self) -> str:
+        """Gets the bytecode file of the module."""
+        return os.path.join(self.cache_dir, f"{self.name}.{sys.implementation.cache_tag}.pyc")
+
+    def get_code(self, fullname: str) -> CodeType:
+        source_path = self.get_filename(fullname)
+        cfile = self.get_cache_file()
+        source = None
+        try:
+            with open(cfile, "rb") as file:
+                data = file.read()
+        except OSError:
+            data = b""
+        if len(data) > 16 and data[:4] == MAGIC_NUMBER:
+            flags = int.from_bytes(data[4:8], "little")
+            # bit 0 hash based, bit 1 check source. Time stamp based files are not written here.
+            if flags & 0b01:
+                if flags & 0b10:
+                    source = self.get_data(source_path)
+                    fresh = source_hash(source) == data[8:16]
+                else:
+                    fresh = True
+                if fresh:
+                    return marshal.loads(memoryview(data)[16:])
+        if source is None:
+            source = self.get_data(source_path)
+        code = self.source_to_code(source, source_path)
+        if not sys.dont_write_bytecode:
+            self._write_cache(cfile, source, code)
+        return code
+
+    def _write_cache(self, cfile: str, source: bytes, code: CodeType) -> None:
+        data = MAGIC_NUMBER + (0b11).to_bytes(4, "little") + source_hash(source) + marshal.dumps(code)
+        tmp = f"{cfile}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp, "wb") as file:
+                file.write(data)
+            os.replace(tmp, cfile)
+        except OSError:
+            # a read only venv imports without a cache.
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+class UnoFinder:
+    """Finds a fixed set of top level modules in a fixed list of directories. A ``sys.meta_path`` finder."""
+
+    def __init__(self, dirs: Iterable[str], names: Iterable[str], cache_dir: Union[str, None] = None) -> None:
+        """
+        Constructor
+
+        Args:
+            dirs (Iterable[str]): Directories to look in, in order.
+            names (Iterable[str]): Top level module names such as ``uno``.
+            cache_dir (str, optional): Directory for bytecode of the modules.
+                Defaults to ``__pycache__`` next to each module.
+        """
+        self.dirs: List[str] = list(dirs)
+        self.names = frozenset(names)
+        self.cache_dir = cache_dir
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.dirs!r}, {sorted(self.names)!r}, {self.cache_dir!r})"
+
+    def find_spec(
+        self, fullname: str, path: Union[Sequence[str], None] = None, target: object = None
+    ) -> Union[ModuleSpec, None]:
+        if path is not None or fullname not in self.names:
+            return None
+        spec = PathFinder.find_spec(fullname, self.dirs)
+        if (
+            spec is not None
+            and self.cache_dir
+            and type(spec.loader) is SourceFileLoader
+            and os.path.basename(spec.origin or "") == f"{fullname}.py"
+        ):
+            spec.loader = CachedSourceLoader(fullname, spec.origin, self.cache_dir)
+            spec.cached = spec.loader.get_cache_file()
+        return spec
+
+
+def install(dirs: Iterable[str], names: Iterable[str], cache_dir: Union[str, None] = None) -> UnoFinder:
+    """
+    Puts a :py:class:`UnoFinder` first on ``sys.meta_path``, replacing one installed before.
+
+    Args:
+        dirs (Iterable[str]): Directories to look in, in order.
+        names (Iterable[str]): Top level module names such as ``uno``.
+        cache_dir (str, optional): Directory for bytecode of the modules.
+
+    Returns:
+        UnoFinder: Installed finder.
+    """
+    uninstall()
+    finder = UnoFinder(dirs, names, cache_dir)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall() -> None:
+    """Removes installed :py:class:`UnoFinder` instances from ``sys.meta_path``."""
+    # compared by name, a finder installed before this module was reloaded is another class.
+    sys.meta_path[:] = [f for f in sys.meta_path if type(f).__name__ != UnoFinder.__name__]
+
+
+def get_pth_line(dirs: Iterable[str], names: Iterable[str], cache_dir: Union[str, None] = None) -> str:
+    """
+    Gets the line of ``oooenv_uno.pth``.
+
+    The finder is only installed when ``oooenv`` can be imported, so a virtual environment
+    without ``oooenv`` still starts.
+
+    Args:
+        dirs (Iterable[str]): Directories to look in, in order.
+        names (Iterable[str]): Top level module names such as ``uno``.
+        cache_dir (str, optional): Directory for bytecode of the modules.
+
+    Returns:
+        str: Line ending with a newline.
+    """
+    args = f"{list(dirs)!r}, {list(names)!r}"
+    if cache_dir:
+        args += f", {cache_dir!r}"
+    return (
+        'import importlib.util; importlib.util.find_spec("oooenv") and '
+        f'__import__("oooenv.uno_finder").uno_finder.install({args})\n'
+    )
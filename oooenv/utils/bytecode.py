@@ -0,0 +1,247 @@
+"""
+Bytecode cache for the LibreOffice modules of a virtual environment.
+
+LibreOffice modules live in directories such as ``/usr/lib/libreoffice/program`` that the user can not write.
+Python can not cache their bytecode there and compiles them again on every cold start.
+Linking compiles them into ``site-packages/__pycache__`` instead, which the virtual environment owns.
+Imports through a link in ``site-packages`` look there already, :py:mod:`oooenv.uno_finder` is pointed there.
+
+The cache files are hash based (:pep:`552`), so they stay valid when file modification times do not,
+such as in container images:
+
+- ``checked-hash`` the source is hashed on import and the cache is used while it matches.
+- ``unchecked-hash`` the cache is used without looking at the source. Link again after LibreOffice changes.
+- ``none`` nothing is compiled.
+"""
+from __future__ import annotations
+import os
+import re
+import sys
+import json
+import importlib.util
+from pathlib import Path
+from typing import Iterable, List, Mapping, NamedTuple, Set, Tuple, Union
+from . import timings
+
+INVALIDATION_MODES = ("checked-hash", "unchecked-hash", "none")
+
+# pep 552 flags field
+_FLAG_HASH = 0b01
+_FLAG_CHECK_SOURCE = 0b10
+_RE_SITE_VERSION = re.compile(r"python(\d+)\.(\d+)$")
+# (source, size, mtime_ns, cache file, size, mtime_ns, mode) of cache files found or written up to date.
+_FRESH: Set[Tuple[str, int, int, str, int, int, str]] = set()
+
+# run by a virtual environment python of another version than this one, it must compile for its own magic number.
+_CHILD_CODE = """\
+import os, sys, json, py_compile, importlib.util
+items, cache_dir, mode = json.loads(sys.argv[1])
+flags = 0b11 if mode == "checked-hash" else 0b01
+compiled, errors = [], []
+for stem, src in items:
+    cfile = os.path.join(cache_dir, stem + "." + sys.implementation.cache_tag + ".pyc")
+    try:
+        with open(src, "rb") as f:
+            source = f.read()
+        try:
+            with open(cfile, "rb") as f:
+                head = f.read(16)
+        except OSError:
+            head = b""
+        if head == importlib.util.MAGIC_NUMBER + flags.to_bytes(4, "little") + importlib.util.source_hash(source):
+            continue
+        py_compile.compile(src, cfile=cfile, doraise=True, invalidation_mode=py_compile.PycInvalidationMode[mode.upper().replace("-", "_")])
+        compiled.append(cfile)
+    except (OSError, py_compile.PyCompileError) as e:
+        errors.append(stem + ": " + str(e))
+print(json.dumps([compiled, errors]))
+"""
+
+
+class CompileResult(NamedTuple):
+    compiled: Tuple[Path, ...]
+    """Cache files written. Files that were up to date are left out."""
+    errors: Tuple[str, ...]
+    """Modules that could not be compiled, with the reason."""
+
+
+def get_invalidation_mode() -> str:
+    """
+    Gets the default invalidation mode.
+
+    Returns:
+        str: Value of ``OOOENV_PYC_INVALIDATION`` environment variable; Otherwise, ``checked-hash``.
+    """
+    return os.environ.get("OOOENV_PYC_INVALIDATION", "checked-hash").strip().lower() or "checked-hash"
+
+
+def get_cache_dir(site_dir: Union[str, os.PathLike]) -> Path:
+    """Gets the bytecode cache directory of a ``site-packages`` directory."""
+    return Path(site_dir, "__pycache__")
+
+
+def get_target_python(site_dir: Union[str, os.PathLike]) -> Union[str, None]:
+    """
+    Gets the interpreter that must compile for ``site_dir``.
+
+    Args:
+        site_dir (str | PathLike): ``site-packages`` directory such as ``<venv>/lib/python3.8/site-packages``.
+
+    Returns:
+        str | None: ``bin/python`` of the virtual environment when it is another python version than the running one;
+        Otherwise, ``None`` to compile in this process.
+    """
+    pth = Path(site_dir)
+    m = _RE_SITE_VERSION.search(pth.parent.name)
+    if m is None or (int(m.group(1)), int(m.group(2))) == sys.version_info[:2]:
+        return None
+    return str(pth.parent.parent.parent / "bin" / "python")
+
+
+def is_fresh(cfile: Union[str, os.PathLike], source: bytes, mode: str) -> bool:
+    """
+    Gets if a cache file is the one compiling ``source`` with ``mode`` would write.
+
+    Args:
+        cfile (str | PathLike): Cache file.
+        source (bytes): Module source.
+        mode (str): ``checked-hash`` or ``unchecked-hash``.
+
+    Returns:
+        bool: ``True`` if it is up to date.
+    """
+    try:
+        with open(cfile, "rb") as file:
+            head = file.read(16)
+    except OSError:
+        return False
+    return head == _get_header(source, mode)
+
+
+def _get_header(source: bytes, mode: str) -> bytes:
+    flags = _FLAG_HASH | _FLAG_CHECK_SOURCE if mode == "checked-hash" else _FLAG_HASH
+    return importlib.util.MAGIC_NUMBER + flags.to_bytes(4, "little") + importlib.util.source_hash(source)
+
+
+def compile_modules(
+    sources: Mapping[str, Union[str, os.PathLike]],
+    cache_dir: Union[str, os.PathLike],
+    mode: str = "",
+    python_exe: Union[str, None] = None,
+) -> CompileResult:
+    """
+    Compiles modules into ``cache_dir``. Modules whose cache file is up to date are skipped.
+
+    Args:
+        sources (Mapping[str, str | PathLike]): Module name such as ``uno`` to source file.
+        cache_dir (str | PathLike): Directory for the cache files, see :py:func:`get_cache_dir`.
+        mode (str, optional): One of :py:data:`INVALIDATION_MODES`. Defaults to :py:func:`get_invalidation_mode`.
+        python_exe (str, optional): Interpreter to compile with when it is another python version than the running one.
+            See :py:func:`get_target_python`.
+
+    Raises:
+        ValueError: If ``mode`` is not known.
+
+    Returns:
+        CompileResult: Result.
+    """
+    mode = mode or get_invalidation_mode()
+    if mode not in INVALIDATION_MODES:
+        raise ValueError(f"Unknown invalidation mode: {mode}")
+    if mode == "none" or not sources:
+        return CompileResult(compiled=(), errors=())
+    with timings.span("bytecode.compile", modules=len(sources), mode=mode):
+        if python_exe:
+            return _compile_with(python_exe, sources, cache_dir, mode)
+        return _compile(sources, cache_dir, mode)
+
+
+def _compile(
+    sources: Mapping[str, Union[str, os.PathLike]], cache_dir: Union[str, os.PathLike], mode: str
+) -> CompileResult:
+    import py_compile
+
+    tag = sys.implementation.cache_tag
+    if tag is None:
+        return CompileResult(compiled=(), errors=())
+    invalidation = py_compile.PycInvalidationMode[mode.upper().replace("-", "_")]
+    compiled: List[Path] = []
+    errors: List[str] = []
+    for stem, src in sources.items():
+        cfile = os.path.join(cache_dir, f"{stem}.{tag}.pyc")
+        src_str = os.fspath(src)
+        try:
+            # a source and cache file that did not change since they were last found fresh are not read again.
+            key = _get_fresh_key(src_str, cfile, mode)
+            if key in _FRESH:
+                continue
+            with open(src_str, "rb") as file:
+                source = file.read()
+            if not is_fresh(cfile, source, mode):
+                py_compile.compile(src_str, cfile=cfile, doraise=True, invalidation_mode=invalidation)
+                compiled.append(Path(cfile))
+                key = _get_fresh_key(src_str, cfile, mode)
+        except (OSError, py_compile.PyCompileError) as e:
+            errors.append(f"{stem}: {e}")
+            continue
+        if key is not None:
+            _FRESH.add(key)
+    return CompileResult(compiled=tuple(compiled), errors=tuple(errors))
+
+
+def _get_fresh_key(src: str, cfile: str, mode: str) -> Union[Tuple[str, int, int, str, int, int, str], None]:
+    st = os.stat(src)
+    try:
+        c_st = os.stat(cfile)
+    except OSError:
+        return None
+    return src, st.st_size, st.st_mtime_ns, cfile, c_st.st_size, c_st.st_mtime_ns, mode
+
+
+def _compile_with(
+    python_exe: str, sources: Mapping[str, Union[str, os.PathLike]], cache_dir: Union[str, os.PathLike], mode: str
+) -> CompileResult:
+    import subprocess
+    from . import probe
+
+    arg = json.dumps([[[k, os.fspath(v)] for k, v in sources.items()], os.fspath(cache_dir), mode])
+    try:
+        out = probe.run([python_exe, "-c", _CHILD_CODE, arg], timeout=60).check().stdout
+        compiled, errors = json.loads(out.decode("utf-8"))
+    except (OSError, ValueError, subprocess.SubprocessError) as e:
+        return CompileResult(compiled=(), errors=(f"{python_exe}: {e}",))
+    return CompileResult(compiled=tuple(Path(f) for f in compiled), errors=tuple(errors))
+
+
+def remove_modules(cache_dir: Union[str, os.PathLike], stems: Iterable[str]) -> Tuple[Path, ...]:
+    """
+    Removes cache files of modules from ``cache_dir``, for every python version. ``cache_dir`` is removed when empty.
+
+    Args:
+        cache_dir (str | PathLike): Directory of the cache files.
+        stems (Iterable[str]): Module names such as ``uno``.
+
+    Returns:
+        Tuple[Path, ...]: Removed files.
+    """
+    names = set(stems)
+    removed = []
+    try:
+        with os.scandir(cache_dir) as it:
+            entries = list(it)
+    except OSError:
+        return ()
+    for entry in entries:
+        if entry.name.endswith(".pyc") and entry.name.split(".", 1)[0] in names:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            removed.append(Path(entry.path))
+    if removed:
+        try:
+            os.rmdir(cache_dir)
+        except OSError:
+            # not empty, other packages cache there too.
+            pass
+    return tuple(removed)
@@ -0,0 +1,138 @@
+"""
+Client for the ``oooenv daemon``.
+
+Requests are one JSON object per line sent over a Unix domain socket, answered by one JSON object per line.
+When the daemon is not running, or runs with a different discovery environment, :py:class:`DaemonUnavailable`
+is raised so that callers can resolve in-process instead.
+
+This module is imported on the start up path of the cli and only imports ``socket`` and ``json`` when a
+daemon socket exists.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+from .resolver import get_env_snapshot
+from . import timings
+
+# environment variables that name the virtual environment. The venv is sent with each request instead.
+VENV_NAMES = ("VIRTUAL_ENV", "OOOENV_VIRTUAL_ENV")
+
+
+class DaemonError(Exception):
+    """The daemon answered a request with an error."""
+
+
+class DaemonUnavailable(Exception):
+    """No daemon that can answer for this process is running."""
+
+
+def is_supported() -> bool:
+    """
+    Gets if the platform has Unix domain sockets.
+
+    Returns:
+        bool: ``True`` if ``socket.AF_UNIX`` is available.
+    """
+    if os.name == "nt":
+        # CPython for Windows does not expose AF_UNIX.
+        return False
+    import socket
+
+    return hasattr(socket, "AF_UNIX")
+
+
+def get_socket_path() -> Path:
+    """
+    Gets the path of the daemon socket.
+
+    Returns:
+        Path: ``OOOENV_DAEMON_SOCKET`` if set, otherwise ``oooenv.sock`` in ``XDG_RUNTIME_DIR``
+        or in the oooenv cache directory.
+    """
+    if pth := os.environ.get("OOOENV_DAEMON_SOCKET", ""):
+        return Path(pth)
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR", ""):
+        return Path(runtime_dir, "oooenv.sock")
+    from .local_paths import get_cache_dir
+
+    return get_cache_dir() / "oooenv.sock"
+
+
+def get_discovery_env() -> List[Tuple[str, str]]:
+    """
+    Gets the environment variables that must be the same in client and daemon for the daemon to answer.
+
+    Returns:
+        List[Tuple[str, str]]: sorted name, value pairs.
+    """
+    return [pair for pair in get_env_snapshot() if pair[0] not in VENV_NAMES]
+
+
+def get_request_venv() -> Union[str, None]:
+    """Gets the virtual environment of this process to send with requests. ``None`` if none is active."""
+    return os.environ.get("OOOENV_VIRTUAL_ENV", "") or os.environ.get("VIRTUAL_ENV", "") or None
+
+
+def request(
+    op: str, venv: Union[str, None] = None, timeout: float = 1.0, socket_path: Union[Path, None] = None
+) -> Any:
+    """
+    Sends a request to the daemon.
+
+    Args:
+        op (str): Operation such as ``is_uno``, ``uno_path``, ``lo_python_version`` or ``status``.
+        venv (str, optional): Virtual environment the request is about. Defaults to :py:func:`get_request_venv`.
+        timeout (float, optional): Seconds to wait for connecting and for the answer. Defaults to ``1.0``.
+        socket_path (Path, optional): Daemon socket. Defaults to :py:func:`get_socket_path`.
+
+    Raises:
+        DaemonUnavailable: If no daemon is running or it can not answer for this process.
+        DaemonError: If the daemon answered with an error.
+
+    Returns:
+        Any: JSON value answered by the daemon.
+    """
+    pth = get_socket_path() if socket_path is None else socket_path
+    if not os.path.exists(pth):
+        raise DaemonUnavailable(f"No daemon socket: {pth}")
+    if not is_supported():
+        raise DaemonUnavailable("Unix domain sockets are not supported")
+    import json
+    import socket
+
+    message: Dict[str, Any] = {
+        "op": op,
+        "venv": get_request_venv() if venv is None else venv,
+        "env": get_discovery_env(),
+    }
+    with timings.span("daemon_client.request", op=op):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(os.fspath(pth))
+                sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+                data = _read_line(sock)
+        except OSError as e:
+            raise DaemonUnavailable(f"Daemon not reachable: {e}") from e
+    try:
+        response = json.loads(data)
+    except ValueError as e:
+        raise DaemonUnavailable(f"Invalid daemon response: {e}") from e
+    if response.get("unavailable", False):
+        raise DaemonUnavailable(response.get("error", ""))
+    if not response.get("ok", False):
+        raise DaemonError(response.get("error", "Unknown daemon error"))
+    return response.get("value", None)
+
+
+def _read_line(sock: Any) -> bytes:
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
@@ -0,0 +1,250 @@
+"""
+Small persistent JSON cache stored per user and per interpreter.
+
+Each entry records a value together with the ``mtime`` stamps of the files it was
+derived from. A later lookup only re-stats those files; if any stamp changed the
+entry is discarded and the caller is expected to probe again.
+
+Negative results (for instance *LibreOffice not found*) can be stored as well and
+are remembered until their time to live expires.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import zlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Union
+from . import local_paths
+
+# bump when the layout of the cache file changes.
+_CACHE_FORMAT = 1
+_DEFAULT_MISS_TTL = 300.0
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    """Cached value. For a missing entry this is the message that was recorded."""
+    missing: bool
+    """``True`` if the entry records a negative result."""
+
+
+def is_disabled() -> bool:
+    """
+    Gets if caching is disabled.
+
+    Returns:
+        bool: ``True`` if ``OOOENV_NO_CACHE`` is set in the environment.
+    """
+    return bool(os.environ.get("OOOENV_NO_CACHE", ""))
+
+
+def is_refresh() -> bool:
+    """
+    Gets if cached values are to be ignored and replaced.
+
+    Returns:
+        bool: ``True`` if ``OOOENV_CACHE_REFRESH`` is set in the environment.
+    """
+    return bool(os.environ.get("OOOENV_CACHE_REFRESH", ""))
+
+
+def get_miss_ttl() -> float:
+    """
+    Gets the number of seconds a negative result is remembered.
+
+    Returns:
+        float: Seconds. Set ``OOOENV_CACHE_MISS_TTL`` to override the default of ``300``.
+    """
+    try:
+        return float(os.environ.get("OOOENV_CACHE_MISS_TTL", _DEFAULT_MISS_TTL))
+    except ValueError:
+        return _DEFAULT_MISS_TTL
+
+
+def get_stamp(pth: Union[str, os.PathLike]) -> Union[int, None]:
+    """
+    Gets the stamp of a file used for invalidation.
+
+    Symbolic links are not followed so that re-pointing a link changes the stamp.
+
+    Args:
+        pth (str | PathLike): path to stamp.
+
+    Returns:
+        int | None: ``st_mtime_ns`` of path or ``None`` if the path does not exist.
+    """
+    try:
+        return os.lstat(pth).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_stamps(depends: Iterable[Union[str, os.PathLike]]) -> Dict[str, Union[int, None]]:
+    """
+    Gets stamps for several paths.
+
+    Args:
+        depends (Iterable[str | PathLike]): paths to stamp.
+
+    Returns:
+        Dict[str, int | None]: stamps keyed by path.
+    """
+    return {str(pth): get_stamp(pth) for pth in depends}
+
+
+def stamps_valid(stamps: Dict[str, Union[int, None]]) -> bool:
+    """
+    Checks if recorded stamps still match the file system.
+
+    Args:
+        stamps (Dict[str, int | None]): stamps as returned by :py:func:`get_stamps`.
+
+    Returns:
+        bool: ``True`` if no stamp has changed.
+    """
+    return all(get_stamp(pth) == stamp for pth, stamp in stamps.items())
+
+
+def _get_interpreter_key() -> str:
+    return format(zlib.crc32(sys.executable.encode("utf-8", "surrogateescape")), "08x")
+
+
+class DiskCache:
+    """
+    JSON backed cache.
+
+    The file is named ``<name>-<interpreter>.json`` and lives in :py:func:`local_paths.get_cache_dir`
+    so that different users and different interpreters never share entries.
+    """
+
+    def __init__(self, name: str, cache_dir: Union[Path, None] = None) -> None:
+        """
+        Constructor
+
+        Args:
+            name (str): Cache name. Used as prefix of the cache file name.
+            cache_dir (Path, optional): Directory to store cache in. Defaults to the user cache directory.
+        """
+        self._name = name
+        self._cache_dir = cache_dir
+        self._data: Union[Dict[str, Any], None] = None
+        self._lock = threading.RLock()
+
+    @property
+    def path(self) -> Path:
+        """Gets the cache file path."""
+        cache_dir = local_paths.get_cache_dir() if self._cache_dir is None else self._cache_dir
+        return cache_dir / f"{self._name}-{_get_interpreter_key()}.json"
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            import json
+
+            try:
+                with open(self.path, "r") as file:
+                    data = json.load(file)
+                if not isinstance(data, dict) or data.get("format") != _CACHE_FORMAT:
+                    data = {}
+            except (OSError, ValueError):
+                data = {}
+            data["format"] = _CACHE_FORMAT
+            data.setdefault("entries", {})
+            self._data = data
+        return self._data
+
+    def _save(self) -> None:
+        import json
+
+        data = self._load()
+        try:
+            pth = self.path
+            pth.parent.mkdir(parents=True, exist_ok=True)
+            local_paths.write_text_atomic(pth, json.dumps(data, indent=1))
+        except OSError:
+            # a cache that can not be written is not an error.
+            pass
+
+    def get(self, key: str, fingerprint: str = "") -> Union[CacheEntry, None]:
+        """
+        Gets a cached entry.
+
+        Args:
+            key (str): Entry key.
+            fingerprint (str, optional): Value that must match the fingerprint the entry was stored with.
+                Usually derived from environment variables that influence the result.
+
+        Returns:
+            CacheEntry | None: Entry if present and still valid; Otherwise, ``None``.
+        """
+        if is_disabled() or is_refresh():
+            return None
+        with self._lock:
+            entry = self._load()["entries"].get(key, None)
+        if not isinstance(entry, dict):
+            return None
+        if entry.get("fingerprint", "") != fingerprint:
+            return None
+        if entry.get("missing", False):
+            if entry.get("expires", 0) < time.time():
+                return None
+            return CacheEntry(value=entry.get("value", ""), missing=True)
+        if not stamps_valid(entry.get("stamps", {})):
+            return None
+        return CacheEntry(value=entry.get("value", None), missing=False)
+
+    def put(
+        self, key: str, value: Any, depends: Iterable[Union[str, os.PathLike]] = (), fingerprint: str = ""
+    ) -> None:
+        """
+        Stores an entry.
+
+        Args:
+            key (str): Entry key.
+            value (Any): JSON serializable value.
+            depends (Iterable[str | PathLike], optional): Paths the value was derived from.
+            fingerprint (str, optional): Fingerprint to store with entry.
+        """
+        if is_disabled():
+            return
+        stamps = get_stamps(depends)
+        with self._lock:
+            self._load()["entries"][key] = {
+                "value": value,
+                "stamps": stamps,
+                "fingerprint": fingerprint,
+            }
+            self._save()
+
+    def put_missing(self, key: str, message: str, ttl: Union[float, None] = None, fingerprint: str = "") -> None:
+        """
+        Stores a negative result.
+
+        Args:
+            key (str): Entry key.
+            message (str): Message to report while the entry is valid.
+            ttl (float, optional): Seconds to remember the result. Defaults to :py:func:`get_miss_ttl`.
+            fingerprint (str, optional): Fingerprint to store with entry.
+        """
+        if is_disabled():
+            return
+        if ttl is None:
+            ttl = get_miss_ttl()
+        with self._lock:
+            self._load()["entries"][key] = {
+                "value": message,
+                "missing": True,
+                "expires": time.time() + ttl,
+                "fingerprint": fingerprint,
+            }
+            self._save()
+
+    def clear(self) -> None:
+        """Removes all entries from memory and disk."""
+        with self._lock:
+            self._data = None
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,106 @@
+"""
+Manifest of the LibreOffice python modules linked into virtual environments.
+
+The built in manifest links ``uno.py`` and ``unohelper.py`` and, when the LibreOffice install has them,
+``scriptforge.py``, ``officehelper.py``, ``pythonscript.py``, ``mailmerge.py`` and ``msgbox.py``.
+
+A manifest file, passed with ``--manifest`` or named by ``OOOENV_LINK_MANIFEST``, changes the built in manifest.
+One module per line::
+
+    # comments and blank lines are ignored
+    access2base.py?   # optional, linked only when LibreOffice has it
+    my_macros.py      # required, reported as missing when LibreOffice does not have it
+    -msgbox.py        # not linked
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Tuple, Union
+
+
+class ManifestEntry(NamedTuple):
+    name: str
+    """File name such as ``uno.py``."""
+    required: bool
+    """``True`` if a missing file is an error; Otherwise, it is skipped."""
+
+
+DEFAULT_MANIFEST = (
+    ManifestEntry("uno.py", True),
+    ManifestEntry("unohelper.py", True),
+    ManifestEntry("scriptforge.py", False),
+    ManifestEntry("officehelper.py", False),
+    ManifestEntry("pythonscript.py", False),
+    ManifestEntry("mailmerge.py", False),
+    ManifestEntry("msgbox.py", False),
+)
+
+
+def get_manifest_file() -> Union[Path, None]:
+    """
+    Gets the user manifest file.
+
+    Returns:
+        Path | None: Value of ``OOOENV_LINK_MANIFEST`` environment variable; Otherwise, ``None``.
+    """
+    if fnm := os.environ.get("OOOENV_LINK_MANIFEST", ""):
+        return Path(fnm)
+    return None
+
+
+def parse(text: str, base: Iterable[ManifestEntry] = DEFAULT_MANIFEST) -> Tuple[ManifestEntry, ...]:
+    """
+    Applies manifest file content to a manifest.
+
+    Args:
+        text (str): Manifest file content.
+        base (Iterable[ManifestEntry], optional): Manifest to change. Defaults to :py:data:`DEFAULT_MANIFEST`.
+
+    Raises:
+        ValueError: If a line names a path instead of a file name.
+
+    Returns:
+        Tuple[ManifestEntry, ...]: Manifest. Entries keep the order of ``base`` followed by the order of ``text``.
+    """
+    entries: Dict[str, ManifestEntry] = {e.name: e for e in base}
+    for line_no, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        remove = line.startswith("-")
+        name = line.lstrip("-").strip()
+        required = not name.endswith("?")
+        name = name.rstrip("?").strip()
+        if not name or os.path.basename(name) != name or name in (".", ".."):
+            raise ValueError(f"Line {line_no}: not a file name: {line}")
+        if remove:
+            entries.pop(name, None)
+        else:
+            entries[name] = ManifestEntry(name, required)
+    return tuple(entries.values())
+
+
+def load_manifest(fnm: Union[str, os.PathLike, None] = None) -> Tuple[ManifestEntry, ...]:
+    """
+    Gets the manifest.
+
+    Args:
+        fnm (str | PathLike, optional): Manifest file applied to :py:data:`DEFAULT_MANIFEST`.
+            Defaults to :py:func:`get_manifest_file`.
+
+    Raises:
+        FileNotFoundError: If the manifest file does not exist.
+        ValueError: If the manifest file is not valid.
+
+    Returns:
+        Tuple[ManifestEntry, ...]: Manifest.
+    """
+    pth = get_manifest_file() if fnm is None else Path(fnm)
+    if pth is None:
+        return DEFAULT_MANIFEST
+    with open(pth, "r", encoding="utf-8") as file:
+        text = file.read()
+    try:
+        return parse(text)
+    except ValueError as e:
+        raise ValueError(f"{pth}: {e}") from None
@@ -0,0 +1,99 @@
+"""
+Settings a virtual environment was last linked with.
+
+:py:meth:`~oooenv.session.OooEnv.link` records its mode, strategy, manifest, bytecode mode and the files it
+placed in ``oooenv_link.json`` in the virtual environment. Links made again later, by ``oooenv watch`` after a
+LibreOffice upgrade or after ``oooenv bench-import --compare``, use them instead of the defaults,
+so a virtual environment linked with ``copy`` is not turned into one of symbolic links.
+"""
+from __future__ import annotations
+import os
+import json
+import stat
+from pathlib import Path
+from typing import Iterable, NamedTuple, Tuple, Union
+from . import local_paths
+
+SETTINGS_NAME = "oooenv_link.json"
+
+
+class LinkSettings(NamedTuple):
+    mode: str = "links"
+    """``links`` or ``finder``."""
+    strategy: str = "auto"
+    """See :py:mod:`oooenv.utils.link_store`."""
+    manifest: str = ""
+    """Manifest file, empty for the built in manifest."""
+    pyc: str = ""
+    """See :py:mod:`oooenv.utils.bytecode`. Empty for the default."""
+    files: Tuple[str, ...] = ()
+    """Names of the files placed in ``site-packages``. Only these are replaced or removed later."""
+
+
+def get_settings_file(venv: Union[str, os.PathLike]) -> Path:
+    """Gets the settings file of a virtual environment."""
+    return Path(venv, SETTINGS_NAME)
+
+
+def load(venv: Union[str, os.PathLike]) -> Union[LinkSettings, None]:
+    """
+    Gets the settings a virtual environment was last linked with.
+
+    Args:
+        venv (str | PathLike): Virtual environment.
+
+    Returns:
+        LinkSettings | None: Settings; Otherwise, ``None`` if none were recorded or the file is not valid.
+    """
+    try:
+        with open(get_settings_file(venv), "r", encoding="utf-8") as file:
+            data = json.load(file)
+        values = {k: str(v) for k, v in data.items() if k in LinkSettings._fields and k != "files"}
+        return LinkSettings(files=tuple(str(name) for name in data.get("files", ())), **values)
+    except (OSError, ValueError, AttributeError, TypeError):
+        return None
+
+
+def save(venv: Union[str, os.PathLike], settings: LinkSettings) -> None:
+    """
+    Records the settings a virtual environment was linked with.
+
+    Args:
+        venv (str | PathLike): Virtual environment.
+        settings (LinkSettings): Settings.
+    """
+    local_paths.write_text_atomic(get_settings_file(venv), json.dumps(settings._asdict(), indent=2) + "\n")
+
+
+def remove(venv: Union[str, os.PathLike]) -> None:
+    """Removes the recorded settings of a virtual environment, if any."""
+    try:
+        os.remove(get_settings_file(venv))
+    except FileNotFoundError:
+        pass
+
+
+def infer_strategy(site_dir: Union[str, os.PathLike], names: Iterable[str]) -> str:
+    """
+    Gets the strategy the linked modules in ``site_dir`` look placed with.
+
+    Used for virtual environments linked before settings were recorded. A reflink can not be told
+    from a copy, both are reported as ``copy``.
+
+    Args:
+        site_dir (str | PathLike): ``site-packages`` directory.
+        names (Iterable[str]): Module file names such as ``uno.py``.
+
+    Returns:
+        str: ``symlink``, ``hardlink`` or ``copy``; Otherwise, ``auto`` if none of ``names`` is in ``site_dir``.
+    """
+    for name in names:
+        try:
+            st = os.lstat(os.path.join(site_dir, name))
+        except OSError:
+            continue
+        if stat.S_ISLNK(st.st_mode):
+            return "symlink"
+        # placed files are hard links to a blob of the store.
+        return "hardlink" if st.st_nlink > 1 else "copy"
+    return "auto"
@@ -0,0 +1,277 @@
+"""
+Content addressed store for files placed into virtual environments.
+
+Files are kept once per content as read only ``blobs/<aa>/<sha256>`` in :py:func:`get_store_dir`.
+Virtual environments get a hard link or a reflink to the blob instead of a copy of their own, so hundreds
+of virtual environments share one copy per LibreOffice version on disk and in the page cache.
+
+After a LibreOffice upgrade linking again adds one new blob and points each virtual environment to it.
+Files that no longer match their source are replaced, never left stale. Blobs that are no longer hard linked
+from anywhere are removed by :py:func:`gc`.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import errno
+import shutil
+import hashlib
+import _thread
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple, Union
+from . import local_paths
+from . import timings
+
+STRATEGIES = ("auto", "symlink", "hardlink", "reflink", "copy")
+"""Ways a file is placed. ``auto`` tries ``symlink``, ``hardlink``, ``reflink`` and ``copy`` in that order."""
+
+_AUTO_ORDER = ("symlink", "hardlink", "reflink", "copy")
+# linux/fs.h _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+# (path, size, mtime_ns) -> sha256
+_HASHES: Dict[Tuple[str, int, int], str] = {}
+
+
+class GcResult(NamedTuple):
+    removed: Tuple[Path, ...]
+    """Blobs removed, or that would be removed on a dry run."""
+    freed: int
+    """Bytes freed."""
+    kept: int
+    """Blobs still linked from a virtual environment or too new to remove."""
+
+
+def get_store_dir() -> Path:
+    """
+    Gets the store directory.
+
+    Returns:
+        Path: ``OOOENV_STORE_DIR`` if set; Otherwise, ``store`` in :py:func:`~oooenv.utils.local_paths.get_cache_dir`.
+
+    Note:
+        Hard links need the store on the same file system as the virtual environments.
+    """
+    if store_dir := os.environ.get("OOOENV_STORE_DIR", ""):
+        return Path(store_dir)
+    return local_paths.get_cache_dir() / "store"
+
+
+def get_strategy() -> str:
+    """
+    Gets the default strategy.
+
+    Returns:
+        str: Value of ``OOOENV_LINK_STRATEGY`` environment variable; Otherwise, ``auto``.
+    """
+    return os.environ.get("OOOENV_LINK_STRATEGY", "auto").strip().lower() or "auto"
+
+
+def hash_file(pth: Union[str, os.PathLike]) -> str:
+    """
+    Gets the sha256 of a file. Hashes are kept in memory until the file changes.
+
+    Args:
+        pth (str | PathLike): File.
+
+    Returns:
+        str: hex digest.
+    """
+    st = os.stat(pth)
+    key = (os.path.abspath(pth), st.st_size, st.st_mtime_ns)
+    if digest := _HASHES.get(key, None):
+        return digest
+    with timings.span("link_store.hash", file=os.fspath(pth)):
+        h = hashlib.sha256()
+        with open(pth, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 16), b""):
+                h.update(chunk)
+    digest = h.hexdigest()
+    _HASHES[key] = digest
+    return digest
+
+
+def get_blob_path(digest: str) -> Path:
+    """Gets the path of the blob for a digest. The blob may not exist."""
+    return get_store_dir() / "blobs" / digest[:2] / digest
+
+
+def add_blob(src: Union[str, os.PathLike]) -> Path:
+    """
+    Adds a file to the store.
+
+    Args:
+        src (str | PathLike): File to add.
+
+    Returns:
+        Path: Read only blob with the content of ``src``.
+    """
+    blob = get_blob_path(hash_file(src))
+    if blob.exists():
+        return blob
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _get_tmp_name(blob)
+    try:
+        shutil.copyfile(src, tmp)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, blob)
+    except BaseException:
+        _remove_quiet(tmp)
+        raise
+    return blob
+
+
+def reflink(src: Union[str, os.PathLike], dst: Union[str, os.PathLike]) -> None:
+    """
+    Creates ``dst`` as a copy on write clone of ``src``.
+
+    Args:
+        src (str | PathLike): File to clone.
+        dst (str | PathLike): New file. Must not exist.
+
+    Raises:
+        OSError: If the platform or file system does not support reflinks.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are only supported on Linux", os.fspath(dst))
+    import fcntl
+
+    with open(src, "rb") as f_src:
+        with open(dst, "xb") as f_dst:
+            try:
+                fcntl.ioctl(f_dst.fileno(), _FICLONE, f_src.fileno())
+            except OSError:
+                f_dst.close()
+                os.unlink(dst)
+                raise
+
+
+def is_current(src: Union[str, os.PathLike], dst: Union[str, os.PathLike], strategy: str) -> bool:
+    """
+    Gets if ``dst`` already is what placing ``src`` with ``strategy`` would make it.
+
+    ``auto`` accepts a symlink to ``src`` or a file with the same content.
+    """
+    if os.path.islink(dst):
+        return strategy in ("auto", "symlink") and os.readlink(dst) == os.fspath(src)
+    if strategy == "symlink" or not os.path.exists(dst):
+        return False
+    digest = hash_file(src)
+    if strategy == "hardlink":
+        blob = get_blob_path(digest)
+        return blob.exists() and os.path.samefile(blob, dst)
+    return hash_file(dst) == digest
+
+
+def place(src: Path, dst: Path, strategy: str = "") -> str:
+    """
+    Atomically makes ``dst`` a symlink to, or a link or copy of a store blob of, ``src``.
+
+    An existing ``dst`` is replaced.
+
+    Args:
+        src (Path): Source file.
+        dst (Path): File to create.
+        strategy (str, optional): One of :py:data:`STRATEGIES`. Defaults to :py:func:`get_strategy`.
+
+    Raises:
+        ValueError: If ``strategy`` is not known.
+        OSError: If ``dst`` could not be placed with ``strategy``, or with any strategy for ``auto``.
+
+    Returns:
+        str: Strategy used, never ``auto``.
+    """
+    strategy = strategy or get_strategy()
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown link strategy: {strategy}")
+    order = _AUTO_ORDER if strategy == "auto" else (strategy,)
+    error: Union[OSError, None] = None
+    for kind in order:
+        try:
+            with timings.span("link_store.place", file=dst.name, strategy=kind):
+                _place(src, dst, kind)
+            return kind
+        except OSError as e:
+            error = e
+    assert error is not None
+    raise error
+
+
+def _place(src: Path, dst: Path, kind: str) -> None:
+    tmp = _get_tmp_name(dst)
+    try:
+        if kind == "symlink":
+            os.symlink(src, tmp)
+        elif kind == "hardlink":
+            os.link(add_blob(src), tmp)
+        elif kind == "reflink":
+            reflink(add_blob(src), tmp)
+        else:
+            shutil.copy2(add_blob(src), tmp)
+            # a copy is owned by the venv, it does not keep the blob read only mode.
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, dst)
+    except BaseException:
+        _remove_quiet(tmp)
+        raise
+
+
+def gc(min_age: float = 60.0, dry_run: bool = False) -> GcResult:
+    """
+    Removes blobs no longer hard linked from any virtual environment.
+
+    Reflinks and copies do not keep a blob, they do not depend on it.
+
+    Args:
+        min_age (float, optional): Seconds a blob must exist before it is removed, so a link being made
+            by another process is not raced. Defaults to ``60``.
+        dry_run (bool, optional): Only report what would be removed.
+
+    Returns:
+        GcResult: Result.
+    """
+    blobs_dir = get_store_dir() / "blobs"
+    removed: List[Path] = []
+    freed = 0
+    kept = 0
+    now = time.time()
+    with timings.span("link_store.gc"):
+        try:
+            sub_dirs = list(os.scandir(blobs_dir))
+        except FileNotFoundError:
+            sub_dirs = []
+        for sub in sub_dirs:
+            if not sub.is_dir(follow_symlinks=False):
+                continue
+            with os.scandir(sub.path) as it:
+                entries = list(it)
+            for entry in entries:
+                st = entry.stat(follow_symlinks=False)
+                if entry.name.endswith(".tmp"):
+                    # left behind by an interrupted add_blob.
+                    if now - st.st_mtime < min_age:
+                        continue
+                elif st.st_nlink > 1 or now - st.st_mtime < min_age:
+                    kept += 1
+                    continue
+                removed.append(Path(entry.path))
+                freed += st.st_size
+                if not dry_run:
+                    _remove_quiet(entry.path)
+            if not dry_run:
+                try:
+                    os.rmdir(sub.path)
+                except OSError:
+                    # not empty
+                    pass
+    return GcResult(removed=tuple(removed), freed=freed, kept=kept)
+
+
+def _get_tmp_name(dst: Path) -> Path:
+    return dst.with_name(f".{dst.name}.{os.getpid()}.{_thread.get_ident()}.tmp")
+
+
+def _remove_quiet(pth: Union[str, os.PathLike]) -> None:
+    try:
+        os.unlink(pth)
+    except OSError:
+        pass
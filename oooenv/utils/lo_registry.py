@@ -0,0 +1,339 @@
+"""
+Registry of the LibreOffice installations on this machine.
+
+All known install locations (``/usr/lib/libreoffice``, ``/opt/libreoffice*``, ``Program Files\\LibreOffice*``,
+the ``soffice`` on ``PATH`` and ``OOOENV_LO_SEARCH_PATHS``) are probed concurrently. The result is kept as
+an index in the disk cache, validated by the ``mtime`` of the probed locations, so selecting an install
+by version does not probe again until something changes.
+
+Example:
+    .. code-block:: python
+
+        inst = lo_registry.select_install(">=7.6")
+        print(inst.version_str, inst.program, inst.python_version)
+"""
+from __future__ import annotations
+import os
+import re
+import sys
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union
+from .disk_cache import DiskCache
+from .py_version import read_install_info
+from .resolver import get_resolver
+from . import timings
+
+_UNIX_PATTERNS = (
+    "/usr/lib/libreoffice",
+    "/usr/lib64/libreoffice",
+    "/usr/local/lib/libreoffice",
+    # TDF builds: /opt/libreoffice7.6, /opt/libreoffice24.2, /opt/libreofficedev24.8
+    "/opt/libreoffice*",
+    "/snap/libreoffice/current/lib/libreoffice",
+)
+_MAC_PATTERNS = ("/Applications/LibreOffice*.app/Contents",)
+# distribution packages put uno.py here rather than in program.
+_DIST_PACKAGES = ("/usr/lib/python3/dist-packages",)
+_SOFFICE_NAMES = ("soffice", "soffice.bin", "soffice.exe")
+_RE_VERSION = re.compile(r"^(\d+(?:\.\d+)*)")
+_RE_CONSTRAINT = re.compile(r"^(>=|<=|==|!=|>|<)?\s*(\d+(?:\.\d+)*)$")
+_MAX_WORKERS = 8
+
+_INDEX_CACHE = DiskCache("lo_index")
+
+
+class LoInstall(NamedTuple):
+    """A LibreOffice installation."""
+
+    install: Path
+    """Install dir such as ``/opt/libreoffice7.6``."""
+    program: Path
+    """Dir containing ``soffice``."""
+    product: str
+    """LibreOffice version such as ``7.6``. Empty if unknown."""
+    build_id: str
+    """
+    ``buildid`` of ``versionrc``. A git hash for TDF builds, other builds may record a version such as ``7.6.4.1``.
+    Empty if unknown.
+    """
+    uno_path: Union[Path, None]
+    """Dir containing ``uno.py``. ``None`` if not found."""
+    python_version: str
+    """Version of the bundled python such as ``3.8.16``. Empty if not bundled or unknown."""
+
+    @property
+    def version(self) -> Tuple[int, ...]:
+        """
+        Gets the version installs are selected by. ``()`` if unknown.
+
+        That is :py:attr:`product`, major.minor such as ``(7, 6)``, unless :py:attr:`build_id` is a version
+        that extends it. TDF builds record a git hash, so ``==7.6.4`` matches none of them.
+        """
+        build = _parse_version(self.build_id)
+        product = _parse_version(self.product)
+        if build and build[: len(product)] == product:
+            return build
+        return product
+
+    @property
+    def version_str(self) -> str:
+        """Gets :py:attr:`version` as a string. ``unknown`` if unknown."""
+        return ".".join(str(i) for i in self.version) or "unknown"
+
+    def to_dict(self) -> Dict[str, str]:
+        """Gets install as a JSON serializable dictionary."""
+        return {
+            "install": str(self.install),
+            "program": str(self.program),
+            "product": self.product,
+            "build_id": self.build_id,
+            "uno_path": "" if self.uno_path is None else str(self.uno_path),
+            "python_version": self.python_version,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, str]) -> LoInstall:
+        """
+        Creates an install from a dictionary created by :py:meth:`to_dict`.
+
+        Raises:
+            KeyError: If a key is missing.
+        """
+        return LoInstall(
+            install=Path(data["install"]),
+            program=Path(data["program"]),
+            product=data["product"],
+            build_id=data["build_id"],
+            uno_path=Path(data["uno_path"]) if data["uno_path"] else None,
+            python_version=data["python_version"],
+        )
+
+
+def _parse_version(s: str) -> Tuple[int, ...]:
+    m = _RE_VERSION.match(s.strip())
+    return tuple(int(i) for i in m.group(1).split(".")) if m else ()
+
+
+def _get_patterns() -> List[str]:
+    if sys.platform == "win32":
+        patterns = []
+        for name in ("PROGRAMFILES", "PROGRAMFILES(X86)"):
+            if base := os.environ.get(name, ""):
+                # LibreOffice, LibreOfficeDev 7, LibreOffice 24.2
+                patterns.append(os.path.join(base, "LibreOffice*"))
+    elif sys.platform == "darwin":
+        patterns = list(_MAC_PATTERNS)
+    else:
+        patterns = list(_UNIX_PATTERNS)
+    patterns.extend(p for p in os.environ.get("OOOENV_LO_SEARCH_PATHS", "").split(os.pathsep) if p)
+    return patterns
+
+
+def _get_program_name() -> str:
+    return "MacOS" if sys.platform == "darwin" else "program"
+
+
+def get_candidates() -> Tuple[List[Path], List[Path]]:
+    """
+    Gets the dirs that may be LibreOffice installs.
+
+    Returns:
+        Tuple[List[Path], List[Path]]: candidate install dirs and the paths whose change
+        may add or remove a candidate.
+    """
+    import glob
+
+    roots: List[Path] = []
+    depends: List[Path] = []
+    for pattern in _get_patterns():
+        if glob.has_magic(pattern):
+            # a new match changes the mtime of the parent dir.
+            depends.append(Path(os.path.dirname(pattern)))
+            roots.extend(Path(p) for p in sorted(glob.glob(pattern)))
+        else:
+            depends.append(Path(pattern))
+            roots.append(Path(pattern))
+
+    with timings.span("lo_registry.which"):
+        s = shutil.which("soffice")
+    if s:
+        depends.append(Path(s))
+        # /usr/bin/soffice -> /usr/lib/libreoffice/program/soffice
+        roots.append(Path(os.path.realpath(s)).parent.parent)
+
+    if sys.platform == "win32":
+        from .uno_paths import _read_registry_install_path
+
+        if value := _read_registry_install_path():
+            roots.append(Path(value).parent)
+
+    seen = set()
+    result = []
+    for root in roots:
+        key = os.path.normcase(os.path.realpath(root))
+        if key not in seen:
+            seen.add(key)
+            result.append(root)
+    return result, depends
+
+
+def probe_install(root: Union[str, os.PathLike]) -> Union[LoInstall, None]:
+    """
+    Reads a LibreOffice install.
+
+    Args:
+        root (str | PathLike): Install dir such as ``/opt/libreoffice7.6``.
+
+    Returns:
+        LoInstall | None: install or ``None`` if ``root`` is not a LibreOffice install.
+    """
+    p_root = Path(root)
+    program = p_root / _get_program_name()
+    with timings.span("lo_registry.probe", root=str(p_root)):
+        if not any((program / name).is_file() for name in _SOFFICE_NAMES):
+            return None
+        info = read_install_info(program)
+        uno_path = None
+        for pth in (program, *(Path(p) for p in _DIST_PACKAGES)):
+            if (pth / "uno.py").is_file():
+                uno_path = pth
+                break
+        python_version = str(info.python_core[0]) if len(info.python_core) == 1 else ""
+    return LoInstall(
+        install=p_root,
+        program=program,
+        product=info.product,
+        build_id=info.build_id,
+        uno_path=uno_path,
+        python_version=python_version,
+    )
+
+
+def scan() -> Tuple[Tuple[LoInstall, ...], List[Path]]:
+    """
+    Probes all candidate dirs concurrently.
+
+    Returns:
+        Tuple[Tuple[LoInstall, ...], List[Path]]: installs found, in candidate order, and the paths the result depends on.
+    """
+    with timings.span("lo_registry.scan") as sp:
+        roots, depends = get_candidates()
+        if len(roots) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(roots))) as pool:
+                found = list(pool.map(probe_install, roots))
+        else:
+            found = [probe_install(root) for root in roots]
+        installs = tuple(inst for inst in found if inst is not None)
+        if timings.is_enabled():
+            sp.attrs["candidates"] = len(roots)
+            sp.attrs["found"] = len(installs)
+    for inst in installs:
+        depends.extend(
+            (
+                inst.program,
+                inst.program / "bootstraprc",
+                inst.program / "bootstrap.ini",
+                inst.program / "versionrc",
+                inst.program / "version.ini",
+            )
+        )
+        if inst.uno_path is not None:
+            depends.append(inst.uno_path / "uno.py")
+    # the fallback uno.py location matters even for installs that did not have it.
+    depends.extend(Path(p, "uno.py") for p in _DIST_PACKAGES)
+    return installs, depends
+
+
+def _get_fingerprint() -> str:
+    return "\0".join((os.environ.get("PATH", ""), os.environ.get("OOOENV_LO_SEARCH_PATHS", "")))
+
+
+def _load_installs() -> Tuple[LoInstall, ...]:
+    fingerprint = _get_fingerprint()
+    with timings.span("disk_cache.lookup"):
+        entry = _INDEX_CACHE.get("installs", fingerprint=fingerprint)
+    if entry is not None and not entry.missing:
+        try:
+            return tuple(LoInstall.from_dict(d) for d in entry.value)
+        except (KeyError, TypeError, AttributeError):
+            # written by another version, probe again.
+            pass
+    installs, depends = scan()
+    with timings.span("disk_cache.store"):
+        _INDEX_CACHE.put("installs", [inst.to_dict() for inst in installs], depends=depends, fingerprint=fingerprint)
+    return installs
+
+
+def get_installs() -> Tuple[LoInstall, ...]:
+    """
+    Gets all LibreOffice installs found on this machine.
+
+    Returns:
+        Tuple[LoInstall, ...]: installs. Empty if none were found.
+
+    Note:
+        Add install dirs to ``OOOENV_LO_SEARCH_PATHS``, separated by ``os.pathsep``, to have them found.
+        Entries may contain wildcards such as ``~/builds/libreoffice*``.
+
+        Results are memoized by :py:mod:`oooenv.utils.resolver` and kept in the on disk index.
+    """
+    return get_resolver().get("lo_installs", _load_installs)
+
+
+def _make_check(op: str, want: Tuple[int, ...]) -> Callable[[Tuple[int, ...]], bool]:
+    if op in ("", "=="):
+        # 7.6 matches 7.6.4.1
+        return lambda have: have[: len(want)] == want
+    if op == "!=":
+        return lambda have: have[: len(want)] != want
+
+    def padded(have: Tuple[int, ...]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        size = max(len(have), len(want))
+        return have + (0,) * (size - len(have)), want + (0,) * (size - len(want))
+
+    compare: Dict[str, Callable[[Any, Any], bool]] = {
+        ">=": lambda a, b: a >= b,
+        "<=": lambda a, b: a <= b,
+        ">": lambda a, b: a > b,
+        "<": lambda a, b: a < b,
+    }
+    func = compare[op]
+    return lambda have: bool(have) and func(*padded(have))
+
+
+def select_install(spec: str = "latest", installs: Union[Tuple[LoInstall, ...], None] = None) -> LoInstall:
+    """
+    Gets the newest install that matches a version constraint.
+
+    Args:
+        spec (str, optional): ``latest`` or comma separated constraints such as ``>=7.6``, ``7.6``, ``>=7.5,<24``.
+            A version without operator matches by prefix, ``7.6`` matches ``7.6.4.1``. Constraints are compared
+            with :py:attr:`LoInstall.version`, usually major.minor only. Defaults to ``latest``.
+        installs (Tuple[LoInstall, ...], optional): installs to select from. Defaults to :py:func:`get_installs`.
+
+    Raises:
+        ValueError: If ``spec`` is not valid.
+        FileNotFoundError: If no install matches.
+
+    Returns:
+        LoInstall: newest matching install.
+    """
+    spec = spec.strip()
+    checks = []
+    if spec.lower() not in ("", "latest"):
+        for part in spec.split(","):
+            m = _RE_CONSTRAINT.match(part.strip())
+            if m is None:
+                raise ValueError(f"Invalid LibreOffice version constraint: '{part.strip()}'")
+            checks.append(_make_check(m.group(1) or "", _parse_version(m.group(2))))
+    if installs is None:
+        installs = get_installs()
+    matches = [inst for inst in installs if all(check(inst.version) for check in checks)]
+    if not matches:
+        found = ", ".join(f"{inst.version_str} ({inst.install})" for inst in installs) or "none"
+        raise FileNotFoundError(f"No LibreOffice install matches '{spec}'. Found: {found}")
+    # max keeps the first of equal versions, which is the one found first.
+    return max(matches, key=lambda inst: inst.version)
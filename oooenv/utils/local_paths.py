@@ -2,12 +2,17 @@ from __future__ import annotations
 import os
 import sys
 import shutil
+import time
+import _thread
+import threading
 import __main__
 from pathlib import Path
 from typing import List, Union, overload
+from .resolver import get_resolver
 
 _APP_ROOT = None
 _OS_PATH_SET = False
+_LOCK = threading.Lock()
 
 
 def get_root() -> str:
@@ -19,7 +24,9 @@ def get_root() -> str:
     """
     global _APP_ROOT
     if _APP_ROOT is None:
-        _APP_ROOT = os.environ.get("project_root", str(Path(__main__.__file__).parent))
+        with _LOCK:
+            if _APP_ROOT is None:
+                _APP_ROOT = os.environ.get("project_root", str(Path(__main__.__file__).parent))
     return _APP_ROOT
 
 
@@ -30,9 +37,10 @@ def set_os_root_path() -> None:
     global _OS_PATH_SET
     if _OS_PATH_SET is False:
         _app_root = get_root()
-        if _app_root not in sys.path:
-            sys.path.insert(0, _app_root)
-    _OS_PATH_SET = True
+        with _LOCK:
+            if _OS_PATH_SET is False and _app_root not in sys.path:
+                sys.path.insert(0, _app_root)
+            _OS_PATH_SET = True
 
 
 @overload
@@ -120,10 +128,28 @@ def get_site_packages_dir() -> Union[Path, None]:
 
     Note:
         If ``OOOENV_SITE_PACKAGES`` environment variable is set in environment then that path is returned.
+
+        The result is memoized by :py:mod:`oooenv.utils.resolver`.
     """
     if site_dir := os.environ.get("OOOENV_SITE_PACKAGES", None):
         return Path(site_dir)
-    v_path = get_virtual_env_path()
+    return get_resolver().get("site_packages", _find_site_packages_dir)
+
+
+def _find_site_packages_dir() -> Union[Path, None]:
+    return find_site_packages_dir(get_virtual_env_path())
+
+
+def find_site_packages_dir(v_path: Union[str, Path]) -> Union[Path, None]:
+    """
+    Gets the ``site-packages`` directory of a virtual environment.
+
+    Args:
+        v_path (str | Path): Virtual environment directory.
+
+    Returns:
+        Union[Path, None]: site-packages dir if found; Otherwise, None.
+    """
     p_site = Path(v_path, "Lib", "site-packages")
     if p_site.exists() and p_site.is_dir():
         return p_site
@@ -133,5 +159,135 @@ def get_site_packages_dir() -> Union[Path, None]:
     return p_site if p_site.exists() and p_site.is_dir() else None
 
 
+def get_pip_e_name(root: str | os.PathLike) -> str:
+    """
+    Gets the name of the ``.pth`` file :py:meth:`~oooenv.session.OooEnv.pip_e` writes for a project dir.
+
+    Args:
+        root (str | PathLike): Project dir, the parent of the virtual environment.
+
+    Returns:
+        str: File name such as ``my_project.pth``.
+    """
+    return f"{Path(root).name.replace('.', '_').replace(' ', '_')}.pth"
+
+
 def copy_file(src: str | Path, dst: str | Path):
     shutil.copy2(src=src, dst=dst)
+
+
+def get_cache_dir() -> Path:
+    """
+    Gets the per user cache directory for oooenv.
+
+    Returns:
+        Path: cache directory. The directory is not guaranteed to exist.
+
+    Note:
+        If ``OOOENV_CACHE_DIR`` environment variable is set in environment then that path is returned.
+    """
+    if cache_dir := os.environ.get("OOOENV_CACHE_DIR", None):
+        return Path(cache_dir)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", None)
+        if base:
+            return Path(base, "oooenv", "Cache")
+    elif sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "oooenv"
+    if xdg := os.environ.get("XDG_CACHE_HOME", None):
+        return Path(xdg, "oooenv")
+    return Path.home() / ".cache" / "oooenv"
+
+
+def _get_tmp_name(dst: Path) -> Path:
+    return dst.with_name(f".{dst.name}.{os.getpid()}.{_thread.get_ident()}.tmp")
+
+
+def write_text_atomic(fnm: str | Path, text: str) -> None:
+    """
+    Writes text to a file by way of a temporary file in the same directory.
+
+    The temporary file is renamed over ``fnm`` with ``os.replace`` so readers
+    see either the old or the new content, never a partially written file.
+
+    Args:
+        fnm (str | Path): File to write.
+        text (str): Content to write.
+    """
+    dst = Path(fnm)
+    tmp = _get_tmp_name(dst)
+    try:
+        with open(tmp, "w") as file:
+            file.write(text)
+        os.replace(tmp, dst)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+
+def get_switch_mode() -> str:
+    """
+    Gets the mode used by :py:func:`switch_file`.
+
+    Returns:
+        str: Value of ``OOOENV_SWITCH_MODE`` environment variable; Otherwise, ``auto``.
+    """
+    return os.environ.get("OOOENV_SWITCH_MODE", "auto").strip().lower() or "auto"
+
+
+def switch_file(src: str | Path, dst: str | Path, mode: str = "") -> float:
+    """
+    Atomically makes ``dst`` have the content of ``src``.
+
+    ``dst`` is never left truncated. Either the old or the new content is seen.
+
+    Args:
+        src (str | Path): Source file. Must be in the same directory as ``dst`` for ``symlink`` mode.
+        dst (str | Path): File to replace.
+        mode (str, optional): One of:
+
+            - ``symlink`` create a relative symlink to ``src`` beside ``dst`` and rename it over ``dst``.
+              Constant cost, ``src`` is not read.
+            - ``replace`` copy ``src`` to a temporary file beside ``dst`` and rename it over ``dst``.
+            - ``copy`` copy ``src`` over ``dst`` in place. Not atomic.
+            - ``auto`` ``symlink`` where the platform allows it, otherwise ``replace``.
+
+            Defaults to :py:func:`get_switch_mode`.
+
+    Raises:
+        ValueError: If ``mode`` is not a known mode.
+
+    Returns:
+        float: Seconds the switch took.
+    """
+    start = time.perf_counter()
+    p_src = Path(src)
+    p_dst = Path(dst)
+    if not mode:
+        mode = get_switch_mode()
+    if mode not in ("auto", "symlink", "replace", "copy"):
+        raise ValueError(f"Unknown switch mode: {mode}")
+    if mode == "copy":
+        shutil.copy2(src=p_src, dst=p_dst)
+        return time.perf_counter() - start
+
+    tmp = _get_tmp_name(p_dst)
+    if mode == "symlink" or (mode == "auto" and os.name != "nt"):
+        try:
+            os.symlink(os.path.relpath(p_src, p_dst.parent), tmp)
+            os.replace(tmp, p_dst)
+            return time.perf_counter() - start
+        except OSError:
+            if tmp.is_symlink():
+                tmp.unlink()
+            if mode == "symlink":
+                raise
+    try:
+        shutil.copyfile(p_src, tmp)
+        os.replace(tmp, p_dst)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return time.perf_counter() - start
@@ -0,0 +1,179 @@
+"""
+Output of the command line interface.
+
+Commands report each operation with :py:func:`emit` as soon as it is done. The ``text`` format prints the
+human readable lines the command always printed. ``ndjson`` writes one JSON object per line and ``json``
+writes a JSON array, one element per event. Both are flushed after each event, so a long running command
+such as ``oooenv watch`` can be read while it runs.
+
+Every event has these fields, commands may add more:
+
+- ``op`` the operation such as ``link`` or ``update``.
+- ``path`` the file or directory operated on, ``null`` if there is none.
+- ``result`` the outcome such as ``ok``, ``updated`` or ``error``.
+- ``elapsed`` seconds the operation took.
+
+Example:
+    .. code-block:: text
+
+        $ oooenv --output ndjson cmd-link -a
+        {"op": "link", "path": "/home/me/proj/.venv/lib/python3.8/site-packages", "result": "ok", "elapsed": 0.004, ...}
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, Iterable, TextIO, Union
+
+FORMATS = ("text", "json", "ndjson")
+
+_FORMAT = "text"
+_STREAM: Union[TextIO, None] = None
+_COUNT = 0
+_RESERVED = ("op", "path", "result", "elapsed", "text", "errors")
+
+
+def set_format(fmt: str, stream: Union[TextIO, None] = None) -> None:
+    """
+    Sets the output format.
+
+    Args:
+        fmt (str): One of :py:data:`FORMATS`.
+        stream (TextIO, optional): Where events are written. Defaults to ``sys.stdout`` at the time of writing.
+
+    Raises:
+        ValueError: If ``fmt`` is not known.
+    """
+    global _FORMAT, _STREAM, _COUNT
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+    _FORMAT = fmt
+    _STREAM = stream
+    _COUNT = 0
+
+
+def get_format() -> str:
+    """Gets the output format, one of :py:data:`FORMATS`."""
+    return _FORMAT
+
+
+def emit(
+    op: str,
+    path: Union[str, os.PathLike, None] = None,
+    result: str = "ok",
+    elapsed: float = 0.0,
+    text: Iterable[str] = (),
+    errors: Iterable[str] = (),
+    **data: Any,
+) -> None:
+    """
+    Reports one operation.
+
+    Args:
+        op (str): Operation.
+        path (str | PathLike, optional): File or directory operated on.
+        result (str, optional): Outcome. Defaults to ``ok``.
+        elapsed (float, optional): Seconds the operation took.
+        text (Iterable[str], optional): Lines the ``text`` format prints to stdout.
+        errors (Iterable[str], optional): Lines the ``text`` format prints to stderr. Other formats add them
+            as ``errors`` when there are any.
+        data (Any): Extra fields of the event. Paths, versions, dataclasses and named tuples are converted to JSON.
+    """
+    global _COUNT
+    if _FORMAT == "text":
+        for line in text:
+            print(line, file=_STREAM or sys.stdout)
+        for line in errors:
+            print(line, file=sys.stderr)
+        return
+    event: Dict[str, Any] = {
+        "op": op,
+        "path": None if path is None else os.fspath(path),
+        "result": result,
+        "elapsed": round(elapsed, 6),
+    }
+    event.update((k, to_jsonable(v)) for k, v in data.items())
+    errs = list(errors)
+    if errs:
+        event["errors"] = errs
+    line = json.dumps(event)
+    stream = _STREAM or sys.stdout
+    if _FORMAT == "json":
+        line = ("[\n" if _COUNT == 0 else ",\n") + line
+    stream.write(line if _FORMAT == "json" else f"{line}\n")
+    stream.flush()
+    _COUNT += 1
+
+
+def emit_result(
+    op: str,
+    res: Any,
+    path: Union[str, os.PathLike, None] = None,
+    result: str = "",
+    elapsed: float = 0.0,
+    **data: Any,
+) -> None:
+    """
+    Reports an operation that returned a result of :py:mod:`oooenv.results`.
+
+    The fields of ``res`` and its ``messages`` become fields of the event. The ``text`` format prints ``messages``.
+
+    Args:
+        op (str): Operation.
+        res (Any): Result dataclass.
+        path (str | PathLike, optional): File or directory operated on.
+        result (str, optional): Outcome. Defaults to ``error`` if ``res.ok`` is false; Otherwise, ``ok``.
+        elapsed (float, optional): Seconds the operation took.
+        data (Any): Extra fields of the event.
+    """
+    values = {f.name: getattr(res, f.name) for f in fields(res) if f.name not in _RESERVED}
+    values["messages"] = res.messages
+    values.update(data)
+    emit(
+        op,
+        path=path,
+        result=result or ("ok" if getattr(res, "ok", True) else "error"),
+        elapsed=elapsed,
+        text=res.messages,
+        **values,
+    )
+
+
+def close() -> None:
+    """Ends the output, closing the array of the ``json`` format. The format is ``text`` again afterwards."""
+    if _FORMAT == "json":
+        stream = _STREAM or sys.stdout
+        stream.write("[]\n" if _COUNT == 0 else "\n]\n")
+        stream.flush()
+    set_format("text")
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Converts a value for :py:func:`json.dumps`.
+
+    Dataclasses and named tuples become objects. Paths and named tuples with their own ``__str__``,
+    such as :py:class:`~oooenv.utils.py_version.Version`, become strings.
+
+    Args:
+        value (Any): Value.
+
+    Returns:
+        Any: Value made of ``dict``, ``list``, ``str``, numbers, booleans and ``None``.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, os.PathLike):
+        return os.fspath(value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return {f.name: to_jsonable(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, tuple) and hasattr(value, "_asdict"):
+        if type(value).__str__ is not tuple.__str__:
+            return str(value)
+        return {k: to_jsonable(v) for k, v in value._asdict().items()}
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_jsonable(v) for v in value]
+    return str(value)
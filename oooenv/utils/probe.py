@@ -0,0 +1,352 @@
+"""
+Runs child processes for oooenv.
+
+Every interpreter or ``soffice`` probe goes through :py:func:`run` or :py:func:`run_async`, which give it:
+
+- a timeout. The child is killed when it runs out.
+- retries with backoff when the executable can not be started for a moment, such as ``Text file busy``
+  while LibreOffice is being upgraded.
+- a limit on how many children run at once, shared by threads and event loops.
+  See :py:func:`set_limit` and ``OOOENV_PROBE_LIMIT``.
+- an optional in-memory result cache keyed on the arguments and the identity (path, size and mtime)
+  of the executable, so an upgraded executable is probed again.
+- counters of spawns, cache hits, retries and timeouts, see :py:func:`get_stats`.
+
+Example:
+    .. code-block:: python
+
+        from oooenv.utils import probe
+
+        out = probe.run(["/usr/lib/libreoffice/program/python", "--version"], timeout=10, cache=True).check().stdout
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import errno
+import shutil
+import asyncio
+import weakref
+import threading
+import subprocess
+from typing import Dict, NamedTuple, Sequence, Tuple, Union
+from . import timings
+
+DEFAULT_TIMEOUT = 30.0
+"""Seconds a child may run."""
+DEFAULT_RETRIES = 2
+"""Times a child that could not be started is tried again."""
+DEFAULT_BACKOFF = 0.1
+"""Seconds before the first retry. Doubled for each retry after it."""
+
+# errors starting an executable that is being replaced, they pass once the upgrade is done.
+_TRANSIENT_ERRNOS = (errno.ETXTBSY, errno.EAGAIN, errno.EBUSY)
+# ERROR_ACCESS_DENIED, ERROR_SHARING_VIOLATION
+_TRANSIENT_WINERRORS = (5, 32)
+
+_LOCK = threading.Lock()
+_CACHE: Dict[Tuple[Tuple[str, ...], Tuple[str, int, int]], ProbeResult] = {}
+_STATS: Dict[str, int] = {"spawns": 0, "hits": 0, "retries": 0, "timeouts": 0, "failures": 0}
+
+
+def _get_default_limit() -> int:
+    try:
+        return max(1, int(os.environ.get("OOOENV_PROBE_LIMIT", "")))
+    except ValueError:
+        return max(1, min(8, os.cpu_count() or 1))
+
+
+_LIMIT = _get_default_limit()
+_SEMAPHORE = threading.BoundedSemaphore(_LIMIT)
+# coroutines of a loop queue here first, so at most _LIMIT of them wait for _SEMAPHORE in executor threads.
+_LOOP_SEMAPHORES: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+class ProbeError(subprocess.CalledProcessError):
+    """A child exited with an error. Unlike :py:class:`subprocess.CalledProcessError` the message ends with its stderr."""
+
+    def __str__(self) -> str:
+        msg = super().__str__()
+        err = self.stderr.decode("utf-8", errors="replace") if isinstance(self.stderr, bytes) else self.stderr or ""
+        lines = err.strip().splitlines()
+        return f"{msg} {lines[-1]}" if lines else msg
+
+
+class ProbeResult(NamedTuple):
+    argv: Tuple[str, ...]
+    returncode: int
+    stdout: bytes
+    stderr: bytes
+    elapsed: float
+    """Seconds the child ran, of the last attempt."""
+    attempts: int = 1
+    """Times the child was started. ``0`` for a cached result."""
+    cached: bool = False
+
+    def check(self) -> ProbeResult:
+        """
+        Checks the child exited without an error.
+
+        Raises:
+            ProbeError: If ``returncode`` is not ``0``.
+
+        Returns:
+            ProbeResult: This result.
+        """
+        if self.returncode != 0:
+            raise ProbeError(self.returncode, list(self.argv), self.stdout, self.stderr)
+        return self
+
+
+class ProbeStats(NamedTuple):
+    spawns: int
+    """Children started, each retry counts."""
+    hits: int
+    """Results answered from the cache."""
+    retries: int
+    """Children started again after a transient error."""
+    timeouts: int
+    """Children killed because they ran out of time."""
+    failures: int
+    """Children that exited with an error."""
+
+
+# region Limits and stats
+def set_limit(limit: int) -> None:
+    """
+    Sets how many children may run at once. Children already running are not affected.
+
+    Args:
+        limit (int): Limit, at least ``1``.
+    """
+    global _LIMIT, _SEMAPHORE
+    with _LOCK:
+        _LIMIT = max(1, limit)
+        _SEMAPHORE = threading.BoundedSemaphore(_LIMIT)
+        _LOOP_SEMAPHORES.clear()
+
+
+def get_limit() -> int:
+    """Gets how many children may run at once. Defaults to ``OOOENV_PROBE_LIMIT`` or the number of CPUs, at most 8."""
+    return _LIMIT
+
+
+def get_stats() -> ProbeStats:
+    """Gets counters since start or since the last :py:func:`reset_stats`."""
+    with _LOCK:
+        return ProbeStats(**_STATS)
+
+
+def reset_stats() -> None:
+    """Resets the counters to ``0``."""
+    with _LOCK:
+        for key in _STATS:
+            _STATS[key] = 0
+
+
+def clear_cache() -> None:
+    """Clears the result cache."""
+    with _LOCK:
+        _CACHE.clear()
+
+
+def _count(key: str) -> None:
+    with _LOCK:
+        _STATS[key] += 1
+
+
+def _get_loop_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        semaphore = _LOOP_SEMAPHORES.get(loop, None)
+        if semaphore is None:
+            semaphore = _LOOP_SEMAPHORES[loop] = asyncio.Semaphore(_LIMIT)
+    return semaphore
+
+
+async def _acquire(semaphore: threading.BoundedSemaphore) -> None:
+    """Acquires the limit shared with threads without blocking the event loop."""
+    if semaphore.acquire(blocking=False):
+        return
+    future = asyncio.get_running_loop().run_in_executor(None, semaphore.acquire)
+    try:
+        await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # the acquire still finishes in its thread, the slot is handed back once it does.
+        def give_back(f: asyncio.Future) -> None:
+            if not f.cancelled() and f.exception() is None:
+                semaphore.release()
+
+        future.add_done_callback(give_back)
+        raise
+
+
+# endregion Limits and stats
+
+
+# region Cache
+def _get_cache_key(argv: Tuple[str, ...]) -> Union[Tuple[Tuple[str, ...], Tuple[str, int, int]], None]:
+    exe = argv[0]
+    if os.path.dirname(exe) == "":
+        exe = shutil.which(exe) or exe
+    try:
+        st = os.stat(exe)
+    except OSError:
+        return None
+    return argv, (os.path.abspath(exe), st.st_size, st.st_mtime_ns)
+
+
+def _get_cached(key: Union[Tuple[Tuple[str, ...], Tuple[str, int, int]], None]) -> Union[ProbeResult, None]:
+    if key is None:
+        return None
+    with _LOCK:
+        result = _CACHE.get(key, None)
+        if result is not None:
+            _STATS["hits"] += 1
+    return result
+
+
+def _put_cached(key: Union[Tuple[Tuple[str, ...], Tuple[str, int, int]], None], result: ProbeResult) -> None:
+    # failures are not kept, the next call may succeed.
+    if key is not None and result.returncode == 0:
+        with _LOCK:
+            _CACHE[key] = result._replace(attempts=0, cached=True)
+
+
+# endregion Cache
+
+
+def _is_transient(e: OSError) -> bool:
+    if sys.platform == "win32" and getattr(e, "winerror", None) in _TRANSIENT_WINERRORS:
+        return True
+    return e.errno in _TRANSIENT_ERRNOS
+
+
+def run(
+    argv: Sequence[str],
+    timeout: Union[float, None] = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: bool = False,
+    env: Union[Dict[str, str], None] = None,
+) -> ProbeResult:
+    """
+    Runs a child process and captures its output.
+
+    Args:
+        argv (Sequence[str]): Executable and arguments.
+        timeout (float, optional): Seconds the child may run. Defaults to :py:data:`DEFAULT_TIMEOUT`.
+            ``None`` waits as long as it takes.
+        retries (int, optional): Times to try again when the executable can not be started for a moment.
+            Defaults to :py:data:`DEFAULT_RETRIES`.
+        backoff (float, optional): Seconds before the first retry. Defaults to :py:data:`DEFAULT_BACKOFF`.
+        cache (bool, optional): Answer from, and keep a successful result in, the result cache. Defaults to ``False``.
+        env (Dict[str, str], optional): Environment of the child. Defaults to the environment of this process.
+
+    Raises:
+        FileNotFoundError: If the executable does not exist.
+        OSError: If the executable could not be started, after the retries.
+        subprocess.TimeoutExpired: If the child did not finish in time. It is killed.
+
+    Returns:
+        ProbeResult: Result. Call :py:meth:`ProbeResult.check` to raise on a non zero exit status.
+    """
+    args = tuple(os.fspath(a) for a in argv)
+    key = _get_cache_key(args) if cache else None
+    if (result := _get_cached(key)) is not None:
+        return result
+    attempt = 0
+    while True:
+        attempt += 1
+        with _SEMAPHORE, timings.span("probe.run", exe=args[0], attempt=attempt):
+            _count("spawns")
+            start = time.perf_counter()
+            try:
+                proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout, env=env)
+            except subprocess.TimeoutExpired:
+                _count("timeouts")
+                raise
+            except OSError as e:
+                if attempt > retries or not _is_transient(e):
+                    raise
+                _count("retries")
+                error: Union[OSError, None] = e
+            else:
+                error = None
+            elapsed = time.perf_counter() - start
+        if error is not None:
+            time.sleep(backoff * 2 ** (attempt - 1))
+            continue
+        if proc.returncode != 0:
+            _count("failures")
+        result = ProbeResult(args, proc.returncode, proc.stdout, proc.stderr, elapsed, attempt)
+        _put_cached(key, result)
+        return result
+
+
+async def run_async(
+    argv: Sequence[str],
+    timeout: Union[float, None] = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: bool = False,
+    env: Union[Dict[str, str], None] = None,
+) -> ProbeResult:
+    """
+    Async :py:func:`run`. Shares the limit, cache and counters with it, the event loop is never blocked.
+
+    Raises:
+        FileNotFoundError: If the executable does not exist.
+        OSError: If the executable could not be started, after the retries.
+        subprocess.TimeoutExpired: If the child did not finish in time. It is killed.
+
+    Returns:
+        ProbeResult: Result.
+    """
+    args = tuple(os.fspath(a) for a in argv)
+    key = _get_cache_key(args) if cache else None
+    if (result := _get_cached(key)) is not None:
+        return result
+    attempt = 0
+    while True:
+        attempt += 1
+        semaphore = _SEMAPHORE
+        async with _get_loop_semaphore():
+            await _acquire(semaphore)
+            try:
+                _count("spawns")
+                start = time.perf_counter()
+                try:
+                    proc = await asyncio.create_subprocess_exec(
+                        *args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+                    )
+                except OSError as e:
+                    if attempt > retries or not _is_transient(e):
+                        raise
+                    _count("retries")
+                    error: Union[OSError, None] = e
+                else:
+                    error = None
+                    try:
+                        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+                    except asyncio.TimeoutError:
+                        proc.kill()
+                        await proc.wait()
+                        _count("timeouts")
+                        raise subprocess.TimeoutExpired(list(args), timeout or 0.0) from None
+                    except asyncio.CancelledError:
+                        proc.kill()
+                        await proc.wait()
+                        raise
+                elapsed = time.perf_counter() - start
+            finally:
+                semaphore.release()
+        if error is not None:
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+            continue
+        returncode = proc.returncode if proc.returncode is not None else -1
+        if returncode != 0:
+            _count("failures")
+        result = ProbeResult(args, returncode, out, err, elapsed, attempt)
+        _put_cached(key, result)
+        return result
@@ -0,0 +1,281 @@
+"""
+LibreOffice Python version probing.
+
+Spawning LibreOffice's python to ask for its version costs a full interpreter start up.
+The install itself usually tells the version: the ``python-core-X.Y.Z`` directory and the
+``pythonXY.dll`` or ``libpython3.X`` library in ``program``. These are checked first and the
+interpreter is only spawned when they are missing or disagree.
+
+Spawn results are cached in memory and on disk keyed on the identity (path, size and mtime)
+of the executable so the interpreter is spawned at most once per install or upgrade.
+"""
+from __future__ import annotations
+import os
+import re
+from pathlib import Path
+from typing import Dict, NamedTuple, Tuple, Union
+from .disk_cache import DiskCache
+from . import timings
+
+
+class Version(NamedTuple):
+    major: int
+    minor: int
+    revision: int
+
+    def __str__(self) -> str:
+        return f"{self.major}.{self.minor}.{self.revision}"
+
+    @staticmethod
+    def from_str(s: str) -> Version:
+        """
+        Gets a Version from a string such as ``3.8.16``.
+
+        Args:
+            s (str): Version string. Anything after the revision is ignored.
+
+        Raises:
+            ValueError: If ``s`` is not a valid version.
+
+        Returns:
+            Version: Version
+        """
+        major, minor, revision = s.strip().split(".", maxsplit=3)[:3]
+        return Version(major=int(major), minor=int(minor), revision=int(revision))
+
+
+class InstallInfo(NamedTuple):
+    """Version information read from a LibreOffice ``program`` directory without spawning anything."""
+
+    python_core: Tuple[Version, ...]
+    """Versions found as ``python-core-X.Y.Z`` directory names."""
+    python_lib: Tuple[Tuple[int, int], ...]
+    """``(major, minor)`` found as ``pythonXY.dll`` or ``libpython3.X`` file names."""
+    product: str
+    """LibreOffice version such as ``7.6`` read from ``bootstraprc`` / ``bootstrap.ini``. Empty if unknown."""
+    build_id: str
+    """``buildid`` read from ``versionrc`` / ``version.ini``. Empty if unknown."""
+
+
+_RE_PY_CORE = re.compile(r"^python-core-(\d+)\.(\d+)\.(\d+)$")
+# python38.dll, python311.dll
+_RE_PY_DLL = re.compile(r"^python(\d)(\d+)\.dll$", re.IGNORECASE)
+# libpython3.8.so.1.0, libpython3.8.dylib, libpython3.11m.so
+_RE_PY_SO = re.compile(r"^libpython(\d)\.(\d+)[a-z]*\.(so|dylib)")
+_RE_PRODUCT = re.compile(r"(\d+(?:\.\d+)+)")
+
+SPAWN_TIMEOUT = 30.0
+"""Seconds a python executable has to report its version."""
+
+_MEM_CACHE: Dict[Tuple[str, int, int], Version] = {}
+# program dir -> (st_mtime_ns, version). Adding or removing python-core-X.Y.Z changes the dir mtime.
+_INSTALL_CACHE: Dict[str, Tuple[int, Union[Version, None]]] = {}
+_DISK_CACHE = DiskCache("py_version")
+_SPAWN_COUNT = 0
+
+
+def get_spawn_count() -> int:
+    """
+    Gets the number of times a python executable was spawned to get its version.
+
+    Returns:
+        int: spawn count since start or since last :py:func:`reset_spawn_count`.
+    """
+    return _SPAWN_COUNT
+
+
+def reset_spawn_count() -> None:
+    """Resets the spawn count to ``0``."""
+    global _SPAWN_COUNT
+    _SPAWN_COUNT = 0
+
+
+def clear_cache() -> None:
+    """Clears the memory and disk version cache."""
+    _MEM_CACHE.clear()
+    _INSTALL_CACHE.clear()
+    _DISK_CACHE.clear()
+
+
+def _get_identity(python_exe: str) -> Tuple[str, int, int]:
+    st = os.stat(python_exe)
+    return (os.path.abspath(python_exe), st.st_size, st.st_mtime_ns)
+
+
+def _count_spawn() -> None:
+    global _SPAWN_COUNT
+    _SPAWN_COUNT += 1
+
+
+def _parse_version_output(output: bytes) -> Version:
+    # something like Python 3.8.10
+    parts = output.decode("UTF8").strip().split()
+    return Version.from_str(parts[1])
+
+
+def _spawn_version(python_exe: str, timeout: Union[float, None] = SPAWN_TIMEOUT) -> Version:
+    from . import probe
+
+    _count_spawn()
+    with timings.span("py_version.spawn", exe=python_exe):
+        output = probe.run([python_exe, "--version"], timeout=timeout).check().stdout
+    return _parse_version_output(output)
+
+
+def _read_rc_value(fnm: Path, key: str) -> str:
+    try:
+        with open(fnm, "r", encoding="utf-8", errors="replace") as file:
+            for line in file:
+                k, sep, v = line.partition("=")
+                if sep and k.strip() == key:
+                    return v.strip()
+    except OSError:
+        pass
+    return ""
+
+
+def read_install_info(program_dir: Union[str, os.PathLike]) -> InstallInfo:
+    """
+    Reads version information from a LibreOffice ``program`` directory.
+
+    The directory is scanned once.
+
+    Args:
+        program_dir (str | PathLike): LibreOffice program directory such as ``/opt/libreoffice7.6/program``.
+
+    Returns:
+        InstallInfo: information found. Fields are empty when nothing was found.
+    """
+    p_dir = Path(program_dir)
+    core = []
+    lib = []
+    rc_files = {}
+    try:
+        with os.scandir(p_dir) as it:
+            for entry in it:
+                name = entry.name
+                if m := _RE_PY_CORE.match(name):
+                    if entry.is_dir():
+                        core.append(Version(int(m.group(1)), int(m.group(2)), int(m.group(3))))
+                elif (m := _RE_PY_DLL.match(name)) or (m := _RE_PY_SO.match(name)):
+                    lib.append((int(m.group(1)), int(m.group(2))))
+                elif name in ("bootstraprc", "bootstrap.ini", "versionrc", "version.ini"):
+                    rc_files[name] = Path(entry.path)
+    except OSError:
+        pass
+
+    product = ""
+    for name in ("bootstraprc", "bootstrap.ini"):
+        if name in rc_files:
+            # ProductKey=LibreOffice 7.6
+            if m := _RE_PRODUCT.search(_read_rc_value(rc_files[name], "ProductKey")):
+                product = m.group(1)
+                break
+    build_id = ""
+    for name in ("versionrc", "version.ini"):
+        if name in rc_files:
+            if build_id := _read_rc_value(rc_files[name], "buildid"):
+                break
+    return InstallInfo(
+        python_core=tuple(sorted(set(core))),
+        python_lib=tuple(sorted(set(lib))),
+        product=product,
+        build_id=build_id,
+    )
+
+
+def get_version_from_install(program_dir: Union[str, os.PathLike]) -> Union[Version, None]:
+    """
+    Gets LibreOffice python version from the install layout without spawning python.
+
+    Args:
+        program_dir (str | PathLike): LibreOffice program directory.
+
+    Returns:
+        Version | None: Version if the install tells it unambiguously; Otherwise, ``None``.
+
+    Note:
+        The result is kept in memory until the ``mtime`` of ``program_dir`` changes.
+    """
+    key = os.fspath(program_dir)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except OSError:
+        return None
+    cached = _INSTALL_CACHE.get(key, None)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with timings.span("py_version.install_info"):
+        info = read_install_info(program_dir)
+    ver: Union[Version, None] = None
+    # missing or more than one python-core-X.Y.Z dir, perhaps left over from an upgrade, is not trusted.
+    if len(info.python_core) == 1:
+        ver = info.python_core[0]
+        if any(lib != (ver.major, ver.minor) for lib in info.python_lib):
+            ver = None
+    _INSTALL_CACHE[key] = (mtime, ver)
+    return ver
+
+
+def resolve_version(
+    program_dir: Union[str, os.PathLike], python_exe: str, timeout: Union[float, None] = SPAWN_TIMEOUT
+) -> Version:
+    """
+    Gets LibreOffice python version trying cheap sources first.
+
+    Args:
+        program_dir (str | PathLike): LibreOffice program directory.
+        python_exe (str): LibreOffice python executable. Only spawned if the install layout
+            does not tell the version.
+        timeout (float, optional): Seconds to wait for ``python_exe``. Defaults to :py:data:`SPAWN_TIMEOUT`.
+
+    Returns:
+        Version: python version.
+    """
+    if ver := get_version_from_install(program_dir):
+        return ver
+    return get_version(python_exe, timeout=timeout)
+
+
+def get_version(python_exe: str, timeout: Union[float, None] = SPAWN_TIMEOUT) -> Version:
+    """
+    Gets the version of a python executable.
+
+    Args:
+        python_exe (str): path to python executable.
+        timeout (float, optional): Seconds to wait for ``python_exe``. Defaults to :py:data:`SPAWN_TIMEOUT`.
+            ``None`` waits as long as it takes.
+
+    Raises:
+        FileNotFoundError: If ``python_exe`` does not exist.
+        subprocess.TimeoutExpired: If ``python_exe`` did not answer in time. It is killed.
+        oooenv.utils.probe.ProbeError: If ``python_exe`` exited with an error.
+
+    Returns:
+        Version: python version.
+    """
+    identity = _get_identity(python_exe)
+    if ver := _get_cached(identity):
+        return ver
+    ver = _spawn_version(python_exe, timeout=timeout)
+    _put_cached(identity, ver)
+    return ver
+
+
+def _get_cached(identity: Tuple[str, int, int]) -> Union[Version, None]:
+    if ver := _MEM_CACHE.get(identity, None):
+        return ver
+    entry = _DISK_CACHE.get(identity[0], fingerprint=f"{identity[1]}:{identity[2]}")
+    if entry is None or entry.missing:
+        return None
+    try:
+        ver = Version.from_str(entry.value)
+    except (ValueError, AttributeError):
+        return None
+    _MEM_CACHE[identity] = ver
+    return ver
+
+
+def _put_cached(identity: Tuple[str, int, int], ver: Version) -> None:
+    _DISK_CACHE.put(identity[0], str(ver), fingerprint=f"{identity[1]}:{identity[2]}")
+    _MEM_CACHE[identity] = ver
@@ -0,0 +1,265 @@
+"""
+Parse once store for ``pyvenv.cfg`` style files.
+
+:py:class:`PyvenvConfig` keeps comments, blank lines and key order so that writing a
+config back only changes the values that were changed.
+
+:py:func:`load` keeps parsed configs keyed on file identity and validated by ``mtime``
+and size, so a file is only parsed again after it changed on disk.
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Dict, Iterator, List, Mapping, MutableMapping, Tuple, Union
+from . import local_paths
+from . import timings
+
+
+class _Line:
+    __slots__ = ("key", "value", "raw", "comment", "head", "tail")
+
+    def __init__(
+        self,
+        raw: Union[str, None],
+        key: Union[str, None] = None,
+        value: str = "",
+        comment: str = "",
+        head: Union[str, None] = None,
+        tail: str = "",
+    ) -> None:
+        self.raw = raw
+        """Original text of line. ``None`` for new and changed lines."""
+        self.key = key
+        """Key of a ``key = value`` line; Otherwise, ``None``."""
+        self.value = value
+        self.comment = comment
+        """Inline comment including leading ``#``."""
+        self.head = head
+        """Text of a read line before the value, such as ``key = ``. ``None`` for new lines."""
+        self.tail = tail
+        """Text of a read line after the value, such as ``  # comment``."""
+
+    def copy(self) -> _Line:
+        return _Line(
+            raw=self.raw, key=self.key, value=self.value, comment=self.comment, head=self.head, tail=self.tail
+        )
+
+    def __str__(self) -> str:
+        if self.raw is not None:
+            return self.raw
+        if self.head is not None:
+            # only the value of a changed line changes, its separator and comment spacing are kept.
+            return f"{self.head}{self.value}{self.tail}"
+        return f"{self.key} = {self.value}{' ' + self.comment if self.comment else ''}"
+
+
+class PyvenvConfig(MutableMapping[str, str]):
+    """
+    ``key = value`` configuration that round trips comments and key order.
+
+    Everything after ``#`` on a line is a comment. Values may contain ``=``.
+    """
+
+    def __init__(self, lines: Union[List[_Line], None] = None) -> None:
+        self._lines: List[_Line] = [] if lines is None else lines
+
+    # region Parse / Write
+    @staticmethod
+    def parse(text: str) -> PyvenvConfig:
+        """
+        Parses configuration text.
+
+        Args:
+            text (str): config file content.
+
+        Returns:
+            PyvenvConfig: config.
+        """
+        lines = []
+        for raw in text.splitlines():
+            content, hash_sign, comment = raw.partition("#")
+            key, sep, value = content.partition("=")
+            if sep and key.strip():
+                start = len(key) + len(sep) + len(value) - len(value.lstrip())
+                end = start + len(value.strip())
+                lines.append(
+                    _Line(
+                        raw=raw,
+                        key=key.strip(),
+                        value=value.strip(),
+                        comment=hash_sign + comment,
+                        head=raw[:start],
+                        tail=raw[end:],
+                    )
+                )
+            else:
+                # comment, blank or unrecognized line. Kept as is.
+                lines.append(_Line(raw=raw))
+        return PyvenvConfig(lines)
+
+    @staticmethod
+    def from_dict(cfg: Mapping[str, str]) -> PyvenvConfig:
+        """
+        Creates a config from a mapping.
+
+        Args:
+            cfg (Mapping[str, str]): keys and values.
+
+        Returns:
+            PyvenvConfig: config.
+        """
+        result = PyvenvConfig()
+        result.update(cfg)
+        return result
+
+    def to_text(self) -> str:
+        """
+        Gets config as text.
+
+        Returns:
+            str: text with unchanged lines exactly as they were read.
+        """
+        if not self._lines:
+            return ""
+        return "\n".join(str(line) for line in self._lines) + "\n"
+
+    def copy(self) -> PyvenvConfig:
+        """Gets an independent copy of config."""
+        return PyvenvConfig([line.copy() for line in self._lines])
+
+    def to_dict(self) -> Dict[str, str]:
+        """Gets keys and values as a new dictionary."""
+        return {line.key: line.value for line in self._lines if line.key is not None}
+
+    def assign(self, cfg: Mapping[str, str]) -> None:
+        """
+        Makes config have exactly the keys and values of ``cfg``.
+
+        Keys not in ``cfg`` are removed, changed values are updated in place and new keys are appended.
+        Comments and the order of existing keys are kept.
+
+        Args:
+            cfg (Mapping[str, str]): keys and values.
+        """
+        for key in [k for k in self if k not in cfg]:
+            del self[key]
+        for key, value in cfg.items():
+            if self.get(key, None) != value:
+                self[key] = value
+
+    # endregion Parse / Write
+
+    # region MutableMapping
+    def _find(self, key: str) -> Union[_Line, None]:
+        # last one wins, the same as when reading into a dict.
+        for line in reversed(self._lines):
+            if line.key == key:
+                return line
+        return None
+
+    def __getitem__(self, key: str) -> str:
+        line = self._find(key)
+        if line is None:
+            raise KeyError(key)
+        return line.value
+
+    def __setitem__(self, key: str, value: str) -> None:
+        line = self._find(key)
+        if line is None:
+            self._lines.append(_Line(raw=None, key=key, value=str(value)))
+            return
+        if line.value != value:
+            line.value = str(value)
+            line.raw = None
+
+    def __delitem__(self, key: str) -> None:
+        count = len(self._lines)
+        self._lines = [line for line in self._lines if line.key != key]
+        if len(self._lines) == count:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __len__(self) -> int:
+        return len(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    # endregion MutableMapping
+
+
+_StatKey = Tuple[int, int]
+_LOCK = threading.Lock()
+# (st_dev, st_ino) -> ((st_mtime_ns, st_size), config)
+_STORE: Dict[Tuple[int, int], Tuple[_StatKey, PyvenvConfig]] = {}
+_PARSE_COUNT = 0
+
+
+def get_parse_count() -> int:
+    """
+    Gets the number of times a file was parsed.
+
+    Returns:
+        int: parse count since start or since last :py:func:`clear`.
+    """
+    return _PARSE_COUNT
+
+
+def clear() -> None:
+    """Forgets all parsed configs and resets the parse count."""
+    global _PARSE_COUNT
+    with _LOCK:
+        _STORE.clear()
+        _PARSE_COUNT = 0
+
+
+def load(fnm: Union[str, os.PathLike]) -> PyvenvConfig:
+    """
+    Gets the parsed config of a file.
+
+    The file is only parsed if it was not parsed before or changed since.
+    Symlinks are followed so a ``pyvenv.cfg`` linked to a profile shares the profile's parsed config.
+
+    Args:
+        fnm (str | PathLike): config file.
+
+    Raises:
+        FileNotFoundError: If file does not exist.
+
+    Returns:
+        PyvenvConfig: A copy of the parsed config that the caller may change.
+    """
+    global _PARSE_COUNT
+    st = os.stat(fnm)
+    ident = (st.st_dev, st.st_ino)
+    stat_key = (st.st_mtime_ns, st.st_size)
+    with _LOCK:
+        cached = _STORE.get(ident, None)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1].copy()
+    with timings.span("pyvenv_config.parse", file=os.fspath(fnm)):
+        with open(fnm, "r") as file:
+            cfg = PyvenvConfig.parse(file.read())
+    with _LOCK:
+        _PARSE_COUNT += 1
+        _STORE[ident] = (stat_key, cfg.copy())
+    return cfg
+
+
+def save(fnm: Union[str, os.PathLike], cfg: PyvenvConfig) -> None:
+    """
+    Atomically writes a config and keeps it as the parsed config of the file.
+
+    If ``fnm`` is a symlink the link is replaced by a regular file.
+
+    Args:
+        fnm (str | PathLike): config file.
+        cfg (PyvenvConfig): config to write.
+    """
+    with timings.span("pyvenv_config.save", file=os.fspath(fnm)):
+        local_paths.write_text_atomic(fnm, cfg.to_text())
+    st = os.stat(fnm)
+    with _LOCK:
+        _STORE[(st.st_dev, st.st_ino)] = ((st.st_mtime_ns, st.st_size), cfg.copy())
@@ -0,0 +1,171 @@
+"""
+Thread safe, single flight memoization of discovered paths.
+
+Every discovered value (LibreOffice install path, uno path, site-packages, ...) is stored
+in one :py:class:`PathResolver`. When several threads ask for a value that is not yet known
+only one of them runs the probe; the others wait for and share its result.
+
+The resolver clears itself when any environment variable that overrides discovery changes,
+see :py:func:`get_env_snapshot`. A full snapshot is only taken when the number of environment variables
+or the value of one in the last snapshot changed, so a memoized value is returned without scanning the environment.
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_ENV_NAMES = ("VIRTUAL_ENV", "ODEV_CONN_SOFFICE", "PATH")
+
+
+def get_env_snapshot() -> Tuple[Tuple[str, str], ...]:
+    """
+    Gets the environment variables that influence discovery.
+
+    These are all ``OOOENV_*`` variables plus ``VIRTUAL_ENV``, ``ODEV_CONN_SOFFICE`` and ``PATH``.
+
+    Returns:
+        Tuple[Tuple[str, str], ...]: sorted name, value pairs.
+    """
+    return tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith("OOOENV_") or k in _ENV_NAMES))
+
+
+def _get_env_key(names: Tuple[str, ...]) -> Tuple[Any, ...]:
+    # a variable added or removed changes the count, one of the snapshot changing its value changes the values.
+    # only removing another variable and adding an override between two gets goes unseen.
+    environ = os.environ
+    return (len(environ), *[environ.get(name, None) for name in names])
+
+
+class _Flight:
+    """A probe in progress."""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class PathResolver:
+    """
+    Memoizes discovered values. Safe to use from many threads.
+
+    Args:
+        check_env (bool, optional): Compare the environment with the last snapshot on each get.
+            Processes that never change their environment, such as the daemon, pass ``False``. Defaults to ``True``.
+    """
+
+    def __init__(self, check_env: bool = True) -> None:
+        self._check = check_env
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._probe_counts: Dict[str, int] = {}
+        self._generation = 0
+        self._env = get_env_snapshot()
+        names = tuple(name for name, _ in self._env)
+        self._env_key = (names, _get_env_key(names))
+
+    def _check_env(self) -> None:
+        # caller must hold lock
+        env = get_env_snapshot()
+        names = tuple(name for name, _ in env)
+        self._env_key = (names, _get_env_key(names))
+        if env != self._env:
+            self._env = env
+            self._clear()
+
+    def _env_changed(self) -> bool:
+        # read without the lock, names and key are replaced together.
+        names, key = self._env_key
+        return _get_env_key(names) != key
+
+    def _clear(self) -> None:
+        # caller must hold lock. Probes already running keep their flight, later callers start a new one.
+        self._values.clear()
+        self._inflight = {}
+        self._generation += 1
+
+    def clear(self) -> None:
+        """Forgets all memoized values. Probes already running will not store their result."""
+        with self._lock:
+            self._clear()
+            self._probe_counts.clear()
+
+    def get(self, key: str, probe: Callable[[], T]) -> T:
+        """
+        Gets a memoized value or runs ``probe`` to get it.
+
+        If another thread is already running the probe for ``key`` this call waits
+        and returns the same result, or raises the same error.
+
+        Args:
+            key (str): Value key.
+            probe (Callable[[], T]): Gets the value when it is not memoized.
+                Errors are not memoized.
+
+        Returns:
+            T: value.
+        """
+        changed = self._check and self._env_changed()
+        with self._lock:
+            if changed:
+                self._check_env()
+            if key in self._values:
+                return self._values[key]
+            flight = self._inflight.get(key, None)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self._probe_counts[key] = self._probe_counts.get(key, 0) + 1
+            generation = self._generation
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = probe()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key, None) is flight:
+                    del self._inflight[key]
+                if flight.error is None and generation == self._generation:
+                    self._values[key] = flight.value
+            flight.event.set()
+        return flight.value
+
+    def get_probe_count(self, key: str) -> int:
+        """
+        Gets how many times a probe was run for ``key`` since the last :py:meth:`clear`.
+
+        Args:
+            key (str): Value key.
+
+        Returns:
+            int: probe count.
+        """
+        with self._lock:
+            return self._probe_counts.get(key, 0)
+
+
+_RESOLVER = PathResolver()
+
+
+def get_resolver() -> PathResolver:
+    """
+    Gets the process wide resolver.
+
+    Returns:
+        PathResolver: resolver.
+    """
+    return _RESOLVER
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import platform
+import sys
 from enum import Enum
 
 
@@ -22,6 +22,15 @@ class SysInfo:
         Returns:
             SysInfo.PlatformEnum: Platform Enum
         """
+        # sys.platform is free; platform.system() requires importing platform.
+        if sys.platform == "win32":
+            return SysInfo.PlatformEnum.WINDOWS
+        if sys.platform == "darwin":
+            return SysInfo.PlatformEnum.MAC
+        if sys.platform.startswith("linux"):
+            return SysInfo.PlatformEnum.LINUX
+        import platform
+
         s = platform.system().lower()
         if s == "windows":
             return SysInfo.PlatformEnum.WINDOWS
@@ -0,0 +1,198 @@
+"""
+Named timing spans.
+
+Spans are only recorded after :py:func:`enable` is called, otherwise :py:func:`span`
+returns a shared no-op context manager so instrumented code pays next to nothing.
+
+Example:
+    .. code-block:: python
+
+        with timings.span("uno_paths.which"):
+            s = shutil.which("soffice")
+"""
+from __future__ import annotations
+import time
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, List, TypeVar, Union
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_ENABLED = False
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_ROOTS: List[Span] = []
+
+
+class Span:
+    """A timed phase. Spans started while another span is active on the same thread become its children."""
+
+    __slots__ = ("name", "attrs", "start", "end", "children", "_parent")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.end = 0.0
+        self.children: List[Span] = []
+        self._parent: Union[Span, None] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Gets elapsed seconds."""
+        return self.end - self.start
+
+    def __enter__(self) -> Span:
+        stack = _get_stack()
+        if stack:
+            self._parent = stack[-1]
+            self._parent.children.append(self)
+        else:
+            with _LOCK:
+                _ROOTS.append(self)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        stack = _get_stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Gets span and its children as a JSON serializable dictionary."""
+        result: Dict[str, Any] = {"name": self.name, "ms": round(self.elapsed * 1000, 3)}
+        if self.attrs:
+            result["attrs"] = {k: v if isinstance(v, (bool, int, float)) else str(v) for k, v in self.attrs.items()}
+        if self.children:
+            result["children"] = [child.to_dict() for child in self.children]
+        return result
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _get_stack() -> List[Span]:
+    stack = getattr(_LOCAL, "stack", None)
+    if stack is None:
+        stack = []
+        _LOCAL.stack = stack
+    return stack
+
+
+def enable(value: bool = True) -> None:
+    """
+    Enables or disables span recording.
+
+    Args:
+        value (bool, optional): ``True`` to record spans. Defaults to ``True``.
+    """
+    global _ENABLED
+    _ENABLED = value
+
+
+def is_enabled() -> bool:
+    """Gets if spans are recorded."""
+    return _ENABLED
+
+
+def span(name: str, **attrs: Any) -> Union[Span, _NullSpan]:
+    """
+    Gets a context manager that times the enclosed block.
+
+    Args:
+        name (str): Span name, by convention ``<module>.<phase>``.
+        attrs (Any): Extra values to record with the span.
+
+    Returns:
+        Span: Span when recording is enabled; Otherwise, a no-op context manager.
+    """
+    if not _ENABLED:
+        return _NULL_SPAN
+    return Span(name, attrs)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Decorator that records a span for each call of the decorated function.
+
+    Args:
+        name (str): Span name.
+    """
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _ENABLED:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def get_spans() -> List[Span]:
+    """Gets recorded top level spans."""
+    with _LOCK:
+        return list(_ROOTS)
+
+
+def reset() -> None:
+    """Discards all recorded spans."""
+    with _LOCK:
+        _ROOTS.clear()
+    _LOCAL.stack = []
+
+
+def render_tree(spans: Union[List[Span], None] = None) -> str:
+    """
+    Renders spans as an indented tree.
+
+    Args:
+        spans (List[Span], optional): Spans to render. Defaults to :py:func:`get_spans`.
+
+    Returns:
+        str: tree, one span per line.
+    """
+    lines = []
+
+    def add(s: Span, depth: int) -> None:
+        attrs = " ".join(f"{k}={v}" for k, v in s.attrs.items())
+        lines.append(f"{'  ' * depth}{s.name} {s.elapsed * 1000:.3f} ms{' ' + attrs if attrs else ''}")
+        for child in s.children:
+            add(child, depth + 1)
+
+    for s in get_spans() if spans is None else spans:
+        add(s, 0)
+    return "\n".join(lines)
+
+
+def to_json(spans: Union[List[Span], None] = None) -> str:
+    """
+    Gets spans as JSON.
+
+    Args:
+        spans (List[Span], optional): Spans to convert. Defaults to :py:func:`get_spans`.
+
+    Returns:
+        str: JSON object with a ``spans`` list.
+    """
+    import json
+
+    data = [s.to_dict() for s in (get_spans() if spans is None else spans)]
+    return json.dumps({"spans": data}, indent=2)
@@ -6,8 +6,11 @@ import sys
 import shutil
 import __main__
 from pathlib import Path
-from typing import overload
+from typing import Callable, Tuple, overload
 from .sys_info import SysInfo
+from .disk_cache import DiskCache
+from .resolver import get_resolver
+from . import timings
 
 # do not import from type_var here.
 # this module is used by uno_lnk.py and type_var imports uno
@@ -17,11 +20,23 @@ from .sys_info import SysInfo
 #   https://ask.libreoffice.org/t/where-is-the-python-executable-embedded-in-libreoffice-on-macos/50042
 
 
-PLATFORM = SysInfo.get_platform()
-if PLATFORM == SysInfo.PlatformEnum.WINDOWS:
-    import winreg
+_PLATFORM = None
+_DISCOVERY_CACHE = DiskCache("discovery")
+
+
+def _get_platform() -> SysInfo.PlatformEnum:
+    global _PLATFORM
+    if _PLATFORM is None:
+        _PLATFORM = SysInfo.get_platform()
+    return _PLATFORM
 
-_INSTALL_PATH = None
+
+def __getattr__(name: str):
+    # PLATFORM used to be computed when this module was imported.
+    # It is now resolved on first use.
+    if name == "PLATFORM":
+        return _get_platform()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_soffice_install_path() -> Path:
@@ -36,34 +51,78 @@ def get_soffice_install_path() -> Path:
 
     Note:
         If `OOOENV_LO_PROGRAM_PATH` is set in the environment, then that path is returned.
+
+        Results are memoized by :py:mod:`oooenv.utils.resolver` and kept in the on disk discovery cache.
+        See :py:mod:`oooenv.utils.disk_cache`.
     """
-    # sourcery skip: assign-if-exp, extract-duplicate-method, extract-method, hoist-statement-from-if, inline-immediately-returned-variable, low-code-quality
-    global _INSTALL_PATH
     if install_pth := os.environ.get("OOOENV_LO_PROGRAM_PATH", ""):
         # supersede all other methods
         return Path(install_pth)
 
-    if _INSTALL_PATH is not None:
-        return _INSTALL_PATH
-    if PLATFORM == SysInfo.PlatformEnum.WINDOWS:
+    if _get_platform() == SysInfo.PlatformEnum.MAC:
+        return Path("/Applications/LibreOffice.app/Contents/MacOS")
+    return get_resolver().get("install_path", lambda: _cached_discovery("install_path", _probe_soffice_install_path))
+
+
+def clear_cache() -> None:
+    """
+    Forgets discovered paths, in memory and in the on disk discovery cache.
+
+    Paths that were not found are cached too, see ``OOOENV_CACHE_MISS_TTL``. Clear the cache to look for
+    a LibreOffice installed since.
+    """
+    get_resolver().clear()
+    _DISCOVERY_CACHE.clear()
+
+
+def _get_discovery_fingerprint() -> str:
+    # shutil.which results depend on PATH
+    return os.environ.get("PATH", "")
+
+
+def _cached_discovery(key: str, probe: Callable[[], Tuple[Path, Tuple[Path, ...]]]) -> Path:
+    """
+    Gets a discovered path from the discovery cache or runs ``probe`` and caches the result.
+
+    Args:
+        key (str): cache key.
+        probe (Callable[[], Tuple[Path, Tuple[Path, ...]]]): Returns the found path and the paths it depends on.
+
+    Raises:
+        FileNotFoundError: if path was not found now or recently.
+
+    Returns:
+        Path: found path.
+    """
+    with timings.span(f"uno_paths.discover.{key}") as sp:
+        fingerprint = _get_discovery_fingerprint()
+        with timings.span("disk_cache.lookup"):
+            entry = _DISCOVERY_CACHE.get(key, fingerprint=fingerprint)
+        if entry:
+            if timings.is_enabled():
+                sp.attrs["cached"] = True
+            if entry.missing:
+                raise FileNotFoundError(entry.value)
+            return Path(entry.value)
+        try:
+            result, depends = probe()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError) as e:
+            _DISCOVERY_CACHE.put_missing(key, str(e), fingerprint=fingerprint)
+            raise
+        with timings.span("disk_cache.store"):
+            _DISCOVERY_CACHE.put(key, str(result), depends=depends, fingerprint=fingerprint)
+        return result
+
+
+def _probe_soffice_install_path() -> Tuple[Path, Tuple[Path, ...]]:
+    # sourcery skip: extract-duplicate-method, extract-method, hoist-statement-from-if, low-code-quality
+    if _get_platform() == SysInfo.PlatformEnum.WINDOWS:
         # get the path location from Registry
-        value = ""
-        for _key in (
-            # LibreOffice 3.4.5,6,7 on Windows
-            "SOFTWARE\\LibreOffice\\UNO\\InstallPath",
-            # OpenOffice 3.3
-            "SOFTWARE\\OpenOffice.org\\UNO\\InstallPath",
-        ):
-            try:
-                value = winreg.QueryValue(winreg.HKEY_LOCAL_MACHINE, _key)  # type: ignore
-            except Exception as detail:
-                value = ""
-                # _errMess = "%s" % detail
-            else:
-                break  # first existing key will do
+        with timings.span("uno_paths.registry"):
+            value = _read_registry_install_path()
         if value != "":
-            _INSTALL_PATH = Path("\\".join(value.split("\\")[:-1]))  # drop the program
-            return _INSTALL_PATH
+            p_install = Path("\\".join(value.split("\\")[:-1]))  # drop the program
+            return p_install, (p_install / "program",)
 
         # failed to get path from Registry. Going Manual
         soffice = "soffice.exe"
@@ -82,37 +141,45 @@ def get_soffice_install_path() -> Path:
             raise IsADirectoryError(f"LibreOffice '{p_sf}' is not a file.")
         # drop \program\soffice.exe
         # expect C:\Program Files\LibreOffice
-        _INSTALL_PATH = p_sf.parent.parent
-        return _INSTALL_PATH
-
-    elif PLATFORM == SysInfo.PlatformEnum.MAC:
-        _INSTALL_PATH = Path("/Applications/LibreOffice.app/Contents/MacOS")
-        return _INSTALL_PATH
-    else:
-        # unix
-        soffice = "soffice"
-        # search system path
+        return p_sf.parent.parent, (p_sf, p_sf.parent)
+
+    # unix
+    soffice = "soffice"
+    # search system path
+    with timings.span("uno_paths.which"):
         s = shutil.which(soffice)
-        p_sf = None
-        if s is not None:
-            # expect '/usr/bin/soffice'
-            if os.path.islink(s):
-                p_sf = Path(os.path.realpath(s)).parent
-            else:
-                p_sf = Path(s).parent
-        if p_sf is None:
-            s = "/usr/bin/soffice"
-            if os.path.islink(s):
-                p_sf = Path(os.path.realpath(s)).parent
-            else:
-                p_sf = Path(s).parent
-        if not p_sf.exists():
-            raise FileNotFoundError(f"LibreOffice '{p_sf}' not found.")
-        if not p_sf.is_file():
-            raise IsADirectoryError(f"LibreOffice '{p_sf}' is not a file.")
-        # drop /program/soffice
-        _INSTALL_PATH = p_sf.parent.parent
-        return _INSTALL_PATH
+    if s is None:
+        s = "/usr/bin/soffice"
+    # expect '/usr/bin/soffice'
+    with timings.span("uno_paths.realpath"):
+        p_sf = Path(os.path.realpath(s)) if os.path.islink(s) else Path(s)
+    if not p_sf.exists():
+        raise FileNotFoundError(f"LibreOffice '{p_sf}' not found.")
+    if not p_sf.is_file():
+        raise IsADirectoryError(f"LibreOffice '{p_sf}' is not a file.")
+    # drop /program/soffice
+    return p_sf.parent.parent, (Path(s), p_sf.parent)
+
+
+def _read_registry_install_path() -> str:
+    """Gets LibreOffice ``program`` path from the Windows registry. Empty string if not found."""
+    import winreg
+
+    value = ""
+    for _key in (
+        # LibreOffice 3.4.5,6,7 on Windows
+        "SOFTWARE\\LibreOffice\\UNO\\InstallPath",
+        # OpenOffice 3.3
+        "SOFTWARE\\OpenOffice.org\\UNO\\InstallPath",
+    ):
+        try:
+            value = winreg.QueryValue(winreg.HKEY_LOCAL_MACHINE, _key)  # type: ignore
+        except Exception as detail:
+            value = ""
+            # _errMess = "%s" % detail
+        else:
+            break  # first existing key will do
+    return value
 
 
 def get_soffice_path() -> Path:
@@ -122,7 +189,7 @@ def get_soffice_path() -> Path:
     Returns:
         Path: path to soffice
     """
-    if PLATFORM == SysInfo.PlatformEnum.WINDOWS:
+    if _get_platform() == SysInfo.PlatformEnum.WINDOWS:
         return Path(get_lo_path(), "soffice.exe")
     return Path(get_lo_path(), "soffice")
 
@@ -133,8 +200,11 @@ def _get_soffice_which_path() -> Path | None:
 
     Usually something like ``/usr/lib/libreoffice/program/soffice``
     """
-    if link_path := shutil.which("soffice"):
-        relative_path = os.path.realpath(link_path)
+    with timings.span("uno_paths.which"):
+        link_path = shutil.which("soffice")
+    if link_path:
+        with timings.span("uno_paths.realpath"):
+            relative_path = os.path.realpath(link_path)
         if os.path.isabs(relative_path):
             return Path(relative_path)
         else:
@@ -164,7 +234,13 @@ def get_uno_path() -> Path:
         # special environment variable, no arguments just return it
         return Path(env_path)
 
-    if PLATFORM == SysInfo.PlatformEnum.WINDOWS:
+    if _get_platform() == SysInfo.PlatformEnum.MAC:
+        return Path("/Applications/LibreOffice.app/Contents/MacOS/soffice")
+    return get_resolver().get("uno_path", lambda: _cached_discovery("uno_path", _probe_uno_path))
+
+
+def _probe_uno_path() -> Tuple[Path, Tuple[Path, ...]]:
+    if _get_platform() == SysInfo.PlatformEnum.WINDOWS:
         p_uno = Path(os.environ["PROGRAMFILES"], "LibreOffice", "program")
         if not p_uno.exists() or not p_uno.is_dir():
             p_uno = Path(os.environ["PROGRAMFILES(X86)"], "LibreOffice", "program")
@@ -172,23 +248,25 @@ def get_uno_path() -> Path:
             raise FileNotFoundError("Uno Source Dir not found.")
         if not p_uno.is_dir():
             raise NotADirectoryError("UNO source is not a Directory")
-        return p_uno
-    elif PLATFORM == SysInfo.PlatformEnum.MAC:
-        return Path("/Applications/LibreOffice.app/Contents/MacOS/soffice")
-    else:
-        check_paths = ("/usr/lib/python3/dist-packages", "/usr/lib/libreoffice/program", "/opt/libreoffice/program")
-        p_uno = None
+        return p_uno, (p_uno, p_uno / "uno.py")
+
+    check_paths = ("/usr/lib/python3/dist-packages", "/usr/lib/libreoffice/program", "/opt/libreoffice/program")
+    # a candidate that appears later in check_paths must invalidate the cache
+    # so the uno.py of each candidate checked is also a dependency.
+    depends = []
+    with timings.span("uno_paths.check_paths"):
         for pth in check_paths:
             p_uno = Path(pth)
+            depends.append(p_uno / "uno.py")
             if p_uno.exists() and p_uno.is_dir() and (p_uno / "uno.py").exists():
-                return p_uno
-        # not found yet.
-        # try using shutil.which to extract the path from the link.
-        if which_path := _get_soffice_which_path():
-            # '/usr/lib/libreoffice/program/soffice'
-            p_uno = which_path.parent
-            if p_uno.exists() and p_uno.is_dir() and (p_uno / "uno.py").exists():
-                return p_uno
+                return p_uno, (p_uno, *depends)
+    # not found yet.
+    # try using shutil.which to extract the path from the link.
+    if which_path := _get_soffice_which_path():
+        # '/usr/lib/libreoffice/program/soffice'
+        p_uno = which_path.parent
+        if p_uno.exists() and p_uno.is_dir() and (p_uno / "uno.py").exists():
+            return p_uno, (which_path, p_uno, p_uno / "uno.py", *depends)
 
     raise FileNotFoundError("Uno Source Dir not found.")
 
@@ -216,33 +294,38 @@ def get_lo_path() -> Path:
         # special environment variable, no arguments just return it
         return Path(lo_path)
 
-    if PLATFORM == SysInfo.PlatformEnum.WINDOWS:
+    if _get_platform() == SysInfo.PlatformEnum.WINDOWS:
         return Path(get_soffice_install_path(), "program")
 
-    elif PLATFORM == SysInfo.PlatformEnum.MAC:
+    elif _get_platform() == SysInfo.PlatformEnum.MAC:
         return Path("/Applications/LibreOffice.app/Contents/MacOS")
-    else:
-        # search system path
-        s = shutil.which("soffice")
-        p_sf = None
-        if s is not None:
-            # expect '/usr/bin/soffice'
-            if os.path.islink(s):
-                # follow link
-                p_sf = Path(os.path.realpath(s)).parent
-            else:
-                p_sf = Path(s).parent
-        if p_sf is None:
-            p_sf = Path("/usr/bin/soffice")
-            if not p_sf.exists() or not p_sf.is_file():
-                raise FileNotFoundError("LibreOffice Source Dir not found.")
-            p_sf = p_sf.parent
+    return get_resolver().get("lo_path", lambda: _cached_discovery("lo_path", _probe_lo_path))
 
-        if not p_sf.exists():
+
+def _probe_lo_path() -> Tuple[Path, Tuple[Path, ...]]:
+    # search system path
+    with timings.span("uno_paths.which"):
+        s = shutil.which("soffice")
+    p_sf = None
+    if s is not None:
+        # expect '/usr/bin/soffice'
+        if os.path.islink(s):
+            # follow link
+            p_sf = Path(os.path.realpath(s)).parent
+        else:
+            p_sf = Path(s).parent
+    if p_sf is None:
+        s = "/usr/bin/soffice"
+        p_sf = Path(s)
+        if not p_sf.exists() or not p_sf.is_file():
             raise FileNotFoundError("LibreOffice Source Dir not found.")
-        if not p_sf.is_dir():
-            raise NotADirectoryError("LibreOffice source is not a Directory")
-        return p_sf
+        p_sf = p_sf.parent
+
+    if not p_sf.exists():
+        raise FileNotFoundError("LibreOffice Source Dir not found.")
+    if not p_sf.is_dir():
+        raise NotADirectoryError("LibreOffice source is not a Directory")
+    return p_sf, (Path(s), p_sf)
 
 
 def get_lo_python_ex() -> str:
@@ -268,7 +351,7 @@ def get_lo_python_ex() -> str:
     """
     if env_path := os.environ.get("OOOENV_LO_PY_EXE", ""):
         return env_path
-    if PLATFORM != SysInfo.PlatformEnum.WINDOWS:
+    if _get_platform() != SysInfo.PlatformEnum.WINDOWS:
         return sys.executable
     p = Path(get_lo_path(), "python.exe")
 
@@ -0,0 +1,274 @@
+"""
+Advisory locking of a virtual environment across processes.
+
+Operations that change a virtual environment, such as switching ``pyvenv.cfg`` or adding links, hold an exclusive
+lock. Operations that only read it hold a shared lock, so they still run in parallel with each other.
+The lock is ``.oooenv.lock`` in the virtual environment, locked with ``flock``. Where ``flock`` is not available,
+such as on Windows or some network file systems, a lock file ``.oooenv.lock.pid`` is created exclusively instead;
+shared locks are then exclusive too.
+
+Locks are reentrant per thread. A thread holding the exclusive lock may take the shared lock, the other way round
+raises :py:class:`RuntimeError`. A virtual environment that can not be written, such as a read only mount,
+or that does not exist is not locked.
+
+Example:
+    .. code-block:: python
+
+        from oooenv.utils import venv_lock
+
+        with venv_lock.exclusive("/home/me/project/.venv"):
+            ...
+"""
+from __future__ import annotations
+import os
+import time
+import errno
+import threading
+from contextlib import contextmanager
+from typing import ContextManager, Dict, Iterator, Union
+
+LOCK_NAME = ".oooenv.lock"
+"""Name of the lock file in the virtual environment."""
+STALE_AGE = 600.0
+"""Seconds after which a fallback lock file of a process that can not be checked is treated as abandoned."""
+
+_POLL_MIN = 0.002
+_POLL_MAX = 0.05
+# the file system can not lock, fall back to a lock file.
+_NO_FLOCK_ERRNOS = (errno.ENOLCK, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL)
+# the virtual environment can not be written or does not exist, it is not locked.
+_NO_LOCK_ERRNOS = (errno.EACCES, errno.EPERM, errno.EROFS, errno.ENOENT, errno.ENOTDIR)
+
+try:
+    import fcntl
+
+    _BACKEND = "flock"
+except ImportError:  # pragma: no cover - Windows
+    _BACKEND = "lockfile"
+
+_STATES_LOCK = threading.Lock()
+_STATES: Dict[str, _State] = {}
+
+
+class VenvLockTimeout(TimeoutError):
+    """The lock of a virtual environment was not acquired in time."""
+
+
+class _State:
+    """Lock of one virtual environment in this process."""
+
+    __slots__ = ("cond", "mode", "owners", "fd", "lock_file")
+
+    def __init__(self) -> None:
+        self.cond = threading.Condition()
+        self.mode = ""
+        """``shared``, ``exclusive``, ``acquiring`` while a thread waits for the OS lock, or empty when not held."""
+        self.owners: Dict[int, int] = {}
+        """Thread ident -> depth."""
+        self.fd: Union[int, None] = None
+        self.lock_file = ""
+        """Fallback lock file that is held."""
+
+
+def get_timeout() -> float:
+    """
+    Gets the default seconds to wait for a lock.
+
+    Returns:
+        float: Value of ``OOOENV_LOCK_TIMEOUT`` environment variable; Otherwise, ``30``.
+    """
+    try:
+        return float(os.environ.get("OOOENV_LOCK_TIMEOUT", ""))
+    except ValueError:
+        return 30.0
+
+
+def get_lock_file(venv: Union[str, os.PathLike]) -> str:
+    """Gets the lock file of a virtual environment."""
+    return os.path.join(os.path.abspath(venv), LOCK_NAME)
+
+
+def _get_state(path: str) -> _State:
+    with _STATES_LOCK:
+        state = _STATES.get(path, None)
+        if state is None:
+            state = _STATES[path] = _State()
+        return state
+
+
+@contextmanager
+def lock(venv: Union[str, os.PathLike], exclusive: bool = True, timeout: Union[float, None] = None) -> Iterator[None]:
+    """
+    Holds the lock of a virtual environment.
+
+    Args:
+        venv (str | PathLike): Virtual environment.
+        exclusive (bool, optional): Exclusive lock for changes, shared lock for reads. Defaults to ``True``.
+        timeout (float, optional): Seconds to wait. Defaults to :py:func:`get_timeout`.
+
+    Raises:
+        VenvLockTimeout: If the lock was not acquired in time.
+        RuntimeError: If the thread holds the shared lock and asks for the exclusive one.
+    """
+    path = get_lock_file(venv)
+    state = _get_state(path)
+    _acquire(state, path, exclusive, get_timeout() if timeout is None else timeout)
+    try:
+        yield
+    finally:
+        _release(state)
+
+
+def exclusive(venv: Union[str, os.PathLike], timeout: Union[float, None] = None) -> ContextManager[None]:
+    """Holds the exclusive lock of a virtual environment. See :py:func:`lock`."""
+    return lock(venv, exclusive=True, timeout=timeout)
+
+
+def shared(venv: Union[str, os.PathLike], timeout: Union[float, None] = None) -> ContextManager[None]:
+    """Holds the shared lock of a virtual environment. See :py:func:`lock`."""
+    return lock(venv, exclusive=False, timeout=timeout)
+
+
+def _acquire(state: _State, path: str, exclusive: bool, timeout: float) -> None:
+    me = threading.get_ident()
+    deadline = time.monotonic() + timeout
+    with state.cond:
+        if me in state.owners:
+            if exclusive and state.mode == "shared":
+                raise RuntimeError(f"Shared lock of {path} is held, it can not be made exclusive")
+            state.owners[me] += 1
+            return
+        # threads of this process share the lock the process holds.
+        while state.mode:
+            if state.mode == "shared" and not exclusive:
+                state.owners[me] = 1
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise VenvLockTimeout(f"Timed out after {timeout:g} seconds waiting for {path}")
+            state.cond.wait(remaining)
+        # other threads wait on the condition, not on this thread polling the OS lock.
+        state.mode = "acquiring"
+    try:
+        _lock_os(state, path, exclusive, deadline, timeout)
+    except BaseException:
+        with state.cond:
+            state.mode = ""
+            state.cond.notify_all()
+        raise
+    with state.cond:
+        state.mode = "exclusive" if exclusive else "shared"
+        state.owners[me] = 1
+        state.cond.notify_all()
+
+
+def _release(state: _State) -> None:
+    me = threading.get_ident()
+    with state.cond:
+        state.owners[me] -= 1
+        if state.owners[me]:
+            return
+        del state.owners[me]
+        if state.owners:
+            return
+        _unlock_os(state)
+        state.mode = ""
+        state.cond.notify_all()
+
+
+def _wait(deadline: float, delay: float, path: str, timeout: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise VenvLockTimeout(f"Timed out after {timeout:g} seconds waiting for {path}")
+    time.sleep(min(delay, remaining))
+    return min(delay * 2, _POLL_MAX)
+
+
+# region OS locks
+def _lock_os(state: _State, path: str, exclusive: bool, deadline: float, timeout: float) -> None:
+    if _BACKEND == "flock":
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError as e:
+            if e.errno in _NO_LOCK_ERRNOS:
+                return
+            raise
+        op = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB
+        delay = _POLL_MIN
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, op)
+                    state.fd = fd
+                    return
+                except BlockingIOError:
+                    delay = _wait(deadline, delay, path, timeout)
+        except OSError as e:
+            os.close(fd)
+            if e.errno not in _NO_FLOCK_ERRNOS:
+                raise
+        except BaseException:
+            os.close(fd)
+            raise
+    _lock_file(state, f"{path}.pid", deadline, timeout)
+
+
+def _lock_file(state: _State, lock_file: str, deadline: float, timeout: float) -> None:
+    delay = _POLL_MIN
+    while True:
+        try:
+            fd = os.open(lock_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            if _is_stale(lock_file):
+                try:
+                    os.remove(lock_file)
+                except FileNotFoundError:
+                    pass
+                continue
+            delay = _wait(deadline, delay, lock_file, timeout)
+            continue
+        except OSError as e:
+            if e.errno in _NO_LOCK_ERRNOS:
+                return
+            raise
+        try:
+            os.write(fd, str(os.getpid()).encode("ascii"))
+        finally:
+            os.close(fd)
+        state.lock_file = lock_file
+        return
+
+
+def _is_stale(lock_file: str) -> bool:
+    try:
+        with open(lock_file, "r") as file:
+            pid = int(file.read().strip() or "0")
+        age = time.time() - os.stat(lock_file).st_mtime
+    except (OSError, ValueError):
+        # being written or just removed, look again.
+        return False
+    if pid > 0 and os.name != "nt":
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass
+        return False
+    return age > STALE_AGE
+
+
+def _unlock_os(state: _State) -> None:
+    if state.fd is not None:
+        # closing the file releases the flock.
+        os.close(state.fd)
+        state.fd = None
+    if state.lock_file:
+        try:
+            os.remove(state.lock_file)
+        except FileNotFoundError:
+            pass
+        state.lock_file = ""
+
+
+# endregion OS locks
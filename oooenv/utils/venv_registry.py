@@ -0,0 +1,80 @@
+"""
+Virtual environments registered for ``oooenv watch``.
+
+The registry is a text file with one virtual environment path per line.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Tuple, Union
+from . import local_paths
+
+
+def get_registry_file() -> Path:
+    """
+    Gets the registry file.
+
+    Returns:
+        Path: ``OOOENV_WATCH_FILE`` if set; Otherwise, ``watched_venvs.txt`` in
+        :py:func:`~oooenv.utils.local_paths.get_cache_dir`.
+    """
+    if fnm := os.environ.get("OOOENV_WATCH_FILE", ""):
+        return Path(fnm)
+    return local_paths.get_cache_dir() / "watched_venvs.txt"
+
+
+def load() -> Tuple[Path, ...]:
+    """
+    Gets the registered virtual environments.
+
+    Returns:
+        Tuple[Path, ...]: Virtual environments in the order they were added.
+    """
+    try:
+        with open(get_registry_file(), "r") as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        return ()
+    return tuple(Path(line.strip()) for line in lines if line.strip())
+
+
+def _save(venvs: Tuple[Path, ...]) -> None:
+    fnm = get_registry_file()
+    fnm.parent.mkdir(parents=True, exist_ok=True)
+    local_paths.write_text_atomic(fnm, "".join(f"{v}\n" for v in venvs))
+
+
+def add(venv: Union[str, os.PathLike]) -> bool:
+    """
+    Registers a virtual environment.
+
+    Args:
+        venv (str | PathLike): Virtual environment. Stored as an absolute path.
+
+    Returns:
+        bool: ``False`` if it was already registered.
+    """
+    pth = Path(os.path.abspath(venv))
+    venvs = load()
+    if pth in venvs:
+        return False
+    _save(venvs + (pth,))
+    return True
+
+
+def remove(venv: Union[str, os.PathLike]) -> bool:
+    """
+    Unregisters a virtual environment.
+
+    Args:
+        venv (str | PathLike): Virtual environment.
+
+    Returns:
+        bool: ``False`` if it was not registered.
+    """
+    pth = Path(os.path.abspath(venv))
+    venvs = load()
+    if pth not in venvs:
+        return False
+    _save(tuple(v for v in venvs if v != pth))
+    return True
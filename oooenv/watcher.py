@@ -0,0 +1,509 @@
+"""
+Repairs registered virtual environments when LibreOffice is upgraded.
+
+``oooenv watch`` watches the LibreOffice install, ``program`` and ``uno.py`` directories and the directory
+the install is in. It uses inotify on Linux, so it blocks in the kernel and costs nothing while idle.
+On other platforms, or when inotify is not available, the directories are polled with ``stat``.
+
+While LibreOffice is not found, the directories an install would appear in are watched instead and
+discovery runs again on changes there, and every ``resolve_interval`` seconds.
+
+An upgrade changes many files in a burst. Repairs start once no change was seen for ``debounce`` seconds.
+Every virtual environment in :py:mod:`oooenv.utils.venv_registry` then gets its LibreOffice cfg profiles
+updated (``oooenv update --all-profiles``) and its links refreshed with the settings it was linked with,
+see :py:mod:`oooenv.utils.link_settings`. Links are not added to a virtual environment that has none.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import re
+import errno
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple, Union
+
+from . import uno_finder
+from .cmds import uno_lnk
+from .session import OooEnv
+from .utils import link_manifest
+from .utils import link_settings
+from .utils import lo_registry
+from .utils import output
+from .utils import uno_paths
+from .utils import venv_registry
+from .utils.resolver import get_resolver
+
+DEFAULT_DEBOUNCE = 2.0
+"""Seconds without changes before repairs start."""
+DEFAULT_MAX_DELAY = 60.0
+"""Seconds after the first change repairs start even if changes keep coming."""
+DEFAULT_INTERVAL = 5.0
+"""Seconds between polls of :py:class:`PollingBackend`."""
+DEFAULT_RESOLVE_INTERVAL = 60.0
+"""Seconds between discoveries while LibreOffice is not found."""
+
+# linux/inotify.h
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+_RE_GLOB = re.compile(r"[*?[]")
+# (directory inode and mtime, matching entries or None when every name counts)
+_PollState = Tuple[Tuple[int, int], Union[List[Tuple[str, int, int]], None]]
+
+
+class WatchTarget(NamedTuple):
+    path: Path
+    """Directory to watch."""
+    prefixes: Tuple[str, ...] = ()
+    """Only names starting with one of these count, compared lower case. Empty for every name."""
+
+    def matches(self, name: str) -> bool:
+        """Gets if a change to ``name`` in :py:attr:`path` counts."""
+        return not self.prefixes or not name or name.lower().startswith(self.prefixes)
+
+
+class Repair(NamedTuple):
+    venv: Path
+    messages: Tuple[str, ...] = ()
+    error: str = ""
+    elapsed: float = 0.0
+    """Seconds the repair took."""
+
+
+def get_watch_targets() -> Tuple[WatchTarget, ...]:
+    """
+    Gets the directories of the discovered LibreOffice to watch.
+
+    The directory the install is in is only watched for names like the install, so an upgrade that
+    replaces ``/opt/libreoffice7.6`` with ``/opt/libreoffice24.2`` is seen without reacting to unrelated changes.
+
+    Returns:
+        Tuple[WatchTarget, ...]: Targets. Empty if LibreOffice is not found.
+    """
+    targets: Dict[Path, WatchTarget] = {}
+    for get in (uno_paths.get_lo_path, uno_paths.get_uno_path):
+        try:
+            pth = get()
+        except Exception:
+            continue
+        targets.setdefault(pth, WatchTarget(pth))
+    try:
+        install = uno_paths.get_soffice_install_path()
+    except Exception:
+        return tuple(targets.values())
+    targets.setdefault(install, WatchTarget(install))
+    prefixes = tuple({install.name.lower(), "libreoffice"})
+    targets.setdefault(install.parent, WatchTarget(install.parent, prefixes))
+    return tuple(targets.values())
+
+
+def get_candidate_targets() -> Tuple[WatchTarget, ...]:
+    """
+    Gets the directories to watch while LibreOffice is not found.
+
+    These are the nearest existing parents of the install locations :py:mod:`oooenv.utils.lo_registry` searches,
+    watched for the name below them, and the ``PATH`` directories, watched for ``soffice``.
+
+    Returns:
+        Tuple[WatchTarget, ...]: Targets.
+    """
+    prefixes: Dict[Path, List[str]] = {}
+    for pattern in lo_registry._get_patterns():
+        child = Path(pattern)
+        parent = child.parent
+        while not parent.is_dir() and parent != parent.parent:
+            child, parent = parent, parent.parent
+        # /opt/libreoffice* is watched as /opt for names starting with libreoffice.
+        prefixes.setdefault(parent, []).append(_RE_GLOB.split(child.name, 1)[0].lower())
+    for dir_name in os.environ.get("PATH", "").split(os.pathsep):
+        if dir_name and os.path.isdir(dir_name):
+            prefixes.setdefault(Path(dir_name), []).append("soffice")
+    return tuple(WatchTarget(pth, tuple(dict.fromkeys(names))) for pth, names in prefixes.items())
+
+
+# region Backends
+class InotifyBackend:
+    """Waits for inotify events. Linux only."""
+
+    def __init__(self) -> None:
+        """
+        Constructor
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+        import ctypes
+
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._wake_r, self._wake_w = os.pipe()
+        self._watches: Dict[int, WatchTarget] = {}
+
+    def set_targets(self, targets: Iterable[WatchTarget]) -> None:
+        """Watches ``targets`` instead of the current ones. Directories that do not exist are skipped."""
+        for wd in list(self._watches):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._watches.clear()
+        for target in targets:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(target.path), _WATCH_MASK | _IN_ONLYDIR)
+            if wd >= 0:
+                self._watches[wd] = target
+
+    def wait(self, timeout: Union[float, None] = None) -> List[Path]:
+        """
+        Waits for changes.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to waiting until a change or :py:meth:`wake`.
+
+        Returns:
+            List[Path]: Changed paths. Empty on timeout or wake.
+        """
+        ready, _, _ = select.select([self._fd, self._wake_r], [], [], timeout)
+        if self._wake_r in ready:
+            os.read(self._wake_r, 512)
+        if self._fd not in ready:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    changed.extend(t.path for t in self._watches.values())
+                    continue
+                target = self._watches.get(wd, None)
+                # IN_IGNORED follows IN_DELETE_SELF, which was already seen.
+                if target is None or mask & _IN_IGNORED:
+                    continue
+                if target.matches(name):
+                    changed.append(target.path / name if name else target.path)
+        return changed
+
+    def wake(self) -> None:
+        """Makes a waiting :py:meth:`wait` return. Safe to call from another thread."""
+        os.write(self._wake_w, b"\0")
+
+    def close(self) -> None:
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
+
+
+class PollingBackend:
+    """Polls directories with ``stat``. Used where inotify is not available."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        self._targets: Tuple[WatchTarget, ...] = ()
+        self._snapshot: Dict[Path, Union[_PollState, None]] = {}
+        self._wake = threading.Event()
+
+    def _stat(self, target: WatchTarget, previous: Union[_PollState, None] = None) -> Union[_PollState, None]:
+        try:
+            st = os.stat(target.path)
+        except OSError:
+            return None
+        dir_sig = (st.st_ino, st.st_mtime_ns)
+        if not target.prefixes:
+            return (dir_sig, None)
+        if previous is not None and previous[0] == dir_sig:
+            return previous
+        # only matching entries count, the parent of an install changes for other reasons too.
+        try:
+            with os.scandir(target.path) as it:
+                entries = [e for e in it if target.matches(e.name)]
+            return (dir_sig, sorted((e.name, e.inode(), e.stat(follow_symlinks=False).st_mtime_ns) for e in entries))
+        except OSError:
+            return None
+
+    def set_targets(self, targets: Iterable[WatchTarget]) -> None:
+        self._targets = tuple(targets)
+        self._snapshot = {t.path: self._stat(t) for t in self._targets}
+
+    def wait(self, timeout: Union[float, None] = None) -> List[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            if self._wake.wait(delay):
+                self._wake.clear()
+                return []
+            changed = []
+            for target in self._targets:
+                previous = self._snapshot.get(target.path, None)
+                current = self._stat(target, previous)
+                self._snapshot[target.path] = current
+                if previous is None or current is None:
+                    is_changed = previous is not current
+                elif target.prefixes:
+                    is_changed = previous[1] != current[1]
+                else:
+                    is_changed = previous[0] != current[0]
+                if is_changed:
+                    changed.append(target.path)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def close(self) -> None:
+        pass
+
+
+def get_backend(poll: bool = False, interval: float = DEFAULT_INTERVAL) -> Union[InotifyBackend, PollingBackend]:
+    """
+    Gets the inotify backend, or the polling backend when inotify is not available or ``poll`` is set.
+    """
+    if not poll:
+        try:
+            return InotifyBackend()
+        except OSError:
+            pass
+    return PollingBackend(interval)
+
+
+# endregion Backends
+
+
+# region Repair
+def repair_venv(venv: Union[str, os.PathLike]) -> Repair:
+    """
+    Brings a virtual environment in line with the current LibreOffice.
+
+    LibreOffice cfg profiles are updated and links, or the import finder, are refreshed with the recorded
+    link settings. Virtual environments linked before settings were recorded keep the strategy their files show.
+
+    Args:
+        venv (str | PathLike): Virtual environment.
+
+    Returns:
+        Repair: What was done. Errors are returned, not raised.
+    """
+    pth = Path(venv)
+    start = time.perf_counter()
+    try:
+        env = OooEnv(venv_path=pth)
+        messages: List[str] = []
+        if env.find_profiles():
+            result = env.update_all()
+            if result.updated or result.reactivated:
+                messages.extend(result.messages)
+        site_dir = env.site_packages
+        if site_dir is not None:
+            settings = link_settings.load(pth)
+            manifest = settings.manifest if settings is not None and settings.manifest else None
+            pyc = settings.pyc if settings is not None else ""
+            names = [e.name for e in link_manifest.load_manifest(manifest)]
+            owned = settings.files if settings is not None else ()
+            linked = uno_lnk.find_owned(site_dir, names, owned=owned)
+            if (site_dir / uno_finder.PTH_NAME).exists():
+                link = env.link(manifest=manifest, mode="finder", pyc=pyc)
+            elif linked:
+                strategy = (
+                    settings.strategy if settings is not None else link_settings.infer_strategy(site_dir, linked)
+                )
+                link = env.link(strategy=strategy, manifest=manifest, pyc=pyc)
+            else:
+                link = None
+            if link is not None and any(f.action != "exists" for f in link.files):
+                messages.extend(link.messages)
+        return Repair(venv=pth, messages=tuple(messages), elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return Repair(venv=pth, error=str(e) or type(e).__name__, elapsed=time.perf_counter() - start)
+
+
+def repair_all(
+    venvs: Union[Sequence[Union[str, os.PathLike]], None] = None,
+    on_repair: Union[Callable[[Repair], None], None] = None,
+) -> Tuple[Repair, ...]:
+    """
+    Repairs virtual environments against freshly discovered LibreOffice paths.
+
+    Args:
+        venvs (Sequence[str | PathLike], optional): Virtual environments. Defaults to the registered ones.
+        on_repair (Callable[[Repair], None], optional): Called with each repair as soon as it is done.
+
+    Returns:
+        Tuple[Repair, ...]: One result per virtual environment.
+    """
+    get_resolver().clear()
+    if venvs is None:
+        venvs = venv_registry.load()
+    repairs = []
+    for venv in venvs:
+        repair = repair_venv(venv)
+        repairs.append(repair)
+        if on_repair is not None:
+            on_repair(repair)
+    return tuple(repairs)
+
+
+# endregion Repair
+
+
+def watch(
+    backend: Union[InotifyBackend, PollingBackend, None] = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    on_repair: Union[Callable[[List[Path], Tuple[Repair, ...]], None], None] = None,
+    stop: Union[threading.Event, None] = None,
+    on_ready: Union[Callable[[Tuple[WatchTarget, ...]], None], None] = None,
+    on_change: Union[Callable[[List[Path], Tuple[Path, ...]], None], None] = None,
+    on_venv: Union[Callable[[Repair], None], None] = None,
+    resolve_interval: float = DEFAULT_RESOLVE_INTERVAL,
+) -> None:
+    """
+    Watches LibreOffice and repairs the registered virtual environments after each burst of changes.
+
+    While LibreOffice is not found, :py:func:`get_candidate_targets` are watched. Once it is found after
+    a change there, or on a periodic check, ``on_ready`` is called with its targets and repairs start.
+
+    Args:
+        backend (InotifyBackend | PollingBackend, optional): Defaults to :py:func:`get_backend`.
+        debounce (float, optional): Seconds without changes before repairs start.
+        max_delay (float, optional): Seconds after the first change repairs start even if changes keep coming.
+        on_repair (Callable, optional): Called with the changed paths and the repairs after each burst.
+        stop (threading.Event, optional): Watching ends when it is set. Call ``backend.wake()`` after setting it.
+        on_ready (Callable[[Tuple[WatchTarget, ...]], None], optional): Called with the targets once they are watched,
+            again when they change. Called with no targets when LibreOffice is not found.
+        on_change (Callable, optional): Called with the changed paths and the virtual environments to repair
+            when a burst ends, before repairs start.
+        on_venv (Callable[[Repair], None], optional): Called with each repair as soon as it is done.
+        resolve_interval (float, optional): Seconds between discoveries while LibreOffice is not found.
+    """
+    backend = backend or get_backend()
+    stop = stop or threading.Event()
+
+    def retarget() -> Tuple[WatchTarget, ...]:
+        found = get_watch_targets()
+        backend.set_targets(found or get_candidate_targets())
+        return found
+
+    try:
+        targets = retarget()
+        if on_ready is not None:
+            on_ready(targets)
+        while not stop.is_set():
+            changed = backend.wait(None if targets else resolve_interval)
+            if changed:
+                first = last = time.monotonic()
+                while not stop.is_set():
+                    now = time.monotonic()
+                    remaining = min(debounce - (now - last), max_delay - (now - first))
+                    if remaining <= 0:
+                        break
+                    more = backend.wait(remaining)
+                    if more:
+                        changed.extend(more)
+                        last = time.monotonic()
+            elif targets:
+                continue
+            if stop.is_set():
+                break
+            if not targets:
+                # misses are cached, LibreOffice may have been installed since.
+                uno_paths.clear_cache()
+                targets = retarget()
+                if not targets:
+                    continue
+                if on_ready is not None:
+                    on_ready(targets)
+                changed = changed or [t.path for t in targets]
+            venvs = venv_registry.load()
+            if on_change is not None:
+                on_change(changed, venvs)
+            repairs = repair_all(venvs, on_repair=on_venv)
+            if on_repair is not None:
+                on_repair(changed, repairs)
+            # the upgrade may have moved or removed LibreOffice.
+            found = retarget()
+            if found != targets and on_ready is not None:
+                on_ready(found)
+            targets = found
+    finally:
+        backend.close()
+
+
+def main(poll: bool = False, interval: float = DEFAULT_INTERVAL, debounce: float = DEFAULT_DEBOUNCE) -> int:
+    """Watches in the foreground, printing repairs. Returns the process exit code."""
+    backend = get_backend(poll=poll, interval=interval)
+    kind = "polling" if isinstance(backend, PollingBackend) else "inotify"
+
+    def on_ready(targets: Tuple[WatchTarget, ...]) -> None:
+        # status, not failures, ``errors`` is kept for those.
+        if not targets:
+            message = "LibreOffice not found, watching for it to be installed"
+            output.emit("watch", result="not-found", text=(message,), message=message, backend=kind)
+        for target in targets:
+            message = f"Watching {target.path} ({kind})"
+            output.emit("watch", path=target.path, result="watching", text=(message,), message=message, backend=kind)
+
+    def on_change(changed: List[Path], venvs: Tuple[Path, ...]) -> None:
+        output.emit(
+            "watch.change",
+            result="changed",
+            text=(f"{len(changed)} change(s) in LibreOffice, checking {len(venvs)} virtual environment(s)",),
+            changed=len(changed),
+            venvs=len(venvs),
+        )
+
+    def on_venv(repair: Repair) -> None:
+        print_repair(repair)
+        sys.stdout.flush()
+
+    try:
+        watch(backend, debounce=debounce, on_ready=on_ready, on_change=on_change, on_venv=on_venv)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def print_repair(repair: Repair) -> None:
+    """Reports the outcome of a repair. See :py:mod:`oooenv.utils.output`."""
+    if repair.error:
+        result, text, errors = "error", (), (f"{repair.venv}: {repair.error}",)
+    elif not repair.messages:
+        result, text, errors = "current", (f"{repair.venv}: up to date",), ()
+    else:
+        result, text, errors = "repaired", (f"{repair.venv}:", *(f"  {line}" for line in repair.messages)), ()
+    output.emit(
+        "repair",
+        path=repair.venv,
+        result=result,
+        elapsed=repair.elapsed,
+        text=text,
+        errors=errors,
+        messages=repair.messages,
+    )
@@ -1,4 +1,6 @@
+import os
 import pytest
+from pathlib import Path
 
 
 @pytest.fixture(scope="session")
@@ -17,3 +19,94 @@ def config_uno():
         return config
 
     return wraps
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """Keeps every test away from the user cache and from state cached by earlier tests."""
+    from oooenv.utils import uno_paths, py_version, pyvenv_config, resolver, lo_registry, probe
+
+    cache_dir = tmp_path_factory.mktemp("oooenv_cache")
+    monkeypatch.setenv("OOOENV_CACHE_DIR", str(cache_dir))
+    for name in ("OOOENV_NO_CACHE", "OOOENV_CACHE_REFRESH"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(resolver, "_RESOLVER", resolver.PathResolver())
+    monkeypatch.setattr(uno_paths, "_DISCOVERY_CACHE", uno_paths.DiskCache("discovery"))
+    monkeypatch.setattr(lo_registry, "_INDEX_CACHE", lo_registry.DiskCache("lo_index"))
+    monkeypatch.setattr(py_version, "_MEM_CACHE", {})
+    monkeypatch.setattr(py_version, "_INSTALL_CACHE", {})
+    monkeypatch.setattr(py_version, "_DISK_CACHE", py_version.DiskCache("py_version"))
+    py_version.reset_spawn_count()
+    probe.clear_cache()
+    probe.reset_stats()
+    pyvenv_config.clear()
+    return cache_dir
+
+
+@pytest.fixture()
+def fake_lo_install(tmp_path: Path, monkeypatch):
+    """
+    Creates a fake LibreOffice 7.6 install tree with python 3.8.16 and puts a ``soffice`` link to it on ``PATH``.
+
+    Layout::
+
+        <tmp>/opt/libreoffice/program/soffice
+        <tmp>/opt/libreoffice/program/python               prints "Python 3.8.16"
+        <tmp>/opt/libreoffice/program/python-core-3.8.16/
+        <tmp>/opt/libreoffice/program/libpython3.8.so.1.0
+        <tmp>/opt/libreoffice/program/bootstraprc
+        <tmp>/opt/libreoffice/program/versionrc
+        <tmp>/opt/libreoffice/program/uno.py
+        <tmp>/opt/libreoffice/program/unohelper.py
+        <tmp>/bin/soffice -> <tmp>/opt/libreoffice/program/soffice
+    """
+    install = tmp_path / "opt" / "libreoffice"
+    program = install / "program"
+    program.mkdir(parents=True)
+    soffice = program / "soffice"
+    soffice.write_text("#!/bin/sh\nexit 0\n")
+    soffice.chmod(0o755)
+    python = program / "python"
+    python.write_text('#!/bin/sh\necho "Python 3.8.16"\n')
+    python.chmod(0o755)
+    (program / "python-core-3.8.16" / "lib").mkdir(parents=True)
+    (program / "libpython3.8.so.1.0").write_bytes(b"")
+    (program / "bootstraprc").write_text(
+        "[Bootstrap]\nInstallMode=<installmode>\nProductKey=LibreOffice 7.6\nUserInstallation=$SYSUSERCONFIG/libreoffice/4\n"
+    )
+    (program / "versionrc").write_text(
+        "[Version]\nAllLanguages=en-US\nbuildid=e19e193f88cd6c0525a17fb7a176ed8e6a3e2aa1\n"
+    )
+    (program / "uno.py").write_text("# fake uno\n")
+    (program / "unohelper.py").write_text("# fake unohelper\n")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    os.symlink(soffice, bin_dir / "soffice")
+    monkeypatch.setenv("PATH", str(bin_dir))
+    for name in ("OOOENV_LO_PROGRAM_PATH", "OOOENV_LO_UNO_PATH", "OOOENV_LO_PY_EXE"):
+        monkeypatch.delenv(name, raising=False)
+    return install
+
+
+@pytest.fixture()
+def fake_venv(tmp_path: Path, monkeypatch):
+    """
+    Creates a fake virtual environment and makes it the active one.
+
+    Layout::
+
+        <tmp>/venv/pyvenv.cfg
+        <tmp>/venv/bin/
+        <tmp>/venv/lib/pythonX.Y/site-packages/
+    """
+    import sys
+
+    venv = tmp_path / "venv"
+    site = venv / "lib" / f"python{sys.version_info[0]}.{sys.version_info[1]}" / "site-packages"
+    site.mkdir(parents=True)
+    (venv / "bin").mkdir()
+    (venv / "pyvenv.cfg").write_text("home = /usr/bin\ninclude-system-site-packages = false\nversion = 3.11.7\n")
+    monkeypatch.setenv("VIRTUAL_ENV", str(venv))
+    for name in ("OOOENV_VIRTUAL_ENV", "OOOENV_SITE_PACKAGES", "ODEV_CONN_SOFFICE"):
+        monkeypatch.delenv(name, raising=False)
+    return venv
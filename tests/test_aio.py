@@ -0,0 +1,110 @@
+from __future__ import annotations
+import sys
+import asyncio
+import threading
+import time
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses shell script executables")
+
+
+def _make_python(pth: Path, body: str) -> Path:
+    pth.write_text(f"#!/bin/sh\n{body}\n")
+    pth.chmod(0o755)
+    return pth
+
+
+def _make_venvs(root: Path, count: int) -> list:
+    venvs = []
+    for i in range(count):
+        venv = root / f"venv{i}"
+        (venv / "lib" / "python3.11" / "site-packages").mkdir(parents=True)
+        (venv / "pyvenv.cfg").write_text("home = /usr/bin\nversion = 3.11.7\n")
+        venvs.append(venv)
+    return venvs
+
+
+def test_get_version_spawns_once(tmp_path: Path):
+    from oooenv import aio
+    from oooenv.utils import py_version
+
+    python = _make_python(tmp_path / "python", 'sleep 0.2\necho "Python 3.9.18"')
+
+    async def main():
+        return await asyncio.gather(*(aio.get_version(python) for _ in range(10)))
+
+    assert {str(v) for v in asyncio.run(main())} == {"3.9.18"}
+    assert py_version.get_spawn_count() == 1
+    # shared with the blocking api
+    assert str(py_version.get_version(str(python))) == "3.9.18"
+    assert py_version.get_spawn_count() == 1
+
+
+def test_get_version_timeout(tmp_path: Path):
+    from oooenv import aio
+
+    python = _make_python(tmp_path / "python", "exec sleep 5")
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        asyncio.run(aio.get_version(python, timeout=0.2))
+    assert time.monotonic() - start < 3
+
+
+def test_map_envs_bounded(tmp_path: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv import aio
+    from oooenv.session import OooEnv
+
+    venvs = _make_venvs(tmp_path / "envs", 40)
+    link = OooEnv.link
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def slow_link(self, *args):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.01)
+        try:
+            return link(self, *args)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(OooEnv, "link", slow_link)
+    results = asyncio.run(aio.map_envs(venvs, lambda env: env.link(), limit=4, lo_install=fake_lo_install))
+    assert all(r.ok for r in results)
+    assert running[1] <= 4
+    assert all((v / "lib" / "python3.11" / "site-packages" / "uno.py").is_symlink() for v in venvs)
+
+
+def test_toggle_and_update(tmp_path: Path, fake_lo_install: Path):
+    from oooenv import aio
+    from oooenv.utils import py_version
+
+    program = fake_lo_install / "program"
+    # the install layout no longer tells the version, the python executable is asked.
+    (program / "python-core-3.8.16").rename(program / "python-core-old")
+    _make_python(program / "python", 'echo "Python 3.8.16"')
+    venv = _make_venvs(tmp_path / "envs", 1)[0]
+
+    async def main():
+        env = aio.AsyncOooEnv(venv_path=venv, lo_install=fake_lo_install)
+        toggled = await env.toggle()
+        assert toggled.target == "uno"
+        assert await env.is_uno()
+        assert not await env.needs_update()
+        return env
+
+    env = asyncio.run(main())
+    assert env.env.load_cfg().get("version_info") == "3.8.16.final.0"
+    assert py_version.get_spawn_count() == 1
+
+    results = asyncio.run(aio.map_envs([venv, tmp_path / "missing"], lambda e: e.is_uno()))
+    assert results[0] is True
+    assert isinstance(results[1], FileNotFoundError)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import json
+import importlib.util
+import pytest
+from pathlib import Path
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+
+@pytest.fixture(scope="module")
+def compare():
+    fnm = Path(__file__).parent.parent / "benchmarks" / "compare.py"
+    spec = importlib.util.spec_from_file_location("bench_compare", fnm)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+def _write_run(fnm: Path, medians: dict) -> Path:
+    data = {
+        "machine_info": {"machine": "x86_64", "system": "Linux"},
+        "datetime": "2026-01-01T00:00:00",
+        "benchmarks": [
+            {"fullname": name, "stats": {"min": v, "median": v, "mean": v, "stddev": 0.0, "rounds": 10}}
+            for name, v in medians.items()
+        ],
+    }
+    fnm.write_text(json.dumps(data))
+    return fnm
+
+
+def test_compare_flags_regression(compare, tmp_path: Path, capsys):
+    base = _write_run(tmp_path / "base.json", {"a": 1.0, "b": 1.0, "gone": 1.0})
+    current = _write_run(tmp_path / "current.json", {"a": 1.1, "b": 1.5, "new": 1.0})
+
+    assert compare.main([str(current), "--baseline", str(base), "--threshold", "25"]) == 1
+    out = capsys.readouterr().out
+    assert "REGRESSION" in out.splitlines()[2]  # b
+    assert "1 benchmark(s) regressed" in out
+
+    assert compare.main([str(current), "--baseline", str(base), "--threshold", "60"]) == 0
+
+
+def test_save_baseline_round_trip(compare, tmp_path: Path):
+    run = _write_run(tmp_path / "run.json", {"a": 0.5})
+    baseline = tmp_path / "baseline.json"
+    assert compare.main([str(run), "--baseline", str(baseline), "--save-baseline"]) == 0
+    assert compare.load_stats(baseline, "median") == {"a": 0.5}
+    assert compare.main([str(run), "--baseline", str(baseline)]) == 0
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+_ROOT = Path(__file__).parent.parent
+
+_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        800 |   pyuno
+import time:       450 |       1250 | uno
+"""
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+_NATIVE_SITECUSTOMIZE = """\
+import sys
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader
+from importlib.util import spec_from_file_location
+
+
+class _Loader(ExtensionFileLoader):
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        SourceFileLoader(self.name, self.path).exec_module(module)
+
+
+class _Finder:
+    @staticmethod
+    def find_spec(name, path=None, target=None):
+        if name != "pyuno":
+            return None
+        return spec_from_file_location(name, {path!r}, loader=_Loader(name, {path!r}))
+
+
+sys.meta_path.insert(0, _Finder)
+"""
+
+
+@pytest.fixture()
+def fake_pyuno(fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    """
+    Makes the fake ``uno.py`` import a ``pyuno`` stand in, the way the real one imports the native module.
+
+    The stand in is python, loaded through an ``ExtensionFileLoader`` by a ``sitecustomize`` on ``PYTHONPATH``,
+    so the child process of the benchmark sees it as native like ``pyuno.so``.
+    """
+    program = fake_lo_install / "program"
+    pyuno = program / "pyuno.py"
+    pyuno.write_text("import json\nVALUE = 1\n")
+    (program / "uno.py").write_text("import pyuno\n")
+    custom = tmp_path / "native"
+    custom.mkdir()
+    (custom / "sitecustomize.py").write_text(_NATIVE_SITECUSTOMIZE.format(path=str(pyuno)))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(custom), str(_ROOT), str(program)]))
+    return program
+
+
+def test_parse_importtime():
+    from oooenv.cmds import bench_import
+    from oooenv.cmds.bench_import import ImportRow
+
+    rows = bench_import.parse_importtime(_IMPORTTIME)
+    assert rows == [
+        ImportRow("_io", 120, 120, 2),
+        ImportRow("pyuno", 300, 800, 1),
+        ImportRow("uno", 450, 1250, 0),
+    ]
+    assert bench_import._percentile([5.0, 1.0, 3.0, 2.0, 4.0], 95) == 5.0
+    assert bench_import._percentile([1.0, 2.0], 50) == 1.0
+
+
+def test_bench(fake_venv: Path, fake_pyuno: Path):
+    from oooenv.cmds import bench_import
+    from oooenv.session import OooEnv
+
+    env = OooEnv()
+    env.link()
+    result = bench_import.bench(sys.executable, runs=3, site_dir=env.site_packages)
+    assert len(result.samples) == 3
+    assert 0 < result.median <= result.p95
+    names = {name for name, _, _ in result.get_breakdown()}
+    # json is imported by the child before the marker, so only pyuno's own imports count
+    assert {"uno", "unohelper", "pyuno"} <= names
+    # pyuno is loaded as an extension module
+    assert result.native_median > 0
+    assert all("pyuno" in s.native_names for s in result.samples)
+    assert [name for name, _, native in result.get_breakdown() if native] == ["pyuno"]
+    report = bench_import.render(result, top=2)
+    assert "median" in report and "p95" in report
+    assert len(report.splitlines()) == 6
+
+
+def test_compare_modes_restores_links(fake_venv: Path, fake_pyuno: Path):
+    from oooenv.cmds import bench_import
+    from oooenv.session import OooEnv
+
+    site = _site_packages(fake_venv)
+    env = OooEnv()
+    env.link()
+    results = bench_import.compare_modes(env, python_exe=sys.executable, runs=2)
+    assert list(results) == ["symlink", "copy", "finder"]
+    assert all(r.median > 0 for r in results.values())
+    assert (site / "uno.py").is_symlink()
+    assert not (site / "oooenv_uno.pth").exists()
+    assert bench_import.render_compare(results).splitlines()[0].split() == [
+        "mode",
+        "median",
+        "p95",
+        "python",
+        "native",
+    ]
+
+
+def test_compare_modes_restores_link_settings(
+    fake_venv: Path, fake_pyuno: Path, tmp_path: Path, monkeypatch: MonkeyPatch
+):
+    from oooenv.cmds import bench_import
+    from oooenv.session import OooEnv
+    from oooenv.utils import link_settings
+
+    monkeypatch.setenv("OOOENV_STORE_DIR", str(tmp_path / "store"))
+    site = _site_packages(fake_venv)
+    manifest = tmp_path / "link.manifest"
+    manifest.write_text("-unohelper.py\n")
+    env = OooEnv()
+    env.link(strategy="copy", manifest=manifest, pyc="none")
+    before = link_settings.load(fake_venv)
+    bench_import.compare_modes(env, python_exe=sys.executable, modules=("uno",), runs=1)
+    assert link_settings.load(fake_venv) == before
+    assert (site / "uno.py").exists() and not (site / "uno.py").is_symlink()
+    assert not (site / "unohelper.py").exists()
+    assert not (site / "__pycache__").exists()
+
+
+def test_cli_reports_import_error(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "bench-import", "-n", "1", "--python", sys.executable])
+    with pytest.raises(SystemExit):
+        main.main()
+    assert "ModuleNotFoundError" in capsys.readouterr().err
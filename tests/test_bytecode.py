@@ -0,0 +1,99 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import subprocess
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+_ROOT = Path(__file__).parent.parent
+_TAG = sys.implementation.cache_tag
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+def _flags(cfile: Path) -> int:
+    return int.from_bytes(cfile.read_bytes()[4:8], "little")
+
+
+def test_link_compiles_and_unlink_removes(fake_venv: Path, fake_lo_install: Path):
+    from oooenv.session import OooEnv
+
+    site = _site_packages(fake_venv)
+    cache = site / "__pycache__"
+    result = OooEnv().link()
+    assert sorted(p.name for p in result.compiled) == [f"uno.{_TAG}.pyc", f"unohelper.{_TAG}.pyc"]
+    assert result.messages[-2] == f"Compiled 2 modules into {cache}"
+    # checked-hash
+    assert _flags(cache / f"uno.{_TAG}.pyc") == 0b11
+
+    again = OooEnv().link()
+    assert again.compiled == ()
+    assert again.messages == ("2 up to date",)
+
+    # a new LibreOffice version of uno.py is compiled again
+    (fake_lo_install / "program" / "uno.py").write_text("# fake uno 2\n")
+    assert [p.name for p in OooEnv().link().compiled] == [f"uno.{_TAG}.pyc"]
+
+    (cache / "other.cpython-311.pyc").write_bytes(b"")
+    OooEnv().unlink()
+    assert sorted(p.name for p in site.iterdir()) == ["__pycache__"]
+    assert [p.name for p in cache.iterdir()] == ["other.cpython-311.pyc"]
+
+
+def test_invalidation_modes(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.session import OooEnv
+
+    site = _site_packages(fake_venv)
+    monkeypatch.setenv("OOOENV_PYC_INVALIDATION", "unchecked-hash")
+    OooEnv().link()
+    assert _flags(site / "__pycache__" / f"unohelper.{_TAG}.pyc") == 0b01
+    # switching mode writes the files again
+    assert len(OooEnv().link(pyc="checked-hash").compiled) == 2
+    OooEnv().unlink()
+    assert not (site / "__pycache__").exists()
+
+    OooEnv().link(pyc="none")
+    assert not (site / "__pycache__").exists()
+    with pytest.raises(ValueError):
+        OooEnv().link(pyc="timestamp")
+
+
+def test_finder_uses_venv_cache(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.session import OooEnv
+
+    monkeypatch.delenv("PYTHONDONTWRITEBYTECODE", raising=False)
+    program = fake_lo_install / "program"
+    site = _site_packages(fake_venv)
+    cfile = site / "__pycache__" / f"uno.{_TAG}.pyc"
+    result = OooEnv().link(mode="finder")
+    assert cfile in result.compiled
+
+    script = (
+        f"import site, json; site.addsitedir({str(site)!r})\n"
+        "import uno\n"
+        "print(json.dumps({'cached': uno.__cached__, 'value': getattr(uno, 'VALUE', None)}))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(_ROOT))
+
+    def run() -> dict:
+        return json.loads(subprocess.check_output([sys.executable, "-c", script], env=env))
+
+    assert run()["cached"] == str(cfile)
+    assert not (program / "__pycache__").exists()
+
+    # stale cache is not used and is written again by the finder
+    (program / "uno.py").write_text("VALUE = 2\n")
+    assert run()["value"] == 2
+    cfile.unlink()
+    assert run()["value"] == 2
+    assert _flags(cfile) == 0b11
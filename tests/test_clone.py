@@ -0,0 +1,133 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+@pytest.fixture
+def template(fake_venv: Path, fake_lo_install: Path) -> Path:
+    """UNO ready virtual environment with scripts and files that name its path."""
+    from oooenv.session import OooEnv
+    from oooenv.utils import venv_lock
+
+    bin_dir = fake_venv / "bin"
+    (bin_dir / "activate").write_text(f"VIRTUAL_ENV='{fake_venv}'\nexport VIRTUAL_ENV\n")
+    tool = bin_dir / "tool"
+    tool.write_text(f"#!{bin_dir / 'python'}\nimport sys\n")
+    tool.chmod(0o755)
+    os.symlink(sys.executable, bin_dir / "python")
+    os.symlink("python", bin_dir / "python3")
+    os.symlink(bin_dir / "tool", fake_venv / "tool-link")
+    site = _site_packages(fake_venv)
+    (site / "pkg").mkdir()
+    (site / "pkg" / "__init__.py").write_text("VALUE = 1\n")
+    (site / "distutils-precedence.pth").write_text("import os\n")
+    env = OooEnv()
+    assert env.link(pyc="none").ok
+    assert env.toggle().ok
+    assert env.pip_e().ok
+    with open(fake_venv / "pyvenv_uno.cfg", "a") as file:
+        file.write(f"command = /usr/bin/python3 -m venv {fake_venv}\n")
+    Path(venv_lock.get_lock_file(fake_venv)).write_text("")
+    return fake_venv
+
+
+def test_clone(template: Path, fake_lo_install: Path, tmp_path: Path):
+    from oooenv.cmds import clone
+    from oooenv.session import OooEnv
+    from oooenv.utils import local_paths
+
+    dst = tmp_path / "jobs" / "job 1.venv"
+    dst.parent.mkdir()
+    result = clone.clone(template, dst, strategy="hardlink")
+    assert result.strategy == "hardlink"
+    assert result.copied == 0
+    bin_dir = dst / "bin"
+    site = _site_packages(dst)
+    assert sorted(p.relative_to(dst).as_posix() for p in result.rewritten) == sorted(
+        [
+            "bin/activate",
+            "bin/tool",
+            "pyvenv_uno.cfg",
+            f"{site.relative_to(dst).as_posix()}/{local_paths.get_pip_e_name(dst.parent)}",
+        ]
+    )
+    assert (bin_dir / "activate").read_text() == f"VIRTUAL_ENV='{dst}'\nexport VIRTUAL_ENV\n"
+    assert (bin_dir / "tool").read_text().startswith(f"#!{bin_dir / 'python'}\n")
+    assert os.access(bin_dir / "tool", os.X_OK)
+    assert f"-m venv {dst}\n" in (dst / "pyvenv_uno.cfg").read_text()
+    assert (site / local_paths.get_pip_e_name(dst.parent)).read_text() == str(dst.parent)
+    assert not (site / local_paths.get_pip_e_name(template.parent)).exists()
+
+    # unchanged files are shared, links carry over.
+    src_site = _site_packages(template)
+    assert os.path.samefile(site / "pkg" / "__init__.py", src_site / "pkg" / "__init__.py")
+    assert os.path.samefile(site / "distutils-precedence.pth", src_site / "distutils-precedence.pth")
+    assert os.readlink(bin_dir / "python") == sys.executable
+    assert os.readlink(bin_dir / "python3") == "python"
+    assert os.readlink(dst / "tool-link") == str(bin_dir / "tool")
+    assert result.retargeted == 1
+    assert os.readlink(site / "uno.py") == str(fake_lo_install / "program" / "uno.py")
+    assert not (dst / ".oooenv.lock").exists()
+
+    env = OooEnv(venv_path=dst)
+    assert env.is_uno()
+    assert str(env.cfg_version("pyvenv.cfg")) == "3.8.16"
+    assert env.toggle().ok
+    assert not env.is_uno()
+    # the template is not touched by the clone.
+    assert OooEnv(venv_path=template).is_uno()
+    assert not [p for p in dst.parent.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_clone_errors(template: Path, tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.cmds import clone
+
+    with pytest.raises(FileExistsError):
+        clone.clone(template, tmp_path)
+    with pytest.raises(ValueError):
+        clone.clone(tmp_path / "opt", tmp_path / "new")
+
+    # a failed clone leaves nothing behind.
+    def fail(kind, entry, dst_path):
+        raise PermissionError(1, "no links", dst_path)
+
+    monkeypatch.setattr(clone, "_place_as", fail)
+    with pytest.raises(PermissionError):
+        clone.clone(template, tmp_path / "new", strategy="hardlink")
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith((".new", "new"))]
+
+
+def test_cli_clone(template: Path, tmp_path: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+    from oooenv.cmds import clone
+
+    assert main._CLONE_STRATEGIES == clone.STRATEGIES
+    dst = tmp_path / "clone"
+    monkeypatch.setattr(sys, "argv", ["oooenv", "--output", "ndjson", "clone", str(dst)])
+    main.main()
+    (event,) = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert event["op"] == "clone"
+    assert event["path"] == str(dst)
+    assert event["src"] == str(template)
+    assert event["strategy"] in ("reflink", "hardlink")
+    assert str(dst / "bin" / "activate") in event["rewritten"]
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "clone", str(dst)])
+    with pytest.raises(SystemExit) as e:
+        main.main()
+    assert e.value.code == 1
+    assert "Destination exists" in capsys.readouterr().err
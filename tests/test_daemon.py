@@ -0,0 +1,101 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import subprocess
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="Needs Unix domain sockets")
+
+
+@pytest.fixture()
+def daemon(fake_venv: Path, fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch):
+    sock = tmp_path / "d.sock"
+    monkeypatch.setenv("OOOENV_DAEMON_SOCKET", str(sock))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "oooenv.cli.main", "daemon"],
+        env=dict(os.environ),
+        stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while not sock.exists():
+            assert proc.poll() is None, proc.stderr.read().decode()
+            assert time.monotonic() < deadline, "daemon did not start"
+            time.sleep(0.02)
+        yield proc
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stderr.close()
+
+
+def test_daemon_answers(daemon, fake_venv: Path, fake_lo_install: Path):
+    from oooenv.utils import daemon_client
+
+    program = fake_lo_install / "program"
+    assert daemon_client.request("is_uno") is False
+    assert daemon_client.request("uno_path") == str(program)
+    assert daemon_client.request("lo_python_version") == "3.8.16"
+    status = daemon_client.request("status")
+    assert status["lo_path"] == str(program)
+    assert status["errors"] == {}
+
+    times = []
+    for _ in range(50):
+        start = time.perf_counter()
+        daemon_client.request("is_uno")
+        times.append(time.perf_counter() - start)
+    times.sort()
+    # well under a millisecond on a quiet machine, leave room for busy CI.
+    assert times[len(times) // 2] < 0.005
+
+
+def test_daemon_sees_file_changes(daemon, fake_venv: Path, fake_lo_install: Path):
+    from oooenv.utils import daemon_client
+
+    cfg = fake_venv / "pyvenv.cfg"
+    assert daemon_client.request("is_uno") is False
+    cfg.write_text(f"home = {fake_lo_install / 'program'}\n")
+    st = cfg.stat()
+    os.utime(cfg, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert daemon_client.request("is_uno") is True
+
+    with pytest.raises(daemon_client.DaemonError):
+        daemon_client.request("is_uno", venv=str(fake_venv.parent / "missing"))
+
+
+def test_client_falls_back(daemon, fake_venv: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+    from oooenv.utils import daemon_client
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "query", "is-uno"])
+    main.main()
+    assert capsys.readouterr().out == "false\n"
+
+    # a different discovery environment is not answered by the daemon.
+    monkeypatch.setenv("OOOENV_CACHE_MISS_TTL", "1")
+    with pytest.raises(daemon_client.DaemonUnavailable):
+        daemon_client.request("is_uno")
+    main.main()
+    assert capsys.readouterr().out == "false\n"
+
+
+def test_daemon_stop(daemon, capsys, monkeypatch: MonkeyPatch):
+    from oooenv.cli import main
+    from oooenv.utils import daemon_client
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "daemon", "--stop"])
+    main.main()
+    assert capsys.readouterr().out == "Daemon stopped\n"
+    assert daemon.wait(timeout=10) == 0
+    assert not daemon_client.get_socket_path().exists()
+    with pytest.raises(daemon_client.DaemonUnavailable):
+        daemon_client.request("ping")
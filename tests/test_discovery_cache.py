@@ -0,0 +1,112 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+def _count_which(monkeypatch: MonkeyPatch) -> list:
+    from oooenv.utils import uno_paths
+
+    calls = []
+    real_which = uno_paths.shutil.which
+
+    def mock_which(cmd, *args, **kwargs):
+        calls.append(cmd)
+        return real_which(cmd, *args, **kwargs)
+
+    monkeypatch.setattr(uno_paths.shutil, "which", mock_which)
+    return calls
+
+
+def _new_process(monkeypatch: MonkeyPatch) -> None:
+    # simulate a fresh process: drop everything held in memory.
+    from oooenv.utils import uno_paths, resolver
+
+    resolver.get_resolver().clear()
+    monkeypatch.setattr(uno_paths, "_DISCOVERY_CACHE", uno_paths.DiskCache("discovery"))
+
+
+def test_install_path_cached_on_disk(fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import uno_paths
+
+    calls = _count_which(monkeypatch)
+    assert uno_paths.get_soffice_install_path() == fake_lo_install
+    assert uno_paths.get_lo_path() == fake_lo_install / "program"
+    assert len(calls) == 2
+
+    _new_process(monkeypatch)
+    assert uno_paths.get_soffice_install_path() == fake_lo_install
+    assert uno_paths.get_lo_path() == fake_lo_install / "program"
+    assert len(calls) == 2
+
+
+def test_cache_invalidated_by_stamp(fake_lo_install: Path, monkeypatch: MonkeyPatch, tmp_path: Path):
+    from oooenv.utils import uno_paths
+
+    assert uno_paths.get_lo_path() == fake_lo_install / "program"
+
+    # re-point the soffice link to another install.
+    other = tmp_path / "other" / "program"
+    other.mkdir(parents=True)
+    (other / "soffice").write_text("")
+    (other / "soffice").chmod(0o755)
+    link = tmp_path / "bin" / "soffice"
+    link.unlink()
+    os.symlink(other / "soffice", link)
+    # make sure the link mtime differs on file systems with coarse timestamps.
+    st = os.lstat(link)
+    os.utime(link, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000), follow_symlinks=False)
+
+    _new_process(monkeypatch)
+    assert uno_paths.get_lo_path() == other
+
+
+def test_missing_result_remembered(tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import uno_paths
+
+    monkeypatch.setenv("PATH", str(tmp_path))
+    monkeypatch.setattr(uno_paths, "_probe_uno_path", lambda: (_ for _ in ()).throw(FileNotFoundError("nope")))
+    with pytest.raises(FileNotFoundError):
+        uno_paths.get_uno_path()
+
+    def fail_probe():
+        raise AssertionError("probe should not run while miss is cached")
+
+    monkeypatch.setattr(uno_paths, "_probe_uno_path", fail_probe)
+    with pytest.raises(FileNotFoundError, match="nope"):
+        uno_paths.get_uno_path()
+
+    monkeypatch.setenv("OOOENV_CACHE_REFRESH", "1")
+    with pytest.raises(AssertionError):
+        uno_paths.get_uno_path()
+
+
+def test_missing_result_expires(monkeypatch: MonkeyPatch):
+    from oooenv.utils.disk_cache import DiskCache
+
+    cache = DiskCache("test")
+    cache.put_missing("key", "gone", ttl=-1.0)
+    assert cache.get("key") is None
+    cache.put_missing("key", "gone", ttl=60.0)
+    entry = cache.get("key")
+    assert entry is not None and entry.missing and entry.value == "gone"
+
+
+def test_no_cache(fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import uno_paths
+
+    monkeypatch.setenv("OOOENV_NO_CACHE", "1")
+    calls = _count_which(monkeypatch)
+    uno_paths.get_lo_path()
+    _new_process(monkeypatch)
+    uno_paths.get_lo_path()
+    assert len(calls) == 2
+    assert not uno_paths._DISCOVERY_CACHE.path.exists()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+@pytest.fixture
+def venv_python(fake_venv: Path) -> Path:
+    """``bin/python`` of the fake virtual environment, this python with ``site-packages`` on the path."""
+    python = fake_venv / "bin" / "python"
+    python.write_text(f'#!/bin/sh\nPYTHONPATH="{_site_packages(fake_venv)}" exec "{sys.executable}" "$@"\n')
+    python.chmod(0o755)
+    return python
+
+
+def test_doctor_checks(fake_venv: Path, fake_lo_install: Path, venv_python: Path):
+    from oooenv.cmds import doctor
+    from oooenv.session import OooEnv
+
+    checks = {c.name: c for c in doctor.run(OooEnv())}
+    assert list(checks) == list(doctor.CHECKS)
+    assert {n: c.status for n, c in checks.items()} == {
+        "install": "pass",
+        "uno": "pass",
+        "site-packages": "pass",
+        "links": "skip",
+        "pyvenv": "skip",
+        "import": "fail",
+    }
+    assert "No module named 'uno'" in checks["import"].detail
+
+    env = OooEnv()
+    env.link(pyc="none")
+    env.toggle()
+    site = _site_packages(fake_venv)
+    checks = {c.name: c for c in doctor.run(env)}
+    assert all(c.status == "pass" for c in checks.values()), checks
+    assert checks["import"].detail == str(site / "uno.py")
+
+    os.remove(site / "unohelper.py")
+    os.symlink("/nonexistent/unohelper.py", site / "unohelper.py")
+    (fake_venv / "pyvenv_uno.cfg").write_text((fake_venv / "pyvenv_uno.cfg").read_text().replace("3.8.16", "3.8.12"))
+    checks = {c.name: c for c in doctor.run(OooEnv(), names=["links", "pyvenv"])}
+    assert checks["links"].status == "fail"
+    assert "unohelper.py -> /nonexistent/unohelper.py" in checks["links"].detail
+    assert checks["pyvenv"].status == "fail"
+
+
+def test_doctor_timeout(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.cmds import doctor
+    from oooenv.session import OooEnv
+
+    def hang(env, timeout):
+        time.sleep(5)
+
+    monkeypatch.setitem(doctor.CHECKS, "uno", hang)
+    start = time.monotonic()
+    checks = {c.name: c for c in doctor.run(OooEnv(), names=["install", "uno"], timeout=0.5)}
+    assert time.monotonic() - start < 2
+    assert checks["install"].status == "pass"
+    assert checks["uno"].status == "timeout"
+    assert not checks["uno"].ok
+
+
+def test_cli_doctor(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+    from oooenv.cmds import doctor
+
+    assert main._DOCTOR_CHECKS == tuple(doctor.CHECKS)
+    monkeypatch.setattr(sys, "argv", ["oooenv", "--output", "ndjson", "doctor", "-c", "uno", "-c", "import"])
+    with pytest.raises(SystemExit) as e:
+        main.main()
+    assert e.value.code == 1
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(e["check"], e["result"]) for e in events] == [("uno", "pass"), ("import", "fail")]
+    assert events[0]["path"] == str(fake_lo_install / "program" / "uno.py")
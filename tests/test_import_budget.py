@@ -0,0 +1,76 @@
+"""
+Cold start budget for the ``oooenv`` cli.
+
+``oooenv env -u`` is run from shell prompts and git hooks, so the modules imported to
+dispatch a command are measured with ``python -X importtime`` and checked against
+``import_budget.json``. The ``env`` sub command is only registered on Windows, so its budget
+runs the dispatch of ``env -u`` below the parser, which is the same on every platform: the
+daemon is asked first, then the query is answered in-process and the answer is printed.
+The commands run against an empty virtual environment and no daemon.
+"""
+from __future__ import annotations
+import os
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Mapping
+
+import pytest
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+_BUDGET = json.loads(Path(__file__).with_name("import_budget.json").read_text())
+_RUNS = 3
+
+
+def _import_times(code: str, env: Mapping[str, str]) -> Dict[str, int]:
+    """Gets self import time in microseconds of each module imported by running ``code``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.fixture(scope="module")
+def run_env(tmp_path_factory) -> Dict[str, str]:
+    venv = tmp_path_factory.mktemp("budget_venv")
+    (venv / "pyvenv.cfg").write_text("home = \n")
+    env = dict(os.environ)
+    env["OOOENV_VIRTUAL_ENV"] = str(venv)
+    env["OOOENV_DAEMON_SOCKET"] = str(venv / "daemon.sock")
+    return env
+
+
+@pytest.fixture(scope="module")
+def startup_modules(run_env: Dict[str, str]) -> set:
+    return set(_import_times("pass", run_env))
+
+
+@pytest.mark.parametrize("name", list(_BUDGET))
+def test_import_budget(name: str, startup_modules: set, run_env: Dict[str, str]):
+    budget = _BUDGET[name]
+    best = None
+    modules = set()
+    for _ in range(_RUNS):
+        times = _import_times(budget["code"], run_env)
+        own = {k: v for k, v in times.items() if k not in startup_modules}
+        modules = set(own)
+        total = sum(own.values())
+        best = total if best is None else min(best, total)
+
+    for forbidden in budget["forbidden"]:
+        loaded = sorted(m for m in modules if m == forbidden or m.startswith(f"{forbidden}."))
+        assert not loaded, f"{name} imports {loaded}"
+    assert best <= budget["max_us"], f"{name} took {best} us to import, budget is {budget['max_us']} us"
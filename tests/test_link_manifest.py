@@ -0,0 +1,160 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+_OPTIONAL = ("scriptforge.py", "officehelper.py", "pythonscript.py", "mailmerge.py", "msgbox.py")
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+def test_parse():
+    from oooenv.utils import link_manifest
+    from oooenv.utils.link_manifest import ManifestEntry
+
+    entries = link_manifest.parse("# extra\naccess2base.py?  # optional\nmy_macros.py\n\n-msgbox.py\nuno.py?\n")
+    by_name = {e.name: e for e in entries}
+    assert "msgbox.py" not in by_name
+    assert by_name["access2base.py"] == ManifestEntry("access2base.py", False)
+    assert by_name["my_macros.py"] == ManifestEntry("my_macros.py", True)
+    assert by_name["uno.py"].required is False
+    assert [e.name for e in entries][:2] == ["uno.py", "unohelper.py"]
+    with pytest.raises(ValueError):
+        link_manifest.parse("../evil.py\n")
+
+
+def test_links_full_module_set(fake_venv: Path, fake_lo_install: Path):
+    from oooenv.session import OooEnv
+
+    program = fake_lo_install / "program"
+    for name in _OPTIONAL[:-1]:
+        (program / name).write_text(f"# {name}\n")
+    site = _site_packages(fake_venv)
+
+    result = OooEnv().link()
+    assert result.ok
+    # msgbox.py is optional and not in this install
+    assert [f.name for f in result.files] == ["uno.py", "unohelper.py", *_OPTIONAL[:-1]]
+    assert all((site / f.name).is_symlink() for f in result.files)
+    assert result.messages[-1] == "6 linked"
+
+    again = OooEnv().link()
+    assert again.messages == ("6 up to date",)
+
+    removed = OooEnv().unlink()
+    assert removed.summary == "6 removed"
+    assert list(site.iterdir()) == []
+
+
+def test_modules_found_in_program_dir(
+    fake_venv: Path, fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch
+):
+    from oooenv.session import OooEnv
+
+    # like Debian: uno.py in dist-packages, the other modules in program.
+    dist = tmp_path / "dist-packages"
+    dist.mkdir()
+    program = fake_lo_install / "program"
+    for name in ("uno.py", "unohelper.py"):
+        (program / name).rename(dist / name)
+    (program / "scriptforge.py").write_text("# scriptforge\n")
+    result = OooEnv(lo_install=fake_lo_install, uno_path=dist).link()
+    assert result.ok
+    srcs = {f.name: f.src for f in result.files}
+    assert srcs == {
+        "uno.py": dist / "uno.py",
+        "unohelper.py": dist / "unohelper.py",
+        "scriptforge.py": program / "scriptforge.py",
+    }
+
+
+def test_user_manifest(fake_venv: Path, fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.session import OooEnv
+
+    manifest = tmp_path / "link.manifest"
+    manifest.write_text("-unohelper.py\nmy_macros.py\n")
+    monkeypatch.setenv("OOOENV_LINK_MANIFEST", str(manifest))
+    result = OooEnv().link()
+    assert not result.ok
+    assert [(f.name, f.action) for f in result.files] == [("uno.py", "linked"), ("my_macros.py", "missing")]
+    assert result.messages[-1] == "1 linked, 1 missing"
+
+
+def test_scans_each_dir_once(tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.cmds import uno_lnk
+
+    src = tmp_path / "src"
+    site = tmp_path / "site"
+    src.mkdir()
+    site.mkdir()
+    names = [f"mod{i}.py" for i in range(200)]
+    for name in names:
+        (src / name).write_text("")
+    calls = []
+    scandir = os.scandir
+
+    def counting_scandir(pth):
+        calls.append(pth)
+        return scandir(pth)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    actions = uno_lnk.link_files(src, site, names, strategy="symlink")
+    assert len(actions) == 200
+    assert calls == [src, site]
+    calls.clear()
+    # links that already point to their source are checked without scanning.
+    assert {f.action for f in uno_lnk.link_files(src, site, names, strategy="symlink")} == {"exists"}
+    assert calls == []
+    (site / names[0]).unlink()
+    actions = uno_lnk.link_files(src, site, names, strategy="symlink")
+    assert [f.action for f in actions if f.action != "exists"] == ["linked"]
+    assert calls == [src, site]
+
+
+@pytest.mark.parametrize("strategy", ["symlink", "copy"])
+def test_foreign_file_left_alone(fake_venv: Path, fake_lo_install: Path, strategy: str):
+    from oooenv.session import OooEnv
+
+    (fake_lo_install / "program" / "msgbox.py").write_text("# LibreOffice msgbox\n")
+    site = _site_packages(fake_venv)
+    foreign = site / "msgbox.py"
+    foreign.write_text("# another package\n")
+
+    result = OooEnv().link(strategy=strategy)
+    assert result.ok
+    actions = {f.name: f.action for f in result.files}
+    assert actions["msgbox.py"] == "conflict"
+    assert actions["uno.py"] == ("linked" if strategy == "symlink" else "copied")
+    assert f"Left {foreign} alone, it was not placed by oooenv" in result.messages
+    assert not foreign.is_symlink()
+    assert foreign.read_text() == "# another package\n"
+
+    removed = OooEnv().unlink()
+    assert [(f.name, f.action) for f in removed.files] == [
+        ("uno.py", "removed"),
+        ("unohelper.py", "removed"),
+        ("msgbox.py", "conflict"),
+    ]
+    assert foreign.read_text() == "# another package\n"
+    assert not (site / "uno.py").exists()
+
+
+def test_foreign_required_file_fails_link(fake_venv: Path, fake_lo_install: Path):
+    from oooenv.session import OooEnv
+
+    foreign = _site_packages(fake_venv) / "uno.py"
+    foreign.write_text("# not LibreOffice\n")
+    result = OooEnv().link()
+    assert not result.ok
+    assert [f.action for f in result.files if f.name == "uno.py"] == ["conflict"]
+    assert foreign.read_text() == "# not LibreOffice\n"
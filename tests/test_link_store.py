@@ -0,0 +1,107 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+def _make_venvs(root: Path, count: int) -> list:
+    sites = []
+    for i in range(count):
+        site = root / f"venv{i}" / "lib" / "python3.11" / "site-packages"
+        site.mkdir(parents=True)
+        sites.append(site)
+    return sites
+
+
+def _touch_later(pth: Path, text: str) -> None:
+    pth.write_text(text)
+    st = pth.stat()
+    os.utime(pth, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_hardlink_shares_blob_and_upgrade(tmp_path: Path, fake_lo_install: Path):
+    from oooenv.cmds import uno_lnk
+    from oooenv.utils import link_store
+
+    program = fake_lo_install / "program"
+    sites = _make_venvs(tmp_path / "envs", 5)
+    for site in sites:
+        actions = uno_lnk.link_files(program, site, strategy="hardlink")
+        assert [(f.action, f.strategy) for f in actions] == [("linked", "hardlink")] * 2
+
+    blob = link_store.get_blob_path(link_store.hash_file(program / "uno.py"))
+    assert blob.stat().st_nlink == 6
+    assert all(os.path.samefile(site / "uno.py", blob) for site in sites)
+    assert [f.action for f in uno_lnk.link_files(program, sites[0], strategy="hardlink")] == ["exists", "exists"]
+
+    # LibreOffice upgrade: one new blob, every venv is repointed, the old blob is collected.
+    _touch_later(program / "uno.py", "# fake uno 24.2\n")
+    for site in sites:
+        actions = uno_lnk.link_files(program, site, strategy="hardlink")
+        assert [f.action for f in actions] == ["replaced", "exists"]
+        assert (site / "uno.py").read_text() == "# fake uno 24.2\n"
+    assert blob.stat().st_nlink == 1
+    result = link_store.gc(min_age=0, dry_run=True)
+    assert result.removed == (blob,)
+    assert blob.exists()
+    result = link_store.gc(min_age=0)
+    assert result.removed == (blob,)
+    assert result.kept == 2
+    assert not blob.exists()
+
+
+def test_copy_and_auto(tmp_path: Path, fake_lo_install: Path):
+    from oooenv.cmds import uno_lnk
+
+    program = fake_lo_install / "program"
+    site = _make_venvs(tmp_path / "envs", 1)[0]
+    actions = uno_lnk.link_files(program, site, strategy="copy")
+    assert [f.action for f in actions] == ["copied", "copied"]
+    assert not (site / "uno.py").is_symlink()
+    assert (site / "uno.py").stat().st_mode & 0o777 == 0o644
+    assert [f.action for f in uno_lnk.link_files(program, site, strategy="copy")] == ["exists", "exists"]
+    # a copy with the same content is fine for auto
+    assert [f.action for f in uno_lnk.link_files(program, site, strategy="auto")] == ["exists", "exists"]
+
+    # a stale copy is not kept, copies are known by the names recorded when they were placed.
+    _touch_later(program / "unohelper.py", "# fake unohelper 24.2\n")
+    actions = uno_lnk.link_files(program, site, strategy="auto", owned={"uno.py", "unohelper.py"})
+    assert [(f.action, f.strategy) for f in actions] == [("exists", ""), ("replaced", "symlink")]
+    assert os.readlink(site / "unohelper.py") == str(program / "unohelper.py")
+
+
+def test_explicit_strategy_failure(tmp_path: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.cmds import uno_lnk
+    from oooenv.utils import link_store
+
+    def no_reflink(src, dst):
+        raise OSError(95, "Operation not supported")
+
+    monkeypatch.setattr(link_store, "reflink", no_reflink)
+    site = _make_venvs(tmp_path / "envs", 1)[0]
+    actions = uno_lnk.link_files(fake_lo_install / "program", site, strategy="reflink")
+    assert [f.action for f in actions] == ["failed", "failed"]
+    assert "not supported" in actions[0].message
+    assert list(site.iterdir()) == []
+    with pytest.raises(ValueError):
+        uno_lnk.link_files(fake_lo_install / "program", site, strategy="junction")
+
+
+def test_cli_strategy_and_gc(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "cmd-link", "--add", "--strategy", "hardlink"])
+    main.main()
+    assert "Created hard link to store" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "cmd-link", "--gc", "--dry-run"])
+    main.main()
+    assert capsys.readouterr().out.splitlines()[-1] == "Would remove 0 file(s), 0 bytes. 2 file(s) in use."
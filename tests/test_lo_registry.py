@@ -0,0 +1,134 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix install layout")
+
+
+def _make_install(opt: Path, name: str, product: str, build_id: str, py_ver: str) -> Path:
+    program = opt / name / "program"
+    (program / f"python-core-{py_ver}").mkdir(parents=True)
+    (program / "soffice").write_text("")
+    (program / "uno.py").write_text("# fake uno\n")
+    (program / "bootstraprc").write_text(f"[Bootstrap]\nProductKey=LibreOffice {product}\n")
+    (program / "versionrc").write_text(f"[Version]\nbuildid={build_id}\n")
+    return opt / name
+
+
+@pytest.fixture()
+def opt_dir(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    from oooenv.utils import lo_registry
+
+    opt = tmp_path / "opt"
+    opt.mkdir()
+    # TDF builds record a git hash as buildid.
+    _make_install(opt, "libreoffice7.5", "7.5", "cdeefe45c17511d326101eed8008ac4092f278a9", "3.8.16")
+    _make_install(opt, "libreoffice7.6", "7.6", "e19e193f88cd6c0525a17fb7a176ed8e6a3e2aa1", "3.8.18")
+    _make_install(opt, "libreoffice24.2", "24.2", "db4def46b0453cc22e2d0305797cf981b68ef5ac", "3.9.18")
+    (opt / "libreoffice-not-an-install").mkdir()
+    # only look at the fake installs.
+    monkeypatch.setattr(lo_registry, "_UNIX_PATTERNS", ())
+    monkeypatch.setattr(lo_registry, "_DIST_PACKAGES", ())
+    monkeypatch.setenv("OOOENV_LO_SEARCH_PATHS", str(opt / "libreoffice*"))
+    monkeypatch.setenv("PATH", "")
+    return opt
+
+
+def test_get_installs(opt_dir: Path):
+    from oooenv.utils import lo_registry
+
+    installs = lo_registry.get_installs()
+    by_name = {inst.install.name: inst for inst in installs}
+    assert set(by_name) == {"libreoffice7.5", "libreoffice7.6", "libreoffice24.2"}
+    inst = by_name["libreoffice7.6"]
+    assert inst.version == (7, 6)
+    assert inst.product == "7.6"
+    assert inst.python_version == "3.8.18"
+    assert inst.uno_path == opt_dir / "libreoffice7.6" / "program"
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("latest", "24.2"),
+        (">=7.6", "24.2"),
+        ("<24", "7.6"),
+        ("7.5", "7.5"),
+        ("==7.6", "7.6"),
+        (">=7.5, <7.6", "7.5"),
+        ("!=24.2", "7.6"),
+    ],
+)
+def test_select_install(opt_dir: Path, spec: str, expected: str):
+    from oooenv.utils import lo_registry
+
+    assert lo_registry.select_install(spec).version_str == expected
+
+
+def test_select_install_errors(opt_dir: Path):
+    from oooenv.utils import lo_registry
+
+    with pytest.raises(FileNotFoundError):
+        lo_registry.select_install(">=25")
+    with pytest.raises(ValueError):
+        lo_registry.select_install("~7.6")
+    # only major.minor is known for a build id that is a git hash.
+    with pytest.raises(FileNotFoundError):
+        lo_registry.select_install("==7.6.4")
+
+
+def test_version_from_build_id():
+    from oooenv.utils.lo_registry import LoInstall
+
+    inst = LoInstall(Path("/usr/lib/libreoffice"), Path("/usr/lib/libreoffice/program"), "7.6", "7.6.4.1", None, "")
+    assert inst.version == (7, 6, 4, 1)
+    assert inst._replace(build_id="24.2.1.2").version == (7, 6)
+    assert inst._replace(build_id="").version_str == "7.6"
+
+
+def test_index_reused_until_install_added(opt_dir: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import lo_registry, resolver
+
+    assert len(lo_registry.get_installs()) == 3
+    scan = lo_registry.scan
+    calls = []
+
+    def counting_scan():
+        calls.append(1)
+        return scan()
+
+    monkeypatch.setattr(lo_registry, "scan", counting_scan)
+
+    # a new process: nothing memoized, index file on disk.
+    monkeypatch.setattr(resolver, "_RESOLVER", resolver.PathResolver())
+    monkeypatch.setattr(lo_registry, "_INDEX_CACHE", lo_registry.DiskCache("lo_index"))
+    assert len(lo_registry.get_installs()) == 3
+    assert calls == []
+
+    _make_install(opt_dir, "libreofficedev24.8", "24.8", "24.8.0.0.alpha0", "3.9.19")
+    st = opt_dir.stat()
+    os.utime(opt_dir, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    monkeypatch.setattr(resolver, "_RESOLVER", resolver.PathResolver())
+    assert lo_registry.select_install("latest").version_str == "24.8.0.0"
+    assert calls == [1]
+
+
+def test_cli_lo_selects_install(opt_dir: Path, fake_venv: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "--lo", "<7.6", "cmd-link", "--add"])
+    assert main.main() == 0
+    site = next((fake_venv / "lib").glob("python*/site-packages"))
+    assert os.readlink(site / "uno.py") == str(opt_dir / "libreoffice7.5" / "program" / "uno.py")
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "installs"])
+    main.main()
+    out = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in out[-3:]] == ["24.2", "7.6", "7.5"]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import io
+import sys
+import json
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+
+@pytest.fixture
+def reset_output():
+    from oooenv.utils import output
+
+    yield output
+    output.set_format("text")
+
+
+def test_ndjson_streams_each_event(reset_output):
+    from oooenv.utils.py_version import Version
+
+    output = reset_output
+    stream = io.StringIO()
+    output.set_format("ndjson", stream=stream)
+    output.emit("update", path=Path("/venv/pyvenv_uno.cfg"), result="updated", elapsed=0.25, version=Version(3, 8, 16))
+    # written before the next operation starts
+    assert json.loads(stream.getvalue()) == {
+        "op": "update",
+        "path": "/venv/pyvenv_uno.cfg",
+        "result": "updated",
+        "elapsed": 0.25,
+        "version": "3.8.16",
+    }
+    output.emit("query", text=("not in ndjson",), errors=("bad",))
+    output.close()
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert events[1] == {"op": "query", "path": None, "result": "ok", "elapsed": 0.0, "errors": ["bad"]}
+
+
+def test_json_array(reset_output):
+    output = reset_output
+    stream = io.StringIO()
+    output.set_format("json", stream=stream)
+    output.close()
+    assert json.loads(stream.getvalue()) == []
+    assert output.get_format() == "text"
+
+    stream = io.StringIO()
+    output.set_format("json", stream=stream)
+    for i in range(3):
+        output.emit("watch.list", path=f"/v{i}", result="registered")
+    assert stream.getvalue().startswith("[\n{")
+    output.close()
+    assert [e["path"] for e in json.loads(stream.getvalue())] == ["/v0", "/v1", "/v2"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="cmd-link is not available on Windows")
+def test_cli_link_ndjson(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch, capsys, reset_output):
+    from oooenv.cli import main
+
+    monkeypatch.setattr(sys, "argv", ["oooenv", "--output", "ndjson", "cmd-link", "-a", "--pyc", "none"])
+    main.main()
+    (event,) = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    site = next((fake_venv / "lib").glob("python*/site-packages"))
+    assert event["op"] == "link"
+    assert event["path"] == str(site)
+    assert event["result"] == "ok"
+    assert event["elapsed"] > 0
+    assert {f["name"]: f["action"] for f in event["files"]} == {"uno.py": "linked", "unohelper.py": "linked"}
+
+    # default text output is unchanged
+    monkeypatch.setattr(sys, "argv", ["oooenv", "cmd-link", "-a", "--pyc", "none"])
+    main.main()
+    assert capsys.readouterr().out.strip() == "2 up to date"
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import sys
+import time
+import errno
+import asyncio
+import threading
+import subprocess
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Probes shell scripts")
+
+
+def _script(path: Path, body: str) -> Path:
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+def test_run_cache_and_stats(tmp_path: Path):
+    from oooenv.utils import probe
+
+    exe = _script(tmp_path / "python", 'echo "Python 3.8.16"')
+    first = probe.run([str(exe), "--version"], cache=True)
+    assert first.check().stdout == b"Python 3.8.16\n"
+    assert not first.cached
+    again = probe.run([str(exe), "--version"], cache=True)
+    assert again.cached and again.stdout == first.stdout
+    # other arguments are another probe
+    probe.run([str(exe), "-V"], cache=True)
+    assert probe.get_stats() == probe.ProbeStats(spawns=2, hits=1, retries=0, timeouts=0, failures=0)
+
+    # an upgraded executable is probed again
+    _script(exe, 'echo "Python 3.9.2"')
+    assert probe.run([str(exe), "--version"], cache=True).stdout == b"Python 3.9.2\n"
+
+    failing = _script(tmp_path / "failing", 'echo "no such module" >&2; exit 3')
+    result = probe.run([str(failing)], cache=True)
+    with pytest.raises(probe.ProbeError, match="no such module"):
+        result.check()
+    assert not probe.run([str(failing)], cache=True).cached
+    assert probe.get_stats().failures == 2
+
+
+def test_timeout(tmp_path: Path):
+    from oooenv.utils import probe
+
+    exe = _script(tmp_path / "hang", "exec sleep 5")
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        probe.run([str(exe)], timeout=0.2)
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(probe.run_async([str(exe)], timeout=0.2))
+    assert time.monotonic() - start < 3
+    assert probe.get_stats().timeouts == 2
+
+
+def test_retry_transient(tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import probe
+
+    exe = _script(tmp_path / "python", 'echo "Python 3.8.16"')
+    real_run = subprocess.run
+    calls = []
+
+    def busy_run(args, **kwargs):
+        calls.append(args)
+        if len(calls) < 3:
+            raise OSError(errno.ETXTBSY, "Text file busy")
+        return real_run(args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", busy_run)
+    result = probe.run([str(exe), "--version"], backoff=0.01)
+    assert result.attempts == 3
+    assert probe.get_stats().retries == 2
+
+    calls.clear()
+    with pytest.raises(OSError):
+        probe.run([str(exe), "--version"], retries=1, backoff=0.01)
+    assert len(calls) == 2
+
+
+def test_limit(tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import probe
+
+    running = tmp_path / "running"
+    running.mkdir()
+    # prints how many copies run at the same time
+    exe = _script(tmp_path / "slow", f'd=$(mktemp -d -p "{running}"); sleep 0.2; ls "{running}" | wc -l; rmdir "$d"')
+    monkeypatch.setattr(probe, "_LIMIT", probe._LIMIT)
+    monkeypatch.setattr(probe, "_SEMAPHORE", probe._SEMAPHORE)
+    probe.set_limit(2)
+    outs = []
+
+    def work():
+        outs.append(int(probe.run([str(exe)]).stdout))
+
+    async def work_async():
+        results = await asyncio.gather(*(probe.run_async([str(exe)]) for _ in range(3)))
+        outs.extend(int(r.stdout) for r in results)
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    threads.append(threading.Thread(target=asyncio.run, args=(work_async(),)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert len(outs) == 6
+    assert max(outs) <= 2
+
+
+def test_async_waits_for_thread_slot(tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import probe
+
+    exe = _script(tmp_path / "fast", "echo ok")
+    monkeypatch.setattr(probe, "_LIMIT", probe._LIMIT)
+    monkeypatch.setattr(probe, "_SEMAPHORE", probe._SEMAPHORE)
+    probe.set_limit(1)
+    semaphore = probe._SEMAPHORE
+    # a thread holds the only slot.
+    assert semaphore.acquire(timeout=1)
+
+    async def main():
+        # the first waits for the thread in an executor, the second behind it in the loop.
+        cancelled = asyncio.ensure_future(probe.run_async([str(exe)]))
+        waiting = asyncio.ensure_future(probe.run_async([str(exe)]))
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+        cancelled.cancel()
+        semaphore.release()
+        result = await asyncio.wait_for(waiting, 5)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return result
+
+    results = []
+    # a leaked slot would block an executor thread and with it the end of asyncio.run.
+    thread = threading.Thread(target=lambda: results.append(asyncio.run(main())), daemon=True)
+    thread.start()
+    thread.join(10)
+    if thread.is_alive():
+        semaphore.release()
+        thread.join(10)
+    assert [r.stdout for r in results] == [b"ok\n"]
+    # the cancelled waiter did not keep the slot.
+    assert semaphore.acquire(timeout=1)
+    semaphore.release()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Fake python is a shell script")
+
+
+@pytest.fixture()
+def fake_python(tmp_path: Path) -> Path:
+    exe = tmp_path / "python"
+    exe.write_text('#!/bin/sh\necho "Python 3.8.16"\n')
+    exe.chmod(0o755)
+    return exe
+
+
+def test_version_spawned_once(fake_python: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import py_version
+
+    assert py_version.get_version(str(fake_python)) == py_version.Version(3, 8, 16)
+    assert py_version.get_version(str(fake_python)) == py_version.Version(3, 8, 16)
+    assert py_version.get_spawn_count() == 1
+
+    # new process, memory cache is empty; disk cache still answers.
+    monkeypatch.setattr(py_version, "_MEM_CACHE", {})
+    monkeypatch.setattr(py_version, "_DISK_CACHE", py_version.DiskCache("py_version"))
+    assert py_version.get_version(str(fake_python)) == py_version.Version(3, 8, 16)
+    assert py_version.get_spawn_count() == 1
+
+
+def test_version_probed_again_after_upgrade(fake_python: Path):
+    from oooenv.utils import py_version
+
+    assert str(py_version.get_version(str(fake_python))) == "3.8.16"
+    fake_python.write_text('#!/bin/sh\necho "Python 3.9.2"\n')
+    st = fake_python.stat()
+    os.utime(fake_python, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert str(py_version.get_version(str(fake_python))) == "3.9.2"
+    assert py_version.get_spawn_count() == 2
+
+
+def test_update_spawns_once(fake_python: Path, config_uno, monkeypatch: MonkeyPatch):
+    from oooenv.cmds import manage_env_cfg
+    from oooenv.cmds import updater
+    from oooenv.utils import py_version
+
+    monkeypatch.setattr(manage_env_cfg, "get_uno_python_exe", lambda: str(fake_python))
+    monkeypatch.setattr(manage_env_cfg, "read_pyvenv_cfg", lambda fnm: config_uno("3.8.12"))
+    monkeypatch.setattr(manage_env_cfg, "save_config", lambda cfg, fnm="pyvenv.cfg": None)
+
+    assert updater.needs_updating()
+    updater.update_cfg()
+    assert py_version.get_spawn_count() == 1
+
+
+def test_version_from_install(fake_lo_install: Path):
+    from oooenv.utils import py_version
+
+    program = fake_lo_install / "program"
+    info = py_version.read_install_info(program)
+    assert info.python_core == (py_version.Version(3, 8, 16),)
+    assert info.python_lib == ((3, 8),)
+    assert info.product == "7.6"
+    assert info.build_id == "e19e193f88cd6c0525a17fb7a176ed8e6a3e2aa1"
+
+    ver = py_version.resolve_version(program, str(program / "python"))
+    assert ver == py_version.Version(3, 8, 16)
+    assert py_version.get_spawn_count() == 0
+
+
+def test_version_spawns_when_install_disagrees(fake_lo_install: Path):
+    from oooenv.utils import py_version
+
+    program = fake_lo_install / "program"
+    (program / "libpython3.9.so.1.0").write_bytes(b"")
+    assert py_version.get_version_from_install(program) is None
+    assert py_version.resolve_version(program, str(program / "python")) == py_version.Version(3, 8, 16)
+    assert py_version.get_spawn_count() == 1
+
+
+def test_version_spawns_without_python_core(fake_lo_install: Path):
+    from oooenv.utils import py_version
+
+    program = fake_lo_install / "program"
+    (program / "python-core-3.8.16" / "lib").rmdir()
+    (program / "python-core-3.8.16").rmdir()
+    assert py_version.get_version_from_install(program) is None
+    assert py_version.resolve_version(program, str(program / "python")) == py_version.Version(3, 8, 16)
+    assert py_version.get_spawn_count() == 1
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+_CFG_TEXT = """# created by hand
+home = /usr/bin
+include-system-site-packages = false  # keep isolated
+
+version = 3.11.7
+prompt = a=b
+"""
+
+
+def test_round_trip():
+    from oooenv.utils.pyvenv_config import PyvenvConfig
+
+    cfg = PyvenvConfig.parse(_CFG_TEXT)
+    assert cfg.to_text() == _CFG_TEXT
+    assert cfg["prompt"] == "a=b"
+    assert cfg["include-system-site-packages"] == "false"
+    assert list(cfg) == ["home", "include-system-site-packages", "version", "prompt"]
+
+
+def test_assign_keeps_comments_and_order():
+    from oooenv.utils.pyvenv_config import PyvenvConfig
+
+    cfg = PyvenvConfig.parse(_CFG_TEXT)
+    values = cfg.to_dict()
+    del values["version"]
+    values["include-system-site-packages"] = "true"
+    values["implementation"] = "CPython"
+    cfg.assign(values)
+    assert cfg.to_text() == (
+        "# created by hand\n"
+        "home = /usr/bin\n"
+        "include-system-site-packages = true  # keep isolated\n"
+        "\n"
+        "prompt = a=b\n"
+        "implementation = CPython\n"
+    )
+
+
+def test_changed_line_keeps_spacing():
+    from oooenv.utils.pyvenv_config import PyvenvConfig
+
+    cfg = PyvenvConfig.parse("home=/usr/bin\nversion =  3.11.7    # keep\nprompt = \nempty =\n")
+    cfg["home"] = "/opt/libreoffice/program"
+    cfg["version"] = "3.8.16"
+    cfg["prompt"] = "uno"
+    cfg["empty"] = ""
+    cfg["new"] = "1"
+    assert cfg.to_text() == (
+        "home=/opt/libreoffice/program\nversion =  3.8.16    # keep\nprompt = uno\nempty =\nnew = 1\n"
+    )
+
+
+def test_load_parses_once(tmp_path: Path):
+    from oooenv.utils import pyvenv_config
+
+    fnm = tmp_path / "pyvenv.cfg"
+    fnm.write_text(_CFG_TEXT)
+    first = pyvenv_config.load(fnm)
+    first["home"] = "/changed"
+    second = pyvenv_config.load(fnm)
+    assert second["home"] == "/usr/bin"
+    assert pyvenv_config.get_parse_count() == 1
+
+    pyvenv_config.save(fnm, first)
+    assert pyvenv_config.load(fnm)["home"] == "/changed"
+    assert pyvenv_config.get_parse_count() == 1
+
+    fnm.write_text("home = /other\nextra = 1\n")
+    st = fnm.stat()
+    os.utime(fnm, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert pyvenv_config.load(fnm)["home"] == "/other"
+    assert pyvenv_config.get_parse_count() == 2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+def test_update_parses_each_file_once(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.cmds import manage_env_cfg, updater
+    from oooenv.utils import pyvenv_config
+
+    program = fake_lo_install / "program"
+    (fake_venv / "pyvenv_uno.cfg").write_text(
+        f"# uno profile\nhome = {program}\nversion_info = 3.8.12.final.0\n"
+        f"base-prefix = {program}/python-core-3.8.12\n"
+    )
+    monkeypatch.setattr(manage_env_cfg, "get_uno_python_exe", lambda: str(program / "python"))
+
+    assert updater.needs_updating()
+    updater.update_cfg()
+    assert pyvenv_config.get_parse_count() == 1
+    text = (fake_venv / "pyvenv_uno.cfg").read_text()
+    assert text.startswith("# uno profile\n")
+    assert "version_info = 3.8.16.final.0" in text
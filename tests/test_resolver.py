@@ -0,0 +1,124 @@
+from __future__ import annotations
+import sys
+import threading
+import time
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+_THREADS = 64
+
+
+def _run_threads(target) -> list:
+    barrier = threading.Barrier(_THREADS)
+    results = [None] * _THREADS
+
+    def worker(i: int) -> None:
+        barrier.wait()
+        try:
+            results[i] = target()
+        except BaseException as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(_THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_single_flight():
+    from oooenv.utils.resolver import PathResolver
+
+    resolver = PathResolver()
+    calls = []
+
+    def probe():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = _run_threads(lambda: resolver.get("key", probe))
+    assert len(calls) == 1
+    assert resolver.get_probe_count("key") == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_single_flight_error_shared():
+    from oooenv.utils.resolver import PathResolver
+
+    resolver = PathResolver()
+    calls = []
+
+    def probe():
+        calls.append(1)
+        time.sleep(0.05)
+        raise FileNotFoundError("not here")
+
+    results = _run_threads(lambda: resolver.get("key", probe))
+    assert len(calls) == 1
+    assert all(isinstance(r, FileNotFoundError) for r in results)
+    # errors are not memoized
+    assert resolver.get("key", lambda: 1) == 1
+
+
+def test_clears_on_override_change(monkeypatch: MonkeyPatch):
+    from oooenv.utils.resolver import PathResolver
+
+    resolver = PathResolver()
+    assert resolver.get("key", lambda: 1) == 1
+    assert resolver.get("key", lambda: 2) == 1
+    monkeypatch.setenv("OOOENV_LO_UNO_PATH", "/somewhere")
+    assert resolver.get("key", lambda: 3) == 3
+
+
+def test_override_change_during_probe(monkeypatch: MonkeyPatch):
+    from oooenv.utils.resolver import PathResolver
+
+    resolver = PathResolver()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_probe():
+        started.set()
+        release.wait(5)
+        return "old-env-value"
+
+    first = []
+    t = threading.Thread(target=lambda: first.append(resolver.get("k", slow_probe)))
+    t.start()
+    assert started.wait(5)
+    monkeypatch.setenv("OOOENV_X", "1")
+    try:
+        # the probe in flight saw the old environment, it is not joined.
+        assert resolver.get("k", lambda: "new-env-value") == "new-env-value"
+    finally:
+        release.set()
+        t.join(5)
+    assert first == ["old-env-value"]
+    assert resolver.get("k", lambda: "other") == "new-env-value"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+def test_discovery_probed_once(fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import uno_paths, resolver
+
+    monkeypatch.setenv("OOOENV_NO_CACHE", "1")
+    probes = []
+    real_probe = uno_paths._probe_lo_path
+
+    def slow_probe():
+        probes.append(1)
+        time.sleep(0.05)
+        return real_probe()
+
+    monkeypatch.setattr(uno_paths, "_probe_lo_path", slow_probe)
+    results = _run_threads(uno_paths.get_lo_path)
+    assert len(probes) == 1
+    assert resolver.get_resolver().get_probe_count("lo_path") == 1
+    assert all(r == fake_lo_install / "program" for r in results)
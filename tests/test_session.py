@@ -0,0 +1,119 @@
+from __future__ import annotations
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+def test_explicit_paths_skip_discovery(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv.session import OooEnv
+    from oooenv.utils import resolver
+
+    # nothing on PATH and no active venv, only the paths passed in are used.
+    monkeypatch.setenv("PATH", "")
+    monkeypatch.delenv("VIRTUAL_ENV")
+    env = OooEnv(venv_path=fake_venv, lo_install=fake_lo_install)
+    assert env.site_packages == _site_packages(fake_venv)
+    assert env.lo_program_path == fake_lo_install / "program"
+    assert env.uno_path == fake_lo_install / "program"
+    assert str(env.lo_python_version) == "3.8.16"
+    assert resolver.get_resolver().get_probe_count("uno_path") == 0
+
+
+def test_link_unlink_results(fake_venv: Path, fake_lo_install: Path, capsys):
+    from oooenv.session import OooEnv
+
+    env = OooEnv()
+    site = _site_packages(fake_venv)
+    result = env.link()
+    assert result.ok
+    assert result.site_packages == site
+    assert [(f.name, f.action) for f in result.files] == [("uno.py", "linked"), ("unohelper.py", "linked")]
+    assert (site / "uno.py").is_symlink()
+
+    again = env.link()
+    assert [f.action for f in again.files] == ["exists", "exists"]
+
+    removed = env.unlink()
+    assert [f.action for f in removed.files] == ["removed", "removed"]
+    assert not (site / "uno.py").exists()
+    assert [f.action for f in env.unlink().files] == ["absent", "absent"]
+    # results never print
+    assert capsys.readouterr().out == ""
+
+
+def test_toggle_creates_profiles(fake_venv: Path, fake_lo_install: Path, capsys):
+    from oooenv.session import OooEnv
+
+    program = fake_lo_install / "program"
+    env = OooEnv(venv_path=fake_venv, lo_install=fake_lo_install)
+    assert not env.is_uno()
+
+    result = env.toggle(mode="replace")
+    assert result.ok and result.target == "uno" and result.profile == "pyvenv_uno.cfg"
+    assert {p.name for p in result.saved} == {"pyvenv_orig.cfg", "pyvenv_uno.cfg"}
+    assert env.is_uno()
+    cfg = env.load_cfg()
+    assert cfg["home"] == str(program)
+    assert cfg["version_info"] == "3.8.16.final.0"
+    assert cfg["base-prefix"] == str(program / "python-core-3.8.16")
+    assert "version" not in cfg
+
+    result = env.toggle(mode="replace")
+    assert result.target == "orig" and result.saved == ()
+    assert not env.is_uno()
+
+    missing = env.toggle(suffix="missing")
+    assert not missing.ok
+    assert missing.messages[-1] == "No action taken"
+    assert capsys.readouterr().out == ""
+
+
+def test_update(fake_venv: Path, fake_lo_install: Path):
+    from oooenv.session import OooEnv
+    from oooenv.utils import py_version
+
+    program = fake_lo_install / "program"
+    (fake_venv / "pyvenv_uno.cfg").write_text(
+        f"home = {program}\nversion_info = 3.8.12.final.0\nbase-prefix = {program}/python-core-3.8.12\n"
+    )
+    env = OooEnv(venv_path=fake_venv, lo_install=fake_lo_install)
+    env.switch("pyvenv_uno.cfg", mode="replace")
+    assert env.needs_update()
+
+    result = env.update(mode="replace")
+    assert result.updated and result.reactivated
+    assert str(result.old_version) == "3.8.12"
+    assert str(result.new_version) == "3.8.16"
+    assert env.load_cfg()["version_info"] == "3.8.16.final.0"
+    assert not env.needs_update()
+    assert env.update().messages == ("No Update Needed",)
+    assert py_version.get_spawn_count() == 0
+
+
+def test_pip_e(fake_venv: Path):
+    from oooenv.session import OooEnv
+
+    result = OooEnv(venv_path=fake_venv).pip_e()
+    assert result.ok
+    assert result.root == fake_venv.parent
+    assert result.pth_file.read_text() == str(fake_venv.parent)
+
+
+def test_legacy_wrappers_print(fake_venv: Path, fake_lo_install: Path, capsys):
+    from oooenv.cmds import uno_lnk
+
+    uno_lnk.add_links()
+    assert "Created system link:" in capsys.readouterr().out
+    uno_lnk.remove_links()
+    assert capsys.readouterr().out == "removed uno.py\nremoved unohelper.py\n2 removed\n"
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import json
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+
+@pytest.fixture()
+def timings_on():
+    from oooenv.utils import timings
+
+    timings.reset()
+    timings.enable()
+    yield timings
+    timings.enable(False)
+    timings.reset()
+
+
+def test_disabled_records_nothing():
+    from oooenv.utils import timings
+
+    timings.reset()
+    with timings.span("outer"):
+        with timings.span("inner"):
+            pass
+    assert timings.get_spans() == []
+
+
+def test_span_tree(timings_on):
+    timings = timings_on
+
+    @timings.timed("decorated")
+    def work():
+        with timings.span("inner", file="x"):
+            pass
+
+    with timings.span("outer"):
+        work()
+        work()
+    spans = timings.get_spans()
+    assert [s.name for s in spans] == ["outer"]
+    assert [c.name for c in spans[0].children] == ["decorated", "decorated"]
+    assert spans[0].children[0].children[0].attrs == {"file": "x"}
+    tree = timings.render_tree()
+    assert tree.splitlines()[2].startswith("    inner ")
+    data = json.loads(timings.to_json())
+    assert data["spans"][0]["children"][1]["children"][0]["name"] == "inner"
+
+
+def test_span_records_error(timings_on):
+    timings = timings_on
+    with pytest.raises(ValueError):
+        with timings.span("failing"):
+            raise ValueError()
+    assert timings.get_spans()[0].attrs == {"error": "ValueError"}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="cmd-link is not available on Windows")
+def test_cli_timings_json(fake_venv: Path, fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.cli import main
+    from oooenv.utils import timings
+
+    out = tmp_path / "timings.json"
+    prof = tmp_path / "out.prof"
+    argv = ["oooenv", "--timings-json", str(out), "--profile", str(prof), "cmd-link", "--add"]
+    monkeypatch.setattr(sys, "argv", argv)
+    try:
+        assert main.main() == 0
+    finally:
+        timings.enable(False)
+        timings.reset()
+    data = json.loads(out.read_text())
+    root = data["spans"][0]
+    assert root["name"] == "cli.cmd-link"
+    names = set()
+
+    def collect(node):
+        names.add(node["name"])
+        for child in node.get("children", []):
+            collect(child)
+
+    collect(root)
+    assert {"session.link", "uno_paths.discover.uno_path", "link_store.place"} <= names
+    assert prof.stat().st_size > 0
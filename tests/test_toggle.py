@@ -0,0 +1,74 @@
+from __future__ import annotations
+import os
+import sys
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+@pytest.fixture()
+def uno_venv(fake_venv: Path, fake_lo_install: Path) -> Path:
+    program = fake_lo_install / "program"
+    (fake_venv / "pyvenv_uno.cfg").write_text(
+        f"home = {program}\nimplementation = CPython\nversion_info = 3.8.16.final.0\n"
+        f"include-system-site-packages = false\nbase-prefix = {program}/python-core-3.8.16\n"
+    )
+    return fake_venv
+
+
+@pytest.mark.parametrize("mode", ["symlink", "replace", "copy"])
+def test_toggle_round_trip(uno_venv: Path, mode: str, capsys):
+    from oooenv.cmds import manage_env_cfg
+
+    orig_text = (uno_venv / "pyvenv.cfg").read_text()
+    uno_text = (uno_venv / "pyvenv_uno.cfg").read_text()
+
+    manage_env_cfg.toggle_cfg(mode=mode)
+    assert (uno_venv / "pyvenv.cfg").read_text() == uno_text
+    assert (uno_venv / "pyvenv.cfg").is_symlink() == (mode == "symlink")
+    assert manage_env_cfg.is_env_uno_python()
+    assert "Set to UNO Environment (" in capsys.readouterr().out
+
+    manage_env_cfg.toggle_cfg(mode=mode)
+    assert not manage_env_cfg.is_env_uno_python()
+    assert manage_env_cfg.read_pyvenv_cfg() == manage_env_cfg.read_pyvenv_cfg("pyvenv_orig.cfg")
+    assert "Set to Original Environment (" in capsys.readouterr().out
+    assert [p.name for p in uno_venv.iterdir() if p.name.endswith(".tmp")] == []
+    assert orig_text.splitlines()[0] == (uno_venv / "pyvenv.cfg").read_text().splitlines()[0]
+
+
+def test_switch_failure_leaves_cfg_intact(uno_venv: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import local_paths
+
+    before = (uno_venv / "pyvenv.cfg").read_text()
+
+    def failing_replace(src, dst):
+        raise OSError("simulated crash")
+
+    monkeypatch.setattr(local_paths.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        local_paths.switch_file(uno_venv / "pyvenv_uno.cfg", uno_venv / "pyvenv.cfg", mode="replace")
+    with pytest.raises(OSError):
+        local_paths.switch_file(uno_venv / "pyvenv_uno.cfg", uno_venv / "pyvenv.cfg", mode="symlink")
+    assert (uno_venv / "pyvenv.cfg").read_text() == before
+    assert [p.name for p in uno_venv.iterdir() if p.name.endswith(".tmp")] == []
+
+
+def test_custom_env(uno_venv: Path, capsys):
+    from oooenv.cmds import manage_env_cfg
+
+    (uno_venv / "pyvenv_myenv.cfg").write_text("home = /opt/python\n")
+    manage_env_cfg.toggle_cfg(suffix="myenv")
+    assert manage_env_cfg.read_pyvenv_cfg() == {"home": "/opt/python"}
+    assert "Set to myenv environment." in capsys.readouterr().out
+
+    manage_env_cfg.toggle_cfg(suffix="missing")
+    out = capsys.readouterr().out
+    assert "pyvenv_missing.cfg" in out
+    assert "No action taken" in out
@@ -0,0 +1,90 @@
+from __future__ import annotations
+import os
+import sys
+import json
+import subprocess
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+_ROOT = Path(__file__).parent.parent
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+def _run_with_site(site: Path, code: str) -> dict:
+    # site.addsitedir processes .pth files the same way as interpreter start up does for a venv.
+    script = f"import site, sys, json; site.addsitedir({str(site)!r})\n{code}"
+    env = dict(os.environ, PYTHONPATH=str(_ROOT))
+    out = subprocess.check_output([sys.executable, "-c", script], env=env)
+    return json.loads(out)
+
+
+def test_finder_only_maps_listed_names(tmp_path: Path):
+    from oooenv import uno_finder
+
+    lo = tmp_path / "lo"
+    lo.mkdir()
+    (lo / "uno.py").write_text("VALUE = 'lo'\n")
+    (lo / "other.py").write_text("VALUE = 'other'\n")
+    finder = uno_finder.UnoFinder([str(lo)], ["uno"])
+    assert finder.find_spec("uno").origin == str(lo / "uno.py")
+    assert finder.find_spec("other") is None
+    assert finder.find_spec("uno", path=[str(lo)]) is None
+    line = uno_finder.get_pth_line([str(lo)], ["uno"])
+    assert line.count("\n") == 1 and line.endswith("\n")
+
+
+def test_finder_mode(fake_venv: Path, fake_lo_install: Path):
+    from oooenv.session import OooEnv
+
+    program = fake_lo_install / "program"
+    site = _site_packages(fake_venv)
+    env = OooEnv()
+    env.link()
+    assert (site / "uno.py").is_symlink()
+
+    result = env.link(mode="finder")
+    assert result.ok
+    assert [(f.name, f.action) for f in result.files] == [
+        ("oooenv_uno.pth", "linked"),
+        ("uno.py", "removed"),
+        ("unohelper.py", "removed"),
+    ]
+    assert sorted(p.name for p in site.iterdir()) == ["__pycache__", "oooenv_uno.pth"]
+    assert env.link(mode="finder").messages == ("1 up to date",)
+
+    info = _run_with_site(
+        site,
+        "import uno, unohelper\n"
+        "print(json.dumps({'uno': uno.__file__, 'helper': unohelper.__file__, 'path': sys.path}))",
+    )
+    assert info["uno"] == str(program / "uno.py")
+    assert info["helper"] == str(program / "unohelper.py")
+    assert str(program) not in info["path"]
+
+    # back to links
+    result = env.link()
+    assert [f.action for f in result.files] == ["linked", "linked", "removed"]
+    assert not (site / "oooenv_uno.pth").exists()
+
+
+def test_cli_finder_and_remove(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+
+    site = _site_packages(fake_venv)
+    monkeypatch.setattr(sys, "argv", ["oooenv", "cmd-link", "--add", "--mode", "finder"])
+    main.main()
+    assert "Created import finder" in capsys.readouterr().out
+    monkeypatch.setattr(sys, "argv", ["oooenv", "cmd-link", "--remove"])
+    main.main()
+    assert capsys.readouterr().out.splitlines()[-1] == "2 not present, 1 removed"
+    assert list(site.iterdir()) == []
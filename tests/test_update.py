@@ -63,3 +63,94 @@ def test_update_cfg(config_uno, monkeypatch: MonkeyPatch):
     monkeypatch.setattr(manage_env_cfg, "save_config", mock_save_config)
 
     updater.update_cfg()
+
+
+def test_save_config_prints_nothing(fake_venv, capsys):
+    from oooenv.cmds import manage_env_cfg
+
+    cfg = manage_env_cfg.load_pyvenv_cfg()
+    cfg["prompt"] = "uno"
+    assert manage_env_cfg.save_config(cfg) == fake_venv / "pyvenv.cfg"
+    assert "prompt = uno" in (fake_venv / "pyvenv.cfg").read_text()
+    assert capsys.readouterr().out == ""
+
+
+def test_rewrite_version_only_version_keys(config_uno):
+    from oooenv.cmds import updater
+    from oooenv.utils.py_version import Version
+
+    cfg = config_uno("3.8.1")
+    cfg["home"] = "C:\\LibreOffice-3.8.1\\program"
+    cfg["base-exec-prefix"] = "C:\\Program Files\\LibreOffice\\program\\python-core-3.8.16"
+    changes = updater.rewrite_version(cfg, Version(3, 8, 1), Version(3, 8, 18))
+    assert sorted(changes) == ["base-prefix", "version_info"]
+    assert cfg["version_info"] == "3.8.18.final.0"
+    assert cfg["base-prefix"].endswith("python-core-3.8.18")
+    # 3.8.16 is another version and home is not a version key
+    assert cfg["base-exec-prefix"].endswith("python-core-3.8.16")
+    assert cfg["home"] == "C:\\LibreOffice-3.8.1\\program"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+def test_update_all_profiles(fake_venv, fake_lo_install):
+    from oooenv.session import OooEnv
+    from oooenv.utils import py_version
+
+    program = fake_lo_install / "program"
+    old = (
+        f"home = {program}\nimplementation = CPython\nversion_info = 3.8.12.final.0  # keep\n"
+        f"base-prefix = {program}/python-core-3.8.12\nbase-exec-prefix = {program}/python-core-3.8.12\n"
+    )
+    orig = "home = /usr/bin\nversion = 3.11.7\n"
+    (fake_venv / "pyvenv_uno.cfg").write_text(old)
+    (fake_venv / "pyvenv_work.cfg").write_text(old)
+    (fake_venv / "pyvenv_orig.cfg").write_text(orig)
+    (fake_venv / "pyvenv.cfg").write_text(old)
+
+    dry = OooEnv().update_all(dry_run=True)
+    assert [p.cfg_file.name for p in dry.updated] == ["pyvenv_uno.cfg", "pyvenv_work.cfg"]
+    assert dry.messages[-2:] == (
+        "pyvenv.cfg: would switch to pyvenv_uno.cfg",
+        "Would update 2 of 4 profiles to python 3.8.16",
+    )
+    assert (fake_venv / "pyvenv_uno.cfg").read_text() == old
+
+    spawns = py_version.get_spawn_count()
+    result = OooEnv().update_all(mode="replace")
+    assert py_version.get_spawn_count() - spawns <= 1
+    assert result.reactivated
+    uno = (fake_venv / "pyvenv_uno.cfg").read_text()
+    assert "version_info = 3.8.16.final.0  # keep" in uno
+    assert "python-core-3.8.16" in uno and "3.8.12" not in uno
+    assert (fake_venv / "pyvenv.cfg").read_text() == uno
+    assert (fake_venv / "pyvenv_orig.cfg").read_text() == orig
+    assert result.profiles[0].messages == ("pyvenv_orig.cfg: not a LibreOffice profile",)
+    assert result.profiles[1].messages[:3] == (
+        "pyvenv_uno.cfg: 3.8.12 -> 3.8.16",
+        "  - version_info = 3.8.12.final.0",
+        "  + version_info = 3.8.16.final.0",
+    )
+    again = OooEnv().update_all()
+    assert again.updated == () and not again.reactivated
+
+
+def test_update_all_streams_profiles(fake_venv, fake_lo_install):
+    from oooenv.session import OooEnv
+
+    program = fake_lo_install / "program"
+    old = f"home = {program}\nversion_info = 3.8.12.final.0\n"
+    for name in ("pyvenv_a.cfg", "pyvenv_b.cfg"):
+        (fake_venv / name).write_text(old)
+    seen = []
+
+    def on_profile(profile):
+        # each profile is reported once it is saved, before the next one is read.
+        texts = {n: (fake_venv / n).read_text() for n in ("pyvenv_a.cfg", "pyvenv_b.cfg")}
+        seen.append((profile.cfg_file.name, profile.elapsed, texts))
+
+    result = OooEnv().update_all(on_profile=on_profile)
+    assert [p.cfg_file.name for p in result.profiles] == ["pyvenv_a.cfg", "pyvenv_b.cfg"]
+    assert [s[0] for s in seen] == ["pyvenv_a.cfg", "pyvenv_b.cfg"]
+    assert "3.8.16" in seen[0][2]["pyvenv_a.cfg"] and seen[0][2]["pyvenv_b.cfg"] == old
+    assert all(s[1] > 0 for s in seen)
+    assert tuple(p.elapsed for p in result.profiles) == tuple(s[1] for s in seen)
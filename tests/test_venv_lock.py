@@ -0,0 +1,153 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import threading
+import subprocess
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+_HOLD = """
+import sys, time
+from oooenv.utils import venv_lock
+venv_lock._BACKEND = sys.argv[4]
+with venv_lock.lock(sys.argv[1], exclusive=sys.argv[2] == "x"):
+    print("held", flush=True)
+    time.sleep(float(sys.argv[3]))
+"""
+
+
+def _hold(venv: Path, mode: str, seconds: float, backend: str = "flock") -> subprocess.Popen:
+    args = [sys.executable, "-c", _HOLD, str(venv), mode, str(seconds), backend]
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE)
+    assert proc.stdout is not None
+    assert proc.stdout.readline().strip() == b"held"
+    return proc
+
+
+@pytest.mark.parametrize("backend", ["flock", "lockfile"])
+def test_lock_across_processes(tmp_path: Path, backend: str, monkeypatch: MonkeyPatch):
+    from oooenv.utils import venv_lock
+
+    monkeypatch.setattr(venv_lock, "_BACKEND", backend)
+    proc = _hold(tmp_path, "x", 1.0, backend)
+    start = time.monotonic()
+    with pytest.raises(venv_lock.VenvLockTimeout):
+        with venv_lock.shared(tmp_path, timeout=0.2):
+            pass
+    assert time.monotonic() - start < 0.9
+    with venv_lock.exclusive(tmp_path, timeout=10):
+        waited = time.monotonic() - start
+    assert waited > 0.5
+    proc.wait()
+
+
+def test_shared_locks_coexist(tmp_path: Path):
+    from oooenv.utils import venv_lock
+
+    proc = _hold(tmp_path, "s", 1.0)
+    with venv_lock.shared(tmp_path, timeout=0.2):
+        pass
+    with pytest.raises(venv_lock.VenvLockTimeout):
+        with venv_lock.exclusive(tmp_path, timeout=0.2):
+            pass
+    proc.wait()
+
+
+def test_stale_lock_file(tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv.utils import venv_lock
+
+    monkeypatch.setattr(venv_lock, "_BACKEND", "lockfile")
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    pid_file = Path(venv_lock.get_lock_file(tmp_path) + ".pid")
+    pid_file.write_text(str(dead.pid))
+    with venv_lock.exclusive(tmp_path, timeout=0.5):
+        assert pid_file.read_text() == str(os.getpid())
+    assert not pid_file.exists()
+
+
+def test_reentrant_and_threads(tmp_path: Path):
+    from oooenv.utils import venv_lock
+
+    with venv_lock.exclusive(tmp_path):
+        with venv_lock.shared(tmp_path), venv_lock.exclusive(tmp_path):
+            pass
+        errors = []
+
+        def other() -> None:
+            try:
+                with venv_lock.shared(tmp_path, timeout=0.1):
+                    pass
+            except venv_lock.VenvLockTimeout as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+        assert len(errors) == 1
+    with venv_lock.shared(tmp_path):
+        with pytest.raises(RuntimeError):
+            with venv_lock.exclusive(tmp_path):
+                pass
+    # missing virtual environment is not locked.
+    with venv_lock.exclusive(tmp_path / "missing"):
+        pass
+
+
+def test_threads_wait_with_timeout(tmp_path: Path):
+    from oooenv.utils import venv_lock
+
+    proc = _hold(tmp_path, "x", 2.0)
+
+    def wait() -> None:
+        with venv_lock.exclusive(tmp_path, timeout=10):
+            pass
+
+    # this thread polls the lock of the other process.
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    with pytest.raises(venv_lock.VenvLockTimeout):
+        with venv_lock.shared(tmp_path, timeout=0.2):
+            pass
+    assert time.monotonic() - start < 0.6
+    waiter.join()
+    proc.wait()
+
+
+_TOGGLE = """
+import sys
+from oooenv.session import OooEnv
+for _ in range(int(sys.argv[1])):
+    OooEnv().toggle()
+"""
+
+
+def test_concurrent_toggle(fake_venv: Path, fake_lo_install: Path):
+    from oooenv.session import OooEnv
+    from oooenv.utils import pyvenv_config
+
+    env = OooEnv()
+    env.link(pyc="none")
+    original = (fake_venv / "pyvenv.cfg").read_text()
+    procs, times = 4, 5
+    children = [
+        subprocess.Popen([sys.executable, "-c", _TOGGLE, str(times)], stderr=subprocess.PIPE) for _ in range(procs)
+    ]
+    for child in children:
+        _, err = child.communicate(timeout=120)
+        assert child.returncode == 0, err.decode()
+    pyvenv_config.clear()
+    # an even number of toggles leaves the original configuration active, nothing lost or torn.
+    assert not OooEnv().is_uno()
+    assert (fake_venv / "pyvenv.cfg").read_text() == original
+    assert str(OooEnv().cfg_version("pyvenv_uno.cfg")) == "3.8.16"
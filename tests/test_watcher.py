@@ -0,0 +1,246 @@
+from __future__ import annotations
+import os
+import sys
+import threading
+import pytest
+from pathlib import Path
+from pytest import MonkeyPatch
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses unix soffice discovery")
+
+
+def _site_packages(venv: Path) -> Path:
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+@pytest.mark.parametrize("kind", ["polling", "inotify"])
+def test_backend_filters_parent_dir(tmp_path: Path, kind: str):
+    from oooenv import watcher
+    from oooenv.watcher import WatchTarget
+
+    if kind == "polling":
+        backend = watcher.PollingBackend(interval=0.02)
+    elif sys.platform.startswith("linux"):
+        backend = watcher.InotifyBackend()
+    else:
+        pytest.skip("inotify is only available on Linux")
+    install = tmp_path / "libreoffice7.6"
+    install.mkdir()
+    try:
+        backend.set_targets([WatchTarget(install), WatchTarget(tmp_path, ("libreoffice7.6", "libreoffice"))])
+        assert backend.wait(0.1) == []
+        (tmp_path / "unrelated").mkdir()
+        assert backend.wait(0.1) == []
+        (tmp_path / "libreoffice24.2").mkdir()
+        assert backend.wait(1.0) != []
+        (install / "versionrc").write_text("[Version]\n")
+        assert backend.wait(1.0) != []
+    finally:
+        backend.close()
+
+
+def test_repair_venv(fake_venv: Path, fake_lo_install: Path):
+    from oooenv import watcher
+
+    program = fake_lo_install / "program"
+    site = _site_packages(fake_venv)
+    # links left dangling by an upgrade that moved LibreOffice, and a profile for the old python.
+    os.symlink("/nonexistent/program/uno.py", site / "uno.py")
+    (fake_venv / "pyvenv_uno.cfg").write_text(
+        f"home = {program}\nversion_info = 3.8.12.final.0\nbase-prefix = {program}/python-core-3.8.12\n"
+    )
+    repair = watcher.repair_venv(fake_venv)
+    assert repair.error == ""
+    assert os.readlink(site / "uno.py") == str(program / "uno.py")
+    assert "version_info = 3.8.16.final.0" in (fake_venv / "pyvenv_uno.cfg").read_text()
+    assert "pyvenv_uno.cfg: 3.8.12 -> 3.8.16" in repair.messages
+
+    again = watcher.repair_venv(fake_venv)
+    assert again.messages == ()
+
+    # a venv without links does not get any
+    bare = fake_venv.parent / "bare"
+    (bare / "lib" / site.parent.name / "site-packages").mkdir(parents=True)
+    (bare / "pyvenv.cfg").write_text("home = /usr/bin\n")
+    assert watcher.repair_venv(bare).messages == ()
+    assert list((bare / "lib" / site.parent.name / "site-packages").iterdir()) == []
+
+
+@pytest.mark.parametrize("strategy", ["copy", "hardlink"])
+def test_repair_keeps_strategy(
+    fake_venv: Path, fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch, strategy: str
+):
+    from oooenv import watcher
+    from oooenv.session import OooEnv
+    from oooenv.utils import link_settings
+
+    monkeypatch.setenv("OOOENV_STORE_DIR", str(tmp_path / "store"))
+    program = fake_lo_install / "program"
+    site = _site_packages(fake_venv)
+    assert OooEnv(venv_path=fake_venv).link(strategy=strategy).ok
+    assert link_settings.load(fake_venv).strategy == strategy
+
+    # an upgrade changes the module
+    (program / "uno.py").write_text("# fake uno, upgraded\n")
+    repair = watcher.repair_venv(fake_venv)
+    assert repair.error == ""
+    assert not (site / "uno.py").is_symlink()
+    assert (site / "uno.py").read_text() == "# fake uno, upgraded\n"
+    assert ((site / "uno.py").stat().st_nlink > 1) == (strategy == "hardlink")
+
+    # linked before settings were recorded, the files tell. A copy can not be told from a file of another package.
+    link_settings.remove(fake_venv)
+    (program / "uno.py").write_text("# fake uno, upgraded again\n")
+    repair = watcher.repair_venv(fake_venv)
+    assert repair.error == ""
+    assert not (site / "uno.py").is_symlink()
+    if strategy == "copy":
+        assert repair.messages == ()
+        assert (site / "uno.py").read_text() == "# fake uno, upgraded\n"
+        return
+    assert (site / "uno.py").read_text() == "# fake uno, upgraded again\n"
+    assert link_settings.load(fake_venv).strategy == strategy
+
+    OooEnv(venv_path=fake_venv).unlink()
+    assert link_settings.load(fake_venv) is None
+
+
+def test_watch_repairs_after_burst(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch):
+    from oooenv import watcher
+    from oooenv.utils import venv_registry
+
+    program = fake_lo_install / "program"
+    site = _site_packages(fake_venv)
+    os.symlink("/nonexistent/program/uno.py", site / "uno.py")
+    venv_registry.add(fake_venv)
+
+    backend = watcher.PollingBackend(interval=0.02)
+    stop = threading.Event()
+    ready = threading.Event()
+    seen = []
+    events = []
+
+    def on_repair(changed, repairs):
+        seen.append(repairs)
+        stop.set()
+
+    thread = threading.Thread(
+        target=watcher.watch,
+        kwargs=dict(
+            backend=backend,
+            debounce=0.1,
+            on_repair=on_repair,
+            stop=stop,
+            on_ready=lambda _: ready.set(),
+            on_change=lambda changed, venvs: events.append(("change", venvs)),
+            on_venv=lambda repair: events.append(("venv", repair)),
+        ),
+    )
+    thread.start()
+    try:
+        assert ready.wait(5)
+        # an upgrade burst
+        for i in range(3):
+            (program / f"libnew{i}.so").write_bytes(b"")
+        thread.join(5)
+    finally:
+        stop.set()
+        backend.wake()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert len(seen) == 1
+    (repair,) = seen[0]
+    assert repair.venv == fake_venv
+    # each venv is reported as soon as it is repaired, after the burst was announced.
+    assert events == [("change", (fake_venv,)), ("venv", repair)]
+    assert os.readlink(site / "uno.py") == str(program / "uno.py")
+
+
+def test_watch_finds_late_install(fake_venv: Path, fake_lo_install: Path, tmp_path: Path, monkeypatch: MonkeyPatch):
+    from oooenv import watcher
+    from oooenv.utils import venv_registry
+
+    program = fake_lo_install / "program"
+    site = _site_packages(fake_venv)
+    os.symlink("/nonexistent/program/uno.py", site / "uno.py")
+    venv_registry.add(fake_venv)
+    # LibreOffice is not on PATH yet.
+    (tmp_path / "bin" / "soffice").unlink()
+    monkeypatch.setenv("OOOENV_LO_SEARCH_PATHS", str(tmp_path / "opt" / "libreoffice*"))
+    assert watcher.get_watch_targets() == ()
+    assert watcher.WatchTarget(tmp_path / "bin", ("soffice",)) in watcher.get_candidate_targets()
+    assert watcher.WatchTarget(tmp_path / "opt", ("libreoffice",)) in watcher.get_candidate_targets()
+
+    backend = watcher.PollingBackend(interval=0.02)
+    stop = threading.Event()
+    ready = []
+    seen = []
+
+    def on_ready(targets):
+        ready.append(targets)
+
+    def on_repair(changed, repairs):
+        seen.append(repairs)
+        stop.set()
+
+    thread = threading.Thread(
+        target=watcher.watch,
+        kwargs=dict(backend=backend, debounce=0.1, on_repair=on_repair, stop=stop, on_ready=on_ready),
+    )
+    thread.start()
+    try:
+        for _ in range(100):
+            if ready:
+                break
+            threading.Event().wait(0.02)
+        assert ready == [()]
+        os.symlink(program / "soffice", tmp_path / "bin" / "soffice")
+        thread.join(5)
+    finally:
+        stop.set()
+        backend.wake()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert len(ready) == 2 and fake_lo_install in {t.path for t in ready[1]}
+    assert [r.venv for r in seen[0]] == [fake_venv]
+    assert os.readlink(site / "uno.py") == str(program / "uno.py")
+
+
+def test_cli_registry(fake_venv: Path, monkeypatch: MonkeyPatch, capsys):
+    from oooenv.cli import main
+
+    for argv, out in (
+        (["--add"], f"Registered {fake_venv}"),
+        (["--add"], f"Already registered {fake_venv}"),
+        (["--list"], str(fake_venv)),
+        (["--remove", str(fake_venv)], f"Unregistered {fake_venv}"),
+        (["--list"], ""),
+    ):
+        monkeypatch.setattr(sys, "argv", ["oooenv", "watch", *argv])
+        main.main()
+        assert capsys.readouterr().out.strip() == out
+
+
+def test_cli_watch_ready_events(fake_venv: Path, fake_lo_install: Path, monkeypatch: MonkeyPatch, capsys):
+    import json
+    from oooenv import watcher
+    from oooenv.utils import output
+
+    def fake_watch(backend, on_ready, **kwargs):
+        on_ready(watcher.get_watch_targets())
+        on_ready(())
+
+    monkeypatch.setattr(watcher, "watch", fake_watch)
+    output.set_format("ndjson")
+    try:
+        watcher.main(poll=True)
+    finally:
+        output.close()
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [e["result"] for e in events[-2:]] == ["watching", "not-found"]
+    assert all("errors" not in e for e in events)
+    assert events[0]["message"] == f"Watching {events[0]['path']} (polling)"